@@ -1,15 +1,26 @@
+import io
 import os
 import csv
-from flask import Flask, render_template, redirect, url_for, request, flash, session, jsonify, send_from_directory, send_file
+from flask import Blueprint, Flask, current_app, g, render_template, redirect, url_for, request, flash, session, jsonify, send_from_directory, send_file
 from flask_sqlalchemy import SQLAlchemy
-from flask_mail import Mail, Message
+from flask_mail import Mail
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
-from werkzeug.security import generate_password_hash, check_password_hash
+from query_profiler import QueryProfiler
+from query_plans import QueryPlanRecorder
+from metrics import metrics
+from snapshot_cache import snapshot_cache
+from email_outbox import email_dispatcher, outbox_status
+from template_cache import template_cache
+from data_fixes import data_fix, batched_update, run_pending_fixes
+from password_hasher import password_hasher, PasswordHashingBusy
+from review_queue import queue_responses, record_reply, drop_responses, decode_cursor, queue_page
 from werkzeug.utils import secure_filename
-from functools import wraps
+from functools import wraps, lru_cache
 from datetime import datetime, timezone
 import hashlib
+import hmac
+import time
 
 # Try to import magic for MIME type detection, but make it optional
 try:
@@ -22,37 +33,7 @@ except ImportError:
 import secrets
 from datetime import timedelta
 
-app = Flask(__name__)
-app.secret_key = os.environ.get('SECRET_KEY', 'supersecretkey-change-in-production')
-
-# Import and setup template error handlers
-try:
-    from template_error_handler import setup_template_error_handlers, setup_custom_filters
-    setup_template_error_handlers(app)
-    setup_custom_filters(app)
-    print("✅ Template error handlers and custom filters loaded")
-except ImportError:
-    print("⚠️  Template error handler not found, using default error handling")
-
-# Security Configuration
-limiter = Limiter(
-    key_func=get_remote_address,
-    default_limits=["200 per day", "50 per hour"],
-    storage_uri="memory://"
-)
-limiter.init_app(app)
-
-# Database Configuration - Professional Setup
 basedir = os.path.abspath(os.path.dirname(__file__))
-app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{os.path.join(basedir, "instance", "securesphere.db")}'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
-    'pool_timeout': 20,
-    'pool_recycle': -1,
-    'pool_pre_ping': True
-}
-app.config['UPLOAD_FOLDER'] = os.path.join(basedir, 'static', 'uploads')
-app.config['MAX_CONTENT_LENGTH'] = 10 * 1024 * 1024  # 10MB max file size
 ALLOWED_EXTENSIONS = {'csv', 'txt', 'pdf', 'jpg', 'jpeg', 'png', 'doc', 'docx', 'xlsx', 'zip'}
 ALLOWED_MIME_TYPES = {
     'text/csv', 'text/plain', 'application/pdf', 'image/jpeg', 'image/png',
@@ -60,31 +41,115 @@ ALLOWED_MIME_TYPES = {
     'application/vnd.ms-excel', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
     'application/zip'
 }
+# The question catalog is addressed by content hash, so browsers may keep it for a year
+CATALOG_MAX_AGE = 365 * 24 * 3600
+
+# Extensions are created unbound and attached to each app in create_app()
+db = SQLAlchemy()
+mail = Mail()
+query_profiler = QueryProfiler()
+query_plan_recorder = QueryPlanRecorder()
+
+# Security Configuration
+# Counters live in a store shared by all worker processes (sqlite:// by default,
+# redis:// in larger deployments) so limits are not multiplied by the worker count
+import rate_limit_storage  # registers the sqlite:// rate limit storage scheme
+limiter = Limiter(
+    key_func=get_remote_address,
+    default_limits=["200 per day", "50 per hour"]
+)
+
+# Views, template filters and globals of this module; create_app() registers them
+bp = Blueprint('main', __name__)
+
 
-# Email Configuration
-app.config['MAIL_SERVER'] = os.environ.get('MAIL_SERVER', 'smtp.gmail.com')
-app.config['MAIL_PORT'] = int(os.environ.get('MAIL_PORT', 587))
-app.config['MAIL_USE_TLS'] = os.environ.get('MAIL_USE_TLS', 'True').lower() == 'true'
-app.config['MAIL_USE_SSL'] = os.environ.get('MAIL_USE_SSL', 'False').lower() == 'true'
-app.config['MAIL_USERNAME'] = os.environ.get('MAIL_USERNAME')
-app.config['MAIL_PASSWORD'] = os.environ.get('MAIL_PASSWORD')
-app.config['MAIL_DEFAULT_SENDER'] = os.environ.get('MAIL_DEFAULT_SENDER', 'noreply@securesphere.com')
+def create_app(test_config=None):
+    """
+    Application factory.
 
-# Ensure instance and upload directories exist
-os.makedirs(os.path.join(basedir, 'instance'), exist_ok=True)
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    Importing this module only defines models, helpers and views; configuration,
+    directory setup, extensions and template handlers are applied here so each
+    worker pays for them once, when it actually builds its app.
+    """
+    app = Flask(__name__)
+    app.secret_key = os.environ.get('SECRET_KEY', 'supersecretkey-change-in-production')
 
-db = SQLAlchemy(app)
-mail = Mail(app)
+    # Database Configuration - Professional Setup
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get(
+        'DATABASE_URL', f'sqlite:///{os.path.join(basedir, "instance", "securesphere.db")}'
+    )
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'pool_timeout': 20,
+        'pool_recycle': -1,
+        'pool_pre_ping': True
+    }
+    app.config['UPLOAD_FOLDER'] = os.path.join(basedir, 'static', 'uploads')
+    app.config['MAX_CONTENT_LENGTH'] = 10 * 1024 * 1024  # 10MB max file size
+
+    # Email Configuration
+    app.config['MAIL_SERVER'] = os.environ.get('MAIL_SERVER', 'smtp.gmail.com')
+    app.config['MAIL_PORT'] = int(os.environ.get('MAIL_PORT', 587))
+    app.config['MAIL_USE_TLS'] = os.environ.get('MAIL_USE_TLS', 'True').lower() == 'true'
+    app.config['MAIL_USE_SSL'] = os.environ.get('MAIL_USE_SSL', 'False').lower() == 'true'
+    app.config['MAIL_USERNAME'] = os.environ.get('MAIL_USERNAME')
+    app.config['MAIL_PASSWORD'] = os.environ.get('MAIL_PASSWORD')
+    app.config['MAIL_DEFAULT_SENDER'] = os.environ.get('MAIL_DEFAULT_SENDER', 'noreply@securesphere.com')
+
+    # Rate limit storage shared between workers
+    app.config['RATELIMIT_STORAGE_URI'] = os.environ.get(
+        'RATELIMIT_STORAGE_URI', f'sqlite:///{os.path.join(basedir, "instance", "ratelimit.db")}'
+    )
+    app.config['RATELIMIT_STRATEGY'] = os.environ.get('RATELIMIT_STRATEGY', 'sliding-window-counter')
+
+    # Seconds a user's accessible client ids are reused before being read again
+    app.config['ACL_CACHE_TTL'] = float(os.environ.get('ACL_CACHE_TTL', 60))
+    # Complete assessments (client + product) per page of the lead dashboard
+    app.config['LEAD_DASHBOARD_PAGE_SIZE'] = int(os.environ.get('LEAD_DASHBOARD_PAGE_SIZE', 10))
+    # Answers per page of the lead review queue
+    app.config['REVIEW_QUEUE_PAGE_SIZE'] = int(os.environ.get('REVIEW_QUEUE_PAGE_SIZE', 25))
+
+    if test_config:
+        app.config.update(test_config)
+
+    # Ensure instance and upload directories exist
+    os.makedirs(os.path.join(basedir, 'instance'), exist_ok=True)
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+
+    db.init_app(app)
+    mail.init_app(app)
+    limiter.init_app(app)
+    query_profiler.init_app(app)
+    query_plan_recorder.init_app(app)
+    # after_request hooks run in reverse order, so metrics reads the query
+    # profiler's per-request stats before the profiler clears them
+    metrics.init_app(app)
+    snapshot_cache.init_app(app)
+    email_dispatcher.init_app(app)
+    template_cache.init_app(app, catalog_version=get_catalog_version)
+    password_hasher.init_app(app)
+
+    # Import and setup template error handlers
+    try:
+        from template_error_handler import setup_template_error_handlers, setup_custom_filters
+        setup_template_error_handlers(app)
+        setup_custom_filters(app)
+        print("✅ Template error handlers and custom filters loaded")
+    except ImportError:
+        print("⚠️  Template error handler not found, using default error handling")
+
+    app.register_blueprint(bp)
+
+    return app
 
 # Custom Jinja2 filter for question numbering
-@app.template_filter('question_number')
+@bp.app_template_filter('question_number')
 def question_number_filter(question_text):
     """Get the question number for a given question text"""
     return get_question_number_from_csv(question_text)
 
 # Template global function for moment-like datetime formatting
-@app.template_global('moment')
+@bp.app_template_global('moment')
 def moment_function():
     """Provide moment-like functionality for templates"""
     class MomentLike:
@@ -110,6 +175,12 @@ def moment_function():
     
     return MomentLike()
 
+# Template global keying {% cache %} fragments to a product's answers and reviews
+@bp.app_template_global('data_version')
+def data_version_function(product_id):
+    """Current data version of a product, or None (render uncached) when versions are not tracked"""
+    return snapshot_cache.data_version(product_id)
+
 # ==================== DATABASE MODELS ====================
 
 class User(db.Model):
@@ -129,6 +200,14 @@ class User(db.Model):
     first_login = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     last_login = db.Column(db.DateTime)
+    # Bumped whenever the clients a lead may access change; cached ACLs of an older version are ignored
+    acl_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    __table_args__ = (
+        db.Index('idx_user_role_created', 'role', 'created_at'),
+        # Emails are stored as entered; bulk onboarding matches them case-insensitively
+        db.Index('idx_user_email_lower', db.text('lower(email)')),
+    )
 
     # Relationships
     products = db.relationship('Product', backref='owner', lazy=True, cascade='all, delete-orphan')
@@ -139,41 +218,58 @@ class User(db.Model):
     # Note: We'll define this after the table is created
     # assigned_clients will be added dynamically
     
+    def accessible_client_ids(self):
+        """Ids of the clients this user may access, None for all; cached per user for ACL_CACHE_TTL"""
+        if self.role == 'superuser':
+            return None
+        if self.role == 'client':
+            return (self.id,)
+        if self.role != 'lead':
+            return ()
+
+        key = (str(db.engine.url), self.id)
+        now = time.time()
+        cached = _acl_cache.get(key)
+        if cached and cached[0] == self.acl_version and cached[1] > now:
+            return cached[2]
+        # Old single assignment first (backward compatibility), then the many-to-many ones
+        ids = [self.assigned_client_id] if self.assigned_client_id else []
+        ids += [client_id for client_id in db.session.execute(
+            db.select(lead_client_association.c.client_id).where(lead_client_association.c.lead_id == self.id)
+        ).scalars() if client_id not in ids]
+        if len(_acl_cache) >= ACL_CACHE_SIZE:
+            _acl_cache.pop(next(iter(_acl_cache)), None)
+        _acl_cache[key] = (self.acl_version, now + current_app.config.get('ACL_CACHE_TTL', 60), tuple(ids))
+        return tuple(ids)
+
+    def invalidate_acl(self):
+        """Call when the clients this user may access change; takes effect in every worker on commit"""
+        self.acl_version = (self.acl_version or 0) + 1
+        _acl_cache.pop((str(db.engine.url), self.id), None)
+
     def can_access_client_data(self, client_id):
         """Check if this user can access data for a specific client"""
-        if self.role == 'superuser':
-            return True
-        elif self.role == 'lead':
-            # Check both old assignment (for backward compatibility) and new many-to-many
-            return (self.assigned_client_id == client_id or 
-                   self.assigned_clients.filter_by(id=client_id).first() is not None)
-        elif self.role == 'client':
-            return self.id == client_id
-        return False
+        ids = self.accessible_client_ids()
+        return ids is None or client_id in ids
     
     def get_accessible_clients(self):
         """Get list of clients this user can access"""
         if self.role == 'superuser':
             return User.query.filter_by(role='client', is_active=True).all()
         elif self.role == 'lead':
-            # Combine old assignment (for backward compatibility) and new many-to-many
-            clients = []
-            # Add old assignment client if exists
-            if self.assigned_client_id:
-                old_client = User.query.filter_by(id=self.assigned_client_id, role='client', is_active=True).first()
-                if old_client:
-                    clients.append(old_client)
-            # Add new assignment clients
-            new_clients = self.assigned_clients.filter_by(role='client', is_active=True).all()
-            # Combine and deduplicate
-            all_clients = {client.id: client for client in clients + new_clients}
-            return list(all_clients.values())
+            ids = self.accessible_client_ids()
+            if not ids:
+                return []
+            clients = {client.id: client for client in User.query.filter(
+                User.id.in_(ids), User.role == 'client', User.is_active.is_(True)
+            )}
+            return [clients[client_id] for client_id in ids if client_id in clients]
         elif self.role == 'client':
             return [self]
         return []
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
     
     def assign_client(self, client_id):
         """Assign a client to this lead user"""
@@ -182,6 +278,7 @@ class User(db.Model):
         client = User.query.filter_by(id=client_id, role='client').first()
         if client and client not in self.assigned_clients:
             self.assigned_clients.append(client)
+            self.invalidate_acl()
             return True
         return False
     
@@ -192,15 +289,26 @@ class User(db.Model):
         client = User.query.filter_by(id=client_id, role='client').first()
         if client and client in self.assigned_clients:
             self.assigned_clients.remove(client)
+            self.invalidate_acl()
             return True
         return False
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
     
     def __repr__(self):
         return f'<User {self.username}>'
 
+# (database url, user id) -> (acl_version, expires_at, accessible client ids)
+_acl_cache = {}
+ACL_CACHE_SIZE = 10000
+
+def get_current_user():
+    """The logged-in user, loaded once per request and kept on g.current_user"""
+    if 'current_user' not in g:
+        g.current_user = db.session.get(User, session['user_id']) if 'user_id' in session else None
+    return g.current_user
+
 # Association table for many-to-many relationship between leads and clients
 # Define after User class to avoid circular reference issues
 lead_client_association = db.Table('lead_client_associations',
@@ -269,7 +377,7 @@ class Product(db.Model):
     cicd_platform = db.Column(db.String(100), nullable=True)
     additional_details = db.Column(db.Text)
     
-    owner_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    owner_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
     is_active = db.Column(db.Boolean, default=True)
@@ -319,14 +427,51 @@ class ProductStatus(db.Model):
     questions_completed = db.Column(db.Integer, default=0)
     total_questions = db.Column(db.Integer, default=0)
     completion_percentage = db.Column(db.Float, default=0.0)
+    is_complete = db.Column(db.Boolean, nullable=False, default=False)  # Every section has an answer
     last_updated = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
-    # Composite index for better performance
-    __table_args__ = (db.Index('idx_product_user', 'product_id', 'user_id'),)
+    # Composite indexes for better performance; the second pages the lead dashboard
+    __table_args__ = (
+        db.Index('idx_product_user', 'product_id', 'user_id'),
+        db.Index('idx_status_user_product_complete', 'user_id', 'product_id', 'is_complete'),
+    )
 
     def __repr__(self):
         return f'<ProductStatus {self.product_id}-{self.user_id}: {self.status}>'
 
+class Question(db.Model):
+    """A devweb.csv question; ids are kept across catalog edits so responses can reference them"""
+    __tablename__ = 'questions'
+
+    id = db.Column(db.Integer, primary_key=True)
+    section = db.Column(db.String(100), nullable=False)
+    subdimension = db.Column(db.String(200))
+    position = db.Column(db.Integer)  # Index within its section
+    number = db.Column(db.Integer)  # Position in the whole questionnaire
+    text = db.Column(db.Text, nullable=False)
+    description = db.Column(db.Text)
+
+    options = db.relationship('QuestionOption', backref='question', lazy=True, order_by='QuestionOption.position')
+
+    __table_args__ = (db.UniqueConstraint('section', 'text', name='uq_question_section_text'),)
+
+    def __repr__(self):
+        return f'<Question {self.id}: {self.text[:50]}>'
+
+class QuestionOption(db.Model):
+    __tablename__ = 'options'
+
+    id = db.Column(db.Integer, primary_key=True)
+    question_id = db.Column(db.Integer, db.ForeignKey('questions.id'), nullable=False)
+    position = db.Column(db.Integer)
+    text = db.Column(db.String(500), nullable=False)
+    score = db.Column(db.Integer)  # 1-5 from devweb.csv, None when the CSV has no score
+
+    __table_args__ = (db.UniqueConstraint('question_id', 'text', name='uq_option_question_text'),)
+
+    def __repr__(self):
+        return f'<QuestionOption {self.id}: {self.text[:30]}>'
+
 class QuestionnaireResponse(db.Model):
     __tablename__ = 'questionnaire_responses'
 
@@ -337,6 +482,9 @@ class QuestionnaireResponse(db.Model):
     question = db.Column(db.Text, nullable=False)
     question_index = db.Column(db.Integer)  # For ordering
     answer = db.Column(db.String(500))
+    # Catalog references; filled on write and by migrate_catalog_ids.py for older rows
+    question_id = db.Column(db.Integer, db.ForeignKey('questions.id'), index=True)
+    option_id = db.Column(db.Integer, db.ForeignKey('options.id'))
     client_comment = db.Column(db.Text)
     evidence_path = db.Column(db.String(500))
     score = db.Column(db.Integer, default=0)
@@ -353,7 +501,9 @@ class QuestionnaireResponse(db.Model):
 
     # Composite indexes for better performance
     __table_args__ = (
-        db.Index('idx_user_product', 'user_id', 'product_id'),
+        db.Index('idx_response_user_product_section', 'user_id', 'product_id', 'section'),
+        db.Index('idx_response_product_user_section', 'product_id', 'user_id', 'section'),
+        db.Index('idx_response_created', 'created_at'),
         db.Index('idx_section', 'section'),
         db.Index('idx_needs_response', 'needs_client_response'),
     )
@@ -386,6 +536,10 @@ class LeadComment(db.Model):
     __table_args__ = (
         db.Index('idx_client_read', 'client_id', 'is_read'),
         db.Index('idx_status', 'status'),
+        db.Index('idx_comment_product_client', 'product_id', 'client_id'),
+        db.Index('idx_comment_response', 'response_id'),
+        db.Index('idx_comment_lead', 'lead_id'),
+        db.Index('idx_comment_created', 'created_at'),
     )
 
     def __repr__(self):
@@ -424,6 +578,14 @@ class SystemSettings(db.Model):
     def __repr__(self):
         return f'<SystemSettings {self.key}: {self.value}>'
 
+class AppliedDataFix(db.Model):
+    """A one-time data fix from data_fixes.py that has completed on this database"""
+    __tablename__ = 'data_fixes'
+
+    name = db.Column(db.String(200), primary_key=True)
+    rows_changed = db.Column(db.Integer, default=0)
+    applied_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
 class InvitationToken(db.Model):
     __tablename__ = 'invitation_tokens'
 
@@ -441,6 +603,12 @@ class InvitationToken(db.Model):
     # Relationships
     inviter = db.relationship('User', backref='sent_invitations')
 
+    __table_args__ = (
+        db.Index('idx_invitation_email_used', 'email', 'is_used'),
+        db.Index('idx_invitation_used_created', 'is_used', 'created_at'),
+        db.Index('idx_invitation_email_lower', db.text('lower(email)'), 'is_used', 'expires_at'),
+    )
+
     def is_expired(self):
         # Ensure both datetimes are timezone-aware for comparison
         now = datetime.now(timezone.utc)
@@ -478,6 +646,7 @@ class RejectedQuestion(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
     lead_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
     question_text = db.Column(db.Text, nullable=False)  # Store question text directly
+    question_id = db.Column(db.Integer, db.ForeignKey("questions.id"))
     reason = db.Column(db.Text)
     status = db.Column(db.String(20), default="pending")  # pending, resolved, cancelled
     new_option = db.Column(db.String(200))
@@ -490,6 +659,8 @@ class RejectedQuestion(db.Model):
     user = db.relationship("User", foreign_keys=[user_id], backref="rejected_questions_as_client")
     lead = db.relationship("User", foreign_keys=[lead_id], backref="rejected_questions_as_lead")
 
+    __table_args__ = (db.Index("idx_rejected_user_product_status", "user_id", "product_id", "status"),)
+
     def __repr__(self):
         return f"<RejectedQuestion {self.id}: {self.question_text[:50]}... by U{self.user_id}>"
 
@@ -517,7 +688,7 @@ class QuestionChat(db.Model):
     # Indexes for better performance
     __table_args__ = (
         db.Index('idx_response_active', 'response_id', 'is_active'),
-        db.Index('idx_status', 'review_status'),
+        db.Index('idx_chat_review_status', 'review_status'),
         db.Index('idx_lead_active', 'lead_id', 'is_active'),
         db.Index('idx_client_active', 'client_id', 'is_active'),
     )
@@ -528,12 +699,12 @@ class QuestionChat(db.Model):
     @property
     def unread_messages_for_client(self):
         """Get count of unread messages for client"""
-        return self.messages.filter_by(is_read_by_client=False).filter(ChatMessage.sender_id != self.client_id).count()
+        return self.messages.filter_by(is_read_by_client=False).filter(ChatMessage.sender_id != self.client_id).order_by(None).count()
     
     @property
     def unread_messages_for_lead(self):
         """Get count of unread messages for lead"""
-        return self.messages.filter_by(is_read_by_lead=False).filter(ChatMessage.sender_id != self.lead_id).count()
+        return self.messages.filter_by(is_read_by_lead=False).filter(ChatMessage.sender_id != self.lead_id).order_by(None).count()
 
 class ChatMessage(db.Model):
     """Individual message in a question chat"""
@@ -556,8 +727,9 @@ class ChatMessage(db.Model):
     # Indexes for better performance
     __table_args__ = (
         db.Index('idx_chat_created', 'chat_id', 'created_at'),
-        db.Index('idx_unread_client', 'is_read_by_client'),
-        db.Index('idx_unread_lead', 'is_read_by_lead'),
+        # Unread counts per chat; replace the single-column idx_unread_client/idx_unread_lead
+        db.Index('idx_chat_unread_client', 'chat_id', 'is_read_by_client', 'sender_id'),
+        db.Index('idx_chat_unread_lead', 'chat_id', 'is_read_by_lead', 'sender_id'),
     )
     
     def __repr__(self):
@@ -571,6 +743,59 @@ class ChatMessage(db.Model):
             self.is_read_by_lead = True
         db.session.commit()
 
+
+class EmailOutbox(db.Model):
+    """Outgoing email, delivered in the background by email_outbox.py"""
+    __tablename__ = 'email_outbox'
+
+    id = db.Column(db.Integer, primary_key=True)
+    recipient = db.Column(db.String(120), nullable=False)
+    sender = db.Column(db.String(120), nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    text_body = db.Column(db.Text)
+    html_body = db.Column(db.Text)
+    status = db.Column(db.String(20), default='pending')  # pending, sending, sent, failed
+    attempts = db.Column(db.Integer, default=0)
+    last_error = db.Column(db.Text)
+    next_attempt_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    claimed_by = db.Column(db.String(100))  # Dispatcher currently sending this message
+    claimed_at = db.Column(db.DateTime)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    sent_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('idx_outbox_due', 'status', 'next_attempt_at'),
+    )
+
+    def __repr__(self):
+        return f'<EmailOutbox {self.id}: {self.recipient} {self.status}>'
+
+class ReviewQueueEntry(db.Model):
+    """An answer waiting for review, revision or re-selection; kept up to date by review_queue.py"""
+    __tablename__ = 'review_queue'
+
+    id = db.Column(db.Integer, primary_key=True)
+    response_id = db.Column(db.Integer, db.ForeignKey('questionnaire_responses.id'), nullable=False, unique=True)
+    client_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    product_id = db.Column(db.Integer, db.ForeignKey('products.id'), nullable=False)
+    state = db.Column(db.String(20), nullable=False)  # review, revision, reselection
+    priority = db.Column(db.Integer, nullable=False)  # Lower comes first, see review_queue.priority_for
+    client_replies = db.Column(db.Integer, nullable=False, default=0)  # Client messages since the lead last acted
+    waiting_since = db.Column(db.DateTime, nullable=False, default=lambda: datetime.now(timezone.utc))
+
+    response = db.relationship('QuestionnaireResponse')
+    client = db.relationship('User')
+    product = db.relationship('Product')
+
+    # Keyset order of one client's queue; a lead's page seeks it once per client
+    __table_args__ = (
+        db.Index('idx_review_queue_order', 'client_id', 'priority', 'waiting_since', 'id'),
+        db.Index('idx_review_queue_product', 'product_id'),
+    )
+
+    def __repr__(self):
+        return f'<ReviewQueueEntry {self.response_id}: {self.state} p{self.priority}>'
+
 # Chat models removed - simplified approval workflow
 
 
@@ -638,90 +863,101 @@ def secure_filename_hash(filename):
     
     return f"{file_hash}{ext}"
 
-def send_invitation_email(email, role, invitation_link, inviter_name):
-    """Send invitation email to new user"""
-    try:
-        subject = f"Invitation to join SecureSphere as {role.title()}"
-
-        html_body = f"""
-        <html>
-        <head>
-            <style>
-                body {{ font-family: 'Inter', Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background: linear-gradient(135deg, #1e40af 0%, #3b82f6 50%, #60a5fa 100%); color: white; padding: 30px; text-align: center; border-radius: 8px 8px 0 0; }}
-                .content {{ background: #f8fafc; padding: 30px; border-radius: 0 0 8px 8px; }}
-                .btn {{ display: inline-block; background: #3b82f6; color: white; padding: 12px 24px; text-decoration: none; border-radius: 6px; font-weight: 600; }}
-                .btn:hover {{ background: #1e40af; }}
-                .footer {{ margin-top: 20px; padding-top: 20px; border-top: 1px solid #e5e7eb; font-size: 14px; color: #6b7280; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>🛡️ SecureSphere</h1>
-                    <h2>You're Invited!</h2>
+def queue_email(recipient, subject, text_body, html_body=None):
+    """Add a message to the outbox; the background dispatcher delivers it"""
+    message = EmailOutbox(
+        recipient=recipient,
+        sender=current_app.config['MAIL_DEFAULT_SENDER'],
+        subject=subject,
+        text_body=text_body,
+        html_body=html_body
+    )
+    db.session.add(message)
+    db.session.commit()
+    email_dispatcher.wake(current_app._get_current_object())
+    return message
+
+def build_invitation_email(email, role, invitation_link, inviter_name):
+    """Subject, text and HTML bodies of the invitation email"""
+    subject = f"Invitation to join SecureSphere as {role.title()}"
+
+    html_body = f"""
+    <html>
+    <head>
+        <style>
+            body {{ font-family: 'Inter', Arial, sans-serif; line-height: 1.6; color: #333; }}
+            .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
+            .header {{ background: linear-gradient(135deg, #1e40af 0%, #3b82f6 50%, #60a5fa 100%); color: white; padding: 30px; text-align: center; border-radius: 8px 8px 0 0; }}
+            .content {{ background: #f8fafc; padding: 30px; border-radius: 0 0 8px 8px; }}
+            .btn {{ display: inline-block; background: #3b82f6; color: white; padding: 12px 24px; text-decoration: none; border-radius: 6px; font-weight: 600; }}
+            .btn:hover {{ background: #1e40af; }}
+            .footer {{ margin-top: 20px; padding-top: 20px; border-top: 1px solid #e5e7eb; font-size: 14px; color: #6b7280; }}
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <div class="header">
+                <h1>🛡️ SecureSphere</h1>
+                <h2>You're Invited!</h2>
+            </div>
+            <div class="content">
+                <p>Hello,</p>
+                <p><strong>{inviter_name}</strong> has invited you to join <strong>SecureSphere</strong> as a <strong>{role.title()}</strong>.</p>
+                <p>SecureSphere is a comprehensive security assessment platform that helps organizations evaluate and improve their security posture.</p>
+
+                <div style="text-align: center; margin: 30px 0;">
+                    <a href="{invitation_link}" class="btn">Accept Invitation & Register</a>
                 </div>
-                <div class="content">
-                    <p>Hello,</p>
-                    <p><strong>{inviter_name}</strong> has invited you to join <strong>SecureSphere</strong> as a <strong>{role.title()}</strong>.</p>
-                    <p>SecureSphere is a comprehensive security assessment platform that helps organizations evaluate and improve their security posture.</p>
-
-                    <div style="text-align: center; margin: 30px 0;">
-                        <a href="{invitation_link}" class="btn">Accept Invitation & Register</a>
-                    </div>
-
-                    <p><strong>What happens next?</strong></p>
-                    <ul>
-                        <li>Click the button above to access the registration page</li>
-                        <li>Create your account with your preferred username and password</li>
-                        <li>Start using SecureSphere immediately</li>
-                    </ul>
-
-                    <p><strong>Note:</strong> This invitation link will expire in 7 days for security purposes.</p>
-
-                    <div class="footer">
-                        <p>If you're having trouble with the button above, copy and paste this link into your browser:</p>
-                        <p><a href="{invitation_link}">{invitation_link}</a></p>
-                        <p>This invitation was sent to {email}. If you didn't expect this invitation, you can safely ignore this email.</p>
-                    </div>
+
+                <p><strong>What happens next?</strong></p>
+                <ul>
+                    <li>Click the button above to access the registration page</li>
+                    <li>Create your account with your preferred username and password</li>
+                    <li>Start using SecureSphere immediately</li>
+                </ul>
+
+                <p><strong>Note:</strong> This invitation link will expire in 7 days for security purposes.</p>
+
+                <div class="footer">
+                    <p>If you're having trouble with the button above, copy and paste this link into your browser:</p>
+                    <p><a href="{invitation_link}">{invitation_link}</a></p>
+                    <p>This invitation was sent to {email}. If you didn't expect this invitation, you can safely ignore this email.</p>
                 </div>
             </div>
-        </body>
-        </html>
-        """
+        </div>
+    </body>
+    </html>
+    """
 
-        text_body = f"""
-        SecureSphere Invitation
+    text_body = f"""
+    SecureSphere Invitation
 
-        Hello,
+    Hello,
 
-        {inviter_name} has invited you to join SecureSphere as a {role.title()}.
+    {inviter_name} has invited you to join SecureSphere as a {role.title()}.
 
-        To accept this invitation and create your account, please visit:
-        {invitation_link}
+    To accept this invitation and create your account, please visit:
+    {invitation_link}
 
-        This invitation link will expire in 7 days.
+    This invitation link will expire in 7 days.
 
-        If you didn't expect this invitation, you can safely ignore this email.
+    If you didn't expect this invitation, you can safely ignore this email.
 
-        Best regards,
-        The SecureSphere Team
-        """
+    Best regards,
+    The SecureSphere Team
+    """
 
-        msg = Message(
-            subject=subject,
-            sender=app.config['MAIL_DEFAULT_SENDER'],
-            recipients=[email],
-            body=text_body,
-            html=html_body
-        )
+    return subject, text_body, html_body
 
-        mail.send(msg)
+def send_invitation_email(email, role, invitation_link, inviter_name):
+    """Queue invitation email to new user"""
+    try:
+        subject, text_body, html_body = build_invitation_email(email, role, invitation_link, inviter_name)
+        queue_email(email, subject, text_body, html_body)
         return True
 
     except Exception as e:
-        print(f"Failed to send email: {str(e)}")
+        print(f"Failed to queue email: {str(e)}")
         return False
 
 def load_questionnaire():
@@ -759,13 +995,157 @@ def load_questionnaire():
             sections[current_dimension].append(current_question_obj)
     return sections
 
-# Load questionnaire data
-QUESTIONNAIRE = load_questionnaire()
-SECTION_IDS = list(QUESTIONNAIRE.keys())
+@lru_cache(maxsize=None)
+def get_questionnaire():
+    """Questionnaire sections parsed from devweb.csv, loaded on first use"""
+    return load_questionnaire()
+
+def load_question_index():
+    """
+    Catalog-level lookups so request handlers never scan the questionnaire:
+      questions:    question text -> {section, index, number, question, description, subdimension, options}
+                    (first occurrence, as the old linear scans matched)
+      by_section:   (section, question text) -> the same entry, for section-scoped lookups
+      scores:       (question text, option) -> 1-5 score from devweb.csv
+      subdimensions: sub-dimension names in CSV order
+    index is the position within its section, number the position in the whole questionnaire.
+    """
+    subdimension_map, subdimension_names = load_subdimension_map()
+    questions, by_section = {}, {}
+    number = 0
+    for section, section_questions in get_questionnaire().items():
+        for index, q in enumerate(section_questions):
+            number += 1
+            entry = {
+                'section': section,
+                'index': index,
+                'number': number,
+                'question': q['question'],
+                'description': q['description'],
+                'subdimension': subdimension_map.get(q['question']),
+                'options': q['options'],
+            }
+            questions.setdefault(q['question'], entry)
+            by_section.setdefault((section, q['question']), entry)
+
+    scores = {}
+    csv_path = os.path.join(os.path.dirname(__file__), 'devweb.csv')
+    with open(csv_path, encoding='utf-8') as f:
+        current_question = None
+        for row in csv.DictReader(f):
+            q = row['Questions'].strip()
+            option = row['Options'].strip()
+            scores_text = (row.get('Scores') or '').strip()
+            if q:
+                current_question = q
+            if current_question and option and scores_text:
+                try:
+                    scores.setdefault((current_question, option), int(scores_text))
+                except ValueError:
+                    pass
+
+    return {'questions': questions, 'by_section': by_section, 'scores': scores, 'subdimensions': subdimension_names}
+
+@lru_cache(maxsize=None)
+def get_question_index():
+    """Question lookups built from devweb.csv on first use (see load_question_index)"""
+    return load_question_index()
+
+@lru_cache(maxsize=None)
+def get_catalog_version():
+    """Short hash of devweb.csv; changes whenever the question catalog is edited"""
+    with open(os.path.join(os.path.dirname(__file__), 'devweb.csv'), 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()[:12]
+
+def get_section_ids():
+    return list(get_questionnaire().keys())
+
+def sync_question_catalog():
+    """
+    Upsert the questions and options tables from devweb.csv. Rows are matched on
+    (section, text) and (question, option text), so existing ids never change;
+    questions dropped from the CSV stay for the responses that reference them.
+    Returns (questions added, options added).
+    """
+    index = get_question_index()
+    existing = {(q.section, q.text): q for q in Question.query.options(db.selectinload(Question.options))}
+    added_questions = added_options = 0
+    for (section, text), entry in index['by_section'].items():
+        question = existing.get((section, text))
+        if question is None:
+            question = Question(section=section, text=text)
+            db.session.add(question)
+            added_questions += 1
+        question.subdimension = entry['subdimension']
+        question.position = entry['index']
+        question.number = entry['number']
+        question.description = entry['description']
+
+        known = {option.text: option for option in question.options}
+        for position, option_text in enumerate(entry['options']):
+            option = known.get(option_text)
+            if option is None:
+                option = QuestionOption(text=option_text)
+                question.options.append(option)
+                added_options += 1
+            option.position = position
+            option.score = index['scores'].get((text, option_text))
+    db.session.commit()
+    _catalog_lookups.pop(str(db.engine.url), None)
+    return added_questions, added_options
+
+_catalog_lookups = {}
+
+def get_catalog_lookups():
+    """
+    Id lookups for the questions and options tables of the current database:
+      by_section: (section, question text) -> (question id, {option text: option id})
+      by_text:    question text -> the same, lowest id first, for rows filed under another section
+      scores:     option id -> 1-5 score
+      catalog:    the same rows as the browser sees them (see get_question_catalog)
+    Cached per database once the catalog is seeded; ids of existing rows never change.
+    """
+    key = str(db.engine.url)
+    lookups = _catalog_lookups.get(key)
+    if lookups is not None:
+        return lookups
+
+    options = {}
+    scores = {}
+    for option in QuestionOption.query.order_by(QuestionOption.id):
+        options.setdefault(option.question_id, {})[option.text] = option.id
+        if option.score is not None:
+            scores[option.id] = option.score
+    by_section, by_text = {}, {}
+    sections, subdimensions, questions = {}, {}, {}
+    for question in Question.query.order_by(Question.id):
+        ids = (question.id, options.get(question.id, {}))
+        by_section[(question.section, question.text)] = ids
+        by_text.setdefault(question.text, ids)
+        section_id = sections.setdefault(question.section, len(sections))
+        subdimension_id = None
+        if question.subdimension:
+            subdimension_id = subdimensions.setdefault(question.subdimension, len(subdimensions))
+        questions[question.id] = [section_id, subdimension_id, question.text,
+                                  {option_id: text for text, option_id in ids[1].items()}]
+
+    catalog = {'sections': list(sections), 'subdimensions': list(subdimensions), 'questions': questions}
+    catalog['version'] = hashlib.sha1(repr(sorted(catalog.items())).encode()).hexdigest()[:12]
+    lookups = {'by_section': by_section, 'by_text': by_text, 'scores': scores, 'catalog': catalog}
+    if by_section:
+        _catalog_lookups[key] = lookups
+    return lookups
+
+def catalog_ids_for(section, question, answer):
+    """(question id, option id) for an answer; either is None when the catalog does not know it"""
+    lookups = get_catalog_lookups()
+    question_id, option_ids = lookups['by_section'].get((section, question)) or lookups['by_text'].get(question, (None, {}))
+    return question_id, option_ids.get(answer)
 
 # Database initialization
-def init_database():
-    """Initialize database and create tables if they don't exist"""
+def init_database(app=None):
+    """Create missing tables and apply data fixes this database has not recorded yet"""
+    app = app or create_app()
     with app.app_context():
         try:
             db.create_all()
@@ -773,97 +1153,68 @@ def init_database():
         except Exception as e:
             print(f"❌ Error initializing database: {e}")
 
-        # Fix any existing naive datetime entries
         try:
-            fix_naive_datetimes()
+            for name, changed in run_pending_fixes(db, AppliedDataFix):
+                print(f"✅ Data fix {name} applied ({changed} rows)")
         except Exception as e:
-            print(f"⚠️ Warning: Could not fix naive datetimes: {e}")
-
-        # Ensure default admin user exists
-        admin_user = User.query.filter_by(username='admin').first()
-        if not admin_user:
-            print("Creating default admin user...")
-            admin = User(
-                username='admin',
-                email='admin@securesphere.com',
-                role='superuser',
-                organization='SecureSphere Inc.',
-                first_name='System',
-                last_name='Administrator'
-            )
-            admin.set_password('AdminPass123')
-            db.session.add(admin)
-            db.session.commit()
-            print("✅ Default admin user created")
-
-def fix_naive_datetimes():
-    """Fix any naive datetime entries in the database"""
-    print("🔧 Checking for naive datetime entries...")
-
-    # Fix InvitationToken entries
-    invitations = InvitationToken.query.all()
-    fixed_count = 0
-
-    for invitation in invitations:
-        needs_update = False
-
-        # Fix expires_at if it's naive
-        if invitation.expires_at and (invitation.expires_at.tzinfo is None or
-                                    invitation.expires_at.tzinfo.utcoffset(invitation.expires_at) is None):
-            invitation.expires_at = invitation.expires_at.replace(tzinfo=timezone.utc)
-            needs_update = True
-
-        # Fix created_at if it's naive
-        if invitation.created_at and (invitation.created_at.tzinfo is None or
-                                    invitation.created_at.tzinfo.utcoffset(invitation.created_at) is None):
-            invitation.created_at = invitation.created_at.replace(tzinfo=timezone.utc)
-            needs_update = True
-
-        # Fix used_at if it's naive
-        if invitation.used_at and (invitation.used_at.tzinfo is None or
-                                 invitation.used_at.tzinfo.utcoffset(invitation.used_at) is None):
-            invitation.used_at = invitation.used_at.replace(tzinfo=timezone.utc)
-            needs_update = True
+            print(f"⚠️ Warning: Could not apply data fixes: {e}")
+
+# Timestamps are stored as naive UTC; rows written by other tools may carry an
+# offset or ISO 'T'/'Z' markers, which readers would otherwise misread
+_OFFSET_TIMESTAMP = "{column} GLOB '*[+-][0-9][0-9]:[0-9][0-9]'"
+_ISO_TIMESTAMP = "{column} GLOB '*T*' OR {column} GLOB '*Z'"
+
+@data_fix('invitation_timestamps_utc')
+def fix_invitation_timestamps(db, batch_size):
+    """Rewrite invitation timestamps with offsets or ISO markers as naive UTC"""
+    changed = 0
+    for column in ('expires_at', 'created_at', 'used_at'):
+        offset = _OFFSET_TIMESTAMP.format(column=column)
+        changed += batched_update(
+            db, 'invitation_tokens',
+            f"{column} = strftime('%Y-%m-%d %H:%M:%f', {column}) || '000'",
+            f"{offset} AND strftime('%Y-%m-%d %H:%M:%f', {column}) IS NOT NULL",
+            batch_size,
+        )
+        changed += batched_update(
+            db, 'invitation_tokens',
+            f"{column} = replace(rtrim({column}, 'Z'), 'T', ' ')",
+            f"({_ISO_TIMESTAMP.format(column=column)}) AND strftime('%s', {column}) IS NOT NULL",
+            batch_size,
+        )
+    return changed
 
-        if needs_update:
-            fixed_count += 1
+@data_fix('default_admin_user')
+def create_default_admin(db, batch_size):
+    """Create the default admin on a new database"""
+    if User.query.filter_by(username='admin').first():
+        return 0
+    print("Creating default admin user...")
+    admin = User(
+        username='admin',
+        email='admin@securesphere.com',
+        role='superuser',
+        organization='SecureSphere Inc.',
+        first_name='System',
+        last_name='Administrator'
+    )
+    admin.set_password('AdminPass123')
+    db.session.add(admin)
+    db.session.commit()
+    print("✅ Default admin user created")
+    return 1
 
-    if fixed_count > 0:
-        db.session.commit()
-        print(f"✅ Fixed {fixed_count} naive datetime entries")
-    else:
-        print("✅ No naive datetime entries found")
+@data_fix('question_catalog', version=get_catalog_version)
+def seed_question_catalog(db, batch_size):
+    """Sync the questions and options tables after devweb.csv changes"""
+    return sum(sync_question_catalog())
 
 def calculate_score_for_answer(question, answer):
     """Calculate score for a specific question-answer pair based on CSV data"""
     try:
-        csv_path = os.path.join(os.path.dirname(__file__), 'devweb.csv')
-        with open(csv_path, encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            current_question = None
-            question_scores = {}
-
-            for row in reader:
-                q = row['Questions'].strip()
-                option = row['Options'].strip()
-                scores_text = row.get('Scores', '').strip()
-
-                # Track current question
-                if q:
-                    current_question = q
-                    question_scores = {}
-
-                # Store score for each option of current question
-                if current_question and option and scores_text:
-                    try:
-                        score = int(scores_text)
-                        question_scores[option] = score
-                    except (ValueError, TypeError):
-                        pass
-
-                # Check if we found a match for our question and answer
-                if current_question == question and answer in question_scores:
-                    return question_scores[answer] * 20  # Scale 1-5 to 20-100 scoring system
+        score = get_question_index()['scores'].get((question, answer))
+        if score is not None:
+            return score * 20  # Scale 1-5 to 20-100 scoring system
 
     except FileNotFoundError:
         print("CSV file not found, using default scoring")
@@ -898,10 +1249,10 @@ def update_product_status(product_id, user_id):
         db.session.add(status_record)
 
     # Count total questions and answered questions
-    total_questions = sum(len(questions) for questions in QUESTIONNAIRE.values())
-    answered_questions = QuestionnaireResponse.query.filter_by(
-        product_id=product_id, user_id=user_id
-    ).count()
+    total_questions = sum(len(questions) for questions in get_questionnaire().values())
+    answered_questions, answered_sections = db.session.query(
+        db.func.count(QuestionnaireResponse.id), db.func.count(db.distinct(QuestionnaireResponse.section))
+    ).filter(QuestionnaireResponse.product_id == product_id, QuestionnaireResponse.user_id == user_id).one()
 
     # Count reviewed questions (with safety check for is_reviewed column)
     try:
@@ -936,6 +1287,7 @@ def update_product_status(product_id, user_id):
 
     status_record.questions_completed = answered_questions
     status_record.total_questions = total_questions
+    status_record.is_complete = answered_sections == len(get_section_ids())
     status_record.last_updated = datetime.utcnow()
 
     db.session.commit()
@@ -960,7 +1312,8 @@ def calculate_and_store_scores(product_id, user_id):
             }
 
         # Calculate score for this response (1-5 scale from CSV)
-        raw_score = calculate_score_for_answer(response.question, response.answer)
+        score = catalog_score(response)
+        raw_score = score * 20 if score is not None else calculate_score_for_answer(response.question, response.answer)
         # Convert from 20-100 scale back to 1-5 scale for proper averaging
         normalized_score = raw_score / 20 if raw_score > 0 else 0
         
@@ -1005,193 +1358,310 @@ def calculate_and_store_scores(product_id, user_id):
     db.session.commit()
     return section_averages
 
-def calculate_overall_maturity_score(product_id, user_id):
+def load_subdimension_map():
+    """Map each CSV question to its sub-dimension, plus sub-dimension names in CSV order"""
+    csv_map = {}
+    subdimension_order = []
+    csv_path = os.path.join(os.path.dirname(__file__), 'devweb.csv')
+    with open(csv_path, encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        current_subdimension = None
+
+        for row in reader:
+            subdimension = row['Sub-Dimensions'].strip()
+            question = row['Questions'].strip()
+
+            if subdimension:
+                current_subdimension = subdimension
+
+            # Map question to sub-dimension
+            if question and current_subdimension:
+                csv_map[question] = current_subdimension
+                if current_subdimension not in subdimension_order:
+                    subdimension_order.append(current_subdimension)
+
+    return csv_map, subdimension_order
+
+def get_question_catalog():
     """
-    Calculate overall maturity score using proper mathematical formulas:
-    1. Average Dimension Score = Sum of scores for all questions in dimension / Number of questions in dimension  
-    2. Overall Maturity Score = Sum of average scores of all dimensions / Number of dimensions
+    The questions and options tables as the browser sees them: section and
+    sub-dimension names plus {question id: [section id, sub-dimension id, text,
+    {option id: text}]}. Question and option ids are the ones responses store;
+    section and sub-dimension ids are list positions, so payloads name the
+    version they were built against.
     """
-    # Get all responses for this product and user
-    responses = QuestionnaireResponse.query.filter_by(
-        product_id=product_id, user_id=user_id
-    ).all()
-    
-    if not responses:
-        return 0, {}
-    
-    # Group responses by dimension/section
-    dimension_questions = {}
-    
-    for response in responses:
-        dimension = response.section
-        if dimension not in dimension_questions:
-            dimension_questions[dimension] = []
-        
-        # Calculate score for this question (1-5 scale based on CSV)
-        question_score = calculate_question_score_from_csv(response.question, response.answer)
-        dimension_questions[dimension].append({
-            'question': response.question,
-            'answer': response.answer,
-            'score': question_score
-        })
-    
-    # Calculate average dimension scores and overall score
-    dimension_averages = []
-    section_data = {}
-    
-    for dimension, questions in dimension_questions.items():
-        # Average Dimension Score = Sum of scores for all questions in dimension / Number of questions in dimension
-        total_score = sum(q['score'] for q in questions)
-        num_questions = len(questions)
-        average_dimension_score = total_score / num_questions if num_questions > 0 else 0
-        
-        dimension_averages.append(average_dimension_score)
-        section_data[dimension] = {
-            'average_score': round(average_dimension_score, 2),
-            'maturity_score': round(average_dimension_score, 2),
-            'questions_count': num_questions,
-            'total_score': total_score,
-            'questions': questions
-        }
-    
-    # Overall Maturity Score = Sum of average scores of all dimensions / Number of dimensions
-    if len(dimension_averages) > 0:
-        overall_score = sum(dimension_averages) / len(dimension_averages)
-    else:
-        overall_score = 0
-    
-    return round(overall_score, 2), section_data
+    return get_catalog_lookups()['catalog']
 
-def calculate_subdimension_scores(product_id, user_id):
+def build_results_payload(responses, subdimension_scores):
     """
-    Calculate scores by sub-dimensions using the same logic: (question score / total questions)
-    Returns a dictionary with sub-dimension names as keys and their calculated scores
+    Chart data for the results page: each answer as the question_id/option_id it
+    stores and sub-dimensions as ids into get_question_catalog(), which the
+    browser fetches once per version. Answers without catalog ids are sent as
+    text in 'unmatched'.
     """
-    # Get all responses for this product and user
-    responses = QuestionnaireResponse.query.filter_by(
-        product_id=product_id, user_id=user_id
-    ).all()
-    
-    if not responses:
-        return {}
-    
-    # Read CSV to map questions to their sub-dimensions
-    csv_map = {}
-    subdimension_questions = {}
-    
-    try:
-        csv_path = os.path.join(os.path.dirname(__file__), 'devweb.csv')
-        with open(csv_path, encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            current_dimension = None
-            current_subdimension = None
-            
-            for row in reader:
-                dimension = row['Dimensions'].strip()
-                subdimension = row['Sub-Dimensions'].strip()
-                question = row['Questions'].strip()
-                option = row['Options'].strip()
-                score_text = row.get('Scores', '').strip()
-                
-                # Track current dimension and sub-dimension
-                if dimension:
-                    current_dimension = dimension
-                if subdimension:
-                    current_subdimension = subdimension
-                    
-                # Map question to sub-dimension
-                if question and current_subdimension:
-                    csv_map[question] = current_subdimension
-                    
-                    # Initialize sub-dimension tracking
-                    if current_subdimension not in subdimension_questions:
-                        subdimension_questions[current_subdimension] = []
-                
-                # Store scoring data for later use
-                if question and option and score_text and current_subdimension:
-                    try:
-                        score = int(score_text)
-                        # This will be used by calculate_question_score_from_csv
-                    except (ValueError, TypeError):
-                        pass
-                        
-    except FileNotFoundError:
-        print("CSV file not found")
-        return {}
-    
-    # Group responses by sub-dimension
-    for response in responses:
-        subdimension = csv_map.get(response.question)
-        if subdimension and subdimension in subdimension_questions:
-            # Calculate score for this question using existing function
-            question_score = calculate_question_score_from_csv(response.question, response.answer)
-            subdimension_questions[subdimension].append({
-                'question': response.question,
-                'answer': response.answer,
-                'score': question_score
+    catalog = get_question_catalog()
+    subdimension_ids = {name: i for i, name in enumerate(catalog['subdimensions'])}
+    compact, unmatched = [], []
+    for resp in responses:
+        comments = resp.get('lead_comments') or []
+        status = comments[0].get('status') if comments else None
+        question_id, option_id = resp.get('question_id'), resp.get('option_id')
+        if question_id in catalog['questions'] and option_id in catalog['questions'][question_id][3]:
+            compact.append([question_id, option_id, status])
+        else:
+            unmatched.append([resp['section'], resp['question'], resp['answer'], status])
+
+    return {
+        'catalog': catalog['version'],
+        'responses': compact,
+        'unmatched': unmatched,
+        # A name instead of an id only for sub-dimensions renamed since the scores were cached
+        'subdimensions': [
+            [subdimension_ids.get(name, name), data['average_score'], data['question_count']]
+            for name, data in subdimension_scores.items()
+        ],
+    }
+
+class AssessmentSnapshot:
+    """
+    Every score view of one product assessment, computed in a single pass.
+    The responses are loaded with one query and each answer is scored once;
+    the overall, dimension, sub-dimension, heatmap and ring views are all
+    derived from that.
+    """
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        # (section, question, answer, score) for every answer, in response order
+        self.scored = []
+        for response in self.responses:
+            score = catalog_score(response)
+            if score is None:
+                score = calculate_question_score_from_csv(response.question, response.answer)
+            self.scored.append((response.section, response.question, response.answer, score))
+        self.overall_score, self.section_data = self._dimensions()
+        self.subdimension_scores = self._subdimensions()
+
+    @classmethod
+    @metrics.timed('securesphere_scoring_duration_seconds', function='assessment_snapshot')
+    def load(cls, product_id, user_id):
+        """Build the snapshot for one product's answers by one user"""
+        return cls(QuestionnaireResponse.query.filter_by(product_id=product_id, user_id=user_id).all())
+
+    @classmethod
+    def cached(cls, product_id, user_id, responses=None):
+        """
+        Snapshot from the snapshot cache, computed on a miss. Pass responses when
+        the caller has already loaded them so a miss does not query again.
+        Cached snapshots carry no ORM rows (responses is empty).
+        """
+        def build():
+            if responses is None:
+                return cls.load(product_id, user_id).to_dict()
+            return cls(responses).to_dict()
+
+        return cls.from_dict(snapshot_cache.get_or_build('assessment', product_id, user_id, build))
+
+    def to_dict(self):
+        return {
+            'scored': self.scored,
+            'overall_score': self.overall_score,
+            'section_data': self.section_data,
+            'subdimension_scores': self.subdimension_scores,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        snapshot = cls.__new__(cls)
+        snapshot.responses = []
+        snapshot.scored = [tuple(item) for item in data['scored']]
+        snapshot.overall_score = data['overall_score']
+        snapshot.section_data = data['section_data']
+        snapshot.subdimension_scores = data['subdimension_scores']
+        return snapshot
+
+    def _dimensions(self):
+        """
+        Calculate overall maturity score using proper mathematical formulas:
+        1. Average Dimension Score = Sum of scores for all questions in dimension / Number of questions in dimension
+        2. Overall Maturity Score = Sum of average scores of all dimensions / Number of dimensions
+        """
+        if not self.scored:
+            return 0, {}
+
+        dimension_questions = {}
+        for section, question, answer, score in self.scored:
+            dimension_questions.setdefault(section, []).append({
+                'question': question,
+                'answer': answer,
+                'score': score
             })
-    
-    # Calculate sub-dimension scores using same logic: sum of scores / number of questions
-    subdimension_scores = {}
-    
-    for subdimension, questions in subdimension_questions.items():
-        if questions:  # Only process sub-dimensions that have questions
+
+        dimension_averages = []
+        section_data = {}
+        for dimension, questions in dimension_questions.items():
             total_score = sum(q['score'] for q in questions)
             num_questions = len(questions)
-            average_score = total_score / num_questions if num_questions > 0 else 0
-            
-            subdimension_scores[subdimension] = {
-                'average_score': round(average_score, 2),
-                'question_count': num_questions,
+            average_dimension_score = total_score / num_questions if num_questions > 0 else 0
+
+            dimension_averages.append(average_dimension_score)
+            section_data[dimension] = {
+                'average_score': round(average_dimension_score, 2),
+                'maturity_score': round(average_dimension_score, 2),
+                'questions_count': num_questions,
                 'total_score': total_score,
                 'questions': questions
             }
-    
-    return subdimension_scores
+
+        overall_score = sum(dimension_averages) / len(dimension_averages) if dimension_averages else 0
+        return round(overall_score, 2), section_data
+
+    def _subdimensions(self):
+        """Scores by sub-dimension using the same logic: sum of scores / number of questions"""
+        if not self.scored:
+            return {}
+
+        index = get_question_index()
+        subdimension_questions = {name: [] for name in index['subdimensions']}
+        for section, question, answer, score in self.scored:
+            entry = index['by_section'].get((section, question)) or index['questions'].get(question)
+            subdimension = entry and entry['subdimension']
+            if subdimension:
+                subdimension_questions[subdimension].append({
+                    'question': question,
+                    'answer': answer,
+                    'score': score
+                })
+
+        subdimension_scores = {}
+        for subdimension, questions in subdimension_questions.items():
+            if questions:  # Only process sub-dimensions that have questions
+                total_score = sum(q['score'] for q in questions)
+                subdimension_scores[subdimension] = {
+                    'average_score': round(total_score / len(questions), 2),
+                    'question_count': len(questions),
+                    'total_score': total_score,
+                    'questions': questions
+                }
+        return subdimension_scores
+
+    def heatmap(self):
+        """Heatmap cells using 1-5 scale scores, grouped by section"""
+        section_questions = {}
+        for section, question, answer, score in self.scored:
+            section_questions.setdefault(section, []).append((question, answer, score))
+
+        heatmap_data = []
+        for section, questions in section_questions.items():
+            for i, (question, answer, score) in enumerate(questions):
+                heatmap_data.append({
+                    'section': section,
+                    'question_index': i,
+                    'question': question[:50] + '...' if len(question) > 50 else question,
+                    'full_question': question,
+                    'score': score,
+                    'max_score': 5,  # Maximum possible score on 1-5 scale
+                    'percentage': (score / 5) * 100,
+                    'answer': answer
+                })
+        return heatmap_data
+
+    def rings(self):
+        """Ring-wise heatmap showing only levels up to achieved maturity"""
+        if not self.scored:
+            return {}
+
+        achieved_level = get_maturity_level_number(self.overall_score)
+        ring_data = {}
+        for level in range(1, 6):  # Levels 1-5
+            ring_data[f"level_{level}"] = {
+                "level": level,
+                "is_achieved": level <= achieved_level,
+                "subdimensions": []
+            }
+
+            for subdim_name, subdim_data in self.subdimension_scores.items():
+                subdim_level = get_maturity_level_number(subdim_data['average_score'])
+                ring_data[f"level_{level}"]["subdimensions"].append({
+                    "name": subdim_name,
+                    "score": subdim_data['average_score'],
+                    "is_achieved": level <= subdim_level,
+                    "percentage": min(100, (subdim_data['average_score'] / level) * 100) if level <= subdim_level else 0
+                })
+
+        return {
+            "overall_score": self.overall_score,
+            "achieved_level": achieved_level,
+            "rings": ring_data
+        }
+
+    def dimension_views(self):
+        """dimension_scores and section_dimensions as the results template expects them"""
+        dimension_scores = {}
+        section_dimensions = {}
+        for section_name, data in self.section_data.items():
+            question_count = data['questions_count']
+            total_score = float(data['total_score'])
+
+            dimension_scores[str(section_name)] = {
+                'average_score': round(float(data['average_score']), 2),
+                'question_count': question_count,
+                'total_score': round(total_score, 2)
+            }
+
+            max_possible = question_count * 5  # Assuming max score of 5 per question
+            percentage = (total_score / max_possible * 100) if max_possible > 0 else 0
+            section_dimensions[str(section_name)] = {
+                'percentage': round(max(0, min(100, percentage)), 1),
+                'question_count': question_count,
+                'total_score': round(total_score, 2),
+                'max_possible_score': max_possible
+            }
+        return dimension_scores, section_dimensions
+
+    def dimension_results(self):
+        """Dimension-wise results rolled up from the sub-dimension scores"""
+        from ring_heatmap_implementation import get_dimension_wise_results
+        return get_dimension_wise_results(self.subdimension_scores)
+
+@metrics.timed('securesphere_scoring_duration_seconds', function='calculate_overall_maturity_score')
+def calculate_overall_maturity_score(product_id, user_id):
+    """Overall maturity score and per-dimension details (see AssessmentSnapshot)"""
+    snapshot = AssessmentSnapshot.load(product_id, user_id)
+    return snapshot.overall_score, snapshot.section_data
+
+@metrics.timed('securesphere_scoring_duration_seconds', function='calculate_subdimension_scores')
+def calculate_subdimension_scores(product_id, user_id):
+    """
+    Calculate scores by sub-dimensions using the same logic: (question score / total questions)
+    Returns a dictionary with sub-dimension names as keys and their calculated scores
+    """
+    return AssessmentSnapshot.load(product_id, user_id).subdimension_scores
 
 def get_question_number_from_csv(question):
     """Get the sequential question number from CSV"""
     try:
-        with open('devweb.csv', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            question_number = 0
-            
-            for row in reader:
-                q = row['Questions'].strip()
-                if q:  # Only count rows that have actual questions
-                    question_number += 1
-                    if q == question:
-                        return question_number
+        entry = get_question_index()['questions'].get(question)
+        if entry:
+            return entry['number']
                         
     except FileNotFoundError:
-        print("CSV file not found, using default numbering")
-    
-    return None
-
-def calculate_question_score_from_csv(question, answer):
-    """Calculate 1-5 score for a specific question-answer pair based on CSV data"""
-    try:
-
-        with open('devweb.csv', encoding='utf-8') as f:
-
-            reader = csv.DictReader(f)
-            current_question = None
-            
-            for row in reader:
-                q = row['Questions'].strip()
-                option = row['Options'].strip()
-                scores_text = row.get('Scores', '').strip()
+        print("CSV file not found, using default numbering")
+    
+    return None
 
-                # Track current question
-                if q:
-                    current_question = q
+def catalog_score(response):
+    """1-5 score of a response's catalog option; None when it has none and must be scored from text"""
+    if response.option_id is None:
+        return None
+    return get_catalog_lookups()['scores'].get(response.option_id)
 
-                # Check if we found a match for our question and answer
-                if current_question == question and option == answer and scores_text:
-                    try:
-                        return int(scores_text)  # Return 1-5 score directly from CSV
-                    except (ValueError, TypeError):
-                        pass
+def calculate_question_score_from_csv(question, answer):
+    """Calculate 1-5 score for a specific question-answer pair based on CSV data"""
+    try:
+        score = get_question_index()['scores'].get((question, answer))
+        if score is not None:
+            return score  # 1-5 score directly from CSV
 
     except FileNotFoundError:
         print("CSV file not found, using default scoring")
@@ -1236,129 +1706,54 @@ def get_maturity_level_number(maturity_score):
     else:
         return 1
 
+@metrics.timed('securesphere_scoring_duration_seconds', function='generate_ringwise_heatmap_data')
 def generate_ringwise_heatmap_data(product_id, user_id):
     """Generate ring-wise heatmap data showing only levels up to achieved maturity"""
-    # Get all responses for this product and user
-    responses = QuestionnaireResponse.query.filter_by(
-        product_id=product_id, user_id=user_id
-    ).all()
-    
-    if not responses:
-        return {}
-    
-    # Calculate sub-dimension scores
-    subdimension_scores = calculate_subdimension_scores(product_id, user_id)
-    
-    # Calculate overall maturity score
-    overall_score, _ = calculate_overall_maturity_score(product_id, user_id)
-    achieved_level = get_maturity_level_number(overall_score)
-    
-    # Create ring data for each level up to achieved level
-    ring_data = {}
-    for level in range(1, 6):  # Levels 1-5
-        ring_data[f"level_{level}"] = {
-            "level": level,
-            "is_achieved": level <= achieved_level,
-            "subdimensions": []
-        }
-        
-        # Add subdimension data for this level
-        for subdim_name, subdim_data in subdimension_scores.items():
-            subdim_level = get_maturity_level_number(subdim_data['average_score'])
-            ring_data[f"level_{level}"]["subdimensions"].append({
-                "name": subdim_name,
-                "score": subdim_data['average_score'],
-                "is_achieved": level <= subdim_level,
-                "percentage": min(100, (subdim_data['average_score'] / level) * 100) if level <= subdim_level else 0
-            })
-    
-    return {
-        "overall_score": overall_score,
-        "achieved_level": achieved_level,
-        "rings": ring_data
-    }
+    return AssessmentSnapshot.load(product_id, user_id).rings()
 
+@metrics.timed('securesphere_scoring_duration_seconds', function='generate_heatmap_data')
 def generate_heatmap_data(product_id, user_id):
     """Generate heatmap data for visualization using 1-5 scale scores"""
-    # Get all responses for this product and user
-    responses = QuestionnaireResponse.query.filter_by(
-        product_id=product_id, user_id=user_id
-    ).all()
-    
-    # Group responses by section and calculate scores
-    heatmap_data = []
-    section_questions = {}
-    
-    for response in responses:
-        section = response.section
-        if section not in section_questions:
-            section_questions[section] = []
-        
-        # Calculate score for this response (1-5 scale)
-        score = calculate_question_score_from_csv(response.question, response.answer)
-        
-        section_questions[section].append({
-            'question': response.question[:50] + '...' if len(response.question) > 50 else response.question,
-            'full_question': response.question,
-            'score': score,
-            'answer': response.answer,
-            'max_score': 5  # Maximum possible score on 1-5 scale
-        })
-    
-    # Convert to heatmap format
-    for section, questions in section_questions.items():
-        for i, q in enumerate(questions):
-            heatmap_data.append({
-                'section': section,
-                'question_index': i,
-                'question': q['question'],
-                'full_question': q['full_question'],
-                'score': q['score'],
-                'max_score': q['max_score'],
-                'percentage': (q['score'] / q['max_score']) * 100,
-                'answer': q['answer']
-            })
-    
-    return heatmap_data
+    return AssessmentSnapshot.load(product_id, user_id).heatmap()
 
 def login_required(role=None):
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
             if 'user_id' not in session:
-                return redirect(url_for('login'))
+                return redirect(url_for('main.login'))
             if role and session.get('role') != role:
                 flash('Access denied!')
-                return redirect(url_for('dashboard'))
+                return redirect(url_for('main.dashboard'))
             return f(*args, **kwargs)
         return decorated_function
     return decorator
 
-@app.route('/')
+@bp.route('/')
 def index():
     return render_template('index.html')
 
-@app.route('/static/uploads/<filename>')
+@bp.route('/static/uploads/<filename>')
 @login_required()
 def uploaded_file(filename):
     """Serve uploaded files from the uploads directory"""
     try:
         # Security: Only allow access to files that exist and are in the uploads folder
-        upload_folder = app.config['UPLOAD_FOLDER']
+        upload_folder = current_app.config['UPLOAD_FOLDER']
         file_path = os.path.join(upload_folder, filename)
         
         # Check if file exists and is within the upload folder
         if not os.path.exists(file_path) or not os.path.commonpath([upload_folder, file_path]) == upload_folder:
             flash('File not found or access denied.', 'error')
-            return redirect(url_for('dashboard'))
+            return redirect(url_for('main.dashboard'))
             
         return send_from_directory(upload_folder, filename)
     except Exception as e:
         print(f"Error serving file {filename}: {e}")
         flash('Error accessing file.', 'error')
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('main.dashboard'))
 
-@app.route('/register', methods=['GET', 'POST'])
+@bp.route('/register', methods=['GET', 'POST'])
 @limiter.limit("5 per minute")
 def register():
     # Get invitation token from URL
@@ -1369,13 +1764,13 @@ def register():
         invitation = InvitationToken.query.filter_by(token=token, is_used=False).first()
         if not invitation:
             flash('Invalid invitation link.')
-            return redirect(url_for('login'))
+            return redirect(url_for('main.login'))
 
         # Check if invitation is expired with error handling
         try:
             if invitation.is_expired():
                 flash('Expired invitation link.')
-                return redirect(url_for('login'))
+                return redirect(url_for('main.login'))
         except Exception as e:
             print(f"Error checking invitation expiration: {e}")
             # If there's an error checking expiration, try to fix the datetime and check again
@@ -1385,14 +1780,14 @@ def register():
                     db.session.commit()
                 if invitation.is_expired():
                     flash('Expired invitation link.')
-                    return redirect(url_for('login'))
+                    return redirect(url_for('main.login'))
             except Exception as e2:
                 print(f"Could not fix invitation datetime: {e2}")
                 flash('There was an issue with your invitation link. Please request a new one.')
-                return redirect(url_for('login'))
+                return redirect(url_for('main.login'))
     else:
         flash('Registration requires a valid invitation.')
-        return redirect(url_for('login'))
+        return redirect(url_for('main.login'))
 
     if request.method == 'POST':
         username = request.form['username']
@@ -1403,30 +1798,30 @@ def register():
         # Validate invitation token
         if not invitation:
             flash('Registration requires a valid invitation.')
-            return redirect(url_for('login'))
+            return redirect(url_for('main.login'))
 
         # Ensure email matches invitation
         if email != invitation.email:
             flash('Email must match the invitation.')
-            return redirect(url_for('register', token=token))
+            return redirect(url_for('main.register', token=token))
 
         # Server-side validation
         if not username or not email or not password:
             flash('Please fill in all fields.')
-            return redirect(url_for('register', token=token))
+            return redirect(url_for('main.register', token=token))
 
         if User.query.filter_by(username=username).first():
             flash('Username already exists.')
-            return redirect(url_for('register', token=token))
+            return redirect(url_for('main.register', token=token))
 
         import re
         if not re.match(r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$', email):
             flash('Invalid email format.')
-            return redirect(url_for('register', token=token))
+            return redirect(url_for('main.register', token=token))
 
         if len(password) < 8 or not re.search(r'[A-Z]', password) or not re.search(r'[a-z]', password) or not re.search(r'\d', password):
             flash('Password must be at least 8 characters and include uppercase, lowercase, and number.')
-            return redirect(url_for('register', token=token))
+            return redirect(url_for('main.register', token=token))
 
         # Create user with invitation details
         user = User(
@@ -1435,7 +1830,11 @@ def register():
             role=invitation.role,  # Use role from invitation
             organization=organization or invitation.organization
         )
-        user.set_password(password)
+        try:
+            user.set_password(password)
+        except PasswordHashingBusy:
+            flash(PASSWORD_HASHING_BUSY)
+            return redirect(url_for('main.register', token=token))
         db.session.add(user)
 
         # Mark invitation as used
@@ -1444,20 +1843,34 @@ def register():
 
         db.session.commit()
         flash('Registration successful. Please login.')
-        return redirect(url_for('login'))
+        return redirect(url_for('main.login'))
 
     return render_template('register.html', invitation=invitation)
 
-@app.route('/login', methods=['GET', 'POST'])
+# Shown when the password hashing queue is full (PasswordHashingBusy)
+PASSWORD_HASHING_BUSY = 'Too many sign-ins right now. Please try again in a moment.'
+
+@bp.route('/login', methods=['GET', 'POST'])
 @limiter.limit("10 per minute")
 def login():
     if request.method == 'POST':
         username = request.form['username']
         password = request.form['password']
         user = User.query.filter_by(username=username).first()
-        if not user or not user.check_password(password):
+        try:
+            valid = user is not None and user.check_password(password)
+        except PasswordHashingBusy:
+            flash(PASSWORD_HASHING_BUSY)
+            return redirect(url_for('main.login'))
+        if not valid:
             flash('Invalid credentials.')
-            return redirect(url_for('login'))
+            return redirect(url_for('main.login'))
+        # Stored with older parameters; upgrade while the plain password is at hand
+        if password_hasher.needs_rehash(user.password_hash):
+            try:
+                user.set_password(password)
+            except PasswordHashingBusy:
+                pass  # upgraded on a later login
         session['user_id'] = user.id
         session['role'] = user.role
         user.last_login = datetime.now(timezone.utc)
@@ -1465,19 +1878,19 @@ def login():
         # Check if this is first login for lead users
         if user.role == 'lead' and user.first_login:
             db.session.commit()
-            return redirect(url_for('change_password_first_login'))
+            return redirect(url_for('main.change_password_first_login'))
         
         db.session.commit()
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('main.dashboard'))
     return render_template('login.html')
 
-@app.route('/logout')
+@bp.route('/logout')
 def logout():
     session.clear()
     flash('Logged out successfully.')
-    return redirect(url_for('index'))
+    return redirect(url_for('main.index'))
 
-@app.route('/dashboard')
+@bp.route('/dashboard')
 @login_required()
 def dashboard():
     role = session['role']
@@ -1498,7 +1911,7 @@ def dashboard():
             # Get responses and calculate progress
             responses = QuestionnaireResponse.query.filter_by(product_id=product.id, user_id=user_id).all()
             completed_sections = set([r.section for r in responses])
-            total_sections = len(SECTION_IDS)
+            total_sections = len(get_section_ids())
             completed_sections_count = len(completed_sections)
 
             # Check for rejected questions that need client attention
@@ -1520,7 +1933,7 @@ def dashboard():
 
             # Find next section to continue
             next_section_idx = 0
-            for i, section in enumerate(SECTION_IDS):
+            for i, section in enumerate(get_section_ids()):
                 if section not in completed_sections:
                     next_section_idx = i
                     break
@@ -1592,27 +2005,18 @@ def dashboard():
             ).all()
             
             # Convert to format expected by template with question data from CSV
+            question_index = get_question_index()['questions']
             for rejected_question, response in product_rejected:
-                # Find the question data from QUESTIONNAIRE
-                question_data = None
-                question_number = 1
-                for section_name, section_questions in QUESTIONNAIRE.items():
-                    for i, q in enumerate(section_questions):
-                        if q['question'] == rejected_question.question_text:
-                            question_data = {
-                                'id': rejected_question.id,
-                                'question_text': q['question'],
-                                'question_number': question_number,
-                                'options': q['options']
-                            }
-                            break
-                        question_number += 1
-                    if question_data:
-                        break
+                entry = question_index.get(rejected_question.question_text)
                 
                 # Add to rejected questions if found
-                if question_data:
-                    rejected_questions.append((rejected_question, question_data))
+                if entry:
+                    rejected_questions.append((rejected_question, {
+                        'id': rejected_question.id,
+                        'question_text': entry['question'],
+                        'question_number': entry['number'],
+                        'options': entry['options']
+                    }))
 
         return render_template('dashboard_client.html', 
                              products=products_with_status, 
@@ -1621,27 +2025,42 @@ def dashboard():
                              active_chats=active_chats,
                              unread_chats_count=unread_chats_count)
     elif role == 'lead':
-        # Get the current lead user to check their assigned client
-        current_lead = User.query.get(user_id)
-        
-        if not current_lead.assigned_client_id:
+        current_lead = get_current_user()
+        client_ids = current_lead.accessible_client_ids()
+
+        if not client_ids:
             # Lead not assigned to any client yet
             return render_template('dashboard_lead.html', clients_data={}, error_message="You have not been assigned to review any client yet. Please contact your administrator.")
-        
-        # Get responses only for the assigned client - only for completed assessments
-        resps = db.session.query(QuestionnaireResponse, User, Product).join(
+
+        selected_client = request.args.get('client', type=int)
+        if selected_client not in client_ids:
+            selected_client = None
+        complete = complete_assessments((selected_client,) if selected_client else client_ids).subquery()
+
+        total_products, total_clients, total_responses = db.session.execute(db.select(
+            db.func.count(), db.func.count(db.distinct(complete.c.user_id)),
+            db.func.coalesce(db.func.sum(complete.c.responses), 0)
+        )).one()
+        per_page = current_app.config['LEAD_DASHBOARD_PAGE_SIZE']
+        pages = max(1, -(-total_products // per_page))
+        page = min(max(request.args.get('page', 1, type=int), 1), pages)
+
+        # One page of complete assessments, joined to their responses, clients and products
+        page_assessments = db.select(complete.c.user_id, complete.c.product_id).order_by(
+            complete.c.user_id, complete.c.product_id
+        ).limit(per_page).offset((page - 1) * per_page).subquery()
+        resps = db.session.execute(db.select(QuestionnaireResponse, User, Product).join(
+            page_assessments, db.and_(QuestionnaireResponse.user_id == page_assessments.c.user_id,
+                                      QuestionnaireResponse.product_id == page_assessments.c.product_id)
+        ).join(
             User, QuestionnaireResponse.user_id == User.id
         ).join(
             Product, QuestionnaireResponse.product_id == Product.id
-        ).filter(User.id == current_lead.assigned_client_id).all()
+        ).order_by(QuestionnaireResponse.user_id, QuestionnaireResponse.product_id, QuestionnaireResponse.id)).all()
 
-        # Organize responses by client and product - filter for complete assessments only
+        # Organize responses by client and product
         clients_data = {}
         for resp, user, product in resps:
-            # Check if this product's assessment is complete for this user
-            if not is_assessment_complete(product.id, user.id):
-                continue  # Skip incomplete assessments
-
             if user.id not in clients_data:
                 clients_data[user.id] = {
                     'user': user,
@@ -1656,7 +2075,7 @@ def dashboard():
 
         # Get unread client replies count
         unread_client_replies = LeadComment.query.filter(
-            LeadComment.client_id == current_lead.assigned_client_id,
+            LeadComment.client_id.in_(client_ids),
             LeadComment.status == 'client_reply',
             LeadComment.is_read == False
         ).count()
@@ -1670,7 +2089,13 @@ def dashboard():
 
         return render_template('dashboard_lead.html', 
                              clients_data=clients_data, 
-                             assigned_client=current_lead.assigned_client, 
+                             accessible_clients=current_lead.get_accessible_clients(),
+                             selected_client=selected_client,
+                             total_clients=total_clients,
+                             total_products=total_products,
+                             total_responses=total_responses,
+                             page=page,
+                             pages=pages,
                              unread_client_replies=unread_client_replies,
                              active_chats_for_lead=active_chats_for_lead,
                              unread_chats_count_lead=unread_chats_count_lead)
@@ -1761,18 +2186,15 @@ def dashboard():
                 grouped_admin_comments['General'].append(comment)
 
         return render_template('dashboard_superuser.html', products_data=products_data, all_responses=all_responses, all_comments=all_comments, grouped_admin_comments=grouped_admin_comments)
-    return redirect(url_for('index'))
+    return redirect(url_for('main.index'))
 
-def is_assessment_complete(product_id, user_id):
-    """Check if assessment is complete for a product"""
-    completed_sections = set([
-        r.section for r in QuestionnaireResponse.query.filter_by(
-            product_id=product_id, user_id=user_id
-        ).all()
-    ])
-    return len(completed_sections) == len(SECTION_IDS)
+def complete_assessments(client_ids):
+    """Select of (user_id, product_id, responses) for the clients' assessments with every section answered"""
+    return db.select(
+        ProductStatus.user_id, ProductStatus.product_id, ProductStatus.questions_completed.label('responses')
+    ).where(ProductStatus.user_id.in_(client_ids), ProductStatus.is_complete == True)
 
-@app.route('/add_product', methods=['GET', 'POST'])
+@bp.route('/add_product', methods=['GET', 'POST'])
 @login_required('client')
 def add_product():
     if request.method == 'POST':
@@ -1784,7 +2206,7 @@ def add_product():
         # Validate required fields
         if not application_name or not product_owner or not business_criticality:
             flash('Please fill in all required fields (Application Name, Product Owner, Business Criticality).')
-            return redirect(url_for('add_product'))
+            return redirect(url_for('main.add_product'))
 
         # Get all question responses
         question_data = {}
@@ -1840,19 +2262,19 @@ def add_product():
         db.session.add(product)
         db.session.commit()
         flash('Product information captured successfully. Now proceeding to detailed security questionnaire.')
-        return redirect(url_for('fill_questionnaire_section', product_id=product.id, section_idx=0))
+        return redirect(url_for('main.fill_questionnaire_section', product_id=product.id, section_idx=0))
     return render_template('add_product.html')
 
-@app.route('/fill_questionnaire/<int:product_id>/section/<int:section_idx>', methods=['GET', 'POST'])
+@bp.route('/fill_questionnaire/<int:product_id>/section/<int:section_idx>', methods=['GET', 'POST'])
 @login_required('client')
 def fill_questionnaire_section(product_id, section_idx):
     product = Product.query.get_or_404(product_id)
-    sections = SECTION_IDS
+    sections = get_section_ids()
     if section_idx >= len(sections):
         flash("All sections complete!")
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('main.dashboard'))
     section_name = sections[section_idx]
-    questions = QUESTIONNAIRE[section_name]
+    questions = get_questionnaire()[section_name]
 
     # Get existing responses for this section to pre-populate form
     existing_responses = QuestionnaireResponse.query.filter_by(
@@ -1861,13 +2283,13 @@ def fill_questionnaire_section(product_id, section_idx):
         section=section_name
     ).all()
 
-    # Create a dictionary for quick lookup of existing responses
+    # Create a dictionary for quick lookup of existing responses by question position
+    question_index = get_question_index()['by_section']
     existing_answers = {}
     for resp in existing_responses:
-        for i, q in enumerate(questions):
-            if q['question'] == resp.question:
-                existing_answers[i] = resp
-                break
+        entry = question_index.get((section_name, resp.question))
+        if entry:
+            existing_answers[entry['index']] = resp
 
     if request.method == 'POST':
         # Get lead comments for validation
@@ -1887,7 +2309,9 @@ def fill_questionnaire_section(product_id, section_idx):
 
         if responses_to_delete:
             QuestionnaireResponse.query.filter(QuestionnaireResponse.id.in_(responses_to_delete)).delete()
+            drop_responses(responses_to_delete)
 
+        new_responses = []
         for i, q in enumerate(questions):
             # Check if this question is approved
             existing_resp = existing_answers.get(i)
@@ -1903,32 +2327,40 @@ def fill_questionnaire_section(product_id, section_idx):
             # Keep existing evidence if no new file uploaded
             if file and file.filename and allowed_file(file.filename):
                 filename = secure_filename(f"{product_id}_{section_idx}_{i}_{file.filename}")
-                filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+                filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
                 file.save(filepath)
+                metrics.inc('securesphere_upload_bytes_total', os.path.getsize(filepath), kind='evidence')
                 evidence_path = f"static/uploads/{filename}"
             elif i in existing_answers:
                 evidence_path = existing_answers[i].evidence_path or ''
 
+            question_id, option_id = catalog_ids_for(section_name, q['question'], answer)
             resp = QuestionnaireResponse(
                 user_id=session['user_id'],
                 product_id=product_id,
                 section=section_name,
                 question=q['question'],
                 answer=answer,
+                question_id=question_id,
+                option_id=option_id,
                 client_comment=comment,
                 evidence_path=evidence_path,
                 is_reviewed=False,  # Reset review status for new/updated responses
                 needs_client_response=False  # Reset the client response flag when they respond
             )
             db.session.add(resp)
+            new_responses.append(resp)
+        db.session.flush()
+        queue_responses(new_responses)
         db.session.commit()
+        snapshot_cache.invalidate(product_id)
 
         # Update product status and calculate scores
         status = update_product_status(product_id, session['user_id'])
         calculate_and_store_scores(product_id, session['user_id'])
 
         if section_idx + 1 < len(sections):
-            return redirect(url_for('fill_questionnaire_section', product_id=product_id, section_idx=section_idx+1))
+            return redirect(url_for('main.fill_questionnaire_section', product_id=product_id, section_idx=section_idx+1))
         else:
             if status == 'questions_done':
                 flash("Questions completed! Waiting for review.")
@@ -1936,7 +2368,7 @@ def fill_questionnaire_section(product_id, section_idx):
                 flash("Assessment completed successfully!")
             else:
                 flash("Section saved successfully!")
-            return redirect(url_for('dashboard'))
+            return redirect(url_for('main.dashboard'))
 
     completed_sections = [
         s.section for s in QuestionnaireResponse.query.filter_by(product_id=product_id, user_id=session['user_id']).distinct(QuestionnaireResponse.section)
@@ -1954,16 +2386,15 @@ def fill_questionnaire_section(product_id, section_idx):
         chats = QuestionChat.query.filter(QuestionChat.response_id.in_(response_ids)).all()
         chat_by_response = {chat.response_id: chat for chat in chats}
         
+        responses_by_id = {resp.id: resp for resp in existing_responses}
         for comment in lead_comments:
-            for resp in existing_responses:
-                if resp.id == comment.response_id:
-                    for i, q in enumerate(questions):
-                        if q['question'] == resp.question:
-                            question_review_status[i] = comment.status
-                            # Add chat information if exists
-                            if resp.id in chat_by_response:
-                                question_chats[i] = chat_by_response[resp.id]
-                            break
+            resp = responses_by_id.get(comment.response_id)
+            entry = question_index.get((section_name, resp.question)) if resp else None
+            if entry:
+                question_review_status[entry['index']] = comment.status
+                # Add chat information if exists
+                if resp.id in chat_by_response:
+                    question_chats[entry['index']] = chat_by_response[resp.id]
 
     return render_template(
         'fill_questionnaire_section.html',
@@ -1978,7 +2409,7 @@ def fill_questionnaire_section(product_id, section_idx):
         question_chats=question_chats
     )
 
-@app.route('/product/<int:product_id>/results')
+@bp.route('/product/<int:product_id>/results')
 @login_required('client')
 def product_results(product_id):
     try:
@@ -1988,10 +2419,12 @@ def product_results(product_id):
         # Verify user has access to this product
         if not product:
             flash('Product not found.', 'error')
-            return redirect(url_for('dashboard'))
+            return redirect(url_for('main.dashboard'))
         
-        # Get all responses for this product and user
+        # Get all responses for this product and user; every score view below
+        # comes from one snapshot of them, served from the cache when unchanged
         resps = QuestionnaireResponse.query.filter_by(product_id=product_id, user_id=session['user_id']).all()
+        snapshot = AssessmentSnapshot.cached(product_id, session['user_id'], responses=resps)
         
         # Get lead comments with proper serializable data
         lead_comments_query = LeadComment.query.filter_by(product_id=product_id, client_id=session['user_id']).order_by(LeadComment.created_at.desc()).all()
@@ -2015,6 +2448,8 @@ def product_results(product_id):
                     'id': getattr(resp, 'id', 0),
                     'section': getattr(resp, 'section', '') or '',
                     'question': getattr(resp, 'question', '') or '',
+                    'question_id': resp.question_id,
+                    'option_id': resp.option_id,
                     'answer': getattr(resp, 'answer', '') or '',
                     'score': getattr(resp, 'score', 0) or 0,
                     'max_score': getattr(resp, 'max_score', 5) or 5,
@@ -2032,90 +2467,28 @@ def product_results(product_id):
                 continue
         
         # Calculate comprehensive assessment data with error handling
-        try:
-            overall_score, section_data = calculate_overall_maturity_score(product_id, session['user_id'])
-            maturity_score = max(1, min(5, round(overall_score))) if overall_score and overall_score > 0 else 1
-        except Exception as e:
-            print(f"Error calculating maturity score: {e}")
-            overall_score = 0
-            section_data = {}
-            maturity_score = 1
-        
-        # Calculate sub-dimension scores with error handling
-        subdimension_scores = {}
-        dimension_scores = {}  # Keep for backward compatibility
-        section_dimensions = {}
+        overall_score = snapshot.overall_score
+        maturity_score = max(1, min(5, round(overall_score))) if overall_score and overall_score > 0 else 1
+        subdimension_scores = snapshot.subdimension_scores
         
         try:
-            subdimension_scores = calculate_subdimension_scores(product_id, session['user_id'])
+            dimension_scores, section_dimensions = snapshot.dimension_views()  # Keep for backward compatibility
         except Exception as e:
-            print(f"Error calculating sub-dimension scores: {e}")
-            subdimension_scores = {}
+            print(f"Error processing dimension scores: {e}")
+            dimension_scores, section_dimensions = {}, {}
         
-        # Keep original dimension scores for backward compatibility
-        if section_data and isinstance(section_data, dict):
-            for section_name, data in section_data.items():
-                try:
-                    if not isinstance(data, dict):
-                        continue
-                        
-                    avg_score = data.get('average_score', 0)
-                    question_count = data.get('questions_count', 0)
-                    total_score = data.get('total_score', 0)
-                    
-                    # Ensure numeric values
-                    avg_score = float(avg_score) if avg_score is not None else 0.0
-                    question_count = int(question_count) if question_count is not None else 0
-                    total_score = float(total_score) if total_score is not None else 0.0
-                    
-                    dimension_scores[str(section_name)] = {
-                        'average_score': round(avg_score, 2),
-                        'question_count': question_count,
-                        'total_score': round(total_score, 2)
-                    }
-                    
-                    # Calculate section percentage for section_dimensions
-                    max_possible = question_count * 5  # Assuming max score of 5 per question
-                    percentage = (total_score / max_possible * 100) if max_possible > 0 else 0
-                    
-                    section_dimensions[str(section_name)] = {
-                        'percentage': round(max(0, min(100, percentage)), 1),
-                        'question_count': question_count,
-                        'total_score': round(total_score, 2),
-                        'max_possible_score': max_possible
-                    }
-                except Exception as e:
-                    print(f"Error processing section {section_name}: {e}")
-                    continue
-        
-        # Generate serializable heatmap data with error handling
         try:
-            heatmap_data = generate_heatmap_data(product_id, session['user_id'])
-            if not isinstance(heatmap_data, list):
-                heatmap_data = []
+            heatmap_data = snapshot.heatmap()
         except Exception as e:
             print(f"Error generating heatmap data: {e}")
             heatmap_data = []
         
-        # Create serializable responses JSON for JavaScript
-        responses_json = []
-        for resp in responses_data:
-            try:
-                responses_json.append({
-                    'section': str(resp.get('section', '')),
-                    'question': str(resp.get('question', '')),
-                    'answer': str(resp.get('answer', '')),
-                    'score': float(resp.get('score', 0)) if resp.get('score') is not None else 0.0,
-                    'lead_comments': resp.get('lead_comments', [])
-                })
-            except Exception as e:
-                print(f"Error serializing response: {e}")
-                continue
+        # Compact chart data for JavaScript; the question text comes from the cached catalog
+        results_payload = build_results_payload(responses_data, subdimension_scores)
         
         # Calculate dimension-wise results from subdimension scores
         try:
-            from ring_heatmap_implementation import get_dimension_wise_results
-            dimension_results = get_dimension_wise_results(subdimension_scores)
+            dimension_results = snapshot.dimension_results()
         except Exception as e:
             print(f'Error calculating dimension-wise results: {e}')
             dimension_results = {}
@@ -2124,7 +2497,7 @@ def product_results(product_id):
         template_vars = {
             'product': product,
             'responses': responses_data,
-            'responses_json': responses_json,
+            'results_payload': results_payload,
             'maturity_score': maturity_score,
             'dimension_scores': dimension_scores,  # Keep for backward compatibility
             'subdimension_scores': subdimension_scores,  # New sub-dimension scores
@@ -2139,9 +2512,9 @@ def product_results(product_id):
         # Handle any unexpected errors
         print(f"Error in product_results route: {e}")
         flash('An error occurred while loading the results. Please try again.', 'error')
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('main.dashboard'))
 
-@app.route('/client/comments')
+@bp.route('/client/comments')
 @login_required('client')
 def client_comments():
     comments = LeadComment.query.options(
@@ -2168,7 +2541,7 @@ def client_comments():
     
     return render_template('client_comments.html', comments=comments, grouped_comments=grouped_comments)
 
-@app.route('/client/question-chats')
+@bp.route('/client/question-chats')
 @login_required('client')
 def client_question_chats():
     """Show active question chats for the client"""
@@ -2189,7 +2562,7 @@ def client_question_chats():
     
     return render_template('client_question_chats.html', chats=chats)
 
-@app.route('/client/comment/<int:comment_id>/read')
+@bp.route('/client/comment/<int:comment_id>/read')
 @login_required('client')
 def mark_comment_read(comment_id):
     comment = LeadComment.query.get_or_404(comment_id)
@@ -2197,15 +2570,15 @@ def mark_comment_read(comment_id):
         comment.is_read = True
         db.session.commit()
         flash('Comment marked as read.', 'success')
-    return redirect(request.referrer or url_for('dashboard'))
+    return redirect(request.referrer or url_for('main.dashboard'))
 
-@app.route('/client/comment/<int:comment_id>/reply', methods=['POST'])
+@bp.route('/client/comment/<int:comment_id>/reply', methods=['POST'])
 @login_required('client')
 def client_reply_comment(comment_id):
     parent_comment = LeadComment.query.get_or_404(comment_id)
     if parent_comment.client_id != session['user_id']:
         flash('Unauthorized access.')
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('main.dashboard'))
 
     reply_text = request.form['reply']
     evidence_file = request.files.get('evidence')
@@ -2217,13 +2590,14 @@ def client_reply_comment(comment_id):
             valid, message = validate_file_security(evidence_file)
             if valid:
                 filename = secure_filename_hash(evidence_file.filename)
-                filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+                filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
                 os.makedirs(os.path.dirname(filepath), exist_ok=True)
                 evidence_file.save(filepath)
+                metrics.inc('securesphere_upload_bytes_total', os.path.getsize(filepath), kind='evidence')
                 evidence_path = f"static/uploads/{filename}"
             else:
                 flash(f'File upload failed: {message}', 'error')
-                return redirect(request.referrer or url_for('client_comments'))
+                return redirect(request.referrer or url_for('main.client_comments'))
 
         # Create a reply comment
         reply_comment = LeadComment(
@@ -2246,15 +2620,26 @@ def client_reply_comment(comment_id):
                 original_response.client_comment = reply_text
 
         db.session.commit()
+        snapshot_cache.invalidate(parent_comment.product_id)
         flash('Reply sent to lead successfully.')
 
-    return redirect(request.referrer or url_for('client_comments'))
+    return redirect(request.referrer or url_for('main.client_comments'))
 
-@app.route('/lead/comments')
+@bp.route('/lead/review-queue')
+@login_required('lead')
+def lead_review_queue():
+    """Answers of the lead's clients that wait on someone, most urgent first, one keyset page at a time"""
+    client_ids = get_current_user().accessible_client_ids()
+    entries, next_cursor = queue_page(client_ids, after=decode_cursor(request.args.get('after')),
+                                      limit=current_app.config['REVIEW_QUEUE_PAGE_SIZE'])
+    return render_template('lead_review_queue.html', entries=entries, next_cursor=next_cursor,
+                           first_page='after' not in request.args)
+
+@bp.route('/lead/comments')
 @login_required('lead')
 def lead_comments():
     # Get the current lead user to check their assigned client
-    current_lead = User.query.get(session['user_id'])
+    current_lead = get_current_user()
     
     if not current_lead.assigned_client_id:
         # Lead not assigned to any client yet
@@ -2310,7 +2695,7 @@ def lead_comments():
     
     return render_template('lead_comments.html', comments=comments, grouped_comments=grouped_comments)
 
-@app.route('/lead/comment/<int:comment_id>/reply', methods=['POST'])
+@bp.route('/lead/comment/<int:comment_id>/reply', methods=['POST'])
 @login_required('lead')
 def lead_reply_comment(comment_id):
     parent_comment = LeadComment.query.get_or_404(comment_id)
@@ -2321,7 +2706,7 @@ def lead_reply_comment(comment_id):
         LeadComment.query.filter_by(id=parent_comment.parent_comment_id, lead_id=session['user_id']).first()
     ):
         flash('Unauthorized access.')
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('main.dashboard'))
 
     reply_text = request.form['reply']
 
@@ -2338,235 +2723,244 @@ def lead_reply_comment(comment_id):
         )
         db.session.add(reply_comment)
         db.session.commit()
+        snapshot_cache.invalidate(parent_comment.product_id)
         flash('Reply sent to client successfully.')
 
-    return redirect(request.referrer or url_for('lead_comments'))
+    return redirect(request.referrer or url_for('main.lead_comments'))
 
-@app.route('/change-password-first-login', methods=['GET', 'POST'])
+@bp.route('/change-password-first-login', methods=['GET', 'POST'])
 @login_required('lead')
 def change_password_first_login():
-    user = User.query.get(session['user_id'])
+    user = get_current_user()
     
     # Only allow this route for first-time login
     if not user.first_login:
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('main.dashboard'))
     
     if request.method == 'POST':
         current_password = request.form['current_password']
         new_password = request.form['new_password']
         confirm_password = request.form['confirm_password']
         
-        # Validate current password
-        if not user.check_password(current_password):
-            flash('Current password is incorrect.', 'error')
-            return render_template('change_password_first_login.html')
-        
-        # Validate new password
-        if len(new_password) < 8:
-            flash('New password must be at least 8 characters long.', 'error')
-            return render_template('change_password_first_login.html')
-        
-        if new_password != confirm_password:
-            flash('New passwords do not match.', 'error')
-            return render_template('change_password_first_login.html')
-        
-        # Update password and mark first login as complete
-        user.set_password(new_password)
+        try:
+            # Validate current password
+            if not user.check_password(current_password):
+                flash('Current password is incorrect.', 'error')
+                return render_template('change_password_first_login.html')
+
+            # Validate new password
+            if len(new_password) < 8:
+                flash('New password must be at least 8 characters long.', 'error')
+                return render_template('change_password_first_login.html')
+
+            if new_password != confirm_password:
+                flash('New passwords do not match.', 'error')
+                return render_template('change_password_first_login.html')
+
+            # Update password and mark first login as complete
+            user.set_password(new_password)
+        except PasswordHashingBusy:
+            flash(PASSWORD_HASHING_BUSY, 'error')
+            return redirect(url_for('main.change_password_first_login'))
         user.first_login = False
         db.session.commit()
         
         flash('Password changed successfully! Welcome to SecureSphere.', 'success')
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('main.dashboard'))
     
     return render_template('change_password_first_login.html')
 
-@app.route('/change-password', methods=['GET', 'POST'])
+@bp.route('/change-password', methods=['GET', 'POST'])
 @login_required()
 def change_password():
-    user = User.query.get(session['user_id'])
+    user = get_current_user()
     
     if request.method == 'POST':
         current_password = request.form['current_password']
         new_password = request.form['new_password']
         confirm_password = request.form['confirm_password']
         
-        # Validate current password
-        if not user.check_password(current_password):
-            flash('Current password is incorrect.', 'error')
-            return render_template('change_password.html')
-        
-        # Validate new password
-        if len(new_password) < 8:
-            flash('New password must be at least 8 characters long.', 'error')
-            return render_template('change_password.html')
-        
-        if new_password != confirm_password:
-            flash('New passwords do not match.', 'error')
-            return render_template('change_password.html')
-        
-        # Update password
-        user.set_password(new_password)
+        try:
+            # Validate current password
+            if not user.check_password(current_password):
+                flash('Current password is incorrect.', 'error')
+                return render_template('change_password.html')
+
+            # Validate new password
+            if len(new_password) < 8:
+                flash('New password must be at least 8 characters long.', 'error')
+                return render_template('change_password.html')
+
+            if new_password != confirm_password:
+                flash('New passwords do not match.', 'error')
+                return render_template('change_password.html')
+
+            # Update password
+            user.set_password(new_password)
+        except PasswordHashingBusy:
+            flash(PASSWORD_HASHING_BUSY, 'error')
+            return redirect(url_for('main.change_password'))
         db.session.commit()
         
         flash('Password changed successfully!', 'success')
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('main.dashboard'))
     
     return render_template('change_password.html')
 
-@app.route('/review/<int:response_id>', methods=['GET', 'POST'])
-@login_required('lead')
-def review_questionnaire(response_id):
-    resp = QuestionnaireResponse.query.get_or_404(response_id)
-    
-    # Check if the lead is assigned to review this client
-    current_lead = User.query.get(session['user_id'])
-    if not current_lead.can_access_client_data(resp.user_id):
-        flash('You are not authorized to review this client\'s responses.')
-        return redirect(url_for('dashboard'))
-    
-    if request.method == 'POST':
-        action = request.form.get('action')
-        comment = request.form.get('comment', '').strip()
-        
+REVIEW_ACTIONS = {
+    'approve': 'Question approved and frozen successfully.',
+    'needs_revision': 'Question marked for revision. Chat created for client communication.',
+    'reject': 'Question rejected. Client will be asked to re-select their answer.',
+}
+
+def apply_review_action(responses, action, comment, lead_id):
+    """
+    Apply a lead's review action to answers in the current transaction: set their
+    review status, open, update or close their chats with the lead's message and
+    requeue them. Active chats are loaded in one query and new chats are added
+    without flushing; the caller commits and recomputes product status and scores.
+    """
+    now = datetime.now(timezone.utc)
+    chats = {chat.response_id: chat for chat in QuestionChat.query.filter(
+        QuestionChat.response_id.in_([resp.id for resp in responses]),
+        QuestionChat.is_active == True
+    )}
+    reason = comment if comment else "No specific reason provided."
+
+    for resp in responses:
+        existing_chat = chats.get(resp.id)
         if action == 'approve':
             # APPROVED: Question is frozen and finalized
             resp.is_reviewed = True
             resp.is_approved = True
             resp.needs_client_response = False
             resp.review_status = 'approved'
-            
-            # Check if there's an existing chat for this response
-            existing_chat = QuestionChat.query.filter_by(response_id=response_id, is_active=True).first()
+            message_type = 'status_change'
+            content = '✅ Question approved and finalized by lead' if existing_chat else None
             if existing_chat:
                 existing_chat.review_status = 'approved'
                 existing_chat.is_active = False
-                existing_chat.updated_at = datetime.now(timezone.utc)
-                
-                # Add system message to chat
-                system_message = ChatMessage(
-                    chat_id=existing_chat.id,
-                    sender_id=session['user_id'],
-                    message_type='status_change',
-                    content='✅ Question approved and finalized by lead',
-                    is_read_by_client=False,
-                    is_read_by_lead=True
-                )
-                db.session.add(system_message)
-            
-            flash('Question approved and frozen successfully.')
-            
+                existing_chat.updated_at = now
+
         elif action == 'needs_revision':
             # NEEDS REVISION: Create/update chat for more evidence
             resp.is_reviewed = True
             resp.is_approved = False
             resp.needs_client_response = True
             resp.review_status = 'needs_revision'
-            
-            # Create or get existing chat
-            existing_chat = QuestionChat.query.filter_by(response_id=response_id, is_active=True).first()
-            if not existing_chat:
-                chat = QuestionChat(
-                    response_id=response_id,
-                    client_id=resp.user_id,
-                    lead_id=session['user_id'],
-                    product_id=resp.product_id,
-                    review_status='needs_revision',
-                    is_active=True
-                )
-                db.session.add(chat)
-                db.session.flush()  # Get the ID
-                
-                # Add initial message from lead
-                initial_message = ChatMessage(
-                    chat_id=chat.id,
-                    sender_id=session['user_id'],
-                    message_type='text',
-                    content=comment if comment else 'This question needs revision. Please provide more comments and evidence.',
-                    is_read_by_client=False,
-                    is_read_by_lead=True
-                )
-                db.session.add(initial_message)
+            message_type = 'text'
+            if existing_chat:
+                content = comment or None
             else:
-                existing_chat.review_status = 'needs_revision'
-                existing_chat.updated_at = datetime.now(timezone.utc)
-                
-                # Add comment message
-                if comment:
-                    new_message = ChatMessage(
-                        chat_id=existing_chat.id,
-                        sender_id=session['user_id'],
-                        message_type='text',
-                        content=comment,
-                        is_read_by_client=False,
-                        is_read_by_lead=True
-                    )
-                    db.session.add(new_message)
-            
-            flash('Question marked for revision. Chat created for client communication.')
-            
-        elif action == 'reject':
+                content = comment if comment else 'This question needs revision. Please provide more comments and evidence.'
+
+        else:
             # REJECTED: Question sent back with all 5 options for re-selection
             resp.is_reviewed = False
             resp.is_approved = False
             resp.needs_client_response = True
             resp.review_status = 'rejected'
-            
-            # Create or get existing chat
-            existing_chat = QuestionChat.query.filter_by(response_id=response_id, is_active=True).first()
-            if not existing_chat:
-                chat = QuestionChat(
-                    response_id=response_id,
+            message_type = 'status_change'
+            if existing_chat:
+                content = f'❌ Question rejected. Please re-select your answer. Reason: {reason}'
+            else:
+                content = f'❌ Question rejected. Please re-select your answer from all available options. Reason: {reason}'
+
+        if action != 'approve':
+            if existing_chat:
+                existing_chat.review_status = resp.review_status
+                existing_chat.updated_at = now
+            else:
+                existing_chat = QuestionChat(
+                    response_id=resp.id,
                     client_id=resp.user_id,
-                    lead_id=session['user_id'],
+                    lead_id=lead_id,
                     product_id=resp.product_id,
-                    review_status='rejected',
+                    review_status=resp.review_status,
                     is_active=True
                 )
-                db.session.add(chat)
-                db.session.flush()
-                
-                # Add initial rejection message
-                initial_message = ChatMessage(
-                    chat_id=chat.id,
-                    sender_id=session['user_id'],
-                    message_type='status_change',
-                    content=f'❌ Question rejected. Please re-select your answer from all available options. Reason: {comment if comment else "No specific reason provided."}',
-                    is_read_by_client=False,
-                    is_read_by_lead=True
-                )
-                db.session.add(initial_message)
-            else:
-                existing_chat.review_status = 'rejected'
-                existing_chat.updated_at = datetime.now(timezone.utc)
-                
-                # Add rejection message
-                rejection_message = ChatMessage(
-                    chat_id=existing_chat.id,
-                    sender_id=session['user_id'],
-                    message_type='status_change',
-                    content=f'❌ Question rejected. Please re-select your answer. Reason: {comment if comment else "No specific reason provided."}',
-                    is_read_by_client=False,
-                    is_read_by_lead=True
-                )
-                db.session.add(rejection_message)
-            
-            flash('Question rejected. Client will be asked to re-select their answer.')
+                db.session.add(existing_chat)
+
+        if content:
+            db.session.add(ChatMessage(
+                chat=existing_chat,
+                sender_id=lead_id,
+                message_type=message_type,
+                content=content,
+                is_read_by_client=False,
+                is_read_by_lead=True
+            ))
 
+    queue_responses(responses)
+
+@bp.route('/review/<int:response_id>', methods=['GET', 'POST'])
+@login_required('lead')
+def review_questionnaire(response_id):
+    resp = QuestionnaireResponse.query.get_or_404(response_id)
+    
+    # Check if the lead is assigned to review this client
+    current_lead = get_current_user()
+    if not current_lead.can_access_client_data(resp.user_id):
+        flash('You are not authorized to review this client\'s responses.')
+        return redirect(url_for('main.dashboard'))
+    
+    if request.method == 'POST':
+        action = request.form.get('action')
+        comment = request.form.get('comment', '').strip()
+
+        if action in REVIEW_ACTIONS:
+            apply_review_action([resp], action, comment, session['user_id'])
+            flash(REVIEW_ACTIONS[action])
         db.session.commit()
+        snapshot_cache.invalidate(resp.product_id)
 
         # Update product status and recalculate scores
         update_product_status(resp.product_id, resp.user_id)
         calculate_and_store_scores(resp.product_id, resp.user_id)
 
         # Redirect back to dashboard after action
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('main.dashboard'))
     
     # Check if there's an existing chat for this response
     existing_chat = QuestionChat.query.filter_by(response_id=response_id, is_active=True).first()
     
     return render_template('review_questionnaire.html', response=resp, existing_chat=existing_chat)
 
-@app.route('/admin/product/<int:product_id>/details')
+@bp.route('/review/bulk', methods=['POST'])
+@login_required('lead')
+def review_bulk():
+    """Apply one review action to many answers, recomputing each product's status and scores once"""
+    action = request.form.get('action')
+    comment = request.form.get('comment', '').strip()
+    response_ids = set(request.form.getlist('response_ids', type=int))
+    next_url = url_for('main.lead_review_queue')
+
+    if action not in REVIEW_ACTIONS or not response_ids:
+        flash('Select at least one question and a review action.')
+        return redirect(next_url)
+
+    client_ids = get_current_user().accessible_client_ids()
+    responses = QuestionnaireResponse.query.filter(QuestionnaireResponse.id.in_(response_ids)).all()
+    if len(responses) != len(response_ids) or any(resp.user_id not in client_ids for resp in responses):
+        flash('You are not authorized to review this client\'s responses.')
+        return redirect(next_url)
+
+    apply_review_action(responses, action, comment, session['user_id'])
+    db.session.commit()
+
+    for product_id, user_id in sorted({(resp.product_id, resp.user_id) for resp in responses}):
+        snapshot_cache.invalidate(product_id)
+        update_product_status(product_id, user_id)
+        calculate_and_store_scores(product_id, user_id)
+
+    flash({
+        'approve': f'{len(responses)} questions approved and frozen.',
+        'needs_revision': f'{len(responses)} questions marked for revision.',
+        'reject': f'{len(responses)} questions rejected. Clients will be asked to re-select their answers.',
+    }[action])
+    return redirect(next_url)
+
+@bp.route('/admin/product/<int:product_id>/details')
 @login_required('superuser')
 def admin_product_details(product_id):
     # Get all responses for this product
@@ -2591,7 +2985,8 @@ def admin_product_details(product_id):
             }
         
         # Calculate score for this response (1-5 scale)
-        raw_score = calculate_score_for_answer(resp.question, resp.answer)
+        score = catalog_score(resp)
+        raw_score = score * 20 if score is not None else calculate_score_for_answer(resp.question, resp.answer)
         normalized_score = raw_score / 20 if raw_score > 0 else 0
         
         dimension_data[section]['responses'].append(resp)
@@ -2666,7 +3061,7 @@ def admin_product_details(product_id):
                          product_id=product_id,
                          communications_by_dimension=communications_by_dimension)
 
-@app.route('/admin/product/<int:product_id>/results')
+@bp.route('/admin/product/<int:product_id>/results')
 @login_required('superuser')
 def admin_product_results(product_id):
     # Get all responses for this product
@@ -2681,7 +3076,7 @@ def admin_product_results(product_id):
     # Handle case where owner might be None (user deleted)
     if not owner:
         flash('Product owner not found. Cannot display results.', 'error')
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('main.dashboard'))
     
     # Get all lead comments for this product
     all_lead_comments = LeadComment.query.filter_by(product_id=product_id, client_id=owner.id).all()
@@ -2702,6 +3097,8 @@ def admin_product_results(product_id):
             'id': resp.id,
             'section': resp.section,
             'question': resp.question,
+            'question_id': resp.question_id,
+            'option_id': resp.option_id,
             'answer': resp.answer,
             'score': resp.score,
             'max_score': resp.max_score,
@@ -2726,22 +3123,14 @@ def admin_product_results(product_id):
             
         responses_data.append(response_data)
     
-    # Calculate overall maturity score and section details
-    overall_score, section_data = calculate_overall_maturity_score(product_id, owner.id)
+    # Every score view comes from the owner's answers, already loaded above
+    snapshot = AssessmentSnapshot.cached(product_id, owner.id,
+                                         responses=[resp for resp in resps if resp.user_id == owner.id])
+    overall_score, section_data = snapshot.overall_score, snapshot.section_data
     maturity_level = get_maturity_level(overall_score)
-    
-    # Calculate sub-dimension scores
-    try:
-        subdimension_scores = calculate_subdimension_scores(product_id, owner.id)
-    except Exception as e:
-        print(f"Error calculating sub-dimension scores: {e}")
-        subdimension_scores = {}
-    
-    # Generate heatmap data
-    heatmap_data = generate_heatmap_data(product_id, owner.id)
-    
-    # Generate ring-wise heatmap data
-    ringwise_heatmap_data = generate_ringwise_heatmap_data(product_id, owner.id)
+    subdimension_scores = snapshot.subdimension_scores
+    heatmap_data = snapshot.heatmap()
+    ringwise_heatmap_data = snapshot.rings()
     
     # Get lead comments for this product
     lead_comments = LeadComment.query.options(
@@ -2749,65 +3138,15 @@ def admin_product_results(product_id):
         db.joinedload(LeadComment.lead)
     ).filter_by(product_id=product_id, client_id=owner.id).order_by(LeadComment.created_at.desc()).all()
     
-    # Create serializable responses JSON for JavaScript (like in client product_results)
-    responses_json = []
-    for resp_data in responses_data:
-        try:
-            responses_json.append({
-                'section': str(resp_data.get('section', '')),
-                'question': str(resp_data.get('question', '')),
-                'answer': str(resp_data.get('answer', '')),
-                'score': float(resp_data.get('score', 0)) if resp_data.get('score') is not None else 0.0,
-                'lead_comments': resp_data.get('lead_comments', [])
-            })
-        except Exception as e:
-            print(f"Error serializing response: {e}")
-            continue
+    # Compact chart data for JavaScript (like in client product_results)
+    results_payload = build_results_payload(responses_data, subdimension_scores)
 
     # Calculate additional variables needed by template (like client route)
-    dimension_scores = {}  # Keep for backward compatibility
-    section_dimensions = {}
-    
-    # Keep original dimension scores for backward compatibility
-    if section_data and isinstance(section_data, dict):
-        for section_name, data in section_data.items():
-            try:
-                if not isinstance(data, dict):
-                    continue
-                    
-                avg_score = data.get('average_score', 0)
-                question_count = data.get('questions_count', 0)
-                total_score = data.get('total_score', 0)
-                
-                # Ensure numeric values
-                avg_score = float(avg_score) if avg_score is not None else 0.0
-                question_count = int(question_count) if question_count is not None else 0
-                total_score = float(total_score) if total_score is not None else 0.0
-                
-                dimension_scores[str(section_name)] = {
-                    'average_score': round(avg_score, 2),
-                    'question_count': question_count,
-                    'total_score': round(total_score, 2)
-                }
-                
-                # Calculate section percentage for section_dimensions
-                max_possible = question_count * 5  # Assuming max score of 5 per question
-                percentage = (total_score / max_possible * 100) if max_possible > 0 else 0
-                
-                section_dimensions[str(section_name)] = {
-                    'percentage': round(max(0, min(100, percentage)), 1),
-                    'question_count': question_count,
-                    'total_score': round(total_score, 2),
-                    'max_possible_score': max_possible
-                }
-            except Exception as e:
-                print(f"Error processing section {section_name}: {e}")
-                continue
+    dimension_scores, section_dimensions = snapshot.dimension_views()  # Keep for backward compatibility
 
     # Calculate dimension-wise results from subdimension scores
     try:
-        from ring_heatmap_implementation import get_dimension_wise_results
-        dimension_results = get_dimension_wise_results(subdimension_scores)
+        dimension_results = snapshot.dimension_results()
     except Exception as e:
         print(f'Error calculating dimension-wise results: {e}')
         dimension_results = {}
@@ -2816,7 +3155,7 @@ def admin_product_results(product_id):
     template_vars = {
         'product': product,
         'responses': responses_data,
-        'responses_json': responses_json,
+        'results_payload': results_payload,
         'lead_comments': lead_comments,
         'overall_score': overall_score,
         'maturity_score': max(1, min(5, round(overall_score))) if overall_score and overall_score > 0 else 1,
@@ -2834,7 +3173,7 @@ def admin_product_results(product_id):
     
     return render_template('product_results.html', **template_vars)
 
-@app.route('/admin/create_product', methods=['GET', 'POST'])
+@bp.route('/admin/create_product', methods=['GET', 'POST'])
 @login_required('superuser')
 def admin_create_product():
     if request.method == 'POST':
@@ -2845,7 +3184,7 @@ def admin_create_product():
         client = User.query.filter_by(id=client_id, role='client').first()
         if not client:
             flash('Invalid client selected.')
-            return redirect(url_for('admin_create_product'))
+            return redirect(url_for('main.admin_create_product'))
 
         # Create product
         product = Product(name=product_name, owner_id=client_id)
@@ -2853,25 +3192,27 @@ def admin_create_product():
         db.session.commit()
 
         flash(f'Product "{product_name}" created successfully for {client.username}.')
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('main.dashboard'))
 
     # Get all clients for the form
     clients = User.query.filter_by(role='client').all()
     return render_template('admin_create_product.html', clients=clients)
 
-@app.route('/admin/products/delete/<int:product_id>')
+@bp.route('/admin/products/delete/<int:product_id>')
 @login_required('superuser')
 def admin_delete_product(product_id):
     product = Product.query.get_or_404(product_id)
     QuestionnaireResponse.query.filter_by(product_id=product_id).delete()
+    drop_responses(product_id=product_id)
     db.session.delete(product)
     db.session.commit()
+    # SQLite can hand the id to the next product, so drop anything cached for it
+    snapshot_cache.invalidate(product_id)
     flash('Product and all responses deleted.')
-    return redirect(url_for('dashboard'))
+    return redirect(url_for('main.dashboard'))
 
-@app.route('/api/product/<int:product_id>/scores')
-@login_required()
-def api_product_scores(product_id):
+def calculate_product_score_summary(product_id):
+    """Section and overall scores over every answer to a product, as served by the scores API"""
     resps = QuestionnaireResponse.query.filter_by(product_id=product_id).all()
     section_scores = {}
     section_max_scores = {}
@@ -2913,12 +3254,13 @@ def api_product_scores(product_id):
                     pass
 
         # Calculate max scores per section
+        answered = {(resp.question, resp.section) for resp in resps}
         for question, options in csv_map.items():
             if options:
                 max_score = max(options.values())
                 # Find dimension for this question
                 for dimension in section_max_scores:
-                    if any(resp.question == question and resp.section == dimension for resp in resps):
+                    if (question, dimension) in answered:
                         if section_max_scores[dimension] == 0:  # Only add once per question
                             section_max_scores[dimension] += max_score
                             total_max_score += max_score
@@ -2952,7 +3294,7 @@ def api_product_scores(product_id):
 
     overall_percentage = (total_score / total_max_score * 100) if total_max_score > 0 else 0
 
-    return jsonify({
+    return {
         "section_labels": section_labels,
         "section_scores": section_values,
         "section_percentages": section_percentages,
@@ -2962,117 +3304,136 @@ def api_product_scores(product_id):
         "overall_percentage": round(overall_percentage, 1),
         "sections_count": len(section_labels),
         "question_scores": question_scores
-    })
+    }
+
+@bp.route('/api/catalog/<version>')
+@login_required()
+def api_catalog(version):
+    """Question catalog for compact result payloads; immutable per version, so browsers keep it"""
+    catalog = get_question_catalog()
+    if version != catalog['version']:
+        return redirect(url_for('main.api_catalog', version=catalog['version']))
+    response = jsonify(catalog)
+    response.headers['Cache-Control'] = f"private, max-age={CATALOG_MAX_AGE}, immutable"
+    return response
+
+@bp.route('/api/product/<int:product_id>/scores')
+@login_required()
+def api_product_scores(product_id):
+    summary = snapshot_cache.get_or_build('product_scores', product_id, None,
+                                          lambda: calculate_product_score_summary(product_id))
+    return jsonify(summary)
+
+def calculate_product_percentage_scores(product_id):
+    """Score totals and percentages for one product, as listed by the all-scores API"""
+    resps = QuestionnaireResponse.query.filter_by(product_id=product_id).all()
+
+    if resps:
+        # Get scores for this product
+        section_scores = {}
+        section_max_scores = {}
+        total_score = 0
+        total_max_score = 0
+        csv_map = {}
+
+        # Build scoring map
+        csv_path = os.path.join(os.path.dirname(__file__), 'devweb.csv')
+        with open(csv_path, encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            current_question = None
+            current_dimension = None
+            question_options = {}
+
+            for row in reader:
+                dimension = row['Dimensions'].strip()
+                question = row['Questions'].strip()
+                option = row['Options'].strip()
+                score_text = row.get('Scores', '').strip()
+
+                # Track current dimension and question
+                if dimension:
+                    current_dimension = dimension
+                if question:
+                    current_question = question
+                    question_options = {}
+                    if current_dimension not in section_max_scores:
+                        section_max_scores[current_dimension] = 0
+
+                # Store option and score for current question
+                if current_question and option and score_text:
+                    try:
+                        score = int(score_text)
+                        question_options[option] = score
+                        csv_map[current_question] = question_options.copy()
+                    except (ValueError, TypeError):
+                        pass
+
+            # Calculate max scores per section
+            answered = {(resp.question, resp.section) for resp in resps}
+            for question, options in csv_map.items():
+                if options:
+                    max_score = max(options.values())
+                    # Find dimension for this question
+                    for dimension in section_max_scores:
+                        if (question, dimension) in answered:
+                            section_max_scores[dimension] += max_score
+                            total_max_score += max_score
+                            break
+
+        # Calculate scores
+        for r in resps:
+            sec = r.section
+            if sec not in section_scores:
+                section_scores[sec] = 0
+
+            score = csv_map.get(r.question, {}).get(r.answer, 0)
+            section_scores[sec] += score
+            total_score += score
+
+        overall_percentage = (total_score / total_max_score * 100) if total_max_score > 0 else 0
+
+        return {
+            'total_score': total_score,
+            'max_score': total_max_score,
+            'percentage': round(overall_percentage, 1),
+            'maturity_score': round(overall_percentage, 1),  # Add this for dashboard compatibility
+            'section_scores': section_scores,
+            'section_percentages': {k: round((v / section_max_scores.get(k, 1) * 100), 1)
+                                   for k, v in section_scores.items()}
+        }
+
+    return {
+        'total_score': 0,
+        'max_score': 0,
+        'percentage': 0,
+        'maturity_score': 0,  # Add this for dashboard compatibility
+        'section_scores': {},
+        'section_percentages': {}
+    }
 
-@app.route('/api/superuser/all_scores')
+@bp.route('/api/superuser/all_scores')
 @login_required('superuser')
 def api_all_scores():
     products = Product.query.all()
     all_scores = []
 
     for product in products:
-        product_data = {}
-        resps = QuestionnaireResponse.query.filter_by(product_id=product.id).all()
-
-        if resps:
-            # Get scores for this product
-            section_scores = {}
-            section_max_scores = {}
-            total_score = 0
-            total_max_score = 0
-            csv_map = {}
-
-            # Build scoring map
-            csv_path = os.path.join(os.path.dirname(__file__), 'devweb.csv')
-            with open(csv_path, encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                current_question = None
-                current_dimension = None
-                question_options = {}
-
-                for row in reader:
-                    dimension = row['Dimensions'].strip()
-                    question = row['Questions'].strip()
-                    option = row['Options'].strip()
-                    score_text = row.get('Scores', '').strip()
-
-                    # Track current dimension and question
-                    if dimension:
-                        current_dimension = dimension
-                    if question:
-                        current_question = question
-                        question_options = {}
-                        if current_dimension not in section_max_scores:
-                            section_max_scores[current_dimension] = 0
-
-                    # Store option and score for current question
-                    if current_question and option and score_text:
-                        try:
-                            score = int(score_text)
-                            question_options[option] = score
-                            csv_map[current_question] = question_options.copy()
-                        except (ValueError, TypeError):
-                            pass
-
-                # Calculate max scores per section
-                for question, options in csv_map.items():
-                    if options:
-                        max_score = max(options.values())
-                        # Find dimension for this question
-                        for dimension in section_max_scores:
-                            if any(resp.question == question and resp.section == dimension for resp in resps):
-                                section_max_scores[dimension] += max_score
-                                total_max_score += max_score
-                                break
-
-            # Calculate scores
-            for r in resps:
-                sec = r.section
-                if sec not in section_scores:
-                    section_scores[sec] = 0
-
-                score = csv_map.get(r.question, {}).get(r.answer, 0)
-                section_scores[sec] += score
-                total_score += score
-
-            overall_percentage = (total_score / total_max_score * 100) if total_max_score > 0 else 0
-
-            # Get owner info
-            owner = User.query.get(product.owner_id)
-
-            product_data = {
-                'id': product.id,
-                'name': product.name,
-                'owner': owner.username if owner else 'Unknown',
-                'organization': owner.organization if owner else 'Unknown',
-                'total_score': total_score,
-                'max_score': total_max_score,
-                'percentage': round(overall_percentage, 1),
-                'maturity_score': round(overall_percentage, 1),  # Add this for dashboard compatibility
-                'section_scores': section_scores,
-                'section_percentages': {k: round((v / section_max_scores.get(k, 1) * 100), 1)
-                                       for k, v in section_scores.items()}
-            }
-        else:
-            owner = User.query.get(product.owner_id)
-            product_data = {
-                'id': product.id,
-                'name': product.name,
-                'owner': owner.username if owner else 'Unknown',
-                'organization': owner.organization if owner else 'Unknown',
-                'total_score': 0,
-                'max_score': 0,
-                'percentage': 0,
-                'maturity_score': 0,  # Add this for dashboard compatibility
-                'section_scores': {},
-                'section_percentages': {}
-            }
-
+        owner = User.query.get(product.owner_id)
+        product_data = {
+            'id': product.id,
+            'name': product.name,
+            'owner': owner.username if owner else 'Unknown',
+            'organization': owner.organization if owner else 'Unknown',
+        }
+        product_data.update(snapshot_cache.get_or_build(
+            'percentage_scores', product.id, None,
+            lambda: calculate_product_percentage_scores(product.id)
+        ))
         all_scores.append(product_data)
 
     return jsonify(all_scores)
 
-@app.route('/api/admin/review_response', methods=['POST'])
+@bp.route('/api/admin/review_response', methods=['POST'])
 @login_required('superuser')
 def api_admin_review_response():
     try:
@@ -3133,6 +3494,7 @@ def api_admin_review_response():
             response.needs_client_response = False
             
         db.session.commit()
+        snapshot_cache.invalidate(product.id)
         
         return jsonify({
             'success': True, 
@@ -3145,7 +3507,7 @@ def api_admin_review_response():
         print(f"Error in admin review: {e}")
         return jsonify({'success': False, 'message': 'Internal server error'}), 500
 
-@app.route('/admin/invite_client', methods=['GET', 'POST'])
+@bp.route('/admin/invite_client', methods=['GET', 'POST'])
 @login_required('superuser')
 def invite_client():
     if request.method == 'POST':
@@ -3158,7 +3520,7 @@ def invite_client():
         # Validate inputs
         if not email:
             flash('Email is required.')
-            return redirect(url_for('invite_client'))
+            return redirect(url_for('main.invite_client'))
 
         # Ensure role is always client for this invitation form
         if role != 'client':
@@ -3167,7 +3529,7 @@ def invite_client():
         # Check if user already exists
         if User.query.filter_by(email=email).first():
             flash('User with this email already exists.')
-            return redirect(url_for('invite_client'))
+            return redirect(url_for('main.invite_client'))
 
         # Check if there's already a pending invitation
         existing_invitation = InvitationToken.query.filter_by(email=email, is_used=False).first()
@@ -3175,7 +3537,7 @@ def invite_client():
             try:
                 if not existing_invitation.is_expired():
                     flash('There is already a pending invitation for this email.')
-                    return redirect(url_for('invite_client'))
+                    return redirect(url_for('main.invite_client'))
             except Exception as e:
                 print(f"Error checking existing invitation expiration: {e}")
                 # If there's an error, assume it's expired and continue with new invitation
@@ -3198,27 +3560,52 @@ def invite_client():
         db.session.commit()
 
         # Generate invitation link
-        invitation_link = url_for('register', token=token, _external=True)
+        invitation_link = url_for('main.register', token=token, _external=True)
 
         # Get inviter's name
-        inviter = User.query.get(session['user_id'])
+        inviter = get_current_user()
         inviter_name = f"{inviter.first_name} {inviter.last_name}".strip() or inviter.username
 
         # Try to send email invitation
         email_sent = send_invitation_email(email, role, invitation_link, inviter_name)
 
         if email_sent:
-            flash(f'Invitation email sent successfully to {email}! They will receive a registration link via email.', 'success')
+            flash(f'Invitation email queued for {email}! They will receive a registration link via email shortly.', 'success')
         else:
-            flash(f'Invitation created but email could not be sent. Registration link: {invitation_link}', 'warning')
+            flash(f'Invitation created but email could not be queued. Registration link: {invitation_link}', 'warning')
 
-        return redirect(url_for('invite_client'))
+        return redirect(url_for('main.invite_client'))
 
     # Get recent client invitations for display
     recent_invitations = User.query.filter_by(role='client').order_by(User.created_at.desc()).limit(5).all()
     return render_template('admin_invite_client.html', recent_invitations=recent_invitations)
 
-@app.route('/admin/invite_reviewer', methods=['GET', 'POST'])
+@bp.route('/admin/bulk_invite_clients', methods=['POST'])
+@login_required('superuser')
+def bulk_invite_clients():
+    """Invite every client listed in an uploaded CSV (email, organization)"""
+    from bulk_onboarding import parse_onboarding_csv, onboard_clients, summarize
+
+    file = request.files.get('csv_file')
+    if not file or not file.filename or not file.filename.lower().endswith('.csv'):
+        flash('Please upload a CSV file.', 'error')
+        return redirect(url_for('main.invite_client'))
+
+    try:
+        rows, invalid = parse_onboarding_csv(io.TextIOWrapper(file.stream, encoding='utf-8-sig', newline=''))
+    except UnicodeDecodeError:
+        flash('The CSV file must be UTF-8 encoded.', 'error')
+        return redirect(url_for('main.invite_client'))
+
+    inviter = get_current_user()
+    report = onboard_clients(rows, inviter, lambda token: url_for('main.register', token=token, _external=True))
+
+    flash(f'Bulk invitation: {summarize(report, invalid)}.', 'success' if report['invited'] else 'warning')
+    for line, reason in invalid[:10]:
+        flash(f'Line {line}: {reason}', 'warning')
+    return redirect(url_for('main.invite_client'))
+
+@bp.route('/admin/invite_reviewer', methods=['GET', 'POST'])
 @login_required('superuser')
 def invite_reviewer():
     # GET request - show the form
@@ -3226,14 +3613,68 @@ def invite_reviewer():
     reviewers = User.query.filter_by(role='lead', is_active=True).order_by(User.created_at.desc()).limit(10).all()
     return render_template('admin_invite_reviewer.html', clients=clients, reviewers=reviewers)
 
+LOOPBACK_ADDRESSES = {'127.0.0.1', '::1'}
+
+def metrics_scrape_allowed():
+    """
+    With METRICS_TOKEN set, only requests bearing it; without, only superusers and
+    scrapers on this host. Proxied requests (X-Forwarded-For) never count as local.
+    """
+    token = current_app.config.get('METRICS_TOKEN')
+    if token:
+        return hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}')
+    if session.get('role') == 'superuser':
+        return True
+    return request.remote_addr in LOOPBACK_ADDRESSES and 'X-Forwarded-For' not in request.headers
+
+@bp.route('/metrics')
+@limiter.exempt
+def prometheus_metrics():
+    """Prometheus scrape endpoint covering every worker process"""
+    if not metrics_scrape_allowed():
+        return jsonify({"error": "Unauthorized"}), 403
+
+    extra_lines = [
+        '# HELP securesphere_rate_limit_hits_total Requests admitted per rate limit',
+        '# TYPE securesphere_rate_limit_hits_total counter',
+    ]
+    limit_metrics = rate_limit_storage.get_limiter_metrics(limiter)
+    extra_lines += [f'securesphere_rate_limit_hits_total{{limit="{m["limit"]}"}} {m["hits"]}' for m in limit_metrics]
+    extra_lines += [
+        '# HELP securesphere_rate_limit_blocked_total Requests rejected per rate limit',
+        '# TYPE securesphere_rate_limit_blocked_total counter',
+    ]
+    extra_lines += [f'securesphere_rate_limit_blocked_total{{limit="{m["limit"]}"}} {m["blocked"]}' for m in limit_metrics]
+
+    return metrics.render(extra_lines), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+@bp.route('/admin/rate_limit_metrics')
+@login_required('superuser')
+def rate_limit_metrics():
+    """Limiter hits and blocked requests per limit, aggregated across workers"""
+    metrics = rate_limit_storage.get_limiter_metrics(limiter)
+    return jsonify({
+        'storage': current_app.config['RATELIMIT_STORAGE_URI'].split('://', 1)[0],
+        'strategy': current_app.config['RATELIMIT_STRATEGY'],
+        'limits': metrics,
+        'total_hits': sum(m['hits'] for m in metrics),
+        'total_blocked': sum(m['blocked'] for m in metrics)
+    })
+
+@bp.route('/admin/email_outbox')
+@login_required('superuser')
+def email_outbox_status():
+    """Outbox delivery status: counts per status and recent failures"""
+    return jsonify(outbox_status())
+
 # Keep the old route for backward compatibility  
-@app.route('/admin/invite_user', methods=['GET', 'POST'])
+@bp.route('/admin/invite_user', methods=['GET', 'POST'])
 @login_required('superuser')
 def invite_user():
     # Redirect to the new client invitation page
-    return redirect(url_for('invite_client'))
+    return redirect(url_for('main.invite_client'))
 
-@app.route('/admin/manage_clients')
+@bp.route('/admin/manage_clients')
 @login_required('superuser')
 def manage_clients():
     # Get all clients with their products
@@ -3248,7 +3689,7 @@ def manage_clients():
 
 
 
-@app.route('/admin/manage_users')
+@bp.route('/admin/manage_users')
 @login_required('superuser')
 def manage_users():
     users = User.query.order_by(User.created_at.desc()).all()
@@ -3257,7 +3698,7 @@ def manage_users():
     clients = User.query.filter_by(role='client', is_active=True).order_by(User.username).all()
     return render_template('admin_manage_users.html', users=users, pending_invitations=pending_invitations, clients=clients)
 
-@app.route('/admin/create_lead', methods=['POST'])
+@bp.route('/admin/create_lead', methods=['POST'])
 @login_required('superuser')
 def create_lead():
     username = request.form['username']
@@ -3268,25 +3709,25 @@ def create_lead():
     # Validate inputs
     if not username or not email or not password:
         flash('Username, email, and password are required.')
-        return redirect(url_for('manage_users'))
+        return redirect(url_for('main.manage_users'))
 
     if not assigned_client_id:
         flash('Please select a client to assign to this lead.')
-        return redirect(url_for('manage_users'))
+        return redirect(url_for('main.manage_users'))
 
     if User.query.filter_by(username=username).first():
         flash('Username already exists.')
-        return redirect(url_for('manage_users'))
+        return redirect(url_for('main.manage_users'))
 
     if User.query.filter_by(email=email).first():
         flash('Email already exists.')
-        return redirect(url_for('manage_users'))
+        return redirect(url_for('main.manage_users'))
 
     # Validate assigned client exists and is a client
     assigned_client = User.query.get(assigned_client_id)
     if not assigned_client or assigned_client.role != 'client':
         flash('Invalid client selection.')
-        return redirect(url_for('manage_users'))
+        return redirect(url_for('main.manage_users'))
 
     # Create lead user
     user = User(
@@ -3296,23 +3737,27 @@ def create_lead():
         organization='ACCORIAN',  # Default organization as requested
         assigned_client_id=int(assigned_client_id)
     )
-    user.set_password(password)
+    try:
+        user.set_password(password)
+    except PasswordHashingBusy:
+        flash(PASSWORD_HASHING_BUSY)
+        return redirect(url_for('main.manage_users'))
     db.session.add(user)
     db.session.commit()
 
     flash(f'Lead user {username} created successfully and assigned to client {assigned_client.username}. Password: {password}')
-    return redirect(url_for('manage_users'))
+    return redirect(url_for('main.manage_users'))
 
-@app.route('/admin/revoke_invitation/<int:invitation_id>')
+@bp.route('/admin/revoke_invitation/<int:invitation_id>')
 @login_required('superuser')
 def revoke_invitation(invitation_id):
     invitation = InvitationToken.query.get_or_404(invitation_id)
     invitation.is_used = True  # Mark as used to effectively revoke it
     db.session.commit()
     flash('Invitation revoked successfully.')
-    return redirect(url_for('manage_users'))
+    return redirect(url_for('main.manage_users'))
 
-@app.route('/admin/assign_client/<int:lead_id>/<int:client_id>', methods=['POST'])
+@bp.route('/admin/assign_client/<int:lead_id>/<int:client_id>', methods=['POST'])
 @login_required('superuser')
 def assign_client_to_lead(lead_id, client_id):
     """Assign a client to a lead"""
@@ -3325,9 +3770,9 @@ def assign_client_to_lead(lead_id, client_id):
     else:
         flash(f'Client {client.username} is already assigned to lead {lead.username}.')
     
-    return redirect(url_for('manage_users'))
+    return redirect(url_for('main.manage_users'))
 
-@app.route('/admin/unassign_client/<int:lead_id>/<int:client_id>', methods=['POST'])
+@bp.route('/admin/unassign_client/<int:lead_id>/<int:client_id>', methods=['POST'])
 @login_required('superuser')
 def unassign_client_from_lead(lead_id, client_id):
     """Unassign a client from a lead"""
@@ -3340,9 +3785,9 @@ def unassign_client_from_lead(lead_id, client_id):
     else:
         flash(f'Client {client.username} was not assigned to lead {lead.username}.')
     
-    return redirect(url_for('manage_users'))
+    return redirect(url_for('main.manage_users'))
 
-@app.route('/admin/client/<int:client_id>/details')
+@bp.route('/admin/client/<int:client_id>/details')
 @login_required('superuser')
 def admin_client_details(client_id):
     """View comprehensive details for a specific client including all their products and responses"""
@@ -3412,7 +3857,7 @@ def admin_client_details(client_id):
             'rejected_questions': rejected_questions,
             'total_responses': len(responses),
             'sections_completed': len(responses_by_section),
-            'total_sections': len(SECTION_IDS)
+            'total_sections': len(get_section_ids())
         })
     
     # Get overall client statistics
@@ -3431,12 +3876,12 @@ def admin_client_details(client_id):
                          client=client, 
                          products_data=products_data, 
                          client_stats=client_stats,
-                         section_ids=SECTION_IDS)
+                         section_ids=get_section_ids())
 
 # ==================== CHAT ROUTES ====================
 
-@app.route('/question-chat/<int:chat_id>')
-@app.route('/question_chat/<int:chat_id>')
+@bp.route('/question-chat/<int:chat_id>')
+@bp.route('/question_chat/<int:chat_id>')
 @login_required()
 def view_question_chat(chat_id):
     """View individual chat for a question"""
@@ -3448,15 +3893,15 @@ def view_question_chat(chat_id):
     if current_user_role == 'client':
         if chat.client_id != current_user_id:
             flash('You do not have permission to access this chat.')
-            return redirect(url_for('dashboard'))
+            return redirect(url_for('main.dashboard'))
     elif current_user_role == 'lead':
-        current_lead = User.query.get(current_user_id)
+        current_lead = get_current_user()
         if not current_lead.can_access_client_data(chat.client_id):
             flash('You do not have permission to access this chat.')
-            return redirect(url_for('dashboard'))
+            return redirect(url_for('main.dashboard'))
     elif current_user_role != 'superuser':
         flash('You do not have permission to access this feature.')
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('main.dashboard'))
     
     # Mark messages as read based on user role
     if current_user_role == 'client':
@@ -3475,8 +3920,8 @@ def view_question_chat(chat_id):
     
     return render_template('question_chat.html', chat=chat, messages=messages)
 
-@app.route('/question-chat/<int:chat_id>/send', methods=['POST'])
-@app.route('/question_chat/<int:chat_id>/send', methods=['POST'])
+@bp.route('/question-chat/<int:chat_id>/send', methods=['POST'])
+@bp.route('/question_chat/<int:chat_id>/send', methods=['POST'])
 @login_required()
 def send_chat_message(chat_id):
     """Send a message in a question chat"""
@@ -3488,25 +3933,25 @@ def send_chat_message(chat_id):
     if current_user_role == 'client':
         if chat.client_id != current_user_id:
             flash('You do not have permission to send messages in this chat.')
-            return redirect(url_for('dashboard'))
+            return redirect(url_for('main.dashboard'))
     elif current_user_role == 'lead':
-        current_lead = User.query.get(current_user_id)
+        current_lead = get_current_user()
         if not current_lead.can_access_client_data(chat.client_id):
             flash('You do not have permission to send messages in this chat.')
-            return redirect(url_for('dashboard'))
+            return redirect(url_for('main.dashboard'))
     elif current_user_role != 'superuser':
         flash('You do not have permission to send messages in this chat.')
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('main.dashboard'))
     
     # Check if chat is still active
     if not chat.is_active and current_user_role != 'superuser':
         flash('This chat has been finalized and is no longer active.')
-        return redirect(url_for('view_question_chat', chat_id=chat_id))
+        return redirect(url_for('main.view_question_chat', chat_id=chat_id))
     
     message_content = request.form.get('message', '').strip()
     if not message_content:
         flash('Message cannot be empty.')
-        return redirect(url_for('view_question_chat', chat_id=chat_id))
+        return redirect(url_for('main.view_question_chat', chat_id=chat_id))
     
     # Handle file upload
     file_path = None
@@ -3519,12 +3964,13 @@ def send_chat_message(chat_id):
                 filename = secure_filename(file.filename)
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 unique_filename = f"{current_user_id}_{timestamp}_{filename}"
-                file_path = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
+                file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], unique_filename)
                 file.save(file_path)
+                metrics.inc('securesphere_upload_bytes_total', os.path.getsize(file_path), kind='chat')
                 file_name = filename
             else:
                 flash(f'File upload error: {error_msg}')
-                return redirect(url_for('view_question_chat', chat_id=chat_id))
+                return redirect(url_for('main.view_question_chat', chat_id=chat_id))
     
     # Create message
     message = ChatMessage(
@@ -3540,22 +3986,24 @@ def send_chat_message(chat_id):
     
     db.session.add(message)
     chat.updated_at = datetime.now(timezone.utc)
+    if current_user_role in ('client', 'lead'):
+        record_reply(chat.response_id, from_client=(current_user_role == 'client'))
     db.session.commit()
     
     flash('Message sent successfully.')
-    return redirect(url_for('view_question_chat', chat_id=chat_id))
+    return redirect(url_for('main.view_question_chat', chat_id=chat_id))
 
-@app.route('/question-chat/<int:chat_id>/approve', methods=['POST'])
+@bp.route('/question-chat/<int:chat_id>/approve', methods=['POST'])
 @login_required('lead')
 def approve_from_chat(chat_id):
     """Approve a question directly from chat interface"""
     chat = QuestionChat.query.get_or_404(chat_id)
-    current_lead = User.query.get(session['user_id'])
+    current_lead = get_current_user()
     
     # Check permissions
     if not current_lead.can_access_client_data(chat.client_id):
         flash('You do not have permission to approve this question.')
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('main.dashboard'))
     
     # Approve the response
     response = chat.response
@@ -3578,17 +4026,19 @@ def approve_from_chat(chat_id):
         is_read_by_lead=True
     )
     db.session.add(approval_message)
+    queue_responses([response])
     
     db.session.commit()
+    snapshot_cache.invalidate(response.product_id)
     
     # Update product status and recalculate scores
     update_product_status(response.product_id, response.user_id)
     calculate_and_store_scores(response.product_id, response.user_id)
     
     flash('Question approved successfully from chat.')
-    return redirect(url_for('view_question_chat', chat_id=chat_id))
+    return redirect(url_for('main.view_question_chat', chat_id=chat_id))
 
-@app.route('/question-chats/<int:product_id>')
+@bp.route('/question-chats/<int:product_id>')
 @login_required()
 def list_question_chats(product_id):
     """List all chats for a product"""
@@ -3600,23 +4050,23 @@ def list_question_chats(product_id):
     if current_user_role == 'client':
         if product.owner_id != current_user_id:
             flash('You do not have permission to access this product.')
-            return redirect(url_for('dashboard'))
+            return redirect(url_for('main.dashboard'))
         chats = QuestionChat.query.filter_by(product_id=product_id, client_id=current_user_id).order_by(QuestionChat.updated_at.desc()).all()
     elif current_user_role == 'lead':
-        current_lead = User.query.get(current_user_id)
+        current_lead = get_current_user()
         if not current_lead.can_access_client_data(product.owner_id):
             flash('You do not have permission to access this product.')
-            return redirect(url_for('dashboard'))
+            return redirect(url_for('main.dashboard'))
         chats = QuestionChat.query.filter_by(product_id=product_id, lead_id=current_user_id).order_by(QuestionChat.updated_at.desc()).all()
     elif current_user_role == 'superuser':
         chats = QuestionChat.query.filter_by(product_id=product_id).order_by(QuestionChat.updated_at.desc()).all()
     else:
         flash('You do not have permission to access this feature.')
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('main.dashboard'))
     
     return render_template('question_chats_list.html', chats=chats, product=product)
 
-@app.route('/download_chat_file/<int:message_id>')
+@bp.route('/download_chat_file/<int:message_id>')
 @login_required()
 def download_chat_file(message_id):
     """Download a file from a chat message"""
@@ -3629,19 +4079,19 @@ def download_chat_file(message_id):
     if current_user_role == 'client':
         if chat.client_id != current_user_id:
             flash('You do not have permission to download this file.')
-            return redirect(url_for('dashboard'))
+            return redirect(url_for('main.dashboard'))
     elif current_user_role == 'lead':
-        current_lead = User.query.get(current_user_id)
+        current_lead = get_current_user()
         if not current_lead.can_access_client_data(chat.client_id):
             flash('You do not have permission to download this file.')
-            return redirect(url_for('dashboard'))
+            return redirect(url_for('main.dashboard'))
     elif current_user_role != 'superuser':
         flash('You do not have permission to download this file.')
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('main.dashboard'))
     
     if not message.file_path or not os.path.exists(message.file_path):
         flash('File not found.')
-        return redirect(url_for('view_question_chat', chat_id=chat.id))
+        return redirect(url_for('main.view_question_chat', chat_id=chat.id))
     
     return send_file(
         message.file_path,
@@ -3649,7 +4099,7 @@ def download_chat_file(message_id):
         download_name=message.file_name or os.path.basename(message.file_path)
     )
 
-@app.route('/admin/all-chats')
+@bp.route('/admin/all-chats')
 @login_required('superuser')
 def admin_all_chats():
     """Admin view to see all question chats in the system"""
@@ -3680,7 +4130,7 @@ def admin_all_chats():
 
 
 # Rejected Questions Routes
-@app.route("/reject_question", methods=["POST"])
+@bp.route("/reject_question", methods=["POST"])
 @login_required()
 def reject_question():
     """Lead rejects a question and sends it back to client"""
@@ -3706,6 +4156,7 @@ def reject_question():
             user_id=user_id,
             lead_id=session["user_id"],
             question_text=response.question,
+            question_id=response.question_id,
             reason=reason,
             status="pending",
             created_at=datetime.now(timezone.utc)
@@ -3720,7 +4171,7 @@ def reject_question():
         db.session.rollback()
         return jsonify({"error": str(e)}), 500
 
-@app.route("/submit_rejected_question_response", methods=["POST"])
+@bp.route("/submit_rejected_question_response", methods=["POST"])
 @login_required()
 def submit_rejected_question_response():
     """Client submits updated response for rejected question"""
@@ -3742,6 +4193,7 @@ def submit_rejected_question_response():
         
         if response:
             response.answer = new_option
+            response.question_id, response.option_id = catalog_ids_for(response.section, response.question, new_option)
             response.updated_at = datetime.now(timezone.utc)
         
         # Mark rejected question as resolved
@@ -3750,6 +4202,7 @@ def submit_rejected_question_response():
         rejected_question.resolved_at = datetime.now(timezone.utc)
         
         db.session.commit()
+        snapshot_cache.invalidate(rejected_question.product_id)
         
         # Recalculate scores
         try:
@@ -3773,7 +4226,7 @@ def submit_rejected_question_response():
         db.session.rollback()
         return jsonify({"error": str(e)}), 500
 
-@app.route("/get_rejected_questions/<int:product_id>")
+@bp.route("/get_rejected_questions/<int:product_id>")
 @login_required()
 def get_rejected_questions(product_id):
     """Get rejected questions for current user and product"""
@@ -3811,7 +4264,7 @@ def get_rejected_questions(product_id):
 
 # ==================== ENHANCED REVIEW SYSTEM ROUTES ====================
 
-@app.route('/reselect_question/<int:response_id>', methods=['GET', 'POST'])
+@bp.route('/reselect_question/<int:response_id>', methods=['GET', 'POST'])
 @login_required('client')
 def reselect_question(response_id):
     """Handle rejected question reselection with all 5 options"""
@@ -3820,19 +4273,15 @@ def reselect_question(response_id):
     # Verify user owns this response and it's rejected
     if response.user_id != session['user_id'] or response.review_status != 'rejected':
         flash('Question not available for reselection.')
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('main.dashboard'))
     
     # Find the question in the questionnaire to get options
-    questions = QUESTIONNAIRE.get(response.section, [])
-    question_data = None
-    for q in questions:
-        if q['question'] == response.question:
-            question_data = q
-            break
+    entry = get_question_index()['by_section'].get((response.section, response.question))
+    question_data = get_questionnaire()[entry['section']][entry['index']] if entry else None
     
     if not question_data:
         flash('Question data not found.')
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('main.dashboard'))
     
     if request.method == 'POST':
         new_answer = request.form.get('answer')
@@ -3853,8 +4302,9 @@ def reselect_question(response_id):
                 filename = secure_filename(file.filename)
                 timestamp = int(datetime.now().timestamp())
                 filename = f"{timestamp}_{filename}"
-                evidence_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+                evidence_path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
                 file.save(evidence_path)
+                metrics.inc('securesphere_upload_bytes_total', os.path.getsize(evidence_path), kind='evidence')
                 evidence_path = f"uploads/{filename}"
             else:
                 flash(f'File upload error: {error_msg}')
@@ -3864,6 +4314,7 @@ def reselect_question(response_id):
         
         # Update the response
         response.answer = new_answer
+        response.question_id, response.option_id = catalog_ids_for(response.section, response.question, new_answer)
         response.client_comment = client_comment
         if evidence_path:
             response.evidence_path = evidence_path
@@ -3890,20 +4341,22 @@ def reselect_question(response_id):
             )
             db.session.add(reselection_message)
         
+        queue_responses([response], client_replied=True)
         db.session.commit()
+        snapshot_cache.invalidate(response.product_id)
         
         # Recalculate scores
         calculate_and_store_scores(response.product_id, response.user_id)
         update_product_status(response.product_id, response.user_id)
         
         flash('Answer updated successfully. Lead will review your new selection.')
-        return redirect(url_for('dashboard'))
+        return redirect(url_for('main.dashboard'))
     
     return render_template('reselect_question.html', 
                            response=response, 
                            question_data=question_data)
 
-@app.route('/get_question_status/<int:response_id>')
+@bp.route('/get_question_status/<int:response_id>')
 @login_required()
 def get_question_status(response_id):
     """Get the current status of a question for UI updates"""
@@ -3913,7 +4366,7 @@ def get_question_status(response_id):
     if session['role'] == 'client' and response.user_id != session['user_id']:
         return jsonify({'error': 'Unauthorized'}), 403
     elif session['role'] == 'lead':
-        lead = User.query.get(session['user_id'])
+        lead = get_current_user()
         if not lead.can_access_client_data(response.user_id):
             return jsonify({'error': 'Unauthorized'}), 403
     
@@ -3933,7 +4386,7 @@ def get_question_status(response_id):
         'needs_client_response': response.needs_client_response
     })
 
-@app.route('/get_unread_notifications')
+@bp.route('/get_unread_notifications')
 @login_required()
 def get_unread_notifications():
     """Get unread notification count for the current user"""
@@ -3958,7 +4411,7 @@ def get_unread_notifications():
         'role': role
     })
 
-@app.route('/get_active_chats/<int:response_id>')
+@bp.route('/get_active_chats/<int:response_id>')
 @login_required('lead')
 def get_active_chats(response_id):
     """Get active chats for a specific response"""
@@ -4006,6 +4459,7 @@ def get_active_chats(response_id):
 if __name__ == '__main__':
     print("🚀 Starting SecureSphere Application")
     print("Initializing database...")
-    init_database()
+    app = create_app()
+    init_database(app)
     print("✅ Application ready")
     app.run(debug=True, port=5001, host='0.0.0.0')
\ No newline at end of file
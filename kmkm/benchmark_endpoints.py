@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Endpoint Benchmark Suite for SecureSphere
+Drives the Flask test client against a seeded database and records, per
+endpoint, latency (median/p95), SQL query count and peak Python memory. Results
+are written as JSON; with --baseline the run fails when any endpoint regresses
+beyond the allowed margin, so performance fixes cannot silently regress.
+
+Usage:
+    python3 benchmark_endpoints.py --output bench.json
+    python3 benchmark_endpoints.py --baseline benchmarks/endpoints_baseline.json --margin 0.25
+    python3 benchmark_endpoints.py --baseline benchmarks/endpoints_baseline.json --update-baseline
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import statistics
+import tracemalloc
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, basedir)
+
+
+def build_context(app):
+    """Pick representative users and records from the seeded database"""
+    from app import db, User, Product, QuestionChat, get_questionnaire, get_section_ids, lead_client_association
+
+    with app.app_context():
+        admin = User.query.filter_by(role='superuser').first()
+        if admin is None:
+            admin = User(username='bench_admin', email='bench_admin@example.com', role='superuser',
+                         organization='ACCORIAN', first_login=False)
+            admin.set_password('BenchAdmin123!')
+            db.session.add(admin)
+            db.session.commit()
+
+        # The busiest lead and a client with a chat thread make the heaviest pages
+        lead_id = db.session.query(lead_client_association.c.lead_id).group_by(
+            lead_client_association.c.lead_id
+        ).order_by(db.func.count().desc()).limit(1).scalar()
+        chat = QuestionChat.query.order_by(QuestionChat.id).first()
+        client_id = chat.client_id if chat else User.query.filter_by(role='client').first().id
+        product = Product.query.filter_by(owner_id=client_id).order_by(Product.id).first()
+
+        section = get_section_ids()[0]
+        form = {}
+        for i, question in enumerate(get_questionnaire()[section]):
+            form[f'answer_{i}'] = question['options'][len(question['options']) // 2]
+            form[f'comment_{i}'] = 'Benchmark answer'
+
+        return {
+            'admin_id': admin.id,
+            'lead_id': lead_id,
+            'client_id': client_id,
+            'product_id': product.id,
+            'chat_id': chat.id if chat else None,
+            'section_form': form,
+        }
+
+
+def benchmark_cases(ctx):
+    """(name, role, method, path, form) for every benchmarked endpoint"""
+    product_id, client_id = ctx['product_id'], ctx['client_id']
+    cases = [
+        ('dashboard[superuser]', 'superuser', 'GET', '/dashboard', None),
+        ('dashboard[lead]', 'lead', 'GET', '/dashboard', None),
+        ('dashboard[client]', 'client', 'GET', '/dashboard', None),
+        ('product_results', 'client', 'GET', f'/product/{product_id}/results', None),
+        ('admin_product_results', 'superuser', 'GET', f'/admin/product/{product_id}/results', None),
+        ('admin_client_details', 'superuser', 'GET', f'/admin/client/{client_id}/details', None),
+        ('api_product_scores', 'client', 'GET', f'/api/product/{product_id}/scores', None),
+        ('api_all_scores', 'superuser', 'GET', '/api/superuser/all_scores', None),
+        ('fill_questionnaire_section[POST]', 'client', 'POST',
+         f'/fill_questionnaire/{product_id}/section/0', ctx['section_form']),
+    ]
+    if ctx['chat_id']:
+        cases.append(('view_question_chat', 'client', 'GET', f'/question_chat/{ctx["chat_id"]}', None))
+    return cases
+
+
+def _client_for(app, ctx, role):
+    client = app.test_client()
+    user_id = {'superuser': ctx['admin_id'], 'lead': ctx['lead_id'], 'client': ctx['client_id']}[role]
+    with client.session_transaction() as sess:
+        sess['user_id'] = user_id
+        sess['role'] = role
+    return client
+
+
+def _request(client, method, path, form):
+    if method == 'POST':
+        return client.post(path, data=form)
+    return client.get(path)
+
+
+def run_case(app, ctx, case, iterations, warmup):
+    name, role, method, path, form = case
+    client = _client_for(app, ctx, role)
+
+    for _ in range(warmup):
+        _request(client, method, path, form)
+
+    latencies = []
+    queries = []
+    status = None
+    for _ in range(iterations):
+        started = time.perf_counter()
+        response = _request(client, method, path, form)
+        latencies.append((time.perf_counter() - started) * 1000)
+        queries.append(int(response.headers.get('X-Query-Count', 0)))
+        status = response.status_code
+
+    # Memory is traced in a separate pass: tracemalloc would distort the timings
+    tracemalloc.start()
+    _request(client, method, path, form)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        'method': method,
+        'path': path,
+        'status': status,
+        'median_ms': round(statistics.median(latencies), 3),
+        'p95_ms': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3),
+        'queries': max(queries),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+def compare(results, baseline, margin, query_margin):
+    """List of human readable regressions against a baseline run"""
+    regressions = []
+    for name, base in baseline.get('results', {}).items():
+        current = results.get(name)
+        if current is None:
+            continue
+        checks = [
+            ('median_ms', margin),
+            ('peak_memory_kb', margin),
+            ('queries', query_margin),
+        ]
+        for metric, allowed in checks:
+            limit = base[metric] * (1 + allowed)
+            if current[metric] > limit:
+                regressions.append(
+                    f"{name}: {metric} {current[metric]} > {base[metric]} (+{allowed:.0%} allowed)"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark SecureSphere endpoints')
+    parser.add_argument('--database', help='Use an existing (seeded) SQLite database instead of a scratch one')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--clients', type=int, default=100)
+    parser.add_argument('--leads', type=int, default=10)
+    parser.add_argument('--products-per-client', type=int, default=3)
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--only', action='append', help='Benchmark only endpoints whose name contains this')
+    parser.add_argument('--output', help='Write results JSON here')
+    parser.add_argument('--baseline', help='Baseline JSON to compare against')
+    parser.add_argument('--margin', type=float, default=0.25, help='Allowed latency/memory regression (0.25 = 25%%)')
+    parser.add_argument('--query-margin', type=float, default=0.0, help='Allowed query count regression')
+    parser.add_argument('--update-baseline', action='store_true', help='Write this run to --baseline')
+    args = parser.parse_args()
+
+    from app import create_app
+    from seed_data import seed_database
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database = os.path.abspath(args.database) if args.database else os.path.join(tmp, 'bench.db')
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{database}',
+            'RATELIMIT_ENABLED': False,
+            'QUERY_PROFILER_HEADERS': True,
+            'SLOW_REQUEST_MS': float('inf'),
+            'SLOW_REQUEST_QUERIES': float('inf'),
+            'UPLOAD_FOLDER': os.path.join(tmp, 'uploads'),
+            'METRICS_DB': os.path.join(tmp, 'metrics.db'),
+            'RATELIMIT_STORAGE_URI': f'sqlite:///{os.path.join(tmp, "ratelimit.db")}',
+            'SNAPSHOT_CACHE_URI': f'sqlite:///{os.path.join(tmp, "snapshot_cache.db")}',
+        })
+
+        print("⏱️  SecureSphere Endpoint Benchmark")
+        print("=" * 78)
+        if not args.database:
+            counts = seed_database(app, seed=args.seed, reset=True, clients=args.clients, leads=args.leads,
+                                   products_per_client=args.products_per_client)
+            print(f"Seeded {sum(counts.values()):,} rows (seed {args.seed}, {args.clients} clients)")
+
+        ctx = build_context(app)
+        results = {}
+        print(f"{'endpoint':<34}{'status':>7}{'median ms':>11}{'p95 ms':>10}{'queries':>9}{'peak KB':>10}")
+        for case in benchmark_cases(ctx):
+            if args.only and not any(part in case[0] for part in args.only):
+                continue
+            result = run_case(app, ctx, case, args.iterations, args.warmup)
+            results[case[0]] = result
+            print(f"{case[0]:<34}{result['status']:>7}{result['median_ms']:>11.1f}{result['p95_ms']:>10.1f}"
+                  f"{result['queries']:>9}{result['peak_memory_kb']:>10.0f}")
+
+        from metrics import metrics
+        metrics.flush()
+
+    report = {
+        'meta': {
+            'seed': args.seed,
+            'clients': args.clients,
+            'leads': args.leads,
+            'products_per_client': args.products_per_client,
+            'iterations': args.iterations,
+            'python': platform.python_version(),
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Results written to {args.output}")
+
+    failed = [name for name, result in results.items() if result['status'] >= 400]
+    for name in failed:
+        print(f"❌ {name} returned HTTP {results[name]['status']}")
+
+    if args.baseline and args.update_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"📌 Baseline updated: {args.baseline}")
+    elif args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.margin, args.query_margin)
+        if regressions:
+            print("❌ Regressions against baseline:")
+            for line in regressions:
+                print(f"   {line}")
+            return 1
+        print("✅ No regressions against baseline")
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Login Throughput Benchmark for SecureSphere
+Fires a burst of concurrent POST /login requests through the real view and
+reports logins per second and login latency for each PASSWORD_HASH_WORKERS
+setting. 0 means hashing on the request thread, as before the process pool.
+While the burst runs, a probe thread keeps requesting the login page. Its
+latency shows how much the burst slows everything else the worker serves.
+
+Usage:
+    python3 benchmark_password_hashing.py
+    python3 benchmark_password_hashing.py --workers 0 2 4 --threads 16 --logins 400 --output logins.json
+    python3 benchmark_password_hashing.py --method pbkdf2:sha256:600000
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import threading
+import statistics
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, basedir)
+
+PASSWORD = 'LoginBench123!'
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+def run_burst(workdir, workers, method, users, threads, logins):
+    """Time `logins` logins spread over `threads` threads; returns a result dict"""
+    from app import create_app, db, User
+    from password_hasher import password_hasher
+
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.join(workdir, f"logins_{workers}.db")}',
+        'METRICS_DB': os.path.join(workdir, 'metrics.db'),
+        'SNAPSHOT_CACHE_URI': 'memory://',
+        'RATELIMIT_ENABLED': False,
+        'PASSWORD_HASH_METHOD': method,
+        'PASSWORD_HASH_WORKERS': workers,
+        'SLOW_REQUEST_MS': 60_000,  # every login is slow under the burst; don't log each one
+    })
+    with app.app_context():
+        db.create_all()
+        password_hash = password_hasher.hash(PASSWORD)  # also starts the pool before timing
+        db.session.add_all([
+            User(username=f'bench_user_{i}', email=f'bench_user_{i}@example.com', role='client',
+                 password_hash=password_hash, first_login=False)
+            for i in range(users)
+        ])
+        db.session.commit()
+
+    latencies, probes, failures = [], [], []
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def login_worker(index):
+        client = app.test_client()
+        for n in range(index, logins, threads):
+            started = time.perf_counter()
+            response = client.post('/login', data={'username': f'bench_user_{n % users}', 'password': PASSWORD})
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+                if response.status_code != 302 or '/dashboard' not in response.headers.get('Location', ''):
+                    failures.append(response.status_code)
+
+    def probe():
+        client = app.test_client()
+        while not done.is_set():
+            started = time.perf_counter()
+            client.get('/login')
+            probes.append(time.perf_counter() - started)
+            time.sleep(0.01)
+
+    probe_thread = threading.Thread(target=probe, daemon=True)
+    pool = [threading.Thread(target=login_worker, args=(i,)) for i in range(threads)]
+    started = time.perf_counter()
+    probe_thread.start()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    done.set()
+    probe_thread.join()
+    password_hasher.shutdown()
+
+    return {
+        'workers': workers,
+        'logins': len(latencies),
+        'failed': len(failures),
+        'seconds': round(elapsed, 3),
+        'logins_per_second': round(len(latencies) / elapsed, 1),
+        'login_median_ms': round(statistics.median(latencies) * 1000, 1),
+        'login_p95_ms': round(_percentile(latencies, 0.95) * 1000, 1),
+        'probe_median_ms': round(statistics.median(probes) * 1000, 1) if probes else None,
+        'probe_p95_ms': round(_percentile(probes, 0.95) * 1000, 1) if probes else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark concurrent logins per PASSWORD_HASH_WORKERS setting')
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, min(4, os.cpu_count() or 1)],
+                        help='PASSWORD_HASH_WORKERS values to compare (0 = request thread)')
+    parser.add_argument('--method', default='scrypt', help='PASSWORD_HASH_METHOD for the stored hashes')
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--threads', type=int, default=8, help='Concurrent login threads')
+    parser.add_argument('--logins', type=int, default=200, help='Logins per run')
+    parser.add_argument('--output', help='Write results JSON here')
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        print("🔐 SecureSphere Login Benchmark")
+        print("=" * 86)
+        print(f"method {args.method}, {args.threads} threads, {args.logins} logins, CPUs {os.cpu_count()}")
+        print(f"{'workers':>8}{'logins/s':>11}{'median ms':>11}{'p95 ms':>9}{'probe median ms':>17}{'probe p95 ms':>14}{'failed':>8}")
+        for workers in args.workers:
+            result = run_burst(tmp, workers, args.method, args.users, args.threads, args.logins)
+            results.append(result)
+            print(f"{workers:>8}{result['logins_per_second']:>11.1f}{result['login_median_ms']:>11.1f}"
+                  f"{result['login_p95_ms']:>9.1f}{result['probe_median_ms'] or 0:>17.1f}"
+                  f"{result['probe_p95_ms'] or 0:>14.1f}{result['failed']:>8}")
+
+        from metrics import metrics
+        metrics.flush()
+
+    if args.output:
+        report = {
+            'meta': {
+                'method': args.method,
+                'threads': args.threads,
+                'logins': args.logins,
+                'cpus': os.cpu_count(),
+                'python': platform.python_version(),
+                'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            },
+            'results': results,
+        }
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Results written to {args.output}")
+    return 0 if not any(result['failed'] for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Results Payload Size Benchmark for SecureSphere
+Compares the chart data embedded in product results pages before and after the
+compact format: the legacy payload (responses_json plus subdimension_scores,
+embedded twice, with every question and answer string) against the compact
+payload of catalog ids. Sizes are reported raw and gzipped; the catalog itself
+is fetched once per catalog version, so it is reported separately and counted
+only on a first visit.
+
+Usage:
+    python3 benchmark_payload.py
+    python3 benchmark_payload.py --clients 20 --products-per-client 2 --output payload.json
+"""
+
+import os
+import re
+import sys
+import gzip
+import json
+import time
+import argparse
+import platform
+import tempfile
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, basedir)
+
+PAYLOAD_PATTERN = re.compile(r'const resultsPayload = (.*?);\n')
+
+
+def legacy_payload(app, product_id, owner_id):
+    """The chart data product_results embedded before the compact format, serialized the same way"""
+    from app import LeadComment, QuestionnaireResponse, AssessmentSnapshot
+
+    responses = QuestionnaireResponse.query.filter_by(product_id=product_id, user_id=owner_id).all()
+    comments = LeadComment.query.filter_by(product_id=product_id, client_id=owner_id).order_by(LeadComment.created_at.desc()).all()
+    responses_json = [{
+        'section': resp.section or '',
+        'question': resp.question or '',
+        'answer': resp.answer or '',
+        'score': float(resp.score or 0),
+        'lead_comments': [{
+            'id': comment.id,
+            'comment': comment.comment or '',
+            'status': comment.status or 'pending',
+            'created_at': comment.created_at.isoformat() if comment.created_at else None,
+        } for comment in comments if comment.response_id == resp.id],
+    } for resp in responses]
+    subdimension_scores = AssessmentSnapshot(responses).subdimension_scores
+    dumps = app.json.dumps
+    return dumps(responses_json) + dumps(subdimension_scores) * 2, len(responses)
+
+
+def sizes(text):
+    data = text.encode('utf-8')
+    return len(data), len(gzip.compress(data, 6))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare legacy and compact results page payload sizes')
+    parser.add_argument('--clients', type=int, default=10)
+    parser.add_argument('--products-per-client', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Write results JSON here')
+    args = parser.parse_args()
+
+    os.chdir(basedir)
+
+    from app import create_app, Product, get_question_catalog
+    from seed_data import seed_database
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.join(tmp, "payload.db")}',
+            'RATELIMIT_ENABLED': False,
+            'UPLOAD_FOLDER': os.path.join(tmp, 'uploads'),
+            'METRICS_DB': os.path.join(tmp, 'metrics.db'),
+            'RATELIMIT_STORAGE_URI': f'sqlite:///{os.path.join(tmp, "ratelimit.db")}',
+            'SNAPSHOT_CACHE_URI': 'memory://',
+        })
+        seed_database(app, seed=args.seed, reset=True, clients=args.clients, leads=max(1, args.clients // 5),
+                      products_per_client=args.products_per_client, completion=1.0)
+
+        with app.app_context():
+            products = [(p.id, p.owner_id) for p in Product.query.order_by(Product.id)]
+            catalog_raw, catalog_gzip = sizes(app.json.dumps(get_question_catalog()))
+
+        print("📦 SecureSphere Results Payload Benchmark")
+        print("=" * 86)
+        print(f"{'product':>8}{'responses':>11}{'legacy B':>11}{'compact B':>11}{'legacy gz':>11}{'compact gz':>12}{'page B':>10}{'saved':>8}")
+        for product_id, owner_id in products:
+            client = app.test_client()
+            with client.session_transaction() as sess:
+                sess['user_id'] = owner_id
+                sess['role'] = 'client'
+            page = client.get(f'/product/{product_id}/results').get_data(as_text=True)
+            match = PAYLOAD_PATTERN.search(page)
+            if match is None:
+                print(f"{product_id:>8}   no payload on page, skipped")
+                continue
+
+            with app.app_context():
+                legacy, response_count = legacy_payload(app, product_id, owner_id)
+            legacy_raw, legacy_gzip = sizes(legacy)
+            compact_raw, compact_gzip = sizes(match.group(1))
+            saved = 1 - compact_raw / legacy_raw if legacy_raw else 0
+            results[str(product_id)] = {
+                'responses': response_count,
+                'legacy_bytes': legacy_raw,
+                'legacy_gzip_bytes': legacy_gzip,
+                'compact_bytes': compact_raw,
+                'compact_gzip_bytes': compact_gzip,
+                'page_bytes': len(page.encode('utf-8')),
+            }
+            print(f"{product_id:>8}{response_count:>11}{legacy_raw:>11,}{compact_raw:>11,}{legacy_gzip:>11,}"
+                  f"{compact_gzip:>12,}{results[str(product_id)]['page_bytes']:>10,}{saved:>8.0%}")
+
+        from metrics import metrics
+        metrics.flush()
+
+    if results:
+        legacy_total = sum(r['legacy_bytes'] for r in results.values())
+        compact_total = sum(r['compact_bytes'] for r in results.values())
+        print("=" * 86)
+        print(f"Catalog: {catalog_raw:,} B ({catalog_gzip:,} B gzipped), fetched once per catalog version")
+        print(f"Total over {len(results)} pages: legacy {legacy_total:,} B, compact {compact_total:,} B, "
+              f"compact + one catalog fetch {compact_total + catalog_raw:,} B")
+
+    if args.output:
+        report = {
+            'meta': {
+                'clients': args.clients,
+                'products_per_client': args.products_per_client,
+                'seed': args.seed,
+                'python': platform.python_version(),
+                'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            },
+            'catalog': {'bytes': catalog_raw, 'gzip_bytes': catalog_gzip},
+            'results': results,
+        }
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Results written to {args.output}")
+    return 0 if results else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
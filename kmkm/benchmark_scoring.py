@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Scoring Engine Micro-benchmarks for SecureSphere
+Times each scoring and heatmap function in isolation against a single product
+holding N responses (10 to 100k by default), and reports throughput in
+responses/second and peak Python memory per call. The ring heatmap functions
+only see the sub-dimension aggregate, whose size does not follow N, so they
+report calls/second instead. Functions that take longer
+than --budget seconds at one size are skipped for the larger sizes, so slow
+implementations still produce a complete report.
+
+Usage:
+    python3 benchmark_scoring.py
+    python3 benchmark_scoring.py --sizes 10 100 1000 --repeat 5 --output scoring.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import statistics
+import tracemalloc
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, basedir)
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000]
+
+# Take the prebuilt sub-dimension aggregate rather than the responses themselves
+AGGREGATE_FUNCTIONS = {'RingHeatmapGenerator.generate_ring_data', 'get_dimension_wise_results'}
+
+
+def build_subdimension_scores(answers):
+    """Same shape as calculate_subdimension_scores(), built in memory for the pure functions"""
+    grouped = {}
+    for question, option, score in answers:
+        grouped.setdefault(question['subdimension'], []).append(
+            {'question': question['question'], 'answer': option, 'score': score}
+        )
+    return {
+        name: {
+            'average_score': round(sum(q['score'] for q in questions) / len(questions), 2),
+            'question_count': len(questions),
+            'total_score': sum(q['score'] for q in questions),
+            'questions': questions,
+        }
+        for name, questions in grouped.items()
+    }
+
+
+class ScoringBenchmark:
+    """Holds the scratch app and regenerates a product's responses for each size"""
+
+    def __init__(self, workdir, seed):
+        import app as app_module
+        from seed_data import load_question_bank
+
+        self.app_module = app_module
+        self.app = app_module.create_app({
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.join(workdir, "scoring.db")}',
+            'METRICS_DB': os.path.join(workdir, 'metrics.db'),
+            'RATELIMIT_STORAGE_URI': f'sqlite:///{os.path.join(workdir, "ratelimit.db")}',
+        })
+        self.rng = random.Random(seed)
+        self.questions = [
+            (section, question) for section, questions in load_question_bank().items() for question in questions
+        ]
+        with self.app.app_context():
+            db = app_module.db
+            db.create_all()
+            client = app_module.User(username='bench_client', email='bench@example.com', role='client')
+            client.set_password('BenchClient123!')
+            db.session.add(client)
+            db.session.flush()
+            product = app_module.Product(name='Scoring benchmark', owner_id=client.id)
+            db.session.add(product)
+            db.session.commit()
+            self.user_id, self.product_id = client.id, product.id
+        self.subdimension_scores = {}
+
+    def load_responses(self, count):
+        """Replace the product's responses with `count` answers cycling through the questionnaire"""
+        app_module = self.app_module
+        table = app_module.QuestionnaireResponse.__table__
+        rows, answers = [], []
+        for i in range(count):
+            section, question = self.questions[i % len(self.questions)]
+            option, score = self.rng.choice(question['options'])
+            answers.append((question, option, score))
+            rows.append({
+                'user_id': self.user_id,
+                'product_id': self.product_id,
+                'section': section,
+                'question': question['question'],
+                'question_index': i,
+                'answer': option,
+                'score': score * 20,
+            })
+        with self.app.app_context():
+            db = app_module.db
+            db.session.execute(table.delete())
+            for start in range(0, len(rows), 5000):
+                db.session.execute(table.insert(), rows[start:start + 5000])
+            db.session.commit()
+        self.subdimension_scores = build_subdimension_scores(answers)
+
+    def functions(self):
+        """(name, callable) for every benchmarked function"""
+        from ring_heatmap_implementation import RingHeatmapGenerator, get_dimension_wise_results
+
+        m = self.app_module
+        return [
+            ('AssessmentSnapshot.load', lambda: m.AssessmentSnapshot.load(self.product_id, self.user_id)),
+            ('calculate_overall_maturity_score', lambda: m.calculate_overall_maturity_score(self.product_id, self.user_id)),
+            ('calculate_subdimension_scores', lambda: m.calculate_subdimension_scores(self.product_id, self.user_id)),
+            ('generate_ringwise_heatmap_data', lambda: m.generate_ringwise_heatmap_data(self.product_id, self.user_id)),
+            ('generate_heatmap_data', lambda: m.generate_heatmap_data(self.product_id, self.user_id)),
+            ('RingHeatmapGenerator.generate_ring_data', lambda: RingHeatmapGenerator().generate_ring_data(self.subdimension_scores)),
+            ('get_dimension_wise_results', lambda: get_dimension_wise_results(self.subdimension_scores)),
+        ]
+
+    def measure(self, func, size, repeat, per_response=True):
+        with self.app.app_context():
+            timings = []
+            for _ in range(repeat):
+                self.app_module.db.session.expunge_all()
+                started = time.perf_counter()
+                func()
+                timings.append(time.perf_counter() - started)
+
+            # Allocations are measured in a separate call so tracing does not skew timings
+            self.app_module.db.session.expunge_all()
+            tracemalloc.start()
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        median = statistics.median(timings)
+        per_second = round((size if per_response else 1) / median) if median > 0 else None
+        return {
+            'median_ms': round(median * 1000, 3),
+            'min_ms': round(min(timings) * 1000, 3),
+            'responses_per_second' if per_response else 'calls_per_second': per_second,
+            'peak_memory_kb': round(peak / 1024, 1),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Micro-benchmark the scoring and heatmap engine')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='Response counts to test')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed calls per function and size')
+    parser.add_argument('--budget', type=float, default=10.0,
+                        help='Skip larger sizes once one call takes longer than this many seconds')
+    parser.add_argument('--only', action='append', help='Benchmark only functions whose name contains this')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Write results JSON here')
+    args = parser.parse_args()
+
+    # Some scoring helpers open devweb.csv relative to the working directory
+    os.chdir(basedir)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bench = ScoringBenchmark(tmp, args.seed)
+        functions = [(name, func) for name, func in bench.functions()
+                     if not args.only or any(part in name for part in args.only)]
+        results = {name: {} for name, _ in functions}
+        over_budget = set()
+
+        print("🧮 SecureSphere Scoring Benchmark")
+        print("=" * 86)
+        print(f"{'function':<42}{'responses':>10}{'median ms':>12}{'per second':>13}{'peak KB':>9}")
+        for size in sorted(args.sizes):
+            bench.load_responses(size)
+            for name, func in functions:
+                if name in over_budget:
+                    results[name][str(size)] = {'skipped': f'over {args.budget}s budget at a smaller size'}
+                    print(f"{name:<42}{size:>10}{'skipped':>12}")
+                    continue
+                per_response = name not in AGGREGATE_FUNCTIONS
+                result = bench.measure(func, size, args.repeat, per_response)
+                results[name][str(size)] = result
+                throughput = result['responses_per_second' if per_response else 'calls_per_second'] or 0
+                unit = 'resp' if per_response else 'call'
+                print(f"{name:<42}{size:>10}{result['median_ms']:>12.2f}{throughput:>8,} {unit}"
+                      f"{result['peak_memory_kb']:>9.0f}")
+                if result['median_ms'] / 1000 > args.budget:
+                    over_budget.add(name)
+
+        # The scoring functions feed the metrics registry; flush it while its scratch file exists
+        from metrics import metrics
+        metrics.flush()
+
+    if args.output:
+        report = {
+            'meta': {
+                'sizes': sorted(args.sizes),
+                'repeat': args.repeat,
+                'seed': args.seed,
+                'python': platform.python_version(),
+                'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            },
+            'results': results,
+        }
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"📄 Results written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
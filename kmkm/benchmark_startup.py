@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Worker cold-start benchmark for SecureSphere.
+Each run uses a fresh interpreter and times importing the app module, building
+the app with create_app() and serving the first request. It also reports whether
+the PDF/charting stack was loaded, since that must stay off the startup path.
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+import statistics
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+
+HEAVY_MODULES = ['reportlab', 'matplotlib', 'PIL']
+
+PROBE = r'''
+import json, sys, time
+t0 = time.perf_counter()
+import app as app_module
+t1 = time.perf_counter()
+app = app_module.create_app()
+t2 = time.perf_counter()
+app.test_client().get('/login')
+t3 = time.perf_counter()
+print(json.dumps({
+    'import': t1 - t0,
+    'create_app': t2 - t1,
+    'first_request': t3 - t2,
+    'heavy_modules': [m for m in %r if m in sys.modules],
+}))
+''' % (HEAVY_MODULES,)
+
+
+def run_probe():
+    """Time one cold start in a fresh interpreter"""
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE],
+        cwd=basedir, capture_output=True, text=True, check=True
+    )
+    # The app prints status lines on startup; the timings are the last line
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def summarize(samples):
+    """Median and worst case for each phase, plus the total"""
+    summary = {}
+    for phase in ('import', 'create_app', 'first_request'):
+        values = [sample[phase] for sample in samples]
+        summary[phase] = {'median': statistics.median(values), 'max': max(values)}
+    totals = [sample['import'] + sample['create_app'] + sample['first_request'] for sample in samples]
+    summary['total'] = {'median': statistics.median(totals), 'max': max(totals)}
+    summary['heavy_modules'] = sorted({m for sample in samples for m in sample['heavy_modules']})
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark SecureSphere worker cold start')
+    parser.add_argument('--runs', type=int, default=5, help='Number of fresh interpreters to time')
+    parser.add_argument('--max-seconds', type=float, help='Fail if the median total exceeds this')
+    parser.add_argument('--json', action='store_true', help='Print the summary as JSON')
+    args = parser.parse_args()
+
+    samples = [run_probe() for _ in range(args.runs)]
+    summary = summarize(samples)
+
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print("🚀 SecureSphere Startup Benchmark")
+        print("=" * 50)
+        for phase in ('import', 'create_app', 'first_request', 'total'):
+            stats = summary[phase]
+            print(f"{phase:<15} median {stats['median'] * 1000:8.1f} ms   max {stats['max'] * 1000:8.1f} ms")
+        if summary['heavy_modules']:
+            print(f"⚠️  Heavy modules loaded at startup: {', '.join(summary['heavy_modules'])}")
+        else:
+            print("✅ PDF/charting stack not loaded at startup")
+
+    failed = bool(summary['heavy_modules'])
+    if args.max_seconds is not None and summary['total']['median'] > args.max_seconds:
+        print(f"❌ Median cold start {summary['total']['median']:.3f}s exceeds {args.max_seconds:.3f}s")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Bulk Client Onboarding for SecureSphere
+Invites every client listed in a CSV in one pass: rows are deduplicated against
+the file itself, existing users and pending invitations with set-based queries,
+then all invitation tokens and outbox emails are inserted in bulk and handed to
+the email dispatcher. Used by /admin/bulk_invite_clients and from the shell.
+
+CSV columns (header required): email, organization. Only email is mandatory;
+other columns are ignored.
+
+Usage:
+    python3 bulk_onboarding.py clients.csv --inviter admin --base-url https://securesphere.example.com
+    python3 bulk_onboarding.py clients.csv --inviter admin --dry-run
+"""
+
+import os
+import re
+import csv
+import sys
+import secrets
+import argparse
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+EMAIL_PATTERN = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+# Rows per IN (...) lookup and per bulk insert
+CHUNK_SIZE = 500
+
+INVITATION_DAYS = 7
+
+
+def _chunks(items, size=CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def parse_onboarding_csv(stream):
+    """
+    Read onboarding rows from a text stream.
+    Returns (rows, invalid) where invalid lists (line number, reason).
+    """
+    reader = csv.DictReader(stream)
+    fields = {name.strip().lower(): name for name in (reader.fieldnames or [])}
+    if 'email' not in fields:
+        return [], [(1, "missing 'email' column")]
+
+    def value(row, column):
+        return (row.get(fields[column]) or '').strip() if column in fields else ''
+
+    rows, invalid = [], []
+    for row in reader:
+        line = reader.line_num
+        email = value(row, 'email').lower()
+        if not email:
+            if any((v or '').strip() for v in row.values() if isinstance(v, str)):
+                invalid.append((line, 'email is empty'))
+            continue
+        if not EMAIL_PATTERN.match(email):
+            invalid.append((line, f'invalid email: {email}'))
+            continue
+        rows.append({
+            'line': line,
+            'email': email,
+            'organization': value(row, 'organization'),
+        })
+    return rows, invalid
+
+
+def onboard_clients(rows, inviter, link_for, dry_run=False):
+    """
+    Create client invitations for rows (as returned by parse_onboarding_csv).
+    link_for(token) builds the registration link; must run inside an app context.
+    Returns a report of invited and skipped emails.
+    """
+    from flask import current_app
+    from app import db, build_invitation_email, email_dispatcher, EmailOutbox, InvitationToken, User
+
+    report = {'invited': [], 'duplicates': [], 'existing_users': [], 'pending_invitations': []}
+
+    # Duplicates within the file: the first occurrence wins
+    unique = {}
+    for row in rows:
+        if row['email'] in unique:
+            report['duplicates'].append(row['email'])
+        else:
+            unique[row['email']] = row
+    emails = list(unique)
+
+    now = datetime.now(timezone.utc)
+    existing, pending = set(), set()
+    # Stored emails keep the case they were entered with; lower(email) is indexed
+    for chunk in _chunks(emails):
+        existing.update(email.lower() for (email,) in db.session.query(User.email).filter(
+            db.func.lower(User.email).in_(chunk)
+        ))
+        pending.update(email.lower() for (email,) in db.session.query(InvitationToken.email).filter(
+            db.func.lower(InvitationToken.email).in_(chunk),
+            InvitationToken.is_used == False,
+            InvitationToken.expires_at > now
+        ))
+
+    inviter_name = f"{inviter.first_name or ''} {inviter.last_name or ''}".strip() or inviter.username
+    sender = current_app.config['MAIL_DEFAULT_SENDER']
+    expires_at = now + timedelta(days=INVITATION_DAYS)
+    tokens, outbox = [], []
+    for email in emails:
+        if email in existing:
+            report['existing_users'].append(email)
+            continue
+        if email in pending:
+            report['pending_invitations'].append(email)
+            continue
+
+        token = secrets.token_urlsafe(32)
+        tokens.append({
+            'token': token,
+            'email': email,
+            'role': 'client',
+            'organization': unique[email]['organization'],
+            'invited_by': inviter.id,
+            'is_used': False,
+            'expires_at': expires_at,
+            'created_at': now,
+        })
+        subject, text_body, html_body = build_invitation_email(email, 'client', link_for(token), inviter_name)
+        outbox.append({
+            'recipient': email,
+            'sender': sender,
+            'subject': subject,
+            'text_body': text_body,
+            'html_body': html_body,
+            'status': 'pending',
+            'attempts': 0,
+            'next_attempt_at': now,
+            'created_at': now,
+        })
+        report['invited'].append(email)
+
+    if dry_run or not tokens:
+        return report
+
+    for chunk in _chunks(tokens):
+        db.session.execute(InvitationToken.__table__.insert(), chunk)
+    for chunk in _chunks(outbox):
+        db.session.execute(EmailOutbox.__table__.insert(), chunk)
+    db.session.commit()
+    email_dispatcher.wake(current_app._get_current_object())
+    return report
+
+
+def summarize(report, invalid):
+    parts = [f"{len(report['invited'])} invited"]
+    for key, label in (('existing_users', 'already registered'), ('pending_invitations', 'already invited'),
+                       ('duplicates', 'duplicate rows')):
+        if report[key]:
+            parts.append(f"{len(report[key])} {label}")
+    if invalid:
+        parts.append(f"{len(invalid)} invalid rows")
+    return ', '.join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Invite clients in bulk from a CSV file')
+    parser.add_argument('csv_file')
+    parser.add_argument('--inviter', default='admin', help='Username of the superuser sending the invitations')
+    parser.add_argument('--base-url', default=os.environ.get('APP_BASE_URL', 'http://localhost:5001'),
+                        help='Public URL used in registration links')
+    parser.add_argument('--dry-run', action='store_true', help='Report what would happen without inviting anyone')
+    parser.add_argument('--no-send', action='store_true',
+                        help='Only queue the emails; a running app or email_outbox.py delivers them')
+    args = parser.parse_args()
+
+    from flask import url_for
+    from app import create_app, User
+    from email_outbox import dispatch_pending
+
+    with open(args.csv_file, encoding='utf-8-sig', newline='') as f:
+        rows, invalid = parse_onboarding_csv(f)
+
+    app = create_app({'MAIL_OUTBOX_DISPATCHER': False})
+    with app.test_request_context(base_url=args.base_url):
+        inviter = User.query.filter_by(username=args.inviter, role='superuser').first()
+        if inviter is None:
+            print(f"❌ No superuser named {args.inviter}")
+            return 1
+        report = onboard_clients(rows, inviter, lambda token: url_for('main.register', token=token, _external=True),
+                                 dry_run=args.dry_run)
+
+        for line, reason in invalid:
+            print(f"   ⚠️  line {line}: {reason}")
+        print(f"{'🔎 Dry run: ' if args.dry_run else '✅ '}{summarize(report, invalid)}")
+
+        if report['invited'] and not (args.dry_run or args.no_send):
+            totals = {'sent': 0, 'retry': 0, 'failed': 0}
+            while True:
+                counts = dispatch_pending()
+                if not any(counts.values()):
+                    break
+                for key, count in counts.items():
+                    totals[key] += count
+            print(f"📤 Emails sent {totals['sent']}, failed {totals['failed']}")
+            if totals['retry']:
+                print("   Some deliveries will be retried: run `python3 email_outbox.py run` or keep the app running")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
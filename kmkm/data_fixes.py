@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+One-time Data Fixes for SecureSphere
+Data corrections that used to run on every boot are registered here once and
+recorded in the data_fixes table when they complete, so a worker starting up
+only reads that table. Fixes are set-based UPDATEs run in batches of
+batch_size rows per transaction (see batched_update), so a large table is
+never locked for the length of the whole fix.
+
+    @data_fix('invitation_timestamps_utc')
+    def invitation_timestamps_utc(db, batch_size):
+        return batched_update(db, 'invitation_tokens', ..., batch_size)
+
+A fix registered with version=callable is recorded as "name@version" and runs
+again whenever the version changes (e.g. the question catalog hash). Fixes
+must be safe to run twice: workers booting together may both apply one
+before either records it.
+
+Usage:
+    python3 data_fixes.py status
+    python3 data_fixes.py run --batch-size 5000
+"""
+
+import os
+import sys
+import time
+import argparse
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+# name -> (function, version callable or None), in registration order
+FIXES = {}
+
+
+def data_fix(name, version=None):
+    """Register fn(db, batch_size) -> rows changed as a one-time fix"""
+    def decorator(func):
+        FIXES[name] = (func, version)
+        return func
+    return decorator
+
+
+def fix_key(name):
+    """The name a fix is recorded under, including its current version"""
+    _, version = FIXES[name]
+    return f'{name}@{version()}' if version else name
+
+
+def batched_update(db, table, assignments, condition, batch_size, pause=0.0):
+    """
+    UPDATE table SET assignments WHERE condition, at most batch_size rows per
+    transaction; returns rows changed. The assignments must make the condition
+    false for the updated rows, or the loop would never finish.
+    """
+    statement = db.text(
+        f'UPDATE {table} SET {assignments} '
+        f'WHERE id IN (SELECT id FROM {table} WHERE {condition} LIMIT :batch_size)'
+    )
+    changed = 0
+    while True:
+        result = db.session.execute(statement, {'batch_size': batch_size})
+        db.session.commit()
+        changed += result.rowcount
+        if result.rowcount < batch_size:
+            return changed
+        if pause:
+            time.sleep(pause)
+
+
+def applied_fixes(db, record_model):
+    """Recorded fix names; one query against data_fixes"""
+    return set(db.session.execute(db.select(record_model.name)).scalars())
+
+
+def pending_fixes(db, record_model):
+    applied = applied_fixes(db, record_model)
+    return [name for name in FIXES if fix_key(name) not in applied]
+
+
+def run_pending_fixes(db, record_model, batch_size=1000, progress=None):
+    """Apply every fix not yet recorded, in registration order; returns [(name, rows changed)]"""
+    results = []
+    for name in pending_fixes(db, record_model):
+        func, _ = FIXES[name]
+        started = time.perf_counter()
+        try:
+            changed = func(db, batch_size) or 0
+        except Exception:
+            db.session.rollback()
+            raise
+        # Another worker may have recorded it meanwhile; the fix itself is idempotent
+        if db.session.get(record_model, fix_key(name)) is None:
+            db.session.add(record_model(name=fix_key(name), rows_changed=changed,
+                                        applied_at=datetime.now(timezone.utc)))
+        db.session.commit()
+        results.append((name, changed))
+        if progress:
+            progress(f"   {name}: {changed:,} rows in {time.perf_counter() - started:.1f}s")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='List or apply one-time data fixes')
+    parser.add_argument('command', choices=['status', 'run'])
+    parser.add_argument('--batch-size', type=int, default=1000, help='Rows updated per transaction')
+    args = parser.parse_args()
+
+    from app import create_app, db, AppliedDataFix
+    # app.py registers its fixes on the imported module, not on this __main__ copy
+    import data_fixes
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        if args.command == 'status':
+            records = {record.name: record for record in AppliedDataFix.query}
+            print("🔧 SecureSphere Data Fixes")
+            print("=" * 60)
+            for name in data_fixes.FIXES:
+                key = data_fixes.fix_key(name)
+                record = records.get(key)
+                if record:
+                    print(f"✅ {key:<40} {record.rows_changed:>8,} rows  {record.applied_at:%Y-%m-%d %H:%M}")
+                else:
+                    print(f"⏳ {key:<40} pending")
+            return 0
+
+        print("🔧 Applying pending data fixes...")
+        results = data_fixes.run_pending_fixes(db, AppliedDataFix, batch_size=args.batch_size, progress=print)
+        print(f"✅ {len(results)} fixes applied" if results else "✅ No pending data fixes")
+        return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,7 +7,9 @@ import sys
 import os
 import shutil
 from datetime import datetime
-from app import app, db, User, Product
+from app import create_app, db, User, Product
+
+app = create_app()
 
 def backup_database():
     """Create a backup of the current database"""
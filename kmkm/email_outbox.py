@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Email Outbox Dispatcher for SecureSphere
+Requests never talk to SMTP: they add a row to the email_outbox table and wake
+the dispatcher. The dispatcher runs in a background thread of the worker that
+queued the mail, sends due messages in batches over one SMTP connection, and
+retries failures with exponential backoff until MAIL_OUTBOX_MAX_ATTEMPTS.
+Rows are claimed before sending, so several workers (or the standalone
+dispatcher below) can share one outbox without sending a message twice.
+
+Usage:
+    python3 email_outbox.py status
+    python3 email_outbox.py run --interval 5     # standalone dispatcher process
+    python3 email_outbox.py once                 # deliver what is due, then exit
+"""
+
+import os
+import sys
+import time
+import uuid
+import socket
+import smtplib
+import argparse
+import threading
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from metrics import metrics
+
+# A claim older than this belongs to a dispatcher that died mid-batch
+STALE_CLAIM = timedelta(minutes=10)
+
+# The server refused this one message (bad recipient, policy...); the connection is still usable.
+# Checked before CONNECTION_ERRORS because smtplib errors are OSError subclasses.
+MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)
+
+# The connection itself is gone or was never established
+CONNECTION_ERRORS = (smtplib.SMTPException, OSError)
+
+
+def _backoff(app, attempts):
+    base = app.config['MAIL_OUTBOX_BACKOFF']
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), 3600))
+
+
+def _claim(limit, dispatcher_id):
+    """Mark up to `limit` due messages as ours and return them"""
+    from app import db, EmailOutbox
+
+    now = datetime.now(timezone.utc)
+    EmailOutbox.query.filter(
+        EmailOutbox.status == 'sending', EmailOutbox.claimed_at < now - STALE_CLAIM
+    ).update({'status': 'pending', 'claimed_by': None}, synchronize_session=False)
+
+    due_ids = [row.id for row in db.session.query(EmailOutbox.id).filter(
+        EmailOutbox.status == 'pending', EmailOutbox.next_attempt_at <= now
+    ).order_by(EmailOutbox.id).limit(limit)]
+    if due_ids:
+        EmailOutbox.query.filter(
+            EmailOutbox.id.in_(due_ids), EmailOutbox.status == 'pending'
+        ).update({'status': 'sending', 'claimed_by': dispatcher_id, 'claimed_at': now}, synchronize_session=False)
+    db.session.commit()
+
+    if not due_ids:
+        return []
+    return EmailOutbox.query.filter_by(status='sending', claimed_by=dispatcher_id).order_by(EmailOutbox.id).all()
+
+
+def _record_failure(app, message, error):
+    message.attempts = (message.attempts or 0) + 1
+    message.last_error = str(error)[:1000]
+    message.claimed_by = None
+    if message.attempts >= app.config['MAIL_OUTBOX_MAX_ATTEMPTS']:
+        message.status = 'failed'
+        metrics.inc('securesphere_emails_total', status='failed')
+        app.logger.error("Giving up on email %s to %s after %s attempts: %s",
+                         message.id, message.recipient, message.attempts, error)
+    else:
+        message.status = 'pending'
+        message.next_attempt_at = datetime.now(timezone.utc) + _backoff(app, message.attempts)
+        metrics.inc('securesphere_emails_total', status='retry')
+
+
+def dispatch_pending(limit=None, dispatcher_id=None):
+    """
+    Deliver due outbox messages over a single SMTP connection.
+    Must run inside an app context; returns counts of sent/retried/failed messages.
+    """
+    from flask import current_app
+    from flask_mail import Message
+    from app import db, mail
+
+    app = current_app._get_current_object()
+    batch = _claim(limit or app.config['MAIL_OUTBOX_BATCH'], dispatcher_id or uuid.uuid4().hex)
+    counts = {'sent': 0, 'retry': 0, 'failed': 0}
+    if not batch:
+        return counts
+
+    remaining = list(batch)
+    try:
+        with mail.connect() as connection:
+            while remaining:
+                message = remaining[0]
+                try:
+                    connection.send(Message(
+                        subject=message.subject,
+                        sender=message.sender,
+                        recipients=[message.recipient],
+                        body=message.text_body,
+                        html=message.html_body
+                    ))
+                except MESSAGE_ERRORS as e:
+                    _record_failure(app, message, e)
+                except CONNECTION_ERRORS:
+                    raise
+                except Exception as e:
+                    # Anything else (e.g. bad headers) is specific to this message too
+                    _record_failure(app, message, e)
+                else:
+                    message.status = 'sent'
+                    message.sent_at = datetime.now(timezone.utc)
+                    message.claimed_by = None
+                    metrics.inc('securesphere_emails_total', status='sent')
+                db.session.commit()
+                remaining.pop(0)
+    except CONNECTION_ERRORS as e:
+        # The server is unreachable or hung up: everything not yet sent is retried later
+        app.logger.warning("SMTP connection to %s failed: %s", app.config['MAIL_SERVER'], e)
+        for message in remaining:
+            _record_failure(app, message, e)
+        db.session.commit()
+
+    for message in batch:
+        if message.status == 'sent':
+            counts['sent'] += 1
+        elif message.status == 'failed':
+            counts['failed'] += 1
+        else:
+            counts['retry'] += 1
+    return counts
+
+
+def outbox_status():
+    """Message counts per status and the most recent failures"""
+    from app import db, EmailOutbox
+
+    counts = dict(db.session.query(EmailOutbox.status, db.func.count()).group_by(EmailOutbox.status).all())
+    failures = EmailOutbox.query.filter(EmailOutbox.last_error.isnot(None), EmailOutbox.status != 'sent') \
+        .order_by(EmailOutbox.id.desc()).limit(10).all()
+    return {
+        'counts': {status: counts.get(status, 0) for status in ('pending', 'sending', 'sent', 'failed')},
+        'recent_failures': [{
+            'id': m.id,
+            'recipient': m.recipient,
+            'subject': m.subject,
+            'status': m.status,
+            'attempts': m.attempts,
+            'last_error': m.last_error,
+            'next_attempt_at': m.next_attempt_at.isoformat() if m.next_attempt_at else None
+        } for m in failures]
+    }
+
+
+class EmailDispatcher:
+    """Flask extension running the outbox dispatcher in a background thread while mail is queued"""
+
+    def __init__(self, app=None):
+        self._thread = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._token = uuid.uuid4().hex[:8]
+        self._resumed = False
+        if app is not None:
+            self.init_app(app)
+
+    @property
+    def dispatcher_id(self):
+        # Includes the pid so workers forked from a preloaded app claim separately
+        return f"{socket.gethostname()}:{os.getpid()}:{self._token}"
+
+    def init_app(self, app):
+        app.config.setdefault('MAIL_OUTBOX_DISPATCHER', os.environ.get('MAIL_OUTBOX_DISPATCHER', 'True').lower() == 'true')
+        app.config.setdefault('MAIL_OUTBOX_INTERVAL', float(os.environ.get('MAIL_OUTBOX_INTERVAL', 5)))
+        app.config.setdefault('MAIL_OUTBOX_BATCH', int(os.environ.get('MAIL_OUTBOX_BATCH', 50)))
+        app.config.setdefault('MAIL_OUTBOX_MAX_ATTEMPTS', int(os.environ.get('MAIL_OUTBOX_MAX_ATTEMPTS', 5)))
+        app.config.setdefault('MAIL_OUTBOX_BACKOFF', float(os.environ.get('MAIL_OUTBOX_BACKOFF', 30)))
+        app.before_request(self._resume_outstanding)
+        app.extensions['email_outbox'] = self
+
+    def _resume_outstanding(self):
+        """Once per process: pick up mail queued by processes that exited before delivering it"""
+        if self._resumed:
+            return
+        self._resumed = True
+        from flask import current_app
+        from app import EmailOutbox
+
+        app = current_app._get_current_object()
+        if not app.config['MAIL_OUTBOX_DISPATCHER']:
+            return
+        try:
+            outstanding = EmailOutbox.query.filter_by(status='pending').first() is not None
+        except Exception:
+            return  # Outbox table not created yet
+        if outstanding:
+            self.wake(app)
+
+    def wake(self, app):
+        """Deliver queued mail soon; starts the background thread if it is not running"""
+        if not app.config['MAIL_OUTBOX_DISPATCHER']:
+            return
+        with self._lock:
+            self._wake.set()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, args=(app,), name='email-outbox', daemon=True)
+                self._thread.start()
+
+    def _run(self, app):
+        from app import EmailOutbox
+
+        while True:
+            self._wake.clear()
+            with app.app_context():
+                try:
+                    dispatch_pending(dispatcher_id=self.dispatcher_id)
+                    outstanding = EmailOutbox.query.filter(EmailOutbox.status.in_(('pending', 'sending'))).count()
+                except Exception as e:
+                    app.logger.error("Email outbox dispatch failed: %s", e)
+                    outstanding = 1
+
+            with self._lock:
+                # Exit once nothing is left to retry; the next wake() starts a new thread
+                if not outstanding and not self._wake.is_set():
+                    self._thread = None
+                    return
+            self._wake.wait(app.config['MAIL_OUTBOX_INTERVAL'])
+
+
+email_dispatcher = EmailDispatcher()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SecureSphere email outbox')
+    sub = parser.add_subparsers(dest='command', required=True)
+    run = sub.add_parser('run', help='Dispatch continuously')
+    run.add_argument('--interval', type=float, default=5.0)
+    sub.add_parser('once', help='Deliver due messages and exit')
+    sub.add_parser('status', help='Show outbox counts and recent failures')
+    args = parser.parse_args()
+
+    from app import create_app
+    app = create_app({'MAIL_OUTBOX_DISPATCHER': False})
+
+    with app.app_context():
+        if args.command == 'status':
+            status = outbox_status()
+            print("📬 Email Outbox")
+            for name, count in status['counts'].items():
+                print(f"   {name:<8} {count}")
+            for failure in status['recent_failures']:
+                print(f"   ⚠️  #{failure['id']} {failure['recipient']} ({failure['status']}, "
+                      f"{failure['attempts']} attempts): {failure['last_error']}")
+            return 0
+
+        if args.command == 'once':
+            counts = dispatch_pending()
+            print(f"📤 Sent {counts['sent']}, retrying {counts['retry']}, failed {counts['failed']}")
+            return 0
+
+        print(f"📤 Dispatching every {args.interval}s (Ctrl+C to stop)")
+        try:
+            while True:
+                counts = dispatch_pending(dispatcher_id=email_dispatcher.dispatcher_id)
+                if any(counts.values()):
+                    print(f"   Sent {counts['sent']}, retrying {counts['retry']}, failed {counts['failed']}")
+                time.sleep(args.interval)
+        except KeyboardInterrupt:
+            return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,7 +7,9 @@ Creates a complete, persistent database with proper structure and sample data.
 import os
 import sys
 from datetime import datetime, timezone
-from app import app, db, User, Product, ProductStatus, QuestionnaireResponse, LeadComment, ScoreHistory, SystemSettings, InvitationToken
+from app import create_app, db, User, Product, ProductStatus, QuestionnaireResponse, LeadComment, ScoreHistory, SystemSettings, InvitationToken
+
+app = create_app()
 
 def reset_database():
     """Completely reset the database by dropping and recreating all tables"""
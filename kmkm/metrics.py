@@ -0,0 +1,256 @@
+"""
+Prometheus-style Metrics for SecureSphere
+Counters and histograms that aggregate across worker processes. Each process
+buffers increments in memory and flushes them as deltas into a shared SQLite
+file (METRICS_DB, default instance/metrics.db) at most every
+METRICS_FLUSH_INTERVAL seconds, and whenever /metrics is scraped. Any worker
+can therefore serve the combined view in the Prometheus text format.
+
+    from metrics import metrics
+    metrics.inc('securesphere_upload_bytes_total', size, kind='evidence')
+
+    @metrics.timed('securesphere_scoring_duration_seconds', function='heatmap')
+    def generate_heatmap_data(...): ...
+"""
+
+import os
+import time
+import json
+import atexit
+import sqlite3
+import threading
+from functools import wraps
+from contextlib import contextmanager
+
+from flask import g, request
+
+from query_profiler import get_request_stats
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels) + '}'
+
+
+class Metrics:
+    """Registry of declared metrics with a shared, multi-process backing store"""
+
+    def __init__(self, path=None, flush_interval=5.0):
+        self.path = path or os.environ.get('METRICS_DB', os.path.join(basedir, 'instance', 'metrics.db'))
+        self.flush_interval = flush_interval
+        self._families = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+        self._tables_ready = False
+        atexit.register(self.flush)
+
+    # ---------------- declaration ----------------
+
+    def counter(self, name, help_text):
+        self._families[name] = {'type': 'counter', 'help': help_text}
+
+    def histogram(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self._families[name] = {'type': 'histogram', 'help': help_text, 'buckets': tuple(buckets)}
+
+    # ---------------- recording ----------------
+
+    def _add(self, sample, labels, amount):
+        key = (sample, json.dumps(labels))
+        self._pending[key] = self._pending.get(key, 0) + amount
+
+    def inc(self, name, amount=1, **labels):
+        """Increment a counter"""
+        with self._lock:
+            self._add(name, sorted(labels.items()), amount)
+        self._maybe_flush()
+
+    def observe(self, name, value, **labels):
+        """Record a histogram observation (buckets are stored cumulatively)"""
+        base = sorted(labels.items())
+        with self._lock:
+            for bound in self._families[name]['buckets']:
+                # Zero increments still create the row, so every bucket is exposed
+                self._add(f'{name}_bucket', base + [('le', _format_value(bound))], 1 if value <= bound else 0)
+            self._add(f'{name}_bucket', base + [('le', '+Inf')], 1)
+            self._add(f'{name}_sum', base, value)
+            self._add(f'{name}_count', base, 1)
+        self._maybe_flush()
+
+    @contextmanager
+    def time(self, name, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def timed(self, name, **labels):
+        """Decorator observing the wrapped function's duration"""
+        def decorator(f):
+            @wraps(f)
+            def wrapper(*args, **kwargs):
+                with self.time(name, **labels):
+                    return f(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    # ---------------- shared store ----------------
+
+    def _connect(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        if not self._tables_ready:
+            conn.execute('PRAGMA journal_mode = WAL')
+            self._tables_ready = True
+        # Cheap enough per flush, and survives the file being replaced underneath us
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS metric_samples (
+                sample TEXT NOT NULL,
+                labels TEXT NOT NULL,
+                value REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (sample, labels)
+            )
+        ''')
+        return conn
+
+    def _maybe_flush(self):
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Write buffered deltas to the shared store"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+        try:
+            conn = self._connect()
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                conn.executemany('''
+                    INSERT INTO metric_samples (sample, labels, value) VALUES (?, ?, ?)
+                    ON CONFLICT(sample, labels) DO UPDATE SET value = value + excluded.value
+                ''', [(sample, labels, amount) for (sample, labels), amount in pending.items()])
+                conn.execute('COMMIT')
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            # Keep the deltas for the next attempt rather than losing them
+            print(f"⚠️ Warning: Could not flush metrics: {e}")
+            with self._lock:
+                for key, amount in pending.items():
+                    self._pending[key] = self._pending.get(key, 0) + amount
+
+    def reset(self):
+        """Drop all recorded samples (used by tests and benchmarks)"""
+        with self._lock:
+            self._pending = {}
+        conn = self._connect()
+        try:
+            conn.execute('DELETE FROM metric_samples')
+        finally:
+            conn.close()
+
+    # ---------------- exposition ----------------
+
+    def render(self, extra_lines=()):
+        """Prometheus text exposition of every process's samples"""
+        self.flush()
+        conn = self._connect()
+        try:
+            rows = conn.execute('SELECT sample, labels, value FROM metric_samples').fetchall()
+        finally:
+            conn.close()
+
+        samples = {}
+        for sample, labels, value in rows:
+            samples.setdefault(sample, []).append((json.loads(labels), value))
+
+        lines = []
+        for name, family in self._families.items():
+            lines.append(f'# HELP {name} {family["help"]}')
+            lines.append(f'# TYPE {name} {family["type"]}')
+            if family['type'] == 'counter':
+                for labels, value in sorted(samples.get(name, [])):
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+                continue
+            buckets = sorted(
+                samples.get(f'{name}_bucket', []),
+                key=lambda item: (item[0][:-1], float(item[0][-1][1].replace('+Inf', 'inf')))
+            )
+            for labels, value in buckets:
+                lines.append(f'{name}_bucket{_format_labels(labels)} {_format_value(value)}')
+            for suffix in ('_sum', '_count'):
+                for labels, value in sorted(samples.get(name + suffix, [])):
+                    lines.append(f'{name}{suffix}{_format_labels(labels)} {_format_value(value)}')
+        lines.extend(extra_lines)
+        return '\n'.join(lines) + '\n'
+
+    # ---------------- Flask integration ----------------
+
+    def init_app(self, app):
+        """Record request latency, status and DB usage for every request"""
+        app.config.setdefault('METRICS_DB', self.path)
+        app.config.setdefault('METRICS_TOKEN', os.environ.get('METRICS_TOKEN'))
+        app.config.setdefault('METRICS_FLUSH_INTERVAL', float(os.environ.get('METRICS_FLUSH_INTERVAL', self.flush_interval)))
+        self.path = app.config['METRICS_DB']
+        self.flush_interval = app.config['METRICS_FLUSH_INTERVAL']
+        self._tables_ready = False
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.extensions['metrics'] = self
+
+    @staticmethod
+    def _start_request():
+        g._metrics_started = time.perf_counter()
+
+    def _finish_request(self, response):
+        started = g.pop('_metrics_started', None)
+        if started is None:
+            return response
+        endpoint = request.endpoint or 'unmatched'
+        self.observe('securesphere_http_request_duration_seconds', time.perf_counter() - started,
+                     endpoint=endpoint, method=request.method)
+        self.inc('securesphere_http_requests_total', endpoint=endpoint, method=request.method,
+                 status=str(response.status_code))
+
+        stats = get_request_stats()
+        if stats is not None:
+            self.inc('securesphere_db_queries_total', stats.count, endpoint=endpoint)
+            self.inc('securesphere_db_query_seconds_total', stats.db_time, endpoint=endpoint)
+        return response
+
+
+metrics = Metrics()
+
+metrics.histogram('securesphere_http_request_duration_seconds', 'Request latency per Flask endpoint')
+metrics.counter('securesphere_http_requests_total', 'Requests per Flask endpoint and status code')
+metrics.counter('securesphere_db_queries_total', 'SQL queries issued per Flask endpoint')
+metrics.counter('securesphere_db_query_seconds_total', 'Time spent in SQL queries per Flask endpoint')
+metrics.histogram('securesphere_scoring_duration_seconds', 'Scoring engine latency per function')
+metrics.counter('securesphere_upload_bytes_total', 'Bytes received in file uploads')
+metrics.counter('securesphere_snapshot_cache_total', 'Assessment snapshot cache lookups by result')
+metrics.counter('securesphere_emails_total', 'Outbox email delivery attempts by outcome')
+metrics.counter('securesphere_fragment_cache_total', 'Template fragment cache lookups by result')
+metrics.histogram('securesphere_pdf_job_duration_seconds', 'PDF report generation time',
+                  buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0))
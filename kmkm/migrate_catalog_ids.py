@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Migration script to move questionnaire answers onto catalog ids
+Creates the questions and options tables, seeds them from devweb.csv, adds
+question_id/option_id to questionnaire_responses (and question_id to
+rejected_questions), then backfills existing rows in batches. Each batch is
+committed on its own and only rows without a question_id are picked up, so an
+interrupted run continues where it stopped when started again. migrations.py
+runs these steps as version 8; this script remains for re-linking by hand.
+
+Usage:
+    python3 migrate_catalog_ids.py
+    python3 migrate_catalog_ids.py --database instance/loadtest.db --batch-size 20000
+"""
+
+import os
+import sys
+import time
+import argparse
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, basedir)
+
+NEW_COLUMNS = {
+    'questionnaire_responses': [
+        ('question_id', 'INTEGER REFERENCES questions(id)'),
+        ('option_id', 'INTEGER REFERENCES options(id)'),
+    ],
+    'rejected_questions': [
+        ('question_id', 'INTEGER REFERENCES questions(id)'),
+    ],
+}
+
+
+def add_columns(db):
+    """Add the catalog id columns missing from an older database; returns the columns added"""
+    inspector = db.inspect(db.engine)
+    tables = inspector.get_table_names()
+    added = []
+    for table, columns in NEW_COLUMNS.items():
+        if table not in tables:
+            continue
+        existing = {column['name'] for column in inspector.get_columns(table)}
+        for name, definition in columns:
+            if name not in existing:
+                db.session.execute(db.text(f'ALTER TABLE {table} ADD COLUMN {name} {definition}'))
+                added.append(f'{table}.{name}')
+    db.session.execute(db.text(
+        'CREATE INDEX IF NOT EXISTS ix_questionnaire_responses_question_id ON questionnaire_responses (question_id)'
+    ))
+    db.session.commit()
+    return added
+
+
+def backfill_responses(db, batch_size, progress=None, pause=0.0):
+    """Set question_id/option_id on responses that have none; returns (matched, unmatched)"""
+    from app import catalog_ids_for
+
+    matched = unmatched = 0
+    last_id = 0
+    while True:
+        rows = db.session.execute(db.text(
+            'SELECT id, section, question, answer FROM questionnaire_responses '
+            'WHERE question_id IS NULL AND id > :last_id ORDER BY id LIMIT :batch_size'
+        ), {'last_id': last_id, 'batch_size': batch_size}).all()
+        if not rows:
+            break
+
+        updates = []
+        for row in rows:
+            question_id, option_id = catalog_ids_for(row.section, row.question, row.answer)
+            if question_id is None:
+                unmatched += 1
+            else:
+                updates.append({'id': row.id, 'question_id': question_id, 'option_id': option_id})
+        if updates:
+            db.session.execute(db.text(
+                'UPDATE questionnaire_responses SET question_id = :question_id, option_id = :option_id WHERE id = :id'
+            ), updates)
+        db.session.commit()
+        matched += len(updates)
+        last_id = rows[-1].id
+        if progress:
+            progress(f"   questionnaire_responses: {matched:,} linked, {unmatched:,} unknown (up to id {last_id})")
+        if pause:
+            time.sleep(pause)
+    return matched, unmatched
+
+
+def backfill_rejected_questions(db, batch_size, progress=None, pause=0.0):
+    """Copy question_id from the rejected response; returns the rows updated"""
+    updated = 0
+    last_id = 0
+    while True:
+        ids = db.session.execute(db.text(
+            'SELECT id FROM rejected_questions WHERE question_id IS NULL AND id > :last_id ORDER BY id LIMIT :batch_size'
+        ), {'last_id': last_id, 'batch_size': batch_size}).scalars().all()
+        if not ids:
+            break
+
+        result = db.session.execute(db.text(
+            'UPDATE rejected_questions SET question_id = ('
+            '    SELECT question_id FROM questionnaire_responses WHERE questionnaire_responses.id = rejected_questions.response_id'
+            ') WHERE question_id IS NULL AND id BETWEEN :first_id AND :last_id'
+        ), {'first_id': ids[0], 'last_id': ids[-1]})
+        db.session.commit()
+        updated += result.rowcount
+        last_id = ids[-1]
+        if progress:
+            progress(f"   rejected_questions: {updated:,} checked (up to id {last_id})")
+        if pause:
+            time.sleep(pause)
+    return updated
+
+
+def migrate_catalog_ids(app, batch_size=5000, progress=None):
+    """Run every step against app's database; returns a summary dict"""
+    from app import db, sync_question_catalog
+
+    with app.app_context():
+        db.create_all()
+        columns = add_columns(db)
+        added_questions, added_options = sync_question_catalog()
+        matched, unmatched = backfill_responses(db, batch_size, progress)
+        rejected = backfill_rejected_questions(db, batch_size, progress)
+    return {
+        'columns_added': columns,
+        'questions_added': added_questions,
+        'options_added': added_options,
+        'responses_linked': matched,
+        'responses_unknown': unmatched,
+        'rejected_questions_checked': rejected,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Link questionnaire answers to catalog question/option ids')
+    parser.add_argument('--database', default=os.path.join(basedir, 'instance', 'securesphere.db'),
+                        help='SQLite file to migrate (default: instance/securesphere.db)')
+    parser.add_argument('--batch-size', type=int, default=5000, help='Rows updated per transaction')
+    args = parser.parse_args()
+
+    database = os.path.abspath(args.database)
+    if not os.path.exists(database):
+        print(f"❌ Database not found at {database}")
+        return 1
+
+    from app import create_app
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{database}'})
+
+    print("🚀 Starting catalog id migration...")
+    started = time.perf_counter()
+    try:
+        summary = migrate_catalog_ids(app, batch_size=args.batch_size, progress=print)
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        print("   Batches committed so far are kept; run the script again to continue.")
+        return 1
+
+    for column in summary['columns_added']:
+        print(f"✅ Added column {column}")
+    print(f"✅ Catalog: {summary['questions_added']} questions, {summary['options_added']} options added")
+    print(f"✅ Linked {summary['responses_linked']:,} responses in {time.perf_counter() - started:.1f}s")
+    if summary['responses_unknown']:
+        print(f"⚠️  {summary['responses_unknown']:,} responses answer questions no longer in devweb.csv; "
+              "they keep their text and are scored from it")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Migration script to bring database indexes in line with the models
+Creates every index declared on the models that an existing database is
+missing, drops indexes the models have replaced, then runs ANALYZE so SQLite's
+planner has row counts to choose between them. db.create_all() only creates
+indexes together with new tables, so older databases need this once after an
+index is added to a model.
+
+The indexes follow the filters routes actually run; test_query_plans.py
+fails when a route query reads a whole table without one.
+
+Usage:
+    python3 migrate_indexes.py
+    python3 migrate_indexes.py --database instance/loadtest.db --dry-run
+"""
+
+import os
+import sys
+import time
+import argparse
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, basedir)
+
+# Superseded by the (chat_id, is_read_by_*, sender_id) indexes on chat_messages, and
+# idx_user_product by idx_response_user_product_section (covers the lead dashboard)
+RETIRED_INDEXES = ['idx_unread_client', 'idx_unread_lead', 'idx_user_product']
+
+
+def sync_indexes(db, dry_run=False):
+    """Create missing model indexes and drop retired ones; returns (created, dropped) index names"""
+    inspector = db.inspect(db.engine)
+    tables = set(inspector.get_table_names())
+    existing = {index['name'] for table in tables for index in inspector.get_indexes(table)}
+
+    created = []
+    for table in db.metadata.sorted_tables:
+        if table.name not in tables:
+            continue
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            if index.name not in existing:
+                if not dry_run:
+                    index.create(db.engine)
+                created.append(index.name)
+
+    dropped = [name for name in RETIRED_INDEXES if name in existing]
+    if not dry_run:
+        with db.engine.begin() as connection:
+            for name in dropped:
+                connection.exec_driver_sql(f'DROP INDEX IF EXISTS {name}')
+            connection.exec_driver_sql('ANALYZE')
+    return created, dropped
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Create missing model indexes on an existing database')
+    parser.add_argument('--database', default=os.path.join(basedir, 'instance', 'securesphere.db'),
+                        help='SQLite file to migrate (default: instance/securesphere.db)')
+    parser.add_argument('--dry-run', action='store_true', help='Only list the indexes that would change')
+    args = parser.parse_args()
+
+    database = os.path.abspath(args.database)
+    if not os.path.exists(database):
+        print(f"❌ Database not found at {database}")
+        return 1
+
+    from app import create_app, db
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{database}'})
+
+    print("🚀 Starting index migration...")
+    started = time.perf_counter()
+    try:
+        with app.app_context():
+            created, dropped = sync_indexes(db, dry_run=args.dry_run)
+    except Exception as e:
+        print(f"❌ Migration failed: {e}")
+        return 1
+
+    prefix = "Would create" if args.dry_run else "Created"
+    for name in created:
+        print(f"✅ {prefix} index {name}")
+    for name in dropped:
+        print(f"🗑️  {'Would drop' if args.dry_run else 'Dropped'} index {name}")
+    if not created and not dropped:
+        print("✅ All model indexes already exist")
+    if not args.dry_run:
+        print(f"✅ Statistics refreshed in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Versioned Schema Migrations for SecureSphere
+Every schema change an existing database may still be missing is registered
+here under an increasing version number and applied in order; applied versions
+are recorded in the schema_migrations table, so each runs once per database.
+
+Backfills never hold the write lock for a whole table. ctx.batched() runs a
+statement over consecutive id ranges of batch_size rows, one transaction per
+range, sleeping `pause` seconds between ranges so the app's own writes get in.
+The last id of each range is saved in migration_checkpoints inside the same
+transaction, so an interrupted run resumes after the last committed range.
+
+    @migration(7, 'review_status')
+    def review_status(ctx):
+        ctx.add_column('questionnaire_responses', 'review_status', "VARCHAR(20) DEFAULT 'pending'")
+        return ctx.batched('classify', 'questionnaire_responses',
+                           "UPDATE questionnaire_responses SET ... WHERE id > :lower AND id <= :upper")
+
+Tables the models define but the database lacks are created (db.create_all())
+before any version runs, and model indexes are synced (see migrate_indexes.py)
+after the last one.
+
+Usage:
+    python3 migrations.py status
+    python3 migrations.py up
+    python3 migrations.py up --database instance/loadtest.db --batch-size 5000 --pause 0.05
+"""
+
+import os
+import sys
+import time
+import argparse
+from datetime import datetime, timezone
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, basedir)
+
+# version -> (name, function), applied in version order
+MIGRATIONS = {}
+
+BOOKKEEPING_TABLES = [
+    """CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INTEGER PRIMARY KEY,
+        name VARCHAR(100) NOT NULL,
+        rows_changed INTEGER NOT NULL DEFAULT 0,
+        started_at DATETIME,
+        completed_at DATETIME
+    )""",
+    """CREATE TABLE IF NOT EXISTS migration_checkpoints (
+        version INTEGER NOT NULL,
+        step VARCHAR(100) NOT NULL,
+        last_id INTEGER NOT NULL,
+        updated_at DATETIME,
+        PRIMARY KEY (version, step)
+    )""",
+]
+
+
+def migration(version, name):
+    """Register fn(ctx) -> rows changed as schema version `version`"""
+    def decorator(func):
+        if version in MIGRATIONS:
+            raise ValueError(f'Migration version {version} is already registered ({MIGRATIONS[version][0]})')
+        MIGRATIONS[version] = (name, func)
+        return func
+    return decorator
+
+
+def _now():
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+class MigrationContext:
+    """What a migration function gets: its database, batch settings and checkpoints"""
+
+    def __init__(self, db, version, name, batch_size=1000, pause=0.0, progress=None, resuming=False):
+        self.db = db
+        self.version = version
+        self.name = name
+        self.batch_size = batch_size
+        self.pause = pause
+        self.progress = progress
+        # True when an earlier run started this version and did not finish it
+        self.resuming = resuming
+
+    def execute(self, statement, params=None):
+        return self.db.session.execute(self.db.text(statement), params or {})
+
+    def columns(self, table):
+        return {row[1] for row in self.execute(f'PRAGMA table_info({table})')}
+
+    def add_column(self, table, column, definition):
+        """ALTER TABLE ADD COLUMN unless the column exists; returns True when it was added"""
+        if column in self.columns(table):
+            return False
+        self.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
+        self.db.session.commit()
+        return True
+
+    def checkpoint(self, step):
+        """Last id a step has committed, 0 when it has not started"""
+        return self.execute(
+            'SELECT last_id FROM migration_checkpoints WHERE version = :version AND step = :step',
+            {'version': self.version, 'step': step},
+        ).scalar() or 0
+
+    def batched(self, step, table, statement, params=None):
+        """
+        Run statement once per range of batch_size ids of table, binding
+        :lower < id <= :upper, each range in its own transaction together with
+        its checkpoint; returns the rows changed. Ranges already committed by
+        an interrupted run are skipped.
+        """
+        lower = self.checkpoint(step)
+        max_id = self.execute(f'SELECT max(id) FROM {table}').scalar() or 0
+        changed = 0
+        while lower < max_id:
+            upper = self.execute(
+                f'SELECT id FROM {table} WHERE id > :lower ORDER BY id LIMIT 1 OFFSET :offset',
+                {'lower': lower, 'offset': self.batch_size - 1},
+            ).scalar() or max_id
+            result = self.execute(statement, dict(params or {}, lower=lower, upper=upper))
+            self.execute(
+                'INSERT OR REPLACE INTO migration_checkpoints (version, step, last_id, updated_at) '
+                'VALUES (:version, :step, :last_id, :now)',
+                {'version': self.version, 'step': step, 'last_id': upper, 'now': _now()},
+            )
+            self.execute(
+                'UPDATE schema_migrations SET rows_changed = rows_changed + :changed WHERE version = :version',
+                {'changed': max(result.rowcount, 0), 'version': self.version},
+            )
+            self.db.session.commit()
+            changed += max(result.rowcount, 0)
+            lower = upper
+            if self.progress:
+                self.progress(f"   {self.name}/{step}: id {upper:,} of {max_id:,} "
+                              f"({upper * 100 // max_id}%), {changed:,} rows changed")
+            if self.pause and lower < max_id:
+                time.sleep(self.pause)
+        return changed
+
+
+def ensure_bookkeeping(db):
+    for statement in BOOKKEEPING_TABLES:
+        db.session.execute(db.text(statement))
+    db.session.commit()
+
+
+def migration_status(db):
+    """[(version, name, state, rows changed, completed_at)] with state applied, partial or pending"""
+    ensure_bookkeeping(db)
+    records = {row.version: row for row in db.session.execute(db.text(
+        'SELECT version, rows_changed, completed_at FROM schema_migrations'
+    ))}
+    status = []
+    for version, (name, _) in sorted(MIGRATIONS.items()):
+        record = records.get(version)
+        if record is None:
+            status.append((version, name, 'pending', 0, None))
+        else:
+            state = 'applied' if record.completed_at else 'partial'
+            status.append((version, name, state, record.rows_changed, record.completed_at))
+    return status
+
+
+def run_migrations(db, batch_size=1000, pause=0.0, target=None, progress=None):
+    """Create missing tables, then apply pending versions up to target in order; returns [(version, name, rows)]"""
+    db.create_all()
+    ensure_bookkeeping(db)
+    results = []
+    for version, name, state, _, _ in migration_status(db):
+        if state == 'applied':
+            continue
+        if target is not None and version > target:
+            break
+        if state == 'pending':
+            db.session.execute(db.text(
+                'INSERT INTO schema_migrations (version, name, started_at) VALUES (:version, :name, :now)'
+            ), {'version': version, 'name': name, 'now': _now()})
+            db.session.commit()
+        elif progress:
+            progress(f"   {name}: resuming an interrupted run")
+
+        started = time.perf_counter()
+        ctx = MigrationContext(db, version, name, batch_size, pause, progress, resuming=state == 'partial')
+        try:
+            changed = MIGRATIONS[version][1](ctx) or 0
+        except BaseException:
+            db.session.rollback()
+            raise
+        # rows_changed already holds what batched() committed, across runs; other work is only in `changed`
+        db.session.execute(db.text(
+            'UPDATE schema_migrations SET completed_at = :now, '
+            'rows_changed = max(rows_changed, :changed) WHERE version = :version'
+        ), {'now': _now(), 'changed': changed, 'version': version})
+        db.session.execute(db.text('DELETE FROM migration_checkpoints WHERE version = :version'), {'version': version})
+        db.session.commit()
+        results.append((version, name, changed))
+        if progress:
+            progress(f"✅ {version:>3} {name}: {changed:,} rows in {time.perf_counter() - started:.1f}s")
+    return results
+
+
+# Migrations, formerly migrate_database.py, migrate_client_assignments.py,
+# migrate_chat_system.py / migrate_question_chat.py, migrate_rejected_questions.py,
+# migrate_review_status.py and migrate_catalog_ids.py
+
+@migration(1, 'users_assigned_client_id')
+def users_assigned_client_id(ctx):
+    ctx.add_column('users', 'assigned_client_id', 'INTEGER REFERENCES users(id)')
+    return 0
+
+
+@migration(2, 'responses_is_approved')
+def responses_is_approved(ctx):
+    ctx.add_column('questionnaire_responses', 'is_approved', 'BOOLEAN DEFAULT 0')
+    return 0
+
+
+@migration(3, 'default_organization')
+def default_organization(ctx):
+    """Users without an organization, and every lead, belong to ACCORIAN"""
+    return ctx.batched('users', 'users', """
+        UPDATE users SET organization = 'ACCORIAN'
+        WHERE id > :lower AND id <= :upper
+          AND (organization IS NULL OR (role = 'lead' AND organization != 'ACCORIAN'))
+    """)
+
+
+@migration(4, 'lead_client_associations')
+def lead_client_associations(ctx):
+    """Copy single lead -> client assignments into the many-to-many table"""
+    return ctx.batched('users', 'users', """
+        INSERT OR IGNORE INTO lead_client_associations (lead_id, client_id, created_at)
+        SELECT id, assigned_client_id, :now FROM users
+        WHERE id > :lower AND id <= :upper AND role = 'lead' AND assigned_client_id IS NOT NULL
+    """, {'now': _now()})
+
+
+@migration(5, 'question_chat_tables')
+def question_chat_tables(ctx):
+    # question_chats and chat_messages are created by db.create_all() before versions run
+    return 0
+
+
+@migration(6, 'rejected_questions_table')
+def rejected_questions_table(ctx):
+    # Likewise created by db.create_all()
+    return 0
+
+
+@migration(7, 'review_status')
+def review_status(ctx):
+    """Derive review_status from the older review flags, only when the column is new"""
+    added = ctx.add_column('questionnaire_responses', 'review_status', "VARCHAR(20) DEFAULT 'pending'")
+    if not added and not ctx.resuming:
+        return 0
+    return ctx.batched('classify', 'questionnaire_responses', """
+        UPDATE questionnaire_responses SET review_status = CASE
+            WHEN is_approved = 1 THEN 'approved'
+            WHEN needs_client_response = 1 THEN 'needs_revision'
+            ELSE 'rejected'
+        END
+        WHERE id > :lower AND id <= :upper
+          AND (is_approved = 1 OR needs_client_response = 1 OR is_reviewed = 1)
+    """)
+
+
+@migration(8, 'catalog_ids')
+def catalog_ids(ctx):
+    """Link answers to catalog question/option ids; only rows without one are touched"""
+    from app import sync_question_catalog
+    from migrate_catalog_ids import add_columns, backfill_responses, backfill_rejected_questions
+
+    add_columns(ctx.db)
+    sync_question_catalog()
+    matched, _ = backfill_responses(ctx.db, ctx.batch_size, ctx.progress, pause=ctx.pause)
+    return matched + backfill_rejected_questions(ctx.db, ctx.batch_size, ctx.progress, pause=ctx.pause)
+
+
+@migration(9, 'users_acl_version')
+def users_acl_version(ctx):
+    ctx.add_column('users', 'acl_version', 'INTEGER NOT NULL DEFAULT 0')
+    return 0
+
+
+@migration(10, 'review_queue')
+def fill_review_queue(ctx):
+    """Queue the answers already waiting for review, revision or re-selection"""
+    from review_queue import BACKFILL_SQL, backfill_params
+
+    return ctx.batched('fill', 'questionnaire_responses', BACKFILL_SQL, backfill_params())
+
+
+@migration(11, 'product_status_is_complete')
+def product_status_is_complete(ctx):
+    """Give every answered assessment a status row and flag those with every section answered"""
+    from app import get_questionnaire, get_section_ids
+
+    ctx.add_column('product_statuses', 'is_complete', 'BOOLEAN NOT NULL DEFAULT 0')
+    total = sum(len(questions) for questions in get_questionnaire().values())
+    changed = ctx.batched('missing', 'products', """
+        INSERT INTO product_statuses (product_id, user_id, status, questions_completed, total_questions,
+                                      completion_percentage, last_updated)
+        SELECT r.product_id, r.user_id, 'in_progress', count(*), :total, count(*) * 100.0 / :total, :now
+        FROM questionnaire_responses r
+        WHERE r.product_id > :lower AND r.product_id <= :upper
+          AND NOT EXISTS (SELECT 1 FROM product_statuses s
+                          WHERE s.product_id = r.product_id AND s.user_id = r.user_id)
+        GROUP BY r.product_id, r.user_id
+    """, {'total': total, 'now': _now()})
+    return changed + ctx.batched('flag', 'product_statuses', """
+        UPDATE product_statuses SET is_complete = (
+            SELECT count(DISTINCT r.section) FROM questionnaire_responses r
+            WHERE r.product_id = product_statuses.product_id AND r.user_id = product_statuses.user_id
+        ) = :sections
+        WHERE id > :lower AND id <= :upper
+    """, {'sections': len(get_section_ids())})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='List or apply versioned schema migrations')
+    parser.add_argument('command', choices=['status', 'up'])
+    parser.add_argument('--database', default=os.path.join(basedir, 'instance', 'securesphere.db'),
+                        help='SQLite file to migrate (default: instance/securesphere.db)')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Rows per backfill transaction')
+    parser.add_argument('--pause', type=float, default=0.0, help='Seconds to sleep between backfill batches')
+    parser.add_argument('--target', type=int, help='Stop after this version')
+    args = parser.parse_args()
+
+    database = os.path.abspath(args.database)
+    if not os.path.exists(database):
+        print(f"❌ Database not found at {database}")
+        return 1
+
+    from app import create_app, db
+    from migrate_indexes import sync_indexes
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{database}'})
+    with app.app_context():
+        if args.command == 'status':
+            print("🔄 SecureSphere Schema Migrations")
+            print("=" * 60)
+            for version, name, state, rows, completed_at in migration_status(db):
+                marker = {'applied': '✅', 'partial': '⏸️ ', 'pending': '⏳'}[state]
+                print(f"{marker} {version:>3} {name:<30} {state:<8} {rows:>10,} rows  {completed_at or ''}")
+            return 0
+
+        print("🚀 Applying schema migrations...")
+        started = time.perf_counter()
+        try:
+            results = run_migrations(db, batch_size=args.batch_size, pause=args.pause,
+                                     target=args.target, progress=print)
+            created, dropped = sync_indexes(db, dry_run=True)
+            if created or dropped:
+                sync_indexes(db)
+        except Exception as e:
+            print(f"❌ Migration failed: {e}")
+            print("   Committed batches are kept; run the command again to resume.")
+            return 1
+
+    for name in created:
+        print(f"✅ Created index {name}")
+    for name in dropped:
+        print(f"🗑️  Dropped index {name}")
+    if not results and not created and not dropped:
+        print("✅ Database is up to date")
+    else:
+        print(f"✅ {len(results)} migrations applied in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
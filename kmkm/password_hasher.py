@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Password Hashing Service for SecureSphere
+Password hashes are deliberately expensive. Computing them on the request
+thread lets a burst of logins take every core of the worker and stall all
+other requests. PasswordHasher runs hashing and verification in a small
+process pool instead. Requests wait for their result without using CPU, and
+at most PASSWORD_HASH_WORKERS hashes run at once per process.
+
+Workers start from a forkserver rather than a fork of the threaded server, so
+like any multiprocessing code they import the running script's module again:
+scripts that hash passwords need the usual `if __name__ == '__main__'` guard.
+
+Stored hashes made with other parameters still verify. After a successful
+login, needs_rehash() tells the login view to store a hash with the
+current parameters.
+
+Configuration (app.config or environment):
+    PASSWORD_HASH_METHOD     default scrypt (Werkzeug method string, e.g. scrypt:65536:8:1
+                             or pbkdf2:sha256:1000000)
+    PASSWORD_HASH_WORKERS    default min(4, CPU count); 0 hashes on the request thread
+    PASSWORD_HASH_QUEUE      default 64; hashes waiting or running before new ones are refused
+    PASSWORD_HASH_TIMEOUT    default 10 seconds to wait for a queue slot
+
+Benchmark logins per second with benchmark_password_hashing.py.
+"""
+
+import os
+import sys
+import atexit
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from flask import current_app, has_app_context
+from werkzeug.security import generate_password_hash, check_password_hash, DEFAULT_PBKDF2_ITERATIONS
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+DEFAULTS = {
+    'PASSWORD_HASH_METHOD': 'scrypt',
+    'PASSWORD_HASH_WORKERS': min(4, os.cpu_count() or 1),
+    'PASSWORD_HASH_QUEUE': 64,
+    'PASSWORD_HASH_TIMEOUT': 10.0,
+}
+
+
+class PasswordHashingBusy(RuntimeError):
+    """More hashes are queued than PASSWORD_HASH_QUEUE allows"""
+
+
+def hash_parameters(method):
+    """A Werkzeug method with its defaults spelled out, as it appears in front of the first '$' of a hash"""
+    name, *args = method.split(':')
+    if name == 'scrypt':
+        n, r, p = (args + ['32768', '8', '1'][len(args):])[:3]
+        return f'scrypt:{n}:{r}:{p}'
+    if name == 'pbkdf2':
+        hash_name, iterations = (args + ['sha256', str(DEFAULT_PBKDF2_ITERATIONS)][len(args):])[:2]
+        return f'pbkdf2:{hash_name}:{iterations}'
+    return method
+
+
+def _hash(password, method):
+    return generate_password_hash(password, method=method)
+
+
+def _verify(pwhash, password):
+    return check_password_hash(pwhash, password)
+
+
+class PasswordHasher:
+    """Flask extension hashing and verifying passwords in a bounded process pool"""
+
+    def __init__(self, app=None):
+        self._pool = None
+        self._pool_shape = None
+        self._slots = None
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('PASSWORD_HASH_METHOD', os.environ.get(
+            'PASSWORD_HASH_METHOD', DEFAULTS['PASSWORD_HASH_METHOD']))
+        app.config.setdefault('PASSWORD_HASH_WORKERS', int(os.environ.get(
+            'PASSWORD_HASH_WORKERS', DEFAULTS['PASSWORD_HASH_WORKERS'])))
+        app.config.setdefault('PASSWORD_HASH_QUEUE', int(os.environ.get(
+            'PASSWORD_HASH_QUEUE', DEFAULTS['PASSWORD_HASH_QUEUE'])))
+        app.config.setdefault('PASSWORD_HASH_TIMEOUT', float(os.environ.get(
+            'PASSWORD_HASH_TIMEOUT', DEFAULTS['PASSWORD_HASH_TIMEOUT'])))
+        app.extensions['password_hasher'] = self
+
+    def _config(self, key):
+        if has_app_context() and key in current_app.config:
+            return current_app.config[key]
+        return DEFAULTS[key]
+
+    def hash(self, password):
+        """A hash of password with the configured method"""
+        return self._run(_hash, password, self._config('PASSWORD_HASH_METHOD'))
+
+    def verify(self, pwhash, password):
+        """Whether password matches pwhash, whatever parameters it was made with"""
+        if not pwhash:
+            return False
+        return self._run(_verify, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """True when pwhash was made with other parameters than the configured method"""
+        return pwhash.split('$', 1)[0] != hash_parameters(self._config('PASSWORD_HASH_METHOD'))
+
+    def _executor(self, workers, queue):
+        with self._lock:
+            if self._pool is None or self._pool_shape != (workers, queue):
+                if self._pool is not None:
+                    self._pool.shutdown(wait=False)
+                # forkserver: never fork the threaded server process itself
+                context = multiprocessing.get_context(
+                    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                )
+                self._pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+                self._pool_shape = (workers, queue)
+                self._slots = threading.BoundedSemaphore(queue)
+            return self._pool, self._slots
+
+    def _run(self, func, *args):
+        workers = self._config('PASSWORD_HASH_WORKERS')
+        if workers <= 0:
+            return func(*args)
+
+        queue = self._config('PASSWORD_HASH_QUEUE')
+        pool, slots = self._executor(workers, queue)
+        if not slots.acquire(timeout=self._config('PASSWORD_HASH_TIMEOUT')):
+            raise PasswordHashingBusy(f'more than {queue} password hashes queued')
+        try:
+            return pool.submit(func, *args).result()
+        except BrokenProcessPool:
+            # A worker died (OOM killer, signal); start a fresh pool next time
+            with self._lock:
+                if self._pool is pool:
+                    self._pool = None
+            return func(*args)
+        finally:
+            slots.release()
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+password_hasher = PasswordHasher()
+atexit.register(password_hasher.shutdown)
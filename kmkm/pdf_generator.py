@@ -6,13 +6,9 @@ from reportlab.lib.pagesizes import letter, A4
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image, PageBreak
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.graphics.shapes import Drawing, Rect, Circle
-from reportlab.graphics.charts.piecharts import Pie
-from reportlab.graphics.charts.barcharts import VerticalBarChart
-from reportlab.graphics import renderPDF
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
-import base64
-from PIL import Image as PILImage
+
+from metrics import metrics
 
 
 class ProductResultsPDFGenerator:
@@ -373,6 +369,7 @@ class ProductResultsPDFGenerator:
         return recommendations
 
 
+@metrics.timed('securesphere_pdf_job_duration_seconds')
 def generate_product_pdf(product, responses, scores, user, filename):
     """Main function to generate PDF report"""
     generator = ProductResultsPDFGenerator(product, responses, scores, user)
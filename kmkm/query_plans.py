@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+SQLite Query Plan Checks for SecureSphere
+Runs EXPLAIN QUERY PLAN on the statements the app issues and flags plans that
+will not keep up as tables grow: full table scans, temporary B-trees built for
+ORDER BY / GROUP BY / DISTINCT, and automatic indexes SQLite builds on the fly
+because no real one exists.
+
+Two ways to collect plans:
+
+  * QueryPlanRecorder, a Flask extension for test and development runs. With
+    QUERY_PLAN_CAPTURE enabled every distinct statement is explained the first
+    time each endpoint issues it, and a report grouped by route is written to
+    QUERY_PLAN_REPORT when the process exits (or on recorder.write_report()).
+  * PlanCapture, a context manager for tests that check plans directly:
+
+        with PlanCapture(db.engine) as capture:
+            client.get('/dashboard')
+        for endpoint, sql, details in capture.explain():
+            print(endpoint, full_table_scans(details))
+
+Statements are grouped by query_profiler.fingerprint(), so one plan is taken
+per query shape using the parameters of its first execution.
+
+Configuration (app.config or environment):
+    QUERY_PLAN_CAPTURE    default False
+    QUERY_PLAN_REPORT     default instance/query_plans.json
+
+Usage:
+    QUERY_PLAN_CAPTURE=True python3 app.py      # browse, then stop the server
+    python3 query_plans.py show                 # report grouped by route
+    python3 query_plans.py show --flagged       # only routes with flagged plans
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import atexit
+import argparse
+import threading
+
+from flask import current_app, request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from query_profiler import fingerprint
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+
+# "SCAN users" / "SCAN TABLE users AS u" (older SQLite); index scans name the index
+_FULL_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$')
+# Subqueries SQLite evaluates on its own; scanning their result is not a table scan
+_SUBQUERY = re.compile(r'^(?:CO-ROUTINE|MATERIALIZE) (?:SUBQUERY \d+|(\w+))')
+_TEMP_BTREE = re.compile(r'^USE TEMP B-TREE FOR (.+)$')
+_AUTOMATIC_INDEX = re.compile(r'^(?:SEARCH|SCAN) (?:TABLE )?(\w+).* USING AUTOMATIC (?:PARTIAL )?(?:COVERING )?INDEX')
+
+
+def full_table_scans(details):
+    """Tables read row by row without an index in an EXPLAIN QUERY PLAN detail list"""
+    subqueries = {match.group(1) for match in map(_SUBQUERY.match, details) if match}
+    tables = []
+    for detail in details:
+        match = _FULL_SCAN.match(detail.strip())
+        if match and match.group(1) not in subqueries:
+            tables.append(match.group(1))
+    return tables
+
+
+def plan_flags(details):
+    """Readable warnings for a plan: full scans, temp B-trees and automatic indexes"""
+    flags = [f'SCAN TABLE {table}' for table in full_table_scans(details)]
+    for detail in details:
+        detail = detail.strip()
+        match = _TEMP_BTREE.match(detail)
+        if match:
+            flags.append(f'TEMP B-TREE for {match.group(1)}')
+        match = _AUTOMATIC_INDEX.match(detail)
+        if match:
+            flags.append(f'AUTOMATIC INDEX on {match.group(1)}')
+    return flags
+
+
+def explain_query_plan(connection, statement, parameters=()):
+    """Detail lines of EXPLAIN QUERY PLAN for one statement"""
+    rows = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).all()
+    return [row[-1] for row in rows]
+
+
+def _explainable(statement, executemany):
+    return not executemany and statement.lstrip().upper().startswith(('SELECT', 'WITH'))
+
+
+class PlanCapture:
+    """Collects distinct SELECT statements run on an engine while the context is open"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = {}
+
+    def __enter__(self):
+        event.listen(self.engine, 'after_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, 'after_cursor_execute', self._record)
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if not _explainable(statement, executemany):
+            return
+        endpoint = request.endpoint if has_request_context() else None
+        self.statements.setdefault((endpoint, fingerprint(statement)), (statement, parameters))
+
+    def explain(self):
+        """(endpoint, statement, plan details) for every captured statement"""
+        results = []
+        with self.engine.connect() as connection:
+            for (endpoint, _), (statement, parameters) in self.statements.items():
+                results.append((endpoint, statement, explain_query_plan(connection, statement, parameters)))
+        return results
+
+
+class QueryPlanRecorder:
+    """Flask extension explaining every distinct statement per endpoint in test/dev runs"""
+
+    def __init__(self, app=None):
+        self.routes = {}
+        self.report_path = None
+        self._lock = threading.Lock()
+        self._listening = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('QUERY_PLAN_CAPTURE', os.environ.get('QUERY_PLAN_CAPTURE', 'False').lower() == 'true')
+        app.config.setdefault('QUERY_PLAN_REPORT', os.environ.get(
+            'QUERY_PLAN_REPORT', os.path.join(basedir, 'instance', 'query_plans.json')
+        ))
+        if not app.config['QUERY_PLAN_CAPTURE']:
+            return
+
+        self.report_path = app.config['QUERY_PLAN_REPORT']
+        app.extensions['query_plan_recorder'] = self
+        if not self._listening:
+            event.listen(Engine, 'after_cursor_execute', self._record)
+            atexit.register(self.write_report)
+            self._listening = True
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        if not has_request_context() or current_app.extensions.get('query_plan_recorder') is not self:
+            return
+        if conn.dialect.name != 'sqlite' or not _explainable(statement, executemany):
+            return
+
+        endpoint = request.endpoint or request.path
+        key = fingerprint(statement)
+        with self._lock:
+            entry = self.routes.setdefault(endpoint, {}).get(key)
+            if entry is not None:
+                entry['count'] += 1
+                return
+
+        # A second cursor on the same connection sees the same transaction as the statement
+        explain_cursor = cursor.connection.cursor()
+        try:
+            explain_cursor.execute(f'EXPLAIN QUERY PLAN {statement}', parameters)
+            details = [row[-1] for row in explain_cursor.fetchall()]
+        except Exception as e:
+            details = [f'EXPLAIN failed: {e}']
+        finally:
+            explain_cursor.close()
+
+        with self._lock:
+            self.routes[endpoint].setdefault(key, {
+                'statement': key, 'count': 0, 'plan': details, 'flags': plan_flags(details),
+            })['count'] += 1
+
+    def report(self):
+        """Statements per route, flagged statements first"""
+        with self._lock:
+            routes = {
+                endpoint: sorted((dict(entry) for entry in statements.values()),
+                                 key=lambda entry: (not entry['flags'], -entry['count']))
+                for endpoint, statements in sorted(self.routes.items())
+            }
+        return {
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'statements': sum(len(statements) for statements in routes.values()),
+            'flagged': sum(1 for statements in routes.values() for entry in statements if entry['flags']),
+            'routes': routes,
+        }
+
+    def write_report(self, path=None):
+        """Write the report as JSON; returns its path, or None when nothing was recorded"""
+        path = path or self.report_path
+        if not path or not self.routes:
+            return None
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+        return path
+
+    def reset(self):
+        with self._lock:
+            self.routes.clear()
+
+
+def _summary(statement, width=160):
+    """A statement with its column list elided, so the FROM and WHERE clauses fit on a line"""
+    head, sep, rest = statement.partition(' FROM ')
+    if sep and head.upper().startswith('SELECT '):
+        statement = f'SELECT … FROM {rest}'
+    return statement[:width]
+
+
+def format_report(report, flagged_only=False):
+    """Plain-text rendering of a report, one block per route"""
+    lines = [f"{report['statements']} distinct statements, {report['flagged']} flagged ({report['created_at']})"]
+    for endpoint, statements in report['routes'].items():
+        flagged = [entry for entry in statements if entry['flags']]
+        if flagged_only and not flagged:
+            continue
+        lines.append('')
+        lines.append(f"{endpoint}  ({len(statements)} statements, {len(flagged)} flagged)")
+        for entry in (flagged if flagged_only else statements):
+            marker = '⚠️ ' if entry['flags'] else '✅'
+            lines.append(f"  {marker} {entry['count']:>5}x  {_summary(entry['statement'])}")
+            for flag in entry['flags']:
+                lines.append(f"           {flag}")
+            if entry['flags']:
+                lines.extend(f"           | {detail}" for detail in entry['plan'])
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show the query plan report grouped by route')
+    parser.add_argument('command', choices=['show'])
+    parser.add_argument('--report', default=os.environ.get(
+        'QUERY_PLAN_REPORT', os.path.join(basedir, 'instance', 'query_plans.json')
+    ))
+    parser.add_argument('--flagged', action='store_true', help='Only routes with flagged plans')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.report):
+        print(f"❌ No report at {args.report}; run the app with QUERY_PLAN_CAPTURE=True first")
+        return 1
+    with open(args.report) as f:
+        report = json.load(f)
+    print("🔎 SecureSphere Query Plans")
+    print("=" * 60)
+    print(format_report(report, flagged_only=args.flagged))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""
+Per-request SQL Query Profiler for SecureSphere
+Counts the queries each request issues and the time spent in the database by
+hooking SQLAlchemy's before/after_cursor_execute events. Requests slower than
+SLOW_REQUEST_MS or issuing more than SLOW_REQUEST_QUERIES queries are logged
+with their query fingerprints, so N+1 patterns show up as one fingerprint with
+a large count. Optionally a cProfile (or pyinstrument, when installed) dump of
+the slow request is written to PROFILE_DIR.
+
+Configuration (app.config or environment):
+    QUERY_PROFILER_ENABLED    default True
+    SLOW_REQUEST_MS           default 500
+    SLOW_REQUEST_QUERIES      default 50
+    REQUEST_PROFILER          '', 'cprofile' or 'pyinstrument' (default '')
+    PROFILE_DIR               default instance/profiles
+    QUERY_PROFILER_HEADERS    add X-Query-Count / X-DB-Time-Ms headers (default False)
+"""
+
+import os
+import re
+import time
+import cProfile
+from collections import defaultdict
+
+from flask import g, request, current_app, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# pyinstrument gives far more readable output but is optional
+try:
+    from pyinstrument import Profiler as PyinstrumentProfiler
+    HAS_PYINSTRUMENT = True
+except ImportError:
+    HAS_PYINSTRUMENT = False
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*\?\s*,?)+\)', re.IGNORECASE)
+_PLACEHOLDER_RUN = re.compile(r'(?:\?\s*,\s*)+\?')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def fingerprint(statement):
+    """Normalize a SQL statement so queries differing only in literals group together"""
+    sql = _STRING_LITERAL.sub('?', statement)
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    sql = _WHITESPACE.sub(' ', sql).strip()
+    sql = _IN_LIST.sub('IN (...)', sql)
+    sql = _PLACEHOLDER_RUN.sub('...', sql)
+    return sql
+
+
+class RequestQueryStats:
+    """Queries and database time recorded for a single request"""
+
+    def __init__(self):
+        self.count = 0
+        self.db_time = 0.0
+        self.fingerprints = defaultdict(lambda: [0, 0.0])
+
+    def record(self, statement, duration):
+        self.count += 1
+        self.db_time += duration
+        entry = self.fingerprints[fingerprint(statement)]
+        entry[0] += 1
+        entry[1] += duration
+
+    def top(self, limit=10):
+        """Most frequent fingerprints as (sql, count, seconds), busiest first"""
+        ranked = sorted(self.fingerprints.items(), key=lambda item: (item[1][0], item[1][1]), reverse=True)
+        return [(sql, count, seconds) for sql, (count, seconds) in ranked[:limit]]
+
+
+def get_request_stats():
+    """Query stats for the current request, or None outside a profiled request"""
+    if not has_request_context():
+        return None
+    return g.get('_query_stats')
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if get_request_stats() is not None:
+        conn.info.setdefault('_query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = get_request_stats()
+    starts = conn.info.get('_query_start')
+    if stats is None or not starts:
+        return
+    stats.record(statement, time.perf_counter() - starts.pop())
+
+
+_listening = False
+
+
+def _install_listeners():
+    # Listening on the Engine class covers every engine, including ones
+    # Flask-SQLAlchemy creates lazily per app and per bind
+    global _listening
+    if not _listening:
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        _listening = True
+
+
+class QueryProfiler:
+    """Flask extension wiring the query counter and slow request logging into an app"""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('QUERY_PROFILER_ENABLED', os.environ.get('QUERY_PROFILER_ENABLED', 'True').lower() == 'true')
+        app.config.setdefault('SLOW_REQUEST_MS', float(os.environ.get('SLOW_REQUEST_MS', 500)))
+        app.config.setdefault('SLOW_REQUEST_QUERIES', int(os.environ.get('SLOW_REQUEST_QUERIES', 50)))
+        app.config.setdefault('REQUEST_PROFILER', os.environ.get('REQUEST_PROFILER', '').lower())
+        app.config.setdefault('PROFILE_DIR', os.environ.get('PROFILE_DIR', os.path.join(basedir, 'instance', 'profiles')))
+        app.config.setdefault('QUERY_PROFILER_HEADERS', False)
+
+        if not app.config['QUERY_PROFILER_ENABLED']:
+            return
+
+        if app.config['REQUEST_PROFILER'] == 'pyinstrument' and not HAS_PYINSTRUMENT:
+            app.logger.warning("pyinstrument is not installed, falling back to cProfile")
+            app.config['REQUEST_PROFILER'] = 'cprofile'
+
+        _install_listeners()
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.extensions['query_profiler'] = self
+
+    @staticmethod
+    def _start_request():
+        g._query_stats = RequestQueryStats()
+        g._request_started = time.perf_counter()
+        mode = current_app.config['REQUEST_PROFILER']
+        if mode == 'pyinstrument':
+            g._profiler = PyinstrumentProfiler()
+            g._profiler.start()
+        elif mode == 'cprofile':
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another request on this interpreter is already being profiled
+                return
+            g._profiler = profiler
+
+    def _finish_request(self, response):
+        stats = g.pop('_query_stats', None)
+        started = g.pop('_request_started', None)
+        profiler = g.pop('_profiler', None)
+        if stats is None or started is None:
+            return response
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if profiler is not None:
+            if isinstance(profiler, cProfile.Profile):
+                profiler.disable()
+            else:
+                profiler.stop()
+
+        config = current_app.config
+        if config['QUERY_PROFILER_HEADERS']:
+            response.headers['X-Query-Count'] = str(stats.count)
+            response.headers['X-DB-Time-Ms'] = f'{stats.db_time * 1000:.1f}'
+
+        if elapsed_ms >= config['SLOW_REQUEST_MS'] or stats.count > config['SLOW_REQUEST_QUERIES']:
+            dump_path = self._dump_profile(profiler, config['PROFILE_DIR']) if profiler is not None else None
+            self._log_slow_request(current_app.logger, elapsed_ms, stats, dump_path)
+
+        return response
+
+    @staticmethod
+    def _dump_profile(profiler, profile_dir):
+        os.makedirs(profile_dir, exist_ok=True)
+        endpoint = (request.endpoint or 'unknown').replace('.', '_')
+        stem = os.path.join(profile_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{endpoint}-{os.getpid()}")
+        if isinstance(profiler, cProfile.Profile):
+            path = stem + '.prof'
+            profiler.dump_stats(path)
+        else:
+            path = stem + '.html'
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(profiler.output_html())
+        return path
+
+    @staticmethod
+    def _log_slow_request(logger, elapsed_ms, stats, dump_path):
+        lines = [
+            f"Slow request {request.method} {request.path} ({request.endpoint}): "
+            f"{elapsed_ms:.1f} ms, {stats.count} queries, {stats.db_time * 1000:.1f} ms in DB"
+        ]
+        for sql, count, seconds in stats.top():
+            lines.append(f"    {count:>4}x {seconds * 1000:8.1f} ms  {sql[:200]}")
+        if dump_path:
+            lines.append(f"    profile: {dump_path}")
+        logger.warning('\n'.join(lines))
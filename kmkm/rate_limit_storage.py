@@ -0,0 +1,221 @@
+"""
+Shared Rate Limit Storage for SecureSphere
+A SQLite-backed storage for Flask-Limiter so every worker process sees the
+same counters. Importing this module registers the ``sqlite://`` scheme with
+the ``limits`` library, so it can be selected through RATELIMIT_STORAGE_URI:
+
+    sqlite:////abs/path/ratelimit.db     absolute path
+    sqlite:///instance/ratelimit.db      path relative to the app directory
+
+Any other scheme supported by ``limits`` (``redis://``, ``memcached://``,
+``memory://``) keeps working unchanged; this backend is the local stand-in for
+a Redis deployment. Sliding-window-counter updates run inside a single
+``BEGIN IMMEDIATE`` transaction, so concurrent workers can never over-admit.
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from math import floor
+
+from limits.storage import Storage, SlidingWindowCounterSupport
+from limits.storage.base import TimestampedSlidingWindow
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+
+# Expired counters are purged on roughly one write in this many
+PURGE_EVERY = 500
+
+
+def limit_scope(key):
+    """
+    Strip the client identifier from a limiter key so metrics stay low-cardinality.
+
+    Flask-Limiter keys look like ``LIMITER/<client>/<endpoint>/<amount>/<multiples>/<granularity>``
+    (sliding window keys carry an extra ``/<window>`` suffix).
+    """
+    parts = key.split('/')
+    if parts and parts[0] == 'LIMITER' and len(parts) > 2:
+        parts = parts[2:]
+    if len(parts) > 4 and parts[-1].isdigit():
+        parts = parts[:-1]
+    return '/'.join(parts)
+
+
+class SQLiteStorage(Storage, SlidingWindowCounterSupport, TimestampedSlidingWindow):
+    """Rate limit storage shared between processes through a SQLite file"""
+
+    STORAGE_SCHEME = ['sqlite']
+
+    def __init__(self, uri, wrap_exceptions=False, **options):
+        path = uri[len('sqlite:///'):]
+        if not os.path.isabs(path):
+            path = os.path.join(basedir, path)
+        self.path = path
+        self.timeout = float(options.get('timeout', 5))
+        self._local = threading.local()
+        self._writes = 0
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._create_tables()
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    # ---------------- connection handling ----------------
+
+    @property
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('PRAGMA synchronous = NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _create_tables(self):
+        conn = self._conn
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS rate_limits (
+                key TEXT PRIMARY KEY,
+                count INTEGER NOT NULL DEFAULT 0,
+                expires_at REAL NOT NULL
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_rate_limits_expires ON rate_limits(expires_at)')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS rate_limit_metrics (
+                scope TEXT PRIMARY KEY,
+                hits INTEGER NOT NULL DEFAULT 0,
+                blocked INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+
+    def _write(self, work):
+        """Run work(conn, now) in an immediate (write-locked) transaction"""
+        conn = self._conn
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            now = time.time()
+            result = work(conn, now)
+            self._writes += 1
+            if self._writes % PURGE_EVERY == 0:
+                conn.execute('DELETE FROM rate_limits WHERE expires_at <= ?', (now,))
+            conn.execute('COMMIT')
+            return result
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    @staticmethod
+    def _read_count(conn, key, now):
+        row = conn.execute('SELECT count, expires_at FROM rate_limits WHERE key = ?', (key,)).fetchone()
+        if row is None or row[1] <= now:
+            return 0, None
+        return row[0], row[1]
+
+    @staticmethod
+    def _incr(conn, key, expiry, amount, now):
+        conn.execute('DELETE FROM rate_limits WHERE key = ? AND expires_at <= ?', (key, now))
+        conn.execute('''
+            INSERT INTO rate_limits (key, count, expires_at) VALUES (?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET count = count + excluded.count
+        ''', (key, amount, now + expiry))
+        return conn.execute('SELECT count FROM rate_limits WHERE key = ?', (key,)).fetchone()[0]
+
+    @staticmethod
+    def _record(conn, key, allowed):
+        conn.execute('''
+            INSERT INTO rate_limit_metrics (scope, hits, blocked) VALUES (?, ?, ?)
+            ON CONFLICT(scope) DO UPDATE SET hits = hits + excluded.hits, blocked = blocked + excluded.blocked
+        ''', (limit_scope(key), 1 if allowed else 0, 0 if allowed else 1))
+
+    # ---------------- fixed window API ----------------
+
+    def incr(self, key, expiry, amount=1):
+        return self._write(lambda conn, now: self._incr(conn, key, expiry, amount, now))
+
+    def get(self, key):
+        return self._read_count(self._conn, key, time.time())[0]
+
+    def get_expiry(self, key):
+        now = time.time()
+        expires_at = self._read_count(self._conn, key, now)[1]
+        return expires_at if expires_at is not None else now
+
+    def check(self):
+        try:
+            self._conn.execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self):
+        def work(conn, now):
+            count = conn.execute('SELECT count(*) FROM rate_limits').fetchone()[0]
+            conn.execute('DELETE FROM rate_limits')
+            return count
+        return self._write(work)
+
+    def clear(self, key):
+        self._write(lambda conn, now: conn.execute('DELETE FROM rate_limits WHERE key = ?', (key,)))
+
+    # ---------------- sliding window counter API ----------------
+
+    def _sliding_window_info(self, conn, key, expiry, now):
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        previous_count = self._read_count(conn, previous_key, now)[0]
+        current_count = self._read_count(conn, current_key, now)[0]
+        if previous_count == 0:
+            previous_ttl = 0.0
+        else:
+            previous_ttl = (1 - (((now - expiry) / expiry) % 1)) * expiry
+        current_ttl = (1 - ((now / expiry) % 1)) * expiry + expiry
+        return previous_count, previous_ttl, current_count, current_ttl
+
+    def acquire_sliding_window_entry(self, key, limit, expiry, amount=1):
+        if amount > limit:
+            return False
+
+        def work(conn, now):
+            previous_count, previous_ttl, current_count, _ = self._sliding_window_info(conn, key, expiry, now)
+            weighted_count = previous_count * previous_ttl / expiry + current_count
+            allowed = floor(weighted_count) + amount <= limit
+            if allowed:
+                # The current window must outlive the next one to act as its "previous"
+                _, current_key = self.sliding_window_keys(key, expiry, now)
+                self._incr(conn, current_key, 2 * expiry, amount, now)
+            self._record(conn, key, allowed)
+            return allowed
+
+        return self._write(work)
+
+    def get_sliding_window(self, key, expiry):
+        return self._sliding_window_info(self._conn, key, expiry, time.time())
+
+    def clear_sliding_window(self, key, expiry):
+        previous_key, current_key = self.sliding_window_keys(key, expiry, time.time())
+        self.clear(previous_key)
+        self.clear(current_key)
+
+    # ---------------- metrics ----------------
+
+    def get_metrics(self):
+        """Return per-limit hit/blocked counters aggregated across all workers"""
+        rows = self._conn.execute(
+            'SELECT scope, hits, blocked FROM rate_limit_metrics ORDER BY scope'
+        ).fetchall()
+        return [{'limit': scope, 'hits': hits, 'blocked': blocked} for scope, hits, blocked in rows]
+
+
+def get_limiter_metrics(limiter):
+    """Hit metrics for a Flask-Limiter instance, or an empty list if it is disabled or its storage keeps none"""
+    if not limiter.enabled:
+        return []  # RATELIMIT_ENABLED=False: no storage was set up
+    storage = getattr(limiter, 'storage', None)
+    if storage is None or not hasattr(storage, 'get_metrics'):
+        return []
+    return storage.get_metrics()
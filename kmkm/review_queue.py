@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Review Queue for SecureSphere
+Every answer waiting on someone has one row in the review_queue table: waiting
+for a lead's review, for the client to revise it (needs_revision) or to
+re-select an option (rejected). Rows are written at each status transition,
+so leads find work by reading the top of the queue, never by loading every
+response of every client.
+
+Order: lower priority first, then the longest waiting, then id.
+    priority = 2 * criticality level (Critical 0, High 1, Medium or unset 2, Low 3)
+               + 0 when it is the lead's turn (awaiting review, or the client replied
+                 since the lead last acted), 1 while waiting on the client
+A page is read per client from the (client_id, priority, waiting_since, id)
+index, starting after the keyset cursor of the previous page, and merged. Each
+page costs one index seek per client, however long the queue is.
+
+Usage:
+    python3 review_queue.py status
+    python3 review_queue.py rebuild --batch-size 5000    # refill from questionnaire_responses
+"""
+
+import os
+import sys
+import argparse
+from datetime import datetime, timezone
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, basedir)
+
+# review_status -> queue state; approved answers leave the queue
+STATES = {'pending': 'review', 'needs_revision': 'revision', 'rejected': 'reselection'}
+
+CRITICALITY_LEVELS = {'Critical': 0, 'High': 1, 'Medium': 2, 'Low': 3}
+DEFAULT_CRITICALITY_LEVEL = 2
+
+# SQLite's limit on SELECTs in one UNION ALL is 500
+CLIENTS_PER_STATEMENT = 400
+
+
+def priority_for(criticality, state, client_replies):
+    leads_turn = state == 'review' or client_replies > 0
+    return 2 * CRITICALITY_LEVELS.get(criticality, DEFAULT_CRITICALITY_LEVEL) + (0 if leads_turn else 1)
+
+
+def _priority_sql(criticality, state, client_replies):
+    levels = ' '.join(f"WHEN '{name}' THEN {level}" for name, level in CRITICALITY_LEVELS.items())
+    return (f"2 * (CASE {criticality} {levels} ELSE {DEFAULT_CRITICALITY_LEVEL} END)"
+            f" + (CASE WHEN {state} = 'review' OR {client_replies} > 0 THEN 0 ELSE 1 END)")
+
+
+# Queues the waiting answers with ids in (:lower, :upper]. Client replies are the
+# client's unread messages in the answer's open chat, the closest record there is.
+BACKFILL_SQL = f"""
+    INSERT OR IGNORE INTO review_queue
+        (response_id, client_id, product_id, state, priority, client_replies, waiting_since)
+    SELECT r.id, r.user_id, r.product_id, r.state,
+           {_priority_sql('p.business_criticality', 'r.state', 'r.replies')},
+           r.replies, COALESCE(r.updated_at, r.created_at, :now)
+    FROM (
+        SELECT r.*, CASE r.review_status WHEN 'needs_revision' THEN 'revision'
+                                         WHEN 'rejected' THEN 'reselection' ELSE 'review' END AS state, (
+            SELECT count(*) FROM question_chats c JOIN chat_messages m ON m.chat_id = c.id
+            WHERE c.response_id = r.id AND c.is_active = 1
+              AND m.is_read_by_lead = 0 AND m.sender_id = c.client_id
+        ) AS replies
+        FROM questionnaire_responses r
+        WHERE r.id > :lower AND r.id <= :upper
+          AND COALESCE(r.is_approved, 0) = 0
+          AND COALESCE(r.review_status, 'pending') IN ('pending', 'needs_revision', 'rejected')
+    ) r JOIN products p ON p.id = r.product_id
+"""
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def backfill_params():
+    """Bind values for BACKFILL_SQL besides the id range"""
+    return {'now': _now().strftime('%Y-%m-%d %H:%M:%S.%f')}
+
+
+def queue_responses(responses, client_replied=False):
+    """
+    Call after answers change review status (new answers, lead review, re-selection):
+    answers still waiting are queued in their new state from now, approved ones leave
+    the queue. client_replied counts the change itself as a client reply.
+    """
+    from app import db, Product, ReviewQueueEntry
+
+    responses = [resp for resp in responses if resp.id is not None]
+    if not responses:
+        return
+    entries = {entry.response_id: entry for entry in ReviewQueueEntry.query.filter(
+        ReviewQueueEntry.response_id.in_([resp.id for resp in responses]))}
+    criticality = dict(db.session.query(Product.id, Product.business_criticality).filter(
+        Product.id.in_({resp.product_id for resp in responses})))
+
+    now = _now()
+    replies = 1 if client_replied else 0
+    for resp in responses:
+        entry = entries.get(resp.id)
+        state = None if resp.is_approved else STATES.get(resp.review_status or 'pending')
+        if state is None:
+            if entry is not None:
+                db.session.delete(entry)
+            continue
+        if entry is None:
+            entry = ReviewQueueEntry(response_id=resp.id)
+            db.session.add(entry)
+        entry.client_id = resp.user_id
+        entry.product_id = resp.product_id
+        entry.state = state
+        entry.client_replies = replies
+        entry.priority = priority_for(criticality.get(resp.product_id), state, replies)
+        entry.waiting_since = now
+
+
+def record_reply(response_id, from_client):
+    """A chat message on the answer: the client's raise its priority, the lead's reset it"""
+    from app import ReviewQueueEntry
+
+    entry = ReviewQueueEntry.query.filter_by(response_id=response_id).first()
+    if entry is None:
+        return
+    entry.client_replies = entry.client_replies + 1 if from_client else 0
+    entry.priority = priority_for(entry.product.business_criticality, entry.state, entry.client_replies)
+
+
+def drop_responses(response_ids=None, product_id=None):
+    """Remove the entries of deleted answers, by answer ids or for a whole product"""
+    from app import ReviewQueueEntry
+
+    query = ReviewQueueEntry.query
+    if response_ids is not None:
+        if not response_ids:
+            return
+        query = query.filter(ReviewQueueEntry.response_id.in_(response_ids))
+    if product_id is not None:
+        query = query.filter_by(product_id=product_id)
+    query.delete(synchronize_session=False)
+
+
+def encode_cursor(entry):
+    return f'{entry.priority}.{entry.waiting_since:%Y%m%d%H%M%S%f}.{entry.id}'
+
+
+def decode_cursor(cursor):
+    """(priority, waiting_since, id) from encode_cursor(), or None when missing or malformed"""
+    try:
+        priority, waiting_since, entry_id = cursor.split('.')
+        return int(priority), datetime.strptime(waiting_since, '%Y%m%d%H%M%S%f'), int(entry_id)
+    except (AttributeError, ValueError):
+        return None
+
+
+def queue_page(client_ids, after=None, limit=25):
+    """
+    The next `limit` entries for these clients after the cursor `after`, with their
+    answers, clients and products loaded; returns (entries, cursor of the next page or None).
+    """
+    from app import db, ReviewQueueEntry
+
+    order = (ReviewQueueEntry.priority, ReviewQueueEntry.waiting_since, ReviewQueueEntry.id)
+    client_ids = list(client_ids)
+    keys = []
+    for start in range(0, len(client_ids), CLIENTS_PER_STATEMENT):
+        branches = []
+        for client_id in client_ids[start:start + CLIENTS_PER_STATEMENT]:
+            branch = db.select(*order).where(ReviewQueueEntry.client_id == client_id)
+            if after is not None:
+                branch = branch.where(db.tuple_(*order) > db.tuple_(*after))
+            branches.append(db.select(branch.order_by(*order).limit(limit + 1).subquery()))
+        merged = db.union_all(*branches).subquery()
+        keys += db.session.execute(db.select(merged).order_by(*merged.c).limit(limit + 1)).all()
+    keys = sorted(keys)[:limit + 1]
+
+    ids = [key.id for key in keys[:limit]]
+    loaded = {entry.id: entry for entry in ReviewQueueEntry.query.options(
+        db.joinedload(ReviewQueueEntry.response),
+        db.joinedload(ReviewQueueEntry.client),
+        db.joinedload(ReviewQueueEntry.product),
+    ).filter(ReviewQueueEntry.id.in_(ids))} if ids else {}
+    entries = [loaded[entry_id] for entry_id in ids]
+    return entries, (encode_cursor(entries[-1]) if len(keys) > limit else None)
+
+
+def rebuild(db, batch_size=1000, progress=None):
+    """Empty the queue and refill it from questionnaire_responses in batches; returns entries queued"""
+    db.session.execute(db.text('DELETE FROM review_queue'))
+    db.session.commit()
+    max_id = db.session.execute(db.text('SELECT max(id) FROM questionnaire_responses')).scalar() or 0
+    queued, lower = 0, 0
+    while lower < max_id:
+        upper = min(lower + batch_size, max_id)
+        queued += db.session.execute(db.text(BACKFILL_SQL), dict(backfill_params(), lower=lower, upper=upper)).rowcount
+        db.session.commit()
+        lower = upper
+        if progress:
+            progress(f"   id {upper:,} of {max_id:,}, {queued:,} queued")
+    return queued
+
+
+def queue_status(db):
+    """{state: (entries, oldest waiting_since)}"""
+    from app import ReviewQueueEntry
+
+    rows = db.session.query(
+        ReviewQueueEntry.state, db.func.count(), db.func.min(ReviewQueueEntry.waiting_since)
+    ).group_by(ReviewQueueEntry.state)
+    return {state: (count, oldest) for state, count, oldest in rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show or rebuild the lead review queue')
+    parser.add_argument('command', choices=['status', 'rebuild'])
+    parser.add_argument('--database', default=os.path.join(basedir, 'instance', 'securesphere.db'),
+                        help='SQLite file (default: instance/securesphere.db)')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Answers per rebuild transaction')
+    args = parser.parse_args()
+
+    database = os.path.abspath(args.database)
+    if not os.path.exists(database):
+        print(f"❌ Database not found at {database}")
+        return 1
+
+    from app import create_app, db
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{database}'})
+    with app.app_context():
+        db.create_all()
+        if args.command == 'rebuild':
+            print("🔄 Rebuilding review queue...")
+            queued = rebuild(db, args.batch_size, progress=print)
+            print(f"✅ {queued:,} answers queued")
+            return 0
+
+        status = queue_status(db)
+        print("📋 Review Queue")
+        for state in STATES.values():
+            count, oldest = status.get(state, (0, None))
+            print(f"   {state:<12} {count:>8,}  {f'oldest {oldest:%Y-%m-%d %H:%M}' if oldest else ''}")
+        return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
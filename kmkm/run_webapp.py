@@ -5,7 +5,9 @@ SecureSphere Web Application Startup Script
 
 import os
 import sys
-from app import app, db, init_database
+from app import create_app, db, init_database
+
+app = create_app()
 
 def setup_and_run():
     """Setup database and run the webapp"""
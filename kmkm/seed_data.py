@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+Synthetic Data Generator for SecureSphere
+Fills a database with realistic volumes of clients, leads, products and
+questionnaire activity for load and scale testing. Answers are drawn from
+devweb.csv, and every row is derived from a seeded RNG and a fixed base time,
+so the same seed always produces the same dataset. Rows are built with
+explicit ids and bulk-inserted in chunks inside a single transaction.
+
+Usage:
+    python3 seed_data.py --clients 500 --leads 40 --seed 7
+    python3 seed_data.py --database instance/loadtest.db --reset --clients 5000
+"""
+
+import os
+import sys
+import csv
+import time
+import random
+import argparse
+from datetime import datetime, timedelta, timezone
+
+from werkzeug.security import generate_password_hash
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, basedir)
+
+SEED_PASSWORD = 'LoadTest123!'
+BASE_TIME = datetime(2025, 1, 1, tzinfo=timezone.utc)
+CHUNK_SIZE = 5000
+
+CRITICALITIES = ['Low', 'Medium', 'High', 'Critical']
+LANGUAGES = ['Python', 'Java', 'Go', 'JavaScript', 'C#', 'Rust']
+CLOUDS = ['AWS', 'Azure', 'GCP', 'On-Premise']
+CICD = ['GitHub Actions', 'GitLab CI', 'Jenkins', 'Azure DevOps']
+FIRST_NAMES = ['Alex', 'Sam', 'Jordan', 'Taylor', 'Morgan', 'Casey', 'Riley', 'Jamie', 'Avery', 'Quinn']
+LAST_NAMES = ['Patel', 'Garcia', 'Nguyen', 'Smith', 'Kim', 'Okafor', 'Rossi', 'Silva', 'Cohen', 'Berg']
+LEAD_REMARKS = [
+    'Please attach evidence for this control.',
+    'The answer does not match the documentation provided.',
+    'Looks good, approved.',
+    'Can you clarify which teams this applies to?',
+    'Evidence is outdated, please upload the current version.',
+]
+CLIENT_REMARKS = [
+    'Updated the evidence as requested.',
+    'This applies to all production teams.',
+    'We are rolling this out next quarter.',
+    'Attached the latest policy document.',
+]
+
+
+def load_question_bank(csv_path=None):
+    """Questions per section with their sub-dimension and (option, score) pairs, in questionnaire order"""
+    csv_path = csv_path or os.path.join(basedir, 'devweb.csv')
+    sections = {}
+    current_section = None
+    current_subdimension = None
+    current_question = None
+    with open(csv_path, encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            if row['Dimensions'].strip():
+                current_section = row['Dimensions'].strip()
+                sections.setdefault(current_section, [])
+            if row['Sub-Dimensions'].strip():
+                current_subdimension = row['Sub-Dimensions'].strip()
+            if row['Questions'].strip():
+                current_question = {
+                    'question': row['Questions'].strip(),
+                    'subdimension': current_subdimension,
+                    'options': []
+                }
+                sections[current_section].append(current_question)
+            option = row['Options'].strip()
+            if current_question is not None and option:
+                try:
+                    score = int(row.get('Scores', '').strip())
+                except ValueError:
+                    score = 0
+                current_question['options'].append((option, score))
+    return sections
+
+
+class SyntheticDataGenerator:
+    """Builds rows for every table from a seed; ids continue after existing rows"""
+
+    def __init__(self, seed=42, clients=50, leads=5, products_per_client=2,
+                 completion=0.7, review_rate=0.6, chat_rate=0.3):
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self.clients = clients
+        self.leads = max(1, leads)
+        self.products_per_client = products_per_client
+        self.completion = completion
+        self.review_rate = review_rate
+        self.chat_rate = chat_rate
+        self.question_bank = load_question_bank()
+        self.rows = {}
+        self._next_ids = {}
+
+    def _timestamp(self, after=None, max_days=180):
+        start = after or BASE_TIME
+        return start + timedelta(seconds=self.rng.randint(60, max_days * 86400))
+
+    def _new_id(self, table):
+        self._next_ids[table] += 1
+        return self._next_ids[table]
+
+    def _add(self, table, row):
+        self.rows.setdefault(table, []).append(row)
+        return row
+
+    def generate(self, start_ids):
+        """Build all rows; start_ids maps table name to its current max id"""
+        self._next_ids = dict(start_ids)
+        self.rows = {}
+        password_hash = generate_password_hash(SEED_PASSWORD)  # hashing per user would dominate the run
+
+        lead_ids = [self._user('lead', i, password_hash) for i in range(self.leads)]
+        for i in range(self.clients):
+            client_id = self._user('client', i, password_hash)
+            reviewers = self.rng.sample(lead_ids, k=min(len(lead_ids), self.rng.choice([1, 1, 2])))
+            for lead_id in reviewers:
+                # Leads are created with a primary client; the dashboard still reads it
+                lead_row = self.rows['users'][lead_id - lead_ids[0]]
+                if lead_row['assigned_client_id'] is None:
+                    lead_row['assigned_client_id'] = client_id
+                self._add('lead_client_associations', {
+                    'lead_id': lead_id, 'client_id': client_id, 'created_at': self._timestamp()
+                })
+            for k in range(self.products_per_client):
+                self._product(client_id, reviewers[0], i, k)
+        return self.rows
+
+    def _user(self, role, index, password_hash):
+        user_id = self._new_id('users')
+        first, last = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+        created_at = self._timestamp(max_days=30)
+        self._add('users', {
+            'id': user_id,
+            'username': f'seed{self.seed}_{role}_{index}',
+            'email': f'seed{self.seed}_{role}_{index}@example.com',
+            'password_hash': password_hash,
+            'role': role,
+            'organization': 'ACCORIAN' if role == 'lead' else f'Client Org {index}',
+            'assigned_client_id': None,
+            'first_name': first,
+            'last_name': last,
+            'is_active': True,
+            'first_login': False,
+            'created_at': created_at,
+            'last_login': self._timestamp(after=created_at, max_days=60),
+        })
+        return user_id
+
+    def _product(self, client_id, lead_id, client_index, product_index):
+        product_id = self._new_id('products')
+        created_at = self._timestamp(max_days=60)
+        self._add('products', {
+            'id': product_id,
+            'name': f'Client {client_index} Product {product_index}',
+            'application_name': f'app-{client_index}-{product_index}',
+            'description': 'Synthetic product generated for load testing',
+            'product_owner': f'{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}',
+            'business_criticality': self.rng.choice(CRITICALITIES),
+            'programming_language': self.rng.choice(LANGUAGES),
+            'cloud_platform': self.rng.choice(CLOUDS),
+            'cicd_platform': self.rng.choice(CICD),
+            'owner_id': client_id,
+            'created_at': created_at,
+            'updated_at': created_at,
+            'is_active': True,
+        })
+
+        sections = list(self.question_bank.items())
+        # Each product sits at a different stage of the review workflow
+        if self.rng.random() >= self.completion:
+            sections = sections[:self.rng.randint(0, len(sections) - 1)]
+            stage = self.rng.choice(['unreviewed', 'in_review'])
+        else:
+            stage = self.rng.choices(['unreviewed', 'in_review', 'reviewed', 'approved'], weights=[2, 4, 2, 2])[0]
+        review_rate = {'unreviewed': 0.0, 'in_review': self.review_rate}.get(stage, 1.0)
+        status_weights = [1, 0, 0] if stage == 'approved' else [7, 2, 1]
+
+        answered = reviewed = approved = 0
+        answered_at = created_at
+        for section, questions in sections:
+            scores = []
+            for index, question in enumerate(questions):
+                # Skew answers towards the middle of the maturity scale
+                options = question['options']
+                option, score = self.rng.choices(options, weights=[min(i, len(options) - 1 - i) + 1 for i in range(len(options))])[0]
+                answered_at = self._timestamp(after=answered_at, max_days=2)
+                review_status = 'pending'
+                if self.rng.random() < review_rate:
+                    review_status = self.rng.choices(['approved', 'needs_revision', 'rejected'], weights=status_weights)[0]
+                response_id = self._new_id('questionnaire_responses')
+                self._add('questionnaire_responses', {
+                    'id': response_id,
+                    'user_id': client_id,
+                    'product_id': product_id,
+                    'section': section,
+                    'question': question['question'],
+                    'question_index': index,
+                    'answer': option,
+                    'client_comment': self.rng.choice(['', '', 'See attached policy.', 'Partially implemented.']),
+                    'evidence_path': '',
+                    'score': score * 20,
+                    'max_score': 0,
+                    'is_reviewed': review_status != 'pending',
+                    'is_approved': review_status == 'approved',
+                    'needs_client_response': review_status in ('needs_revision', 'rejected'),
+                    'review_status': review_status,
+                    'created_at': answered_at,
+                    'updated_at': answered_at,
+                })
+                answered += 1
+                scores.append(score)
+                if review_status != 'pending':
+                    reviewed += 1
+                    approved += review_status == 'approved'
+                    self._review(response_id, client_id, lead_id, product_id, question['question'], review_status, answered_at)
+
+            average = sum(scores) / len(scores)
+            self._add('score_history', {
+                'id': self._new_id('score_history'),
+                'product_id': product_id,
+                'user_id': client_id,
+                'section_name': section,
+                'total_score': int(average * 20),
+                'max_score': 100,
+                'percentage': average / 5.0 * 100,
+                'questions_answered': len(scores),
+                'questions_total': len(scores),
+                'calculated_at': answered_at,
+            })
+
+        total_questions = sum(len(questions) for questions in self.question_bank.values())
+        if answered == 0:
+            status = 'in_progress'
+        elif reviewed == 0:
+            status = 'questions_done' if answered == total_questions else 'in_progress'
+        elif reviewed < answered:
+            status = 'under_review'
+        else:
+            status = 'completed' if approved == answered else 'review_done'
+        self._add('product_statuses', {
+            'id': self._new_id('product_statuses'),
+            'product_id': product_id,
+            'user_id': client_id,
+            'status': status,
+            'questions_completed': answered,
+            'total_questions': total_questions,
+            'completion_percentage': answered / total_questions * 100,
+            'is_complete': len(sections) == len(self.question_bank),
+            'last_updated': answered_at,
+        })
+
+    def _review(self, response_id, client_id, lead_id, product_id, question, review_status, answered_at):
+        reviewed_at = self._timestamp(after=answered_at, max_days=5)
+        comment_id = self._new_id('lead_comments')
+        self._add('lead_comments', {
+            'id': comment_id,
+            'response_id': response_id,
+            'lead_id': lead_id,
+            'client_id': client_id,
+            'product_id': product_id,
+            'comment': self.rng.choice(LEAD_REMARKS),
+            'status': review_status,
+            'parent_comment_id': None,
+            'is_read': self.rng.random() < 0.5,
+            'created_at': reviewed_at,
+            'updated_at': reviewed_at,
+        })
+        if review_status == 'approved':
+            return
+
+        if self.rng.random() < 0.5:
+            self._add('lead_comments', {
+                'id': self._new_id('lead_comments'),
+                'response_id': response_id,
+                'lead_id': lead_id,
+                'client_id': client_id,
+                'product_id': product_id,
+                'comment': self.rng.choice(CLIENT_REMARKS),
+                'status': 'client_reply',
+                'parent_comment_id': comment_id,
+                'is_read': False,
+                'created_at': reviewed_at + timedelta(hours=1),
+                'updated_at': reviewed_at + timedelta(hours=1),
+            })
+
+        if review_status == 'rejected':
+            self._add('rejected_questions', {
+                'id': self._new_id('rejected_questions'),
+                'response_id': response_id,
+                'product_id': product_id,
+                'user_id': client_id,
+                'lead_id': lead_id,
+                'question_text': question,
+                'reason': self.rng.choice(LEAD_REMARKS),
+                'status': self.rng.choice(['pending', 'pending', 'resolved']),
+                'new_option': None,
+                'created_at': reviewed_at,
+                'resolved_at': None,
+            })
+
+        if self.rng.random() < self.chat_rate:
+            chat_id = self._new_id('question_chats')
+            self._add('question_chats', {
+                'id': chat_id,
+                'response_id': response_id,
+                'client_id': client_id,
+                'lead_id': lead_id,
+                'product_id': product_id,
+                'review_status': review_status,
+                'is_active': True,
+                'created_at': reviewed_at,
+                'updated_at': reviewed_at,
+            })
+            sent_at = reviewed_at
+            for n in range(self.rng.randint(2, 8)):
+                sent_at = sent_at + timedelta(minutes=self.rng.randint(5, 600))
+                from_lead = n % 2 == 0
+                self._add('chat_messages', {
+                    'id': self._new_id('chat_messages'),
+                    'chat_id': chat_id,
+                    'sender_id': lead_id if from_lead else client_id,
+                    'message_type': 'text',
+                    'content': self.rng.choice(LEAD_REMARKS if from_lead else CLIENT_REMARKS),
+                    'is_read_by_client': not from_lead or self.rng.random() < 0.6,
+                    'is_read_by_lead': from_lead or self.rng.random() < 0.6,
+                    'created_at': sent_at,
+                })
+
+
+# Parents before children so foreign keys are satisfied
+INSERT_ORDER = [
+    'users', 'lead_client_associations', 'products', 'questionnaire_responses', 'product_statuses',
+    'score_history', 'lead_comments', 'rejected_questions', 'question_chats', 'chat_messages',
+]
+
+
+def seed_database(app, seed=42, reset=False, **options):
+    """Generate and bulk-insert a dataset into app's database; returns row counts per table"""
+    from app import db, catalog_ids_for, sync_question_catalog
+    from review_queue import rebuild as rebuild_review_queue
+
+    with app.app_context():
+        if reset:
+            db.drop_all()
+        db.create_all()
+        sync_question_catalog()
+
+        metadata = db.metadata
+        start_ids = {}
+        for table in INSERT_ORDER:
+            if table != 'lead_client_associations':
+                column = metadata.tables[table].c.id
+                start_ids[table] = db.session.query(db.func.coalesce(db.func.max(column), 0)).scalar()
+
+        generator = SyntheticDataGenerator(seed=seed, **options)
+        rows = generator.generate(start_ids)
+        question_ids = {}
+        for row in rows.get('questionnaire_responses', []):
+            row['question_id'], row['option_id'] = catalog_ids_for(row['section'], row['question'], row['answer'])
+            question_ids[row['id']] = row['question_id']
+        for row in rows.get('rejected_questions', []):
+            row['question_id'] = question_ids[row['response_id']]
+
+        # Durability does not matter for a throwaway dataset; speed does
+        db.session.execute(db.text('PRAGMA synchronous = OFF'))
+        for table in INSERT_ORDER:
+            table_rows = rows.get(table, [])
+            for start in range(0, len(table_rows), CHUNK_SIZE):
+                db.session.execute(metadata.tables[table].insert(), table_rows[start:start + CHUNK_SIZE])
+        db.session.commit()
+        rebuild_review_queue(db, batch_size=CHUNK_SIZE)
+        return {table: len(rows.get(table, [])) for table in INSERT_ORDER}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic SecureSphere data for load testing')
+    parser.add_argument('--database', default=os.path.join(basedir, 'instance', 'loadtest.db'),
+                        help='SQLite file to fill (default: instance/loadtest.db)')
+    parser.add_argument('--reset', action='store_true', help='Drop and recreate all tables first')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed (same seed, same data)')
+    parser.add_argument('--clients', type=int, default=50)
+    parser.add_argument('--leads', type=int, default=5)
+    parser.add_argument('--products-per-client', type=int, default=2)
+    parser.add_argument('--completion', type=float, default=0.7, help='Share of products with all sections answered')
+    parser.add_argument('--review-rate', type=float, default=0.6, help='Share of answers reviewed on products still in review')
+    parser.add_argument('--chat-rate', type=float, default=0.3, help='Share of disputed answers with a chat thread')
+    args = parser.parse_args()
+
+    from app import create_app
+
+    database = os.path.abspath(args.database)
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{database}'})
+
+    print("🌱 SecureSphere Synthetic Data Generator")
+    print("=" * 50)
+    print(f"Database: {database}")
+    print(f"Seed: {args.seed}")
+
+    started = time.perf_counter()
+    counts = seed_database(
+        app, seed=args.seed, reset=args.reset,
+        clients=args.clients, leads=args.leads, products_per_client=args.products_per_client,
+        completion=args.completion, review_rate=args.review_rate, chat_rate=args.chat_rate,
+    )
+    elapsed = time.perf_counter() - started
+
+    for table, count in counts.items():
+        print(f"   {table:<26} {count:>10,}")
+    total = sum(counts.values())
+    print("=" * 50)
+    print(f"✅ Inserted {total:,} rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} rows/s)")
+    print(f"👤 All generated users share the password: {SEED_PASSWORD}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
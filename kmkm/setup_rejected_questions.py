@@ -9,11 +9,11 @@ import sys
 import subprocess
 from datetime import datetime
 
-def run_script(script_name, description):
+def run_script(script_name, description, *args):
     """Run a Python script and return success status"""
     print(f"\n🔄 {description}...")
     try:
-        result = subprocess.run([sys.executable, script_name], 
+        result = subprocess.run([sys.executable, script_name, *args], 
                               capture_output=True, text=True)
         
         if result.returncode == 0:
@@ -32,7 +32,7 @@ def check_prerequisites():
     required_files = [
         'app.py',
         'backup_database.py',
-        'migrate_rejected_questions.py',
+        'migrations.py',
         'ring_heatmap_implementation.py'
     ]
     
@@ -70,7 +70,7 @@ def main():
     
     # Step 3: Run migration
     print("\nStep 3: Running database migration...")
-    if not run_script('migrate_rejected_questions.py', 'Running database migration'):
+    if not run_script('migrations.py', 'Running database migration', 'up'):
         print("❌ Setup failed at migration step")
         print("Database backup is available in the 'backups' directory")
         return False
@@ -81,9 +81,9 @@ def main():
         # Import and test the new functionality
         sys.path.append(os.path.dirname(os.path.abspath(__file__)))
         from ring_heatmap_implementation import RejectedQuestionsManager, RingHeatmapGenerator
-        from app import app, db, RejectedQuestion
+        from app import create_app, db, RejectedQuestion
         
-        with app.app_context():
+        with create_app().app_context():
             # Test database connection
             count = RejectedQuestion.query.count()
             print(f"✅ Database connection successful")
@@ -0,0 +1,238 @@
+"""
+Assessment Snapshot Cache for SecureSphere
+LRU + TTL cache for computed assessment snapshots and score payloads. Entries
+are keyed by (kind, product_id, user_id, data_version); every write path bumps
+the product's data version after committing, so older entries are never read
+again and simply age out. The backend is selected through SNAPSHOT_CACHE_URI:
+
+    sqlite:///instance/snapshot_cache.db     shared by every worker (default,
+                                             path relative to the app directory)
+    sqlite:////abs/path/snapshot_cache.db    absolute path
+    memory://                                per-process LRU, single worker only
+
+Other stores (e.g. Redis) plug in through register_backend(). Values are kept
+as JSON, so hits and misses return the same plain data with every backend.
+"""
+
+import os
+import time
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from flask import current_app
+
+from metrics import metrics
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+
+# Shared backends record an entry's last use at most once per this fraction of
+# the TTL, so cache hits are plain reads and never take the write lock
+USED_AT_RESOLUTION = 0.1
+
+
+class MemoryBackend:
+    """In-process LRU; data versions are only visible to the current process"""
+
+    def __init__(self, uri, max_entries, ttl=None):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, now):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires_at):
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def version(self, product_id):
+        return self._versions.get(product_id, 0)
+
+    def bump(self, product_id):
+        with self._lock:
+            self._versions[product_id] = self._versions.get(product_id, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteBackend:
+    """LRU shared between worker processes through a SQLite file"""
+
+    def __init__(self, uri, max_entries, ttl=300):
+        path = uri[len('sqlite:///'):]
+        if not os.path.isabs(path):
+            path = os.path.join(basedir, path)
+        self.path = path
+        self.max_entries = max_entries
+        self.touch_interval = ttl * USED_AT_RESOLUTION
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._create_tables()
+
+    @property
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('PRAGMA synchronous = NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _create_tables(self):
+        conn = self._conn
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS snapshot_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL,
+                used_at REAL NOT NULL
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_snapshot_cache_used ON snapshot_cache(used_at)')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS data_versions (
+                product_id INTEGER PRIMARY KEY,
+                version INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+
+    def get(self, key, now):
+        conn = self._conn
+        row = conn.execute('SELECT value, expires_at, used_at FROM snapshot_cache WHERE key = ?', (key,)).fetchone()
+        if row is None or row[1] <= now:
+            return None
+        # Eviction order only needs to be approximately LRU
+        if now - row[2] >= self.touch_interval:
+            conn.execute('UPDATE snapshot_cache SET used_at = ? WHERE key = ? AND used_at < ?',
+                         (now, key, now - self.touch_interval))
+        return row[0]
+
+    def set(self, key, value, expires_at):
+        conn = self._conn
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute('INSERT OR REPLACE INTO snapshot_cache (key, value, expires_at, used_at) VALUES (?, ?, ?, ?)',
+                         (key, value, expires_at, now))
+            conn.execute('DELETE FROM snapshot_cache WHERE expires_at <= ?', (now,))
+            conn.execute('''
+                DELETE FROM snapshot_cache WHERE key IN (
+                    SELECT key FROM snapshot_cache ORDER BY used_at DESC LIMIT -1 OFFSET ?
+                )
+            ''', (self.max_entries,))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def version(self, product_id):
+        row = self._conn.execute('SELECT version FROM data_versions WHERE product_id = ?', (product_id,)).fetchone()
+        return row[0] if row else 0
+
+    def bump(self, product_id):
+        self._conn.execute('''
+            INSERT INTO data_versions (product_id, version) VALUES (?, 1)
+            ON CONFLICT(product_id) DO UPDATE SET version = version + 1
+        ''', (product_id,))
+
+    def clear(self):
+        self._conn.execute('DELETE FROM snapshot_cache')
+
+
+BACKENDS = {
+    'memory': MemoryBackend,
+    'sqlite': SQLiteBackend,
+}
+
+
+def register_backend(scheme, backend_class):
+    """
+    Make another store selectable through SNAPSHOT_CACHE_URI. backend_class is
+    built as backend_class(uri, max_entries, ttl) and provides get(key, now),
+    set(key, value, expires_at), version(product_id), bump(product_id) and clear().
+    """
+    BACKENDS[scheme] = backend_class
+
+
+class SnapshotCache:
+    """Flask extension serving computed score data from the configured backend"""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('SNAPSHOT_CACHE_ENABLED', os.environ.get('SNAPSHOT_CACHE_ENABLED', 'True').lower() == 'true')
+        app.config.setdefault('SNAPSHOT_CACHE_URI', os.environ.get(
+            'SNAPSHOT_CACHE_URI', f'sqlite:///{os.path.join(basedir, "instance", "snapshot_cache.db")}'
+        ))
+        app.config.setdefault('SNAPSHOT_CACHE_TTL', float(os.environ.get('SNAPSHOT_CACHE_TTL', 300)))
+        app.config.setdefault('SNAPSHOT_CACHE_SIZE', int(os.environ.get('SNAPSHOT_CACHE_SIZE', 512)))
+
+        backend = None
+        if app.config['SNAPSHOT_CACHE_ENABLED']:
+            uri = app.config['SNAPSHOT_CACHE_URI']
+            scheme = uri.split('://', 1)[0]
+            if scheme not in BACKENDS:
+                raise ValueError(f"Unsupported SNAPSHOT_CACHE_URI scheme: {scheme}")
+            backend = BACKENDS[scheme](uri, app.config['SNAPSHOT_CACHE_SIZE'], app.config['SNAPSHOT_CACHE_TTL'])
+        app.extensions['snapshot_cache'] = backend
+
+    @staticmethod
+    def _backend():
+        return current_app.extensions.get('snapshot_cache')
+
+    def get_or_build(self, kind, product_id, user_id, build):
+        """Return the cached value for the product's current data version, calling build() on a miss"""
+        backend = self._backend()
+        if backend is None:
+            return build()
+
+        now = time.time()
+        key = f'{kind}:{product_id}:{user_id}:{backend.version(product_id)}'
+        cached = backend.get(key, now)
+        if cached is not None:
+            metrics.inc('securesphere_snapshot_cache_total', kind=kind, result='hit')
+            return json.loads(cached)
+
+        metrics.inc('securesphere_snapshot_cache_total', kind=kind, result='miss')
+        payload = json.dumps(build())
+        backend.set(key, payload, now + current_app.config['SNAPSHOT_CACHE_TTL'])
+        return json.loads(payload)
+
+    def data_version(self, product_id):
+        """The product's current data version, or None while caching is disabled"""
+        backend = self._backend()
+        return backend.version(product_id) if backend is not None else None
+
+    def invalidate(self, product_id):
+        """Call after committing a change to a product's answers or reviews"""
+        backend = self._backend()
+        if backend is not None:
+            backend.bump(product_id)
+
+    def clear(self):
+        backend = self._backend()
+        if backend is not None:
+            backend.clear()
+
+
+snapshot_cache = SnapshotCache()
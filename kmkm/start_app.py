@@ -97,7 +97,7 @@ def main():
     # Start the application
     try:
         import app
-        app.app.run(debug=True, port=5001, host='0.0.0.0')
+        app.create_app().run(debug=True, port=5001, host='0.0.0.0')
     except KeyboardInterrupt:
         print("\n🛑 Application stopped by user")
     except Exception as e:
@@ -152,7 +152,8 @@ def start_app():
     
     try:
         # Import and run the app
-        from app import app
+        from app import create_app
+        app = create_app()
         
         print("✓ Flask app imported successfully")
         print("\n🚀 Starting server...")
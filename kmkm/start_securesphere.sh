@@ -88,14 +88,21 @@ if [ -f "instance/securesphere.db" ]; then
     if [ "$1" == "--reset-db" ]; then
         print_warning "Resetting database as requested..."
         $PYTHON_CMD init_database.py --reset
+        # Record the migration versions the recreated schema already has
+        $PYTHON_CMD migrations.py up
         print_success "Database reset completed"
     else
         print_status "Use --reset-db flag to reset database if needed"
+        # Apply pending schema migrations in batches, then create any new model
+        # indexes, before init_database.py queries columns older databases lack
+        print_status "Applying database migrations..."
+        $PYTHON_CMD migrations.py up
         $PYTHON_CMD init_database.py
     fi
 else
     print_status "Initializing new database..."
     $PYTHON_CMD init_database.py
+    $PYTHON_CMD migrations.py up
     print_success "Database initialized"
 fi
 
@@ -116,6 +123,14 @@ fi
 
 print_success "Security checks completed"
 
+# Compile templates once so workers start from the bytecode cache
+print_status "Compiling templates..."
+if $PYTHON_CMD template_cache.py warm > /dev/null; then
+    print_success "Templates compiled"
+else
+    print_warning "Some templates failed to compile - run: $PYTHON_CMD template_cache.py warm"
+fi
+
 # Start the application
 print_status "Starting SecureSphere Application..."
 
@@ -123,7 +138,7 @@ if [ "$1" == "--production" ]; then
     print_status "Starting in production mode..."
     if command -v gunicorn &> /dev/null; then
         print_success "Using Gunicorn WSGI server"
-        gunicorn -w 4 -b 0.0.0.0:5001 --access-logfile "$LOG_FILE" --error-logfile "$LOG_FILE" app:app
+        gunicorn -w 4 -b 0.0.0.0:5001 --access-logfile "$LOG_FILE" --error-logfile "$LOG_FILE" 'app:create_app()'
     else
         print_warning "Gunicorn not available, using development server"
         $PYTHON_CMD app.py 2>&1 | tee "$LOG_FILE"
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Template Caching for SecureSphere
+Two layers that keep template work off the request path:
+
+  * a filesystem bytecode cache, so each worker loads compiled templates from
+    TEMPLATE_BYTECODE_CACHE_DIR instead of recompiling them from source
+    (``python3 template_cache.py warm`` fills it ahead of a deploy)
+  * a ``{% cache %}`` tag for fragments that only change with the question
+    catalog or a product's data version:
+
+        {% cache 'question_options', product.id, section_idx, answer %}
+            ...
+        {% endcache %}
+
+Fragment keys always include the catalog version (a hash of devweb.csv); every
+other input the fragment renders from must be passed as a key part. Pass
+data_version(product_id) to tie a fragment to a product's answers and reviews.
+A key part of None renders the fragment uncached. Rendered fragments are kept
+in a per-process LRU (TEMPLATE_FRAGMENT_CACHE_SIZE entries).
+
+Usage:
+    python3 template_cache.py warm     # compile every template into the cache
+    python3 template_cache.py clear    # drop compiled templates and fragments
+"""
+
+import os
+import sys
+import argparse
+import threading
+from collections import OrderedDict
+
+from flask import current_app
+from jinja2 import FileSystemBytecodeCache, TemplateSyntaxError, nodes
+from jinja2.ext import Extension
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from metrics import metrics
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+
+
+class FragmentStore:
+    """Thread-safe LRU of rendered fragments"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class FragmentCacheExtension(Extension):
+    """Jinja extension providing {% cache name, key... %}...{% endcache %}"""
+
+    tags = {'cache'}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=None, fragment_cache_version=lambda: None)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        parts = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            parts.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        return nodes.CallBlock(
+            self.call_method('_render_fragment', [nodes.List(parts)]), [], [], body
+        ).set_lineno(lineno)
+
+    def _render_fragment(self, parts, caller):
+        store = self.environment.fragment_cache
+        if store is None or any(part is None for part in parts):
+            return caller()
+
+        name = str(parts[0])
+        key = repr((self.environment.fragment_cache_version(), *parts))
+        fragment = store.get(key)
+        if fragment is not None:
+            metrics.inc('securesphere_fragment_cache_total', fragment=name, result='hit')
+            return fragment
+
+        fragment = caller()
+        store.set(key, fragment)
+        metrics.inc('securesphere_fragment_cache_total', fragment=name, result='miss')
+        return fragment
+
+
+class TemplateCache:
+    """Flask extension wiring the bytecode and fragment caches into app.jinja_env"""
+
+    def __init__(self, app=None, catalog_version=None):
+        if app is not None:
+            self.init_app(app, catalog_version)
+
+    def init_app(self, app, catalog_version=None):
+        app.config.setdefault('TEMPLATE_BYTECODE_CACHE_DIR', os.environ.get(
+            'TEMPLATE_BYTECODE_CACHE_DIR', os.path.join(basedir, 'instance', 'jinja_cache')
+        ))
+        app.config.setdefault('TEMPLATE_FRAGMENT_CACHE', os.environ.get('TEMPLATE_FRAGMENT_CACHE', 'True').lower() == 'true')
+        app.config.setdefault('TEMPLATE_FRAGMENT_CACHE_SIZE', int(os.environ.get('TEMPLATE_FRAGMENT_CACHE_SIZE', 2048)))
+
+        env = app.jinja_env
+        directory = app.config['TEMPLATE_BYTECODE_CACHE_DIR']
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            env.bytecode_cache = FileSystemBytecodeCache(directory, pattern='securesphere-%s.cache')
+
+        env.add_extension(FragmentCacheExtension)
+        if app.config['TEMPLATE_FRAGMENT_CACHE']:
+            env.fragment_cache = FragmentStore(app.config['TEMPLATE_FRAGMENT_CACHE_SIZE'])
+        if catalog_version is not None:
+            env.fragment_cache_version = catalog_version
+        app.extensions['template_cache'] = self
+
+    @staticmethod
+    def warm(app):
+        """Compile every template so workers start from the bytecode cache; returns (compiled, failed)"""
+        compiled, failed = [], []
+        for name in app.jinja_env.list_templates(extensions=('html',)):
+            try:
+                app.jinja_env.get_template(name)
+                compiled.append(name)
+            except TemplateSyntaxError as e:
+                failed.append((name, e))
+        return compiled, failed
+
+    @staticmethod
+    def clear(app=None):
+        env = (app or current_app).jinja_env
+        if env.bytecode_cache is not None:
+            env.bytecode_cache.clear()
+        if env.fragment_cache is not None:
+            env.fragment_cache.clear()
+        env.cache.clear()
+
+
+template_cache = TemplateCache()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Manage the compiled template cache')
+    parser.add_argument('command', choices=['warm', 'clear'])
+    args = parser.parse_args()
+
+    from app import create_app
+
+    app = create_app()
+    if args.command == 'clear':
+        TemplateCache.clear(app)
+        print(f"🧹 Cleared {app.config['TEMPLATE_BYTECODE_CACHE_DIR']}")
+        return 0
+
+    compiled, failed = TemplateCache.warm(app)
+    print(f"✅ Compiled {len(compiled)} templates into {app.config['TEMPLATE_BYTECODE_CACHE_DIR']}")
+    for name, error in failed:
+        print(f"   ⚠️  {name}: {error}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
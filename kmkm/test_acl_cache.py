@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Test script for the request-scoped current user and the lead ACL cache.
+Checks that the logged-in user is loaded once per request, that repeated
+access checks for a lead reuse its cached client ids, and that assigning or
+unassigning a client is seen at once, also by workers holding an older cache.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import session
+from sqlalchemy import event
+
+from app import db, get_current_user, lead_client_association, User
+from testing import login_as, make_app
+
+
+def _app(tmp, **config):
+    return make_app(tmp, 'acl.db', PASSWORD_HASH_WORKERS=0, **config)
+
+
+def _seed():
+    superuser = User(username='acl_admin', email='acl_admin@example.com', role='superuser',
+                     password_hash='x', first_login=False)
+    clients = [User(username=f'acl_client_{i}', email=f'acl_client_{i}@example.com', role='client',
+                    password_hash='x', first_login=False) for i in range(3)]
+    db.session.add_all([superuser] + clients)
+    db.session.flush()
+    lead = User(username='acl_lead', email='acl_lead@example.com', role='lead', password_hash='x',
+                first_login=False, assigned_client_id=clients[0].id)
+    db.session.add(lead)
+    db.session.flush()
+    lead.assign_client(clients[1].id)
+    db.session.commit()
+    return superuser.id, lead.id, [client.id for client in clients]
+
+
+class _Statements:
+    """Counts the SELECT statements run on the engine while active"""
+
+    def __enter__(self):
+        self.selects = []
+        event.listen(db.engine, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(db.engine, 'before_cursor_execute', self._record)
+
+    def _record(self, conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith('SELECT'):
+            self.selects.append(statement)
+
+
+def test_current_user_loaded_once():
+    """get_current_user() queries the users table once per request"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = _app(tmp)
+        with app.app_context():
+            db.create_all()
+            _, lead_id, _ = _seed()
+            db.session.remove()
+        with app.test_request_context('/dashboard'):
+            session['user_id'] = lead_id
+            with _Statements() as statements:
+                assert get_current_user().id == lead_id
+                assert get_current_user() is get_current_user()
+            assert len(statements.selects) == 1, statements.selects
+        with app.test_request_context('/dashboard'):
+            assert get_current_user() is None
+    print("   ✅ Current user loaded once per request")
+
+
+def test_lead_checks_reuse_cached_ids():
+    """A lead's access checks after the first one run no query"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = _app(tmp)
+        with app.app_context():
+            db.create_all()
+            _, lead_id, client_ids = _seed()
+            db.session.remove()
+            lead = db.session.get(User, lead_id)
+            assert lead.accessible_client_ids() == tuple(client_ids[:2])
+            with _Statements() as statements:
+                assert lead.can_access_client_data(client_ids[0])
+                assert lead.can_access_client_data(client_ids[1])
+                assert not lead.can_access_client_data(client_ids[2])
+            assert statements.selects == [], statements.selects
+            assert [client.id for client in lead.get_accessible_clients()] == client_ids[:2]
+    print("   ✅ Lead access checks answered from the cache")
+
+
+def test_assignment_changes_invalidate():
+    """Assign/unassign through the admin routes, and in another worker, are seen on the next check"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = _app(tmp)
+        with app.app_context():
+            db.create_all()
+            superuser_id, lead_id, client_ids = _seed()
+            db.session.remove()
+            assert not db.session.get(User, lead_id).can_access_client_data(client_ids[2])
+            db.session.remove()
+
+        admin = login_as(app, superuser_id, 'superuser')
+        admin.post(f'/admin/assign_client/{lead_id}/{client_ids[2]}')
+        with app.app_context():
+            lead = db.session.get(User, lead_id)
+            assert lead.acl_version == 2
+            assert lead.can_access_client_data(client_ids[2])
+            db.session.remove()
+
+        admin.post(f'/admin/unassign_client/{lead_id}/{client_ids[1]}')
+        with app.app_context():
+            lead = db.session.get(User, lead_id)
+            assert lead.accessible_client_ids() == (client_ids[0], client_ids[2])
+
+            # Another worker revokes a client: its commit bumps acl_version, our cache entry is stale
+            db.session.execute(lead_client_association.delete().where(
+                lead_client_association.c.lead_id == lead_id))
+            db.session.execute(db.text('UPDATE users SET acl_version = acl_version + 1 WHERE id = :id'),
+                               {'id': lead_id})
+            db.session.commit()
+            db.session.remove()
+            lead = db.session.get(User, lead_id)
+            assert lead.accessible_client_ids() == (client_ids[0],)
+            assert not lead.can_access_client_data(client_ids[2])
+    print("   ✅ Assignment changes seen by the next check, in any worker")
+
+
+def test_zero_ttl_reads_every_time():
+    """ACL_CACHE_TTL=0 reads the assignments on every check"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = _app(tmp, ACL_CACHE_TTL=0)
+        with app.app_context():
+            db.create_all()
+            _, lead_id, client_ids = _seed()
+            lead = db.session.get(User, lead_id)
+            with _Statements() as statements:
+                lead.can_access_client_data(client_ids[0])
+                lead.can_access_client_data(client_ids[0])
+            assert len(statements.selects) == 2, statements.selects
+    print("   ✅ Zero TTL disables the cache")
+
+
+def main():
+    """Run all tests"""
+    print("ACL Cache Test")
+    print("=" * 40)
+
+    tests = [test_current_user_loaded_once, test_lead_checks_reuse_cached_ids,
+             test_assignment_changes_invalidate, test_zero_ttl_reads_every_time]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"❌ Test {test.__name__} failed: {e}")
+
+    print("=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test script for the single-pass assessment snapshot.
+Checks the results pages load a product's answers once, that the snapshot
+views agree with the standalone scoring functions, and that building one does
+not read devweb.csv again.
+"""
+
+import builtins
+import os
+import sys
+import tempfile
+from unittest import mock
+
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import app as app_module
+from app import db, AssessmentSnapshot, Product, User
+from seed_data import seed_database
+from testing import login_as, make_app
+
+
+def _app(tmp):
+    app = make_app(tmp, 'snapshot.db')
+    seed_database(app, seed=5, reset=True, clients=3, leads=1, products_per_client=1, completion=1.0)
+    with app.app_context():
+        admin = User(username='snapshot_admin', email='snapshot_admin@example.com', role='superuser')
+        admin.set_password('SnapshotAdmin123!')
+        db.session.add(admin)
+        db.session.commit()
+    return app
+
+
+def test_views_match_scoring_functions():
+    """Snapshot views equal what the per-view functions return"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = _app(tmp)
+        with app.app_context():
+            product = Product.query.order_by(Product.id).first()
+            args = (product.id, product.owner_id)
+            snapshot = AssessmentSnapshot.load(*args)
+
+            assert snapshot.responses
+            assert (snapshot.overall_score, snapshot.section_data) == app_module.calculate_overall_maturity_score(*args)
+            assert snapshot.subdimension_scores == app_module.calculate_subdimension_scores(*args)
+            assert snapshot.heatmap() == app_module.generate_heatmap_data(*args)
+            assert snapshot.rings() == app_module.generate_ringwise_heatmap_data(*args)
+            assert AssessmentSnapshot([]).rings() == {}
+            print(f"   ✅ {len(snapshot.responses)} answers give identical views")
+
+
+def test_snapshot_reuses_cached_catalog():
+    """Once the catalog is cached, sub-dimension scores do not reopen devweb.csv"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = _app(tmp)
+        with app.app_context():
+            product = Product.query.order_by(Product.id).first()
+            assert AssessmentSnapshot.load(product.id, product.owner_id).subdimension_scores
+
+            real_open = builtins.open
+            with mock.patch('builtins.open', side_effect=real_open) as opened:
+                scores = AssessmentSnapshot.load(product.id, product.owner_id).subdimension_scores
+            reads = [call for call in opened.call_args_list if str(call.args[0]).endswith('devweb.csv')]
+            assert scores and not reads, reads
+            print(f"   ✅ {len(scores)} sub-dimensions scored without reading devweb.csv")
+
+
+def test_results_pages_load_answers_once():
+    """Client and admin results pages query questionnaire_responses a single time"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = _app(tmp)
+        with app.app_context():
+            product = Product.query.order_by(Product.id).first()
+            admin = User.query.filter_by(username='snapshot_admin').first()
+            pages = [
+                ('client', product.owner_id, f'/product/{product.id}/results'),
+                ('superuser', admin.id, f'/admin/product/{product.id}/results'),
+            ]
+            engine = db.engine
+
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, 'before_cursor_execute', record)
+        try:
+            for role, user_id, path in pages:
+                client = login_as(app, user_id, role)
+                del statements[:]
+                response = client.get(path)
+                assert response.status_code == 200
+                loads = [s for s in statements if 'FROM questionnaire_responses' in s]
+                assert len(loads) == 1, f"{path} loaded responses {len(loads)} times"
+                print(f"   ✅ {path}: {len(statements)} queries, responses loaded once")
+        finally:
+            event.remove(engine, 'before_cursor_execute', record)
+
+
+def main():
+    """Run all tests"""
+    print("Assessment Snapshot Test")
+    print("=" * 40)
+
+    tests = [test_views_match_scoring_functions, test_snapshot_reuses_cached_catalog,
+             test_results_pages_load_answers_once]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"❌ Test {test.__name__} failed: {e}")
+
+    print("=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
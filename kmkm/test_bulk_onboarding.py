@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test script for bulk client onboarding.
+Uploads a CSV mixing new, registered, already invited, duplicate and invalid
+rows and checks only the new clients get a token and an outbox email, with
+index lookups for the existing emails.
+"""
+
+import io
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import db, EmailOutbox, InvitationToken, User
+from query_plans import PlanCapture
+from testing import login_as, make_app
+
+NEW_CLIENTS = 1000
+
+
+def test_bulk_upload_dedupes_and_queues():
+    """Only new emails are invited, with a constant number of queries"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(tmp, 'onboarding.db', MAIL_OUTBOX_DISPATCHER=False)
+        with app.app_context():
+            db.create_all()
+            admin = User(username='bulk_admin', email='bulk_admin@example.com', role='superuser')
+            admin.set_password('BulkAdmin123!')
+            registered = User(username='registered', email='Registered@Example.com', role='client')
+            registered.set_password('Registered123!')
+            db.session.add_all([admin, registered])
+            db.session.flush()
+            db.session.add(InvitationToken(token='pending-token', email='pending@example.com', role='client',
+                                           invited_by=admin.id,
+                                           expires_at=datetime.now(timezone.utc) + timedelta(days=3)))
+            db.session.add(InvitationToken(token='expired-token', email='expired@example.com', role='client',
+                                           invited_by=admin.id,
+                                           expires_at=datetime.now(timezone.utc) - timedelta(days=1)))
+            db.session.commit()
+            admin_id = admin.id
+            engine = db.engine
+
+        lines = ['Email,Organization,First_Name,Last_Name']
+        lines += [f'client{i}@example.com,Org {i % 7},First{i},Last{i}' for i in range(NEW_CLIENTS)]
+        lines += [
+            'registered@example.com,Org,,',
+            'pending@example.com,Org,,',
+            'expired@example.com,Org,,',
+            'CLIENT1@example.com,Dup,,',
+            'not-an-email,Org,,',
+        ]
+        upload = io.BytesIO('\n'.join(lines).encode('utf-8'))
+
+        client = login_as(app, admin_id, 'superuser')
+
+        statements = []
+        record = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(engine, 'before_cursor_execute', record)
+        try:
+            with PlanCapture(engine) as plans:
+                response = client.post('/admin/bulk_invite_clients',
+                                       data={'csv_file': (upload, 'clients.csv')},
+                                       content_type='multipart/form-data')
+        finally:
+            event.remove(engine, 'before_cursor_execute', record)
+        assert response.status_code == 302
+
+        # Case-insensitive email lookups seek the lower(email) indexes, not scan every row
+        for endpoint, statement, details in plans.explain():
+            if 'lower(' in statement:
+                assert not any(d.startswith('SCAN') for d in details), (statement, details)
+                assert any('_email_lower' in d for d in details), (statement, details)
+
+        with app.app_context():
+            invited = {t.email for t in InvitationToken.query.filter(InvitationToken.token.notin_(['pending-token', 'expired-token']))}
+            assert len(invited) == NEW_CLIENTS + 1  # the expired invitation is renewed
+            assert 'expired@example.com' in invited
+            assert not invited & {'registered@example.com', 'pending@example.com', 'not-an-email'}
+            assert EmailOutbox.query.filter_by(status='pending').count() == NEW_CLIENTS + 1
+            assert InvitationToken.query.filter_by(email='client3@example.com').one().organization == 'Org 3'
+
+        # Lookups and inserts are batched, so the query count does not grow per row
+        assert len(statements) < 30, f"{len(statements)} queries for {NEW_CLIENTS} rows"
+        print(f"   ✅ {NEW_CLIENTS + 1} invited with {len(statements)} queries; registered, pending, duplicate and invalid rows skipped")
+
+
+def main():
+    """Run all tests"""
+    print("Bulk Onboarding Test")
+    print("=" * 40)
+
+    tests = [test_bulk_upload_dedupes_and_queues]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"❌ Test {test.__name__} failed: {e}")
+
+    print("=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Test script for bulk review actions.
+Checks that one bulk POST leaves answers, chats and messages exactly as the
+same reviews one at a time would, that product status and scores are
+recomputed once per product, and that answers of unassigned clients are refused.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import app as app_module
+from app import (db, ChatMessage, QuestionChat, QuestionnaireResponse,
+                 ReviewQueueEntry, User)
+from review_queue import rebuild
+from seed_data import seed_database
+from testing import login_as, make_app
+
+
+def _setup(app):
+    """Seed two clients and one lead assigned to the first only; returns (lead id, client ids)"""
+    seed_database(app, seed=33, reset=True, clients=2, leads=1, products_per_client=2,
+                  completion=1.0, review_rate=0.3, chat_rate=0.3)
+    with app.app_context():
+        lead = User.query.filter_by(role='lead').first()
+        clients = User.query.filter_by(role='client').order_by(User.id).all()
+        lead.assign_client(clients[0].id)
+        lead.unassign_client(clients[1].id)
+        db.session.commit()
+        rebuild(db)
+        return lead.id, [client.id for client in clients]
+
+
+def _waiting_ids(client_id, limit):
+    return [r.id for r in QuestionnaireResponse.query.filter_by(user_id=client_id, is_approved=False)
+            .order_by(QuestionnaireResponse.id).limit(limit)]
+
+
+def _review_state():
+    """Everything a review action writes, without ids and timestamps"""
+    responses = sorted((r.id, r.review_status, r.is_reviewed, r.is_approved, r.needs_client_response)
+                       for r in QuestionnaireResponse.query)
+    chats = sorted((c.response_id, c.review_status, c.is_active, c.lead_id)
+                   for c in QuestionChat.query)
+    messages = sorted((m.chat.response_id, m.message_type, m.content) for m in ChatMessage.query)
+    queue = sorted((e.response_id, e.state, e.client_replies) for e in ReviewQueueEntry.query)
+    return responses, chats, messages, queue
+
+
+class _CountRecomputes:
+    """Counts calculate_and_store_scores calls made by the routes"""
+
+    def __enter__(self):
+        self.calls = []
+        self.original = app_module.calculate_and_store_scores
+
+        def counted(product_id, user_id):
+            self.calls.append((product_id, user_id))
+            return self.original(product_id, user_id)
+
+        app_module.calculate_and_store_scores = counted
+        return self
+
+    def __exit__(self, *exc):
+        app_module.calculate_and_store_scores = self.original
+
+
+def test_bulk_matches_single_reviews():
+    """Each action in bulk leaves the same answers, chats, messages and queue as one at a time"""
+    for action in ('needs_revision', 'reject', 'approve'):
+        with tempfile.TemporaryDirectory() as tmp:
+            states = []
+            for name in ('single.db', 'bulk.db'):
+                app = make_app(tmp, name)
+                lead_id, client_ids = _setup(app)
+                with app.app_context():
+                    ids = _waiting_ids(client_ids[0], 40)
+                lead = login_as(app, lead_id, 'lead')
+                with _CountRecomputes() as recomputes:
+                    if name == 'single.db':
+                        for response_id in ids:
+                            lead.post(f'/review/{response_id}', data={'action': action, 'comment': 'Check evidence'})
+                    else:
+                        response = lead.post('/review/bulk', data={
+                            'action': action, 'comment': 'Check evidence', 'response_ids': ids})
+                        assert response.status_code == 302
+                with app.app_context():
+                    states.append(_review_state())
+                    products = {r.product_id for r in QuestionnaireResponse.query.filter(
+                        QuestionnaireResponse.id.in_(ids))}
+                    if name == 'bulk.db':
+                        assert sorted(recomputes.calls) == sorted((p, client_ids[0]) for p in products), recomputes.calls
+                    else:
+                        assert len(recomputes.calls) == len(ids)
+            assert states[0] == states[1], action
+    print(f"   ✅ Bulk approve, revision and reject match {len(ids)} single reviews with one recompute per product")
+
+
+def test_bulk_refuses_unassigned_clients():
+    """Nothing changes when any selected answer belongs to a client the lead cannot access"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(tmp, 'refuse.db')
+        lead_id, client_ids = _setup(app)
+        with app.app_context():
+            ids = _waiting_ids(client_ids[0], 3) + _waiting_ids(client_ids[1], 1)
+            before = _review_state()
+
+        lead = login_as(app, lead_id, 'lead')
+        assert lead.post('/review/bulk', data={'action': 'approve', 'response_ids': ids}).status_code == 302
+        assert lead.post('/review/bulk', data={'action': 'approve', 'response_ids': [10 ** 9]}).status_code == 302
+        assert lead.post('/review/bulk', data={'action': 'delete', 'response_ids': ids[:3]}).status_code == 302
+        client = login_as(app, client_ids[0], 'client')
+        client.post('/review/bulk', data={'action': 'approve', 'response_ids': ids[:3]})
+        with app.app_context():
+            assert _review_state() == before
+    print("   ✅ Unassigned, missing and invalid selections changed nothing")
+
+
+def main():
+    """Run all tests"""
+    print("Bulk Review Test")
+    print("=" * 40)
+
+    tests = [test_bulk_matches_single_reviews, test_bulk_refuses_unassigned_clients]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"❌ Test {test.__name__} failed: {e}")
+
+    print("=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test script for catalog question/option ids.
+Checks the catalog seeded from devweb.csv, that the backfill migration resumes
+after an interruption, and that saved answers reference the catalog.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import (db, calculate_question_score_from_csv, get_questionnaire, get_section_ids,
+                 sync_question_catalog, AssessmentSnapshot, Product, Question, QuestionOption, QuestionnaireResponse,
+                 RejectedQuestion)
+from migrate_catalog_ids import backfill_responses, migrate_catalog_ids
+from seed_data import seed_database
+from testing import login_as, make_app
+
+
+def _app(tmp):
+    return make_app(tmp, 'catalog.db', UPLOAD_FOLDER=os.path.join(tmp, 'uploads'))
+
+
+def test_backfill_resumes_after_interruption():
+    """An interrupted backfill keeps its committed batches and a second run links the rest"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = _app(tmp)
+        seed_database(app, seed=3, reset=True, clients=2, leads=1, products_per_client=1, completion=1.0)
+        with app.app_context():
+            expected = {r.id: (r.question_id, r.option_id) for r in QuestionnaireResponse.query}
+            expected_scores = AssessmentSnapshot(QuestionnaireResponse.query.all()).scored
+            QuestionnaireResponse.query.update({'question_id': None, 'option_id': None})
+            RejectedQuestion.query.update({'question_id': None})
+            db.session.commit()
+
+            def interrupt(message):
+                raise KeyboardInterrupt
+            try:
+                backfill_responses(db, batch_size=25, progress=interrupt)
+            except KeyboardInterrupt:
+                pass
+            assert QuestionnaireResponse.query.filter(QuestionnaireResponse.question_id.isnot(None)).count() == 25
+
+        summary = migrate_catalog_ids(app, batch_size=25)
+        assert summary['responses_linked'] == len(expected) - 25 and summary['responses_unknown'] == 0
+        assert summary['questions_added'] == summary['options_added'] == 0
+        with app.app_context():
+            responses = QuestionnaireResponse.query.all()
+            assert {r.id: (r.question_id, r.option_id) for r in responses} == expected
+            for response in responses:
+                option = db.session.get(QuestionOption, response.option_id)
+                assert option.question.text == response.question and option.text == response.answer
+                assert option.score == calculate_question_score_from_csv(response.question, response.answer)
+            assert RejectedQuestion.query.filter(RejectedQuestion.question_id.is_(None)).count() == 0
+            assert AssessmentSnapshot(responses).scored == expected_scores
+    print(f"   ✅ {len(expected)} responses linked across an interrupted backfill")
+
+
+def test_catalog_sync_and_saved_answers():
+    """The catalog matches the questionnaire, keeps its ids on resync and new answers reference it"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = _app(tmp)
+        seed_database(app, seed=4, reset=True, clients=1, leads=1, products_per_client=1, completion=0.0)
+        questionnaire = get_questionnaire()
+        with app.app_context():
+            assert Question.query.count() == sum(len(questions) for questions in questionnaire.values())
+            ids = {(q.section, q.text): q.id for q in Question.query}
+            assert sync_question_catalog() == (0, 0)
+            assert {(q.section, q.text): q.id for q in Question.query} == ids
+            product = Product.query.first()
+            product_id, owner_id = product.id, product.owner_id
+
+        section = get_section_ids()[0]
+        questions = questionnaire[section]
+        client = login_as(app, owner_id, 'client')
+        form = {f'answer_{i}': q['options'][1] for i, q in enumerate(questions)}
+        assert client.post(f'/fill_questionnaire/{product_id}/section/0', data=form).status_code == 302
+
+        with app.app_context():
+            saved = QuestionnaireResponse.query.filter_by(product_id=product_id, section=section).all()
+            assert len(saved) == len(questions)
+            for response in saved:
+                assert response.question_id == ids[(section, response.question)]
+                assert db.session.get(QuestionOption, response.option_id).text == response.answer
+    print(f"   ✅ {len(ids)} catalog questions stable across resync; saved answers carry their ids")
+
+
+def main():
+    """Run all tests"""
+    print("Catalog Ids Test")
+    print("=" * 40)
+
+    tests = [test_backfill_resumes_after_interruption, test_catalog_sync_and_saved_answers]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"❌ Test {test.__name__} failed: {e}")
+
+    print("=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Test script for one-time data fixes.
+Checks that init_database applies each fix once and records it, that a later
+boot only reads the data_fixes table, that invitation timestamps are
+normalized in batches, and that a versioned fix runs again after its version
+changes.
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sqlalchemy import event
+
+import data_fixes
+from app import db, init_database, AppliedDataFix, InvitationToken, User
+from data_fixes import data_fix, fix_key, pending_fixes, run_pending_fixes
+from testing import make_app
+
+
+
+def test_fixes_recorded_and_skipped_on_boot():
+    """The first boot applies and records every fix; the next one never touches invitations"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(tmp, 'fixes.db')
+        init_database(app)
+        with app.app_context():
+            recorded = {record.name for record in AppliedDataFix.query}
+            assert recorded == {fix_key(name) for name in data_fixes.FIXES}, recorded
+            assert User.query.filter_by(username='admin').count() == 1
+            assert pending_fixes(db, AppliedDataFix) == []
+
+            statements = []
+            def record(conn, cursor, statement, *args):
+                statements.append(statement)
+            event.listen(db.engine, 'before_cursor_execute', record)
+            try:
+                init_database(app)
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', record)
+            queries = [s for s in statements if not s.startswith('PRAGMA')]
+            assert queries == ['SELECT data_fixes.name \nFROM data_fixes'], queries
+            assert User.query.filter_by(username='admin').count() == 1
+    print(f"   ✅ {len(recorded)} fixes applied once; second boot read only data_fixes")
+
+
+def test_invitation_timestamps_normalized_in_batches():
+    """Offset and ISO formatted timestamps become naive UTC; stored values already naive are left alone"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(tmp, 'fixes.db')
+        with app.app_context():
+            db.create_all()
+            admin = User(username='fix_admin', email='fix_admin@example.com', role='superuser')
+            admin.set_password('FixAdmin123!')
+            db.session.add(admin)
+            db.session.flush()
+            now = datetime(2025, 3, 1, 12, 0, 0)
+            for i in range(7):
+                db.session.add(InvitationToken(email=f'invitee{i}@example.com', token=f'token-{i}', role='client',
+                                               expires_at=now + timedelta(days=7), created_at=now,
+                                               invited_by=admin.id))
+            db.session.commit()
+            untouched = db.session.execute(db.text(
+                "SELECT id, expires_at, created_at FROM invitation_tokens WHERE id > 4")).all()
+            db.session.execute(db.text(
+                "UPDATE invitation_tokens SET created_at = '2025-03-01T14:30:00+02:30', "
+                "expires_at = '2025-03-08T12:00:00Z' WHERE id <= 4"))
+            db.session.commit()
+
+            assert run_pending_fixes(db, AppliedDataFix, batch_size=3)[0] == ('invitation_timestamps_utc', 8)
+            rows = db.session.execute(db.text(
+                "SELECT id, expires_at, created_at FROM invitation_tokens ORDER BY id")).all()
+            fixed = {row.id: (row.expires_at, row.created_at) for row in rows if row.id <= 4}
+            assert set(fixed.values()) == {('2025-03-08 12:00:00', '2025-03-01 12:00:00.000000')}, fixed
+            assert [row for row in rows if row.id > 4] == untouched
+            token = db.session.get(InvitationToken, 1)
+            assert token.created_at == now and token.expires_at == now + timedelta(days=7)
+            assert db.session.get(AppliedDataFix, 'invitation_timestamps_utc').rows_changed == 8
+    print("   ✅ 8 timestamps normalized; naive UTC rows unchanged")
+
+
+def test_versioned_fix_reruns():
+    """A fix registered with a version runs again once the version changes"""
+    version = ['v1']
+    calls = []
+
+    @data_fix('test_versioned_fix', version=lambda: version[0])
+    def versioned_fix(db, batch_size):
+        calls.append(batch_size)
+        return 3
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            app = make_app(tmp, 'fixes.db')
+            init_database(app)
+            with app.app_context():
+                assert calls == [1000]
+                assert run_pending_fixes(db, AppliedDataFix, batch_size=50) == []
+                version[0] = 'v2'
+                assert run_pending_fixes(db, AppliedDataFix, batch_size=50) == [('test_versioned_fix', 3)]
+                assert calls == [1000, 50]
+                assert {r.name for r in AppliedDataFix.query.filter(AppliedDataFix.name.like('test_versioned_fix%'))} == {
+                    'test_versioned_fix@v1', 'test_versioned_fix@v2'}
+    finally:
+        data_fixes.FIXES.pop('test_versioned_fix', None)
+    print("   ✅ Versioned fix re-ran after its version changed")
+
+
+def main():
+    """Run all tests"""
+    print("Data Fixes Test")
+    print("=" * 40)
+
+    tests = [test_fixes_recorded_and_skipped_on_boot, test_invitation_timestamps_normalized_in_batches,
+             test_versioned_fix_reruns]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"❌ Test {test.__name__} failed: {e}")
+
+    print("=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
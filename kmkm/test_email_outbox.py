@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Test script for the email outbox.
+Delivers through a minimal local SMTP stand-in to check batching over one
+connection, retries with backoff and that invites never wait on SMTP.
+"""
+
+import os
+import sys
+import time
+import socket
+import tempfile
+import threading
+import socketserver
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import db, queue_email, EmailOutbox, User
+from email_outbox import dispatch_pending
+from testing import login_as, make_app
+
+
+class SMTPStandIn(socketserver.ThreadingTCPServer):
+    """Just enough SMTP to accept mail; recipients in `refused` get a 550"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, refused=()):
+        super().__init__(('127.0.0.1', 0), _SMTPHandler)
+        self.refused = set(refused)
+        self.messages = []
+        self.connections = 0
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def _reply(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        self.server.connections += 1
+        self._reply('220 standin ESMTP')
+        recipients = []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode().strip()
+            verb = command.split(' ', 1)[0].upper()
+            if verb in ('EHLO', 'HELO', 'NOOP', 'RSET'):
+                self._reply('250 OK')
+            elif verb == 'MAIL':
+                recipients = []
+                self._reply('250 OK')
+            elif verb == 'RCPT':
+                address = command.split(':', 1)[1].strip().strip('<>')
+                if address in self.server.refused:
+                    self._reply('550 No such user')
+                else:
+                    recipients.append(address)
+                    self._reply('250 OK')
+            elif verb == 'DATA':
+                self._reply('354 End data with <CR><LF>.<CR><LF>')
+                data = []
+                for data_line in self.rfile:
+                    if data_line in (b'.\r\n', b'.\n'):
+                        break
+                    data.append(data_line)
+                self.server.messages.append((recipients, b''.join(data)))
+                self._reply('250 Queued')
+            elif verb == 'QUIT':
+                self._reply('221 Bye')
+                return
+            else:
+                self._reply('502 Not implemented')
+
+
+def _closed_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _app(tmp, port, **config):
+    settings = {
+        'MAIL_SERVER': '127.0.0.1',
+        'MAIL_PORT': port,
+        'MAIL_USE_TLS': False,
+        'MAIL_USERNAME': None,
+        'MAIL_OUTBOX_DISPATCHER': False,
+    }
+    settings.update(config)
+    app = make_app(tmp, 'outbox.db', **settings)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def test_batch_shares_one_connection():
+    """One batch is one SMTP session; a refused recipient is retried alone"""
+    server = SMTPStandIn(refused={'nobody@example.com'})
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            app = _app(tmp, server.port, MAIL_OUTBOX_BACKOFF=60)
+            with app.app_context():
+                for i in range(4):
+                    queue_email(f'user{i}@example.com', f'Hello {i}', 'Body')
+                refused = queue_email('nobody@example.com', 'Hello', 'Body').id
+
+                counts = dispatch_pending()
+                assert counts == {'sent': 4, 'retry': 1, 'failed': 0}, counts
+                assert server.connections == 1
+                assert len(server.messages) == 4
+
+                message = db.session.get(EmailOutbox, refused)
+                assert message.status == 'pending' and message.attempts == 1
+                assert '550' in message.last_error
+                next_attempt = message.next_attempt_at.replace(tzinfo=timezone.utc)
+                assert (next_attempt - datetime.now(timezone.utc)).total_seconds() > 50
+                assert dispatch_pending() == {'sent': 0, 'retry': 0, 'failed': 0}
+        print(f"   ✅ 4 delivered over {server.connections} connection, refused one scheduled for retry")
+    finally:
+        server.stop()
+
+
+def test_unreachable_server_gives_up_after_max_attempts():
+    """Connection failures are retried with backoff, then marked failed"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = _app(tmp, _closed_port(), MAIL_OUTBOX_MAX_ATTEMPTS=2, MAIL_OUTBOX_BACKOFF=1)
+        with app.app_context():
+            message_id = queue_email('user@example.com', 'Hello', 'Body').id
+            assert dispatch_pending() == {'sent': 0, 'retry': 1, 'failed': 0}
+
+            message = db.session.get(EmailOutbox, message_id)
+            message.next_attempt_at = datetime.now(timezone.utc)
+            db.session.commit()
+            assert dispatch_pending() == {'sent': 0, 'retry': 0, 'failed': 1}
+            assert db.session.get(EmailOutbox, message_id).status == 'failed'
+    print("   ✅ Unreachable SMTP retried, then marked failed")
+
+
+def test_invite_returns_without_waiting_for_smtp():
+    """Inviting a client only queues the mail; the background thread delivers it"""
+    server = SMTPStandIn()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            app = _app(tmp, server.port, MAIL_OUTBOX_DISPATCHER=True, MAIL_OUTBOX_INTERVAL=0.1)
+            with app.app_context():
+                admin = User(username='outbox_admin', email='outbox_admin@example.com', role='superuser')
+                admin.set_password('OutboxAdmin123!')
+                db.session.add(admin)
+                db.session.commit()
+                admin_id = admin.id
+
+            client = login_as(app, admin_id, 'superuser')
+            response = client.post('/admin/invite_client', data={'email': 'invitee@example.com'})
+            assert response.status_code == 302
+
+            deadline = time.time() + 5
+            while not server.messages and time.time() < deadline:
+                time.sleep(0.05)
+            assert server.messages and server.messages[0][0] == ['invitee@example.com']
+            with app.app_context():
+                deadline = time.time() + 5
+                while EmailOutbox.query.filter_by(status='sent').count() != 1 and time.time() < deadline:
+                    time.sleep(0.05)
+                assert EmailOutbox.query.filter_by(status='sent').count() == 1
+        print("   ✅ Invite queued and delivered in the background")
+    finally:
+        server.stop()
+
+
+def main():
+    """Run all tests"""
+    print("Email Outbox Test")
+    print("=" * 40)
+
+    tests = [
+        test_batch_shares_one_connection,
+        test_unreachable_server_gives_up_after_max_attempts,
+        test_invite_returns_without_waiting_for_smtp,
+    ]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"❌ Test {test.__name__} failed: {e}")
+
+    print("=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
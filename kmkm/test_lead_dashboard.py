@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Test script for the lead dashboard.
+Checks that a lead sees the complete assessments of every assigned client,
+the legacy assigned_client_id and the many-to-many assignments alike, that
+pages split them without gaps or repeats, that an assessment leaves the pages
+once update_product_status() finds a section unanswered, and that the number of
+queries does not grow with the number of responses shown.
+"""
+
+import os
+import re
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import db, get_section_ids, update_product_status, QuestionnaireResponse, User
+from seed_data import seed_database
+from testing import login_as, make_app
+
+PRODUCT_PANE = re.compile(r'id="product-(\d+)"')
+
+
+def _app(tmp, **config):
+    return make_app(tmp, 'lead_dashboard.db', QUERY_PROFILER_HEADERS=True, **config)
+
+
+def _setup(app):
+    """Assign the lead one legacy and two many-to-many clients; returns (lead id, client ids, complete assessments)"""
+    seed_database(app, seed=11, reset=True, clients=4, leads=1, products_per_client=3,
+                  completion=0.5, chat_rate=0.0)
+    with app.app_context():
+        db.session.execute(db.text('DELETE FROM lead_client_associations'))
+        clients = User.query.filter_by(role='client').order_by(User.id).all()
+        lead = User.query.filter_by(role='lead').first()
+        lead.assigned_client_id = clients[0].id
+        lead.assign_client(clients[1].id)
+        lead.assign_client(clients[2].id)
+        db.session.commit()
+
+        sections = db.session.query(
+            QuestionnaireResponse.user_id, QuestionnaireResponse.product_id,
+            db.func.count(db.distinct(QuestionnaireResponse.section))
+        ).group_by(QuestionnaireResponse.user_id, QuestionnaireResponse.product_id).all()
+        complete = {(user_id, product_id) for user_id, product_id, count in sections
+                    if count == len(get_section_ids())}
+        assert any(user_id == clients[3].id for user_id, _ in complete)
+        assert len(complete) < len(sections), 'seed left no incomplete assessment'
+        return lead.id, [client.id for client in clients], complete
+
+
+def test_all_assigned_clients_paginated():
+    """Every complete assessment of the lead's clients appears on exactly one page"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = _app(tmp, LEAD_DASHBOARD_PAGE_SIZE=2)
+        lead_id, client_ids, complete = _setup(app)
+        expected = sorted(product_id for user_id, product_id in complete if user_id in client_ids[:3])
+        client = login_as(app, lead_id, 'lead')
+
+        pages = -(-len(expected) // 2)
+        seen = []
+        for page in range(1, pages + 1):
+            html = client.get(f'/dashboard?page={page}').get_data(as_text=True)
+            products = PRODUCT_PANE.findall(html)
+            assert 0 < len(products) <= 2, (page, products)
+            assert f'page={page + 1}' in html or page == pages
+            seen += [int(product_id) for product_id in products]
+        assert sorted(seen) == expected, (seen, expected)
+        assert len(seen) == len(set(seen))
+        assert f'<h3 class="mb-0">{len(expected)}</h3>' in html
+
+        last = client.get('/dashboard?page=999').get_data(as_text=True)
+        assert PRODUCT_PANE.findall(last) == products
+    print(f"   ✅ {len(expected)} complete assessments of 3 clients over {pages} pages")
+
+
+def test_client_filter():
+    """?client= narrows the pages to one assigned client and ignores other clients"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = _app(tmp, LEAD_DASHBOARD_PAGE_SIZE=50)
+        lead_id, client_ids, complete = _setup(app)
+        client = login_as(app, lead_id, 'lead')
+
+        html = client.get(f'/dashboard?client={client_ids[1]}').get_data(as_text=True)
+        shown = sorted(int(product_id) for product_id in PRODUCT_PANE.findall(html))
+        assert shown == sorted(product_id for user_id, product_id in complete if user_id == client_ids[1])
+
+        html = client.get(f'/dashboard?client={client_ids[3]}').get_data(as_text=True)
+        shown = sorted(int(product_id) for product_id in PRODUCT_PANE.findall(html))
+        assert shown == sorted(product_id for user_id, product_id in complete if user_id in client_ids[:3])
+    print("   ✅ Client filter limited to the lead's own clients")
+
+
+def test_incomplete_after_status_update():
+    """An assessment that loses a section's answers drops off once its status is updated"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = _app(tmp, LEAD_DASHBOARD_PAGE_SIZE=50)
+        lead_id, client_ids, complete = _setup(app)
+        user_id, product_id = min(pair for pair in complete if pair[0] in client_ids[:3])
+        with app.app_context():
+            QuestionnaireResponse.query.filter_by(
+                user_id=user_id, product_id=product_id, section=get_section_ids()[0]
+            ).delete()
+            db.session.commit()
+            update_product_status(product_id, user_id)
+
+        html = login_as(app, lead_id, 'lead').get(f'/dashboard?client={user_id}').get_data(as_text=True)
+        shown = sorted(int(pane) for pane in PRODUCT_PANE.findall(html))
+        assert shown == sorted(product for user, product in complete if user == user_id and product != product_id)
+    print("   ✅ Assessment with an unanswered section left the dashboard")
+
+
+def test_query_count_independent_of_rows():
+    """A page with more assessments issues the same number of queries"""
+    counts = {}
+    for page_size in (1, 50):
+        with tempfile.TemporaryDirectory() as tmp:
+            app = _app(tmp, LEAD_DASHBOARD_PAGE_SIZE=page_size)
+            lead_id, _, _ = _setup(app)
+            response = login_as(app, lead_id, 'lead').get('/dashboard')
+            assert response.status_code == 200
+            counts[page_size] = int(response.headers['X-Query-Count'])
+    assert counts[1] == counts[50], counts
+    print(f"   ✅ {counts[50]} queries for one assessment or all of them")
+
+
+def test_unassigned_lead():
+    """A lead without clients gets the not-assigned message"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = _app(tmp)
+        lead_id, _, _ = _setup(app)
+        with app.app_context():
+            db.session.execute(db.text('DELETE FROM lead_client_associations'))
+            lead = db.session.get(User, lead_id)
+            lead.assigned_client_id = None
+            lead.invalidate_acl()
+            db.session.commit()
+        html = login_as(app, lead_id, 'lead').get('/dashboard').get_data(as_text=True)
+        assert 'You have not been assigned to review any client yet' in html
+        assert not PRODUCT_PANE.findall(html)
+    print("   ✅ Unassigned lead sees the not-assigned message")
+
+
+def main():
+    """Run all tests"""
+    print("Lead Dashboard Test")
+    print("=" * 40)
+
+    tests = [test_all_assigned_clients_paginated, test_client_filter, test_incomplete_after_status_update,
+             test_query_count_independent_of_rows, test_unassigned_lead]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"❌ Test {test.__name__} failed: {e}")
+
+    print("=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test script for the multi-process metrics registry.
+Worker processes record into a scratch store; the exposition must combine them.
+Also checks who may scrape /metrics with and without METRICS_TOKEN.
+"""
+
+import os
+import sys
+import tempfile
+from multiprocessing import Pool
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from metrics import Metrics
+from testing import login_as, make_app
+
+
+def _registry(path):
+    registry = Metrics(path=path, flush_interval=3600)
+    registry.counter('jobs_total', 'Jobs processed')
+    registry.histogram('job_duration_seconds', 'Job duration', buckets=(0.1, 1.0))
+    return registry
+
+
+def _worker(path):
+    registry = _registry(path)
+    for _ in range(10):
+        registry.inc('jobs_total', queue='default')
+    registry.observe('job_duration_seconds', 0.5, queue='default')
+    registry.flush()
+
+
+def test_samples_aggregate_across_processes():
+    """Counters and histograms from four workers are summed in one exposition"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'metrics.db')
+        with Pool(4) as pool:
+            pool.map(_worker, [path] * 4)
+
+        output = _registry(path).render()
+        print(output)
+        assert 'jobs_total{queue="default"} 40' in output
+        assert 'job_duration_seconds_bucket{queue="default",le="0.1"} 0' in output
+        assert 'job_duration_seconds_bucket{queue="default",le="1"} 4' in output
+        assert 'job_duration_seconds_bucket{queue="default",le="+Inf"} 4' in output
+        assert 'job_duration_seconds_sum{queue="default"} 2' in output
+        assert 'job_duration_seconds_count{queue="default"} 4' in output
+        print("   ✅ Samples from 4 processes combined")
+
+
+def test_scrape_requires_token_or_local_access():
+    """Without a token only local scrapers and superusers; with one, only its bearer"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(tmp, 'metrics_access.db')
+        remote = {'REMOTE_ADDR': '203.0.113.7'}
+        client = app.test_client()
+        assert client.get('/metrics', environ_overrides=remote).status_code == 403
+        assert client.get('/metrics', headers={'X-Forwarded-For': '203.0.113.7'}).status_code == 403
+        assert client.get('/metrics').status_code == 200
+        assert login_as(app, 1, 'client').get('/metrics', environ_overrides=remote).status_code == 403
+        assert login_as(app, 1, 'superuser').get('/metrics', environ_overrides=remote).status_code == 200
+
+        app = make_app(tmp, 'metrics_access.db', METRICS_TOKEN='scrape-secret')
+        client = app.test_client()
+        assert client.get('/metrics').status_code == 403
+        assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 403
+        response = client.get('/metrics', environ_overrides=remote, headers={'Authorization': 'Bearer scrape-secret'})
+        assert response.status_code == 200 and b'securesphere_rate_limit_hits_total' in response.data
+    print("   ✅ /metrics closed to remote anonymous scrapes, open to the token")
+
+
+def main():
+    """Run all tests"""
+    print("Metrics Test")
+    print("=" * 40)
+
+    tests = [test_samples_aggregate_across_processes, test_scrape_requires_token_or_local_access]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"❌ Test {test.__name__} failed: {e}")
+
+    print("=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test script for the versioned migration runner.
+Migrates a seeded database set back to an older schema, interrupts a batched
+backfill part way and checks that the next run resumes from its checkpoint,
+and that a new database gets every version recorded without rewriting data.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import db, lead_client_association, QuestionnaireResponse, User
+from migrations import MIGRATIONS, migration_status, run_migrations
+from seed_data import seed_database
+from testing import make_app
+
+
+
+def _expected_status(response):
+    if response.is_approved:
+        return 'approved'
+    if response.needs_client_response:
+        return 'needs_revision'
+    return 'rejected' if response.is_reviewed else 'pending'
+
+
+def test_interrupted_backfill_resumes():
+    """A backfill stopped after some batches continues after its checkpoint and changes each row once"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(tmp, 'migrations.db')
+        seed_database(app, seed=5, reset=True, clients=3, leads=2, products_per_client=1, completion=1.0)
+        with app.app_context():
+            responses = QuestionnaireResponse.query.all()
+            expected = {r.id: _expected_status(r) for r in responses}
+            flagged = sum(1 for status in expected.values() if status != 'pending')
+            lead = User.query.filter_by(role='lead').first()
+            client = User.query.filter_by(role='client').first()
+            lead.assigned_client_id = client.id
+            db.session.commit()
+            lead_id, client_id = lead.id, client.id
+
+            # Back to the schema before review_status, with no migrations recorded
+            db.session.execute(db.text('ALTER TABLE questionnaire_responses DROP COLUMN review_status'))
+            db.session.execute(db.text('DELETE FROM lead_client_associations'))
+            db.session.execute(db.text("UPDATE users SET organization = NULL WHERE role = 'client'"))
+            db.session.commit()
+            db.session.remove()
+
+            batches = []
+            def interrupt(message):
+                if 'review_status/classify' in message:
+                    batches.append(message)
+                    if len(batches) == 3:
+                        raise KeyboardInterrupt
+            try:
+                run_migrations(db, batch_size=20, progress=interrupt)
+            except KeyboardInterrupt:
+                pass
+            status = {version: state for version, _, state, _, _ in migration_status(db)}
+            assert status[7] == 'partial' and status[8] == 'pending', status
+            checkpoint = db.session.execute(db.text(
+                "SELECT last_id FROM migration_checkpoints WHERE version = 7")).scalar()
+            assert checkpoint == sorted(expected)[59], checkpoint
+
+            resumed = []
+            results = run_migrations(db, batch_size=20, progress=resumed.append)
+            assert [version for version, _, _ in results] == [version for version in sorted(MIGRATIONS) if version >= 7]
+            first_batch = next(m for m in resumed if 'review_status/classify' in m)
+            assert f'id {sorted(expected)[79]:,} of' in first_batch, first_batch
+
+            stored = dict(db.session.execute(db.text('SELECT id, review_status FROM questionnaire_responses')).all())
+            assert stored == expected
+            rows = db.session.execute(db.text(
+                'SELECT rows_changed FROM schema_migrations WHERE version = 7')).scalar()
+            assert rows == flagged, (rows, flagged)
+            assert db.session.execute(db.text('SELECT count(*) FROM migration_checkpoints')).scalar() == 0
+            assert all(state == 'applied' for _, _, state, _, _ in migration_status(db))
+            assert User.query.filter(User.organization.is_(None)).count() == 0
+            assert db.session.execute(lead_client_association.select().where(
+                lead_client_association.c.lead_id == lead_id)).all()[0].client_id == client_id
+            assert run_migrations(db, batch_size=20) == []
+    print(f"   ✅ review_status backfill resumed after {checkpoint=}; {flagged} rows classified once")
+
+
+def test_new_database_records_every_version():
+    """On a new database every version is recorded and nothing is rewritten"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(tmp, 'migrations.db')
+        seed_database(app, seed=6, reset=True, clients=2, leads=1, products_per_client=1, completion=1.0)
+        with app.app_context():
+            before = dict(db.session.execute(db.text('SELECT id, review_status FROM questionnaire_responses')).all())
+            results = run_migrations(db, batch_size=50)
+            assert [version for version, _, _ in results] == sorted(MIGRATIONS)
+            assert {name: rows for _, name, rows in results}['review_status'] == 0
+            after = dict(db.session.execute(db.text('SELECT id, review_status FROM questionnaire_responses')).all())
+            assert after == before
+            assert run_migrations(db) == []
+    print(f"   ✅ {len(results)} versions recorded on a new database")
+
+
+def main():
+    """Run all tests"""
+    print("Migrations Test")
+    print("=" * 40)
+
+    tests = [test_interrupted_backfill_resumes, test_new_database_records_every_version]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"❌ Test {test.__name__} failed: {e}")
+
+    print("=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Test script for the password hashing service.
+Checks that hashes made in the process pool verify like Werkzeug's, that
+stored hashes with older parameters are upgraded on a successful login only,
+and that a full queue refuses new hashes instead of piling them up, with the
+views asking the user to try again.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from app import db, User
+from password_hasher import PasswordHashingBusy, hash_parameters, password_hasher
+from testing import login_as, make_app
+
+FAST_METHOD = 'pbkdf2:sha256:1000'
+
+
+
+def test_hash_parameters():
+    """Method strings are compared with Werkzeug's defaults filled in"""
+    assert hash_parameters('scrypt') == 'scrypt:32768:8:1'
+    assert hash_parameters('scrypt:16384') == 'scrypt:16384:8:1'
+    assert hash_parameters('pbkdf2:sha512:5000') == 'pbkdf2:sha512:5000'
+    assert generate_password_hash('x').startswith(hash_parameters('scrypt') + '$')
+    assert generate_password_hash('x', method='pbkdf2').startswith(hash_parameters('pbkdf2') + '$')
+    print("   ✅ Method defaults match Werkzeug's hash prefixes")
+
+
+def test_pool_hashes_verify():
+    """Hashes made in worker processes are ordinary Werkzeug hashes"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(tmp, 'hashing.db', PASSWORD_HASH_METHOD=FAST_METHOD, PASSWORD_HASH_WORKERS=2)
+        with app.app_context():
+            pwhash = password_hasher.hash('Correct-Horse-1')
+            assert pwhash.startswith(FAST_METHOD + '$') and check_password_hash(pwhash, 'Correct-Horse-1')
+            assert password_hasher.verify(generate_password_hash('Battery-Staple-2'), 'Battery-Staple-2')
+            assert not password_hasher.verify(pwhash, 'wrong')
+            assert not password_hasher.verify(None, 'anything')
+            assert password_hasher._pool is not None
+    password_hasher.shutdown()
+    print("   ✅ Pool hashes verify with Werkzeug and vice versa")
+
+
+def test_login_upgrades_old_hashes():
+    """A successful login stores a hash with the current parameters; a failed one changes nothing"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(tmp, 'hashing.db', PASSWORD_HASH_METHOD=FAST_METHOD, PASSWORD_HASH_WORKERS=0)
+        with app.app_context():
+            db.create_all()
+            old_hash = generate_password_hash('Upgrade-Me-3', method='pbkdf2:sha256:500')
+            user = User(username='upgrade_me', email='upgrade_me@example.com', role='client',
+                        password_hash=old_hash, first_login=False)
+            db.session.add(user)
+            db.session.commit()
+            user_id = user.id
+
+        client = app.test_client()
+        response = client.post('/login', data={'username': 'upgrade_me', 'password': 'wrong'})
+        assert '/dashboard' not in response.headers.get('Location', '')
+        with app.app_context():
+            assert db.session.get(User, user_id).password_hash == old_hash
+
+        response = client.post('/login', data={'username': 'upgrade_me', 'password': 'Upgrade-Me-3'})
+        assert response.headers['Location'].endswith('/dashboard')
+        with app.app_context():
+            new_hash = db.session.get(User, user_id).password_hash
+            assert new_hash.startswith(FAST_METHOD + '$') and check_password_hash(new_hash, 'Upgrade-Me-3')
+            assert not password_hasher.needs_rehash(new_hash)
+
+        client.get('/logout')
+        response = client.post('/login', data={'username': 'upgrade_me', 'password': 'Upgrade-Me-3'})
+        assert response.headers['Location'].endswith('/dashboard')
+        with app.app_context():
+            assert db.session.get(User, user_id).password_hash == new_hash
+    print("   ✅ Old hash upgraded on login, left alone on a failed attempt")
+
+
+def test_full_queue_refuses_hashes():
+    """With every queue slot taken, hashing fails fast and login asks the user to retry"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(tmp, 'hashing.db', PASSWORD_HASH_METHOD=FAST_METHOD, PASSWORD_HASH_WORKERS=1,
+                       PASSWORD_HASH_QUEUE=1, PASSWORD_HASH_TIMEOUT=0.2)
+        with app.app_context():
+            db.create_all()
+            user = User(username='busy_user', email='busy_user@example.com', role='client', first_login=False)
+            user.set_password('Busy-User-4')
+            db.session.add(user)
+            db.session.commit()
+
+            _, slots = password_hasher._executor(1, 1)
+            assert slots.acquire(blocking=False)
+            try:
+                try:
+                    password_hasher.hash('Busy-User-4')
+                    raise AssertionError('hash ran with the queue full')
+                except PasswordHashingBusy:
+                    pass
+                response = app.test_client().post('/login', data={'username': 'busy_user', 'password': 'Busy-User-4'})
+                assert response.status_code == 302 and '/dashboard' not in response.headers['Location']
+            finally:
+                slots.release()
+            response = app.test_client().post('/login', data={'username': 'busy_user', 'password': 'Busy-User-4'})
+            assert response.headers['Location'].endswith('/dashboard')
+    password_hasher.shutdown()
+    print("   ✅ Full queue refused a hash; login asked to retry")
+
+
+def test_full_queue_password_change_retries():
+    """Password changes with a full queue ask the user to retry and leave the password alone"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(tmp, 'hashing.db', PASSWORD_HASH_METHOD=FAST_METHOD, PASSWORD_HASH_WORKERS=1,
+                       PASSWORD_HASH_QUEUE=1, PASSWORD_HASH_TIMEOUT=0.2)
+        with app.app_context():
+            db.create_all()
+            user = User(username='busy_changer', email='busy_changer@example.com', role='client', first_login=False)
+            user.set_password('Old-Password-5')
+            db.session.add(user)
+            db.session.commit()
+            user_id, old_hash = user.id, user.password_hash
+
+        client = login_as(app, user_id, 'client')
+        form = {'current_password': 'Old-Password-5', 'new_password': 'New-Password-6',
+                'confirm_password': 'New-Password-6'}
+        with app.app_context():
+            _, slots = password_hasher._executor(1, 1)
+        assert slots.acquire(blocking=False)
+        try:
+            response = client.post('/change-password', data=form)
+            assert response.status_code == 302 and response.headers['Location'].endswith('/change-password')
+            assert 'try again in a moment' in client.get('/change-password').get_data(as_text=True)
+        finally:
+            slots.release()
+        with app.app_context():
+            assert db.session.get(User, user_id).password_hash == old_hash
+
+        response = client.post('/change-password', data=form)
+        assert response.headers['Location'].endswith('/dashboard')
+        with app.app_context():
+            assert check_password_hash(db.session.get(User, user_id).password_hash, 'New-Password-6')
+    password_hasher.shutdown()
+    print("   ✅ Full queue: password change asked to retry, then succeeded")
+
+
+def test_concurrent_hashes_share_the_pool():
+    """Hashes from many request threads all complete through the pool"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(tmp, 'hashing.db', PASSWORD_HASH_METHOD=FAST_METHOD, PASSWORD_HASH_WORKERS=2)
+        results = {}
+
+        def hash_one(i):
+            with app.app_context():
+                results[i] = password_hasher.hash(f'Thread-Password-{i}')
+
+        threads = [threading.Thread(target=hash_one, args=(i,)) for i in range(12)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(results) == 12
+        assert all(check_password_hash(pwhash, f'Thread-Password-{i}') for i, pwhash in results.items())
+    password_hasher.shutdown()
+    print("   ✅ 12 concurrent hashes completed through 2 workers")
+
+
+def main():
+    """Run all tests"""
+    print("Password Hasher Test")
+    print("=" * 40)
+
+    tests = [test_hash_parameters, test_pool_hashes_verify, test_login_upgrades_old_hashes,
+             test_full_queue_refuses_hashes, test_full_queue_password_change_retries,
+             test_concurrent_hashes_share_the_pool]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"❌ Test {test.__name__} failed: {e}")
+
+    print("=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Test script for route query plans.
+Visits the main pages of each role on a seeded database, runs EXPLAIN QUERY
+PLAN on every distinct statement and fails when one reads a whole table
+without an index. A page that lists every row of a table may scan it; those
+are listed in ALLOWED_SCANS. Also checks the per-route report of the
+QUERY_PLAN_CAPTURE recorder.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import db, query_plan_recorder, ChatMessage, Product, QuestionChat, QuestionnaireResponse, User
+from query_plans import PlanCapture, format_report, full_table_scans, plan_flags
+from seed_data import seed_database
+from testing import login_as, make_app
+
+# (role, endpoint, table) for pages that show every row of the table
+ALLOWED_SCANS = {
+    ('superuser', 'main.dashboard', 'products'),
+    ('superuser', 'main.api_all_scores', 'products'),
+    ('superuser', 'main.manage_users', 'users'),
+    ('superuser', 'main.admin_all_chats', 'question_chats'),
+    ('superuser', 'main.email_outbox_status', 'email_outbox'),  # newest first by id, stops at the LIMIT
+}
+
+
+def _pages(ids):
+    product, owner, response, lead = ids['product'], ids['owner'], ids['response'], ids['lead']
+    chat, chat_client, chat_lead, chat_product = ids['chat']
+    client_pages = [
+        '/dashboard', f'/fill_questionnaire/{product}/section/0', f'/product/{product}/results',
+        '/client/comments', '/client/question-chats', f'/api/product/{product}/scores',
+        f'/get_rejected_questions/{product}', f'/reselect_question/{response}', f'/get_question_status/{response}',
+        '/get_unread_notifications', f'/get_active_chats/{response}',
+    ]
+    lead_pages = ['/dashboard', '/lead/comments', '/lead/review-queue', f'/review/{response}', '/get_unread_notifications']
+    admin_pages = [
+        '/dashboard', f'/admin/product/{product}/details', f'/admin/product/{product}/results',
+        '/api/superuser/all_scores', '/admin/manage_clients', '/admin/manage_users',
+        f'/admin/client/{owner}/details', '/admin/all-chats', '/admin/invite_client', '/admin/email_outbox',
+    ]
+    return {
+        'client': [(owner, path) for path in client_pages] + [(chat_client, f'/question-chat/{chat}')],
+        'lead': [(lead, path) for path in lead_pages] + [
+            (chat_lead, f'/question-chat/{chat}'), (chat_lead, f'/question-chats/{chat_product}'),
+        ],
+        'superuser': [(ids['admin'], path) for path in admin_pages],
+    }
+
+
+def test_route_queries_use_indexes():
+    """No route query reads a whole table unless the page lists all of it"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(tmp, 'plans.db', UPLOAD_FOLDER=os.path.join(tmp, 'uploads'),
+                       SLOW_REQUEST_MS=60_000, SLOW_REQUEST_QUERIES=10_000)
+        seed_database(app, seed=8, reset=True, clients=6, leads=2, products_per_client=2)
+        with app.app_context():
+            admin = User(username='plan_admin', email='plan_admin@example.com', role='superuser', first_login=False)
+            admin.set_password('PlanAdmin123!')
+            db.session.add(admin)
+            db.session.commit()
+            product = Product.query.first()
+            chat = QuestionChat.query.join(ChatMessage).first()
+            ids = {
+                'admin': admin.id,
+                'product': product.id,
+                'owner': product.owner_id,
+                'lead': User.query.filter_by(role='lead').first().id,
+                'response': QuestionnaireResponse.query.filter_by(product_id=product.id).first().id,
+                'chat': (chat.id, chat.client_id, chat.lead_id, chat.product_id),
+            }
+
+            scans, statements = [], 0
+            for role, pages in _pages(ids).items():
+                with PlanCapture(db.engine) as capture:
+                    for user_id, path in pages:
+                        client = login_as(app, user_id, role)
+                        assert client.get(path).status_code < 400, path
+                for endpoint, statement, details in capture.explain():
+                    statements += 1
+                    for table in full_table_scans(details):
+                        if (role, endpoint, table) not in ALLOWED_SCANS:
+                            scans.append(f"{role} {endpoint}: SCAN {table} in {' '.join(statement.split())[:300]}")
+
+        assert not scans, "full table scans:\n" + "\n".join(scans)
+    print(f"   ✅ {statements} distinct route queries served by indexes")
+
+
+def test_scan_detection():
+    """Whole-table scans are reported; index scans and subquery results are not"""
+    assert full_table_scans(['SCAN users', 'USE TEMP B-TREE FOR ORDER BY']) == ['users']
+    assert full_table_scans(['SCAN TABLE products AS p']) == ['products']
+    assert full_table_scans(['SCAN users USING INDEX idx_user_role_created']) == []
+    assert full_table_scans(['SEARCH lead_comments USING INDEX idx_comment_response (response_id=?)']) == []
+    assert full_table_scans(['CO-ROUTINE anon_1', 'SEARCH chat_messages USING INDEX idx_chat_created (chat_id=?)',
+                             'SCAN anon_1']) == []
+    assert plan_flags(['SCAN users', 'SEARCH products_1 USING AUTOMATIC COVERING INDEX (owner_id=?) LEFT-JOIN',
+                       'USE TEMP B-TREE FOR ORDER BY']) == [
+        'SCAN TABLE users', 'AUTOMATIC INDEX on products_1', 'TEMP B-TREE for ORDER BY']
+    assert plan_flags(['SEARCH users USING INTEGER PRIMARY KEY (rowid=?)']) == []
+    print("   ✅ Plan details classified")
+
+
+def test_recorder_reports_by_route():
+    """With capture on, each endpoint's statements are explained once and reported by route"""
+    with tempfile.TemporaryDirectory() as tmp:
+        report_path = os.path.join(tmp, 'plans.json')
+        # ACL_CACHE_TTL 0: the same statements on every visit
+        assert 'query_plan_recorder' not in make_app(tmp, 'recorder.db', ACL_CACHE_TTL=0).extensions
+
+        app = make_app(tmp, 'recorder.db', ACL_CACHE_TTL=0, QUERY_PLAN_CAPTURE=True, QUERY_PLAN_REPORT=report_path)
+        seed_database(app, seed=2, reset=True, clients=2, leads=1, products_per_client=1)
+        with app.app_context():
+            admin = User(username='recorder_admin', email='recorder_admin@example.com', role='superuser', first_login=False)
+            admin.set_password('Recorder123!')
+            db.session.add(admin)
+            db.session.commit()
+            admin_id = admin.id
+        query_plan_recorder.reset()
+
+        client = login_as(app, admin_id, 'superuser')
+        assert client.get('/admin/manage_users').status_code == 200
+        first_visit = {entry['statement']: entry['count'] for entry in query_plan_recorder.report()['routes']['main.manage_users']}
+        assert client.get('/admin/manage_users').status_code == 200
+
+        report = query_plan_recorder.report()
+        assert set(report['routes']) == {'main.manage_users'}, report['routes'].keys()
+        statements = report['routes']['main.manage_users']
+        assert {entry['statement']: entry['count'] for entry in statements} == {
+            statement: count * 2 for statement, count in first_visit.items()}
+        assert all(entry['plan'] for entry in statements)
+        assert 'SCAN TABLE users' in statements[0]['flags']  # flagged statements are listed first
+        assert query_plan_recorder.write_report() == report_path and os.path.exists(report_path)
+        assert 'main.manage_users  (' in format_report(report, flagged_only=True)
+        query_plan_recorder.reset()
+    print(f"   ✅ {len(statements)} statements explained once and reported under their route")
+
+
+def main():
+    """Run all tests"""
+    print("Query Plan Test")
+    print("=" * 40)
+
+    tests = [test_scan_detection, test_route_queries_use_indexes, test_recorder_reports_by_route]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"❌ Test {test.__name__} failed: {e}")
+
+    print("=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script for the per-request query profiler.
+Uses a throwaway Flask app and in-memory database with a deliberate N+1 loop.
+"""
+
+import os
+import sys
+import logging
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from flask import Flask
+from sqlalchemy import create_engine, text
+
+from query_profiler import QueryProfiler, fingerprint
+
+
+def _build_app(**config):
+    app = Flask(__name__)
+    app.config.update(config)
+    QueryProfiler(app)
+    engine = create_engine('sqlite://')
+
+    with engine.begin() as conn:
+        conn.execute(text('CREATE TABLE products (id INTEGER PRIMARY KEY, name TEXT)'))
+        for i in range(5):
+            conn.execute(text('INSERT INTO products (name) VALUES (:name)'), {'name': f'product {i}'})
+
+    @app.route('/products')
+    def products():
+        with engine.connect() as conn:
+            ids = [row[0] for row in conn.execute(text('SELECT id FROM products'))]
+            # N+1: one lookup per product
+            names = [conn.execute(text(f'SELECT name FROM products WHERE id = {i}')).scalar() for i in ids]
+        return ', '.join(names)
+
+    return app
+
+
+def test_fingerprint_groups_literals():
+    """Queries differing only in literals share a fingerprint"""
+    assert fingerprint("SELECT * FROM users WHERE id = 7") == fingerprint("SELECT * FROM users WHERE id = 42")
+    assert fingerprint("SELECT * FROM t WHERE name = 'a'") == "SELECT * FROM t WHERE name = ?"
+    assert fingerprint("SELECT * FROM t WHERE id IN (?, ?, ?)") == "SELECT * FROM t WHERE id IN (...)"
+    print("   ✅ Fingerprints normalize literals and IN lists")
+
+
+def test_counts_queries_and_logs_slow_requests():
+    """Each request reports its query count and N+1 requests are logged"""
+    app = _build_app(QUERY_PROFILER_HEADERS=True, SLOW_REQUEST_MS=10_000, SLOW_REQUEST_QUERIES=3)
+
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    app.logger.addHandler(handler)
+
+    response = app.test_client().get('/products')
+    assert response.status_code == 200
+    assert response.headers['X-Query-Count'] == '6'
+    print(f"   ✅ Request issued {response.headers['X-Query-Count']} queries")
+
+    assert len(records) == 1
+    message = records[0].getMessage()
+    assert '6 queries' in message
+    assert '5x' in message and 'SELECT name FROM products WHERE id = ?' in message
+    print("   ✅ Slow request log groups the N+1 lookups")
+
+
+def main():
+    """Run all tests"""
+    print("Query Profiler Test")
+    print("=" * 40)
+
+    tests = [test_fingerprint_groups_literals, test_counts_queries_and_logs_slow_requests]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"❌ Test {test.__name__} failed: {e}")
+
+    print("=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
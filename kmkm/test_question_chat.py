@@ -11,7 +11,9 @@ from datetime import datetime, timezone
 # Add the app directory to the path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from app import app, db, User, Product, QuestionnaireResponse, QuestionChat, ChatMessage
+from app import create_app, db, User, Product, QuestionnaireResponse, QuestionChat, ChatMessage
+
+app = create_app()
 
 def test_question_chat_system():
     """Test the new question chat system functionality"""
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script for the question lookup index.
+Checks the index against an independent parse of devweb.csv and that the
+questionnaire page places review statuses on the right questions.
+"""
+
+import os
+import re
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import (db, calculate_question_score_from_csv, get_question_index, get_question_number_from_csv,
+                 get_questionnaire, get_section_ids, LeadComment, Product, QuestionnaireResponse, User)
+from seed_data import load_question_bank
+from testing import login_as, make_app
+
+
+def test_index_matches_csv():
+    """Scores, numbers and positions agree with the questionnaire and a fresh CSV parse"""
+    index = get_question_index()
+    bank = [question for questions in load_question_bank().values() for question in questions]
+    for number, question in enumerate(bank, start=1):
+        assert get_question_number_from_csv(question['question']) == number
+        for option, score in question['options']:
+            assert calculate_question_score_from_csv(question['question'], option) == score
+
+    for section, questions in get_questionnaire().items():
+        for position, question in enumerate(questions):
+            entry = index['by_section'][(section, question['question'])]
+            assert entry['index'] == position and entry['options'] == question['options']
+
+    assert get_question_number_from_csv('Not a question') is None
+    assert calculate_question_score_from_csv('Not a question', 'C) Something') == 3
+    print(f"   ✅ {len(bank)} questions indexed with matching numbers, positions and scores")
+
+
+def test_review_status_lands_on_matching_question():
+    """Review statuses and answers are shown against the question they belong to"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(tmp, 'index.db')
+        section = get_section_ids()[1]
+        questions = get_questionnaire()[section]
+        statuses = ['needs_revision', 'rejected', 'approved']
+        with app.app_context():
+            db.create_all()
+            client = User(username='index_client', email='index_client@example.com', role='client', first_login=False)
+            client.set_password('IndexClient123!')
+            db.session.add(client)
+            db.session.flush()
+            product = Product(name='Index product', owner_id=client.id)
+            db.session.add(product)
+            db.session.flush()
+            # Saved in reverse order so list position and question position differ
+            for position in reversed(range(len(statuses))):
+                response = QuestionnaireResponse(user_id=client.id, product_id=product.id, section=section,
+                                                 question=questions[position]['question'],
+                                                 answer=questions[position]['options'][-1])
+                db.session.add(response)
+                db.session.flush()
+                db.session.add(LeadComment(response_id=response.id, product_id=product.id, client_id=client.id,
+                                           lead_id=client.id, comment='', status=statuses[position]))
+            db.session.commit()
+            client_id, product_id = client.id, product.id
+
+        http = login_as(app, client_id, 'client')
+        page = http.get(f'/fill_questionnaire/{product_id}/section/1').get_data(as_text=True)
+        rendered = re.findall(r'answer_(\d+)"[^>]*?disabled', page)
+        assert rendered and set(rendered) == {'2'}, rendered  # only the approved question is locked
+        for position in range(len(statuses)):
+            option = questions[position]['options'][-1]
+            assert re.search(rf'name="answer_{position}"[^>]*value="{re.escape(option)}"[^>]*checked', page, re.S)
+    print("   ✅ Answers and review statuses rendered against their own questions")
+
+
+def main():
+    """Run all tests"""
+    print("Question Index Test")
+    print("=" * 40)
+
+    tests = [test_index_matches_csv, test_review_status_lands_on_matching_question]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"❌ Test {test.__name__} failed: {e}")
+
+    print("=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
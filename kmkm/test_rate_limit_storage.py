@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test script for the shared SQLite rate limit storage.
+Several worker processes hit the same limit; together they must not exceed it.
+"""
+
+import os
+import sys
+import tempfile
+from multiprocessing import Pool
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import rate_limit_storage  # noqa: F401 - registers the sqlite:// scheme
+from limits import parse
+from limits.storage import storage_from_string
+from limits.strategies import SlidingWindowCounterRateLimiter
+
+LOGIN_LIMIT = '10 per minute'
+
+
+def _worker_hits(db_path):
+    limiter = SlidingWindowCounterRateLimiter(storage_from_string(f'sqlite:///{db_path}'))
+    limit = parse(LOGIN_LIMIT)
+    return sum(limiter.hit(limit, '10.0.0.1', 'login') for _ in range(5))
+
+
+def test_limit_is_shared_across_processes():
+    """Eight workers hammering the login limit admit exactly ten requests in total"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'ratelimit.db')
+        with Pool(8) as pool:
+            admitted = sum(pool.map(_worker_hits, [db_path] * 8))
+        print(f"   ✅ Admitted {admitted} of 40 requests across 8 workers")
+        assert admitted == 10
+
+        storage = storage_from_string(f'sqlite:///{db_path}')
+        metrics = storage.get_metrics()
+        assert metrics == [{'limit': 'login/10/1/minute', 'hits': 10, 'blocked': 30}]
+
+
+def test_sliding_window_stats():
+    """Window stats reflect hits and clearing the limit resets them"""
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = storage_from_string(f'sqlite:///{os.path.join(tmp, "ratelimit.db")}')
+        limiter = SlidingWindowCounterRateLimiter(storage)
+        limit = parse('3 per hour')
+
+        for _ in range(2):
+            assert limiter.hit(limit, 'client')
+        assert limiter.get_window_stats(limit, 'client').remaining == 1
+
+        limiter.clear(limit, 'client')
+        assert limiter.get_window_stats(limit, 'client').remaining == 3
+
+
+def main():
+    """Run all tests"""
+    print("Rate Limit Storage Test")
+    print("=" * 40)
+
+    tests = [test_limit_is_shared_across_processes, test_sliding_window_stats]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"❌ Test {test.__name__} failed: {e}")
+
+    print("=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test script for the compact results payload.
+Resolves the ids in a results page payload through the catalog endpoint and
+checks they are the question/option ids the responses store and describe the
+same answers and sub-dimension scores as the database.
+"""
+
+import os
+import re
+import sys
+import json
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import (build_results_payload, get_question_catalog, AssessmentSnapshot, LeadComment,
+                 Product, QuestionnaireResponse)
+from seed_data import seed_database
+from testing import login_as, make_app
+
+PAYLOAD_PATTERN = re.compile(r'const resultsPayload = (.*?);\n')
+
+
+def test_payload_resolves_through_catalog():
+    """Every answer and sub-dimension score survives the round trip through catalog ids"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(tmp, 'payload.db', UPLOAD_FOLDER=os.path.join(tmp, 'uploads'))
+        seed_database(app, seed=5, reset=True, clients=1, leads=1, products_per_client=1, completion=1.0)
+        with app.app_context():
+            product = Product.query.first()
+            product_id, owner_id = product.id, product.owner_id
+            responses = QuestionnaireResponse.query.filter_by(product_id=product_id, user_id=owner_id).all()
+            latest_status = {}
+            for comment in LeadComment.query.filter_by(product_id=product_id).order_by(LeadComment.created_at.desc()):
+                latest_status.setdefault(comment.response_id, comment.status)
+            expected_answers = sorted((r.section, r.question, r.answer or '', latest_status.get(r.id)) for r in responses)
+            stored_ids = sorted((r.question_id, r.option_id) for r in responses if r.option_id is not None)
+            version = get_question_catalog()['version']
+            expected_scores = {name: [data['average_score'], data['question_count']]
+                               for name, data in AssessmentSnapshot(responses).subdimension_scores.items()}
+
+        client = login_as(app, owner_id, 'client')
+        page = client.get(f'/product/{product_id}/results').get_data(as_text=True)
+        payload = json.loads(PAYLOAD_PATTERN.search(page).group(1))
+        assert payload['catalog'] == version
+        assert sorted((question_id, option_id) for question_id, option_id, _ in payload['responses']) == stored_ids
+
+        catalog_response = client.get(f"/api/catalog/{payload['catalog']}")
+        assert catalog_response.status_code == 200
+        assert 'immutable' in catalog_response.headers['Cache-Control']
+        catalog = catalog_response.get_json()
+        stale = client.get('/api/catalog/0000')
+        assert stale.status_code == 302 and stale.headers['Location'].endswith(payload['catalog'])
+
+        answers = []
+        for question_id, option_id, status in payload['responses']:
+            section_id, _, question, options = catalog['questions'][str(question_id)]
+            answers.append((catalog['sections'][section_id], question, options[str(option_id)], status))
+        answers += [tuple(entry) for entry in payload['unmatched']]
+        assert sorted(answers) == expected_answers
+        assert len(payload['unmatched']) < len(payload['responses'])
+
+        scores = {catalog['subdimensions'][sub_id]: [average, count] for sub_id, average, count in payload['subdimensions']}
+        assert scores == expected_scores
+
+        # No question text is repeated in the page payload
+        assert not any(question in PAYLOAD_PATTERN.search(page).group(1) for _, question, _, _ in answers[:5])
+    print(f"   ✅ {len(answers)} answers and {len(scores)} sub-dimension scores resolved through the catalog")
+
+
+def test_unknown_answers_fall_back_to_text():
+    """Answers that are not in the catalog are carried as text instead of being dropped"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(tmp, 'payload.db')
+        with app.app_context():
+            payload = build_results_payload(
+                [{'section': 'Legacy', 'question': 'Retired question?', 'answer': 'Yes',
+                  'lead_comments': [{'status': 'approved'}]}],
+                {'Retired Sub-Dimension': {'average_score': 3.0, 'question_count': 1}},
+            )
+        assert payload['responses'] == []
+        assert payload['unmatched'] == [['Legacy', 'Retired question?', 'Yes', 'approved']]
+        assert payload['subdimensions'] == [['Retired Sub-Dimension', 3.0, 1]]
+    print("   ✅ Unknown answers and sub-dimensions sent as text")
+
+
+def main():
+    """Run all tests"""
+    print("Results Payload Test")
+    print("=" * 40)
+
+    tests = [test_payload_resolves_through_catalog, test_unknown_answers_fall_back_to_text]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"❌ Test {test.__name__} failed: {e}")
+
+    print("=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Test script for the lead review queue.
+Walks one answer through review, chat replies, rejection, re-selection and
+approval and checks its queue entry after each step, checks that the queue
+kept up by the routes matches one rebuilt from scratch, and pages through a
+lead's queue with keyset cursors.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import (db, get_questionnaire, get_section_ids, Product, QuestionChat,
+                 QuestionnaireResponse, ReviewQueueEntry, User)
+from review_queue import decode_cursor, priority_for, queue_page, rebuild
+from seed_data import seed_database
+from testing import login_as, make_app
+
+
+
+def _setup(app):
+    """Seed three clients and one lead assigned to all of them; returns (lead id, client ids)"""
+    seed_database(app, seed=21, reset=True, clients=3, leads=1, products_per_client=2,
+                  completion=1.0, review_rate=0.5, chat_rate=0.0)
+    with app.app_context():
+        lead = User.query.filter_by(role='lead').first()
+        clients = User.query.filter_by(role='client').order_by(User.id).all()
+        for client in clients:
+            lead.assign_client(client.id)
+        for product, criticality in zip(Product.query.order_by(Product.id), ['Critical', 'Low', 'High'] * 2):
+            product.business_criticality = criticality
+        db.session.commit()
+        rebuild(db)
+        return lead.id, [client.id for client in clients]
+
+
+def _entry(response_id):
+    db.session.expire_all()
+    return ReviewQueueEntry.query.filter_by(response_id=response_id).first()
+
+
+def _queued():
+    return {(entry.response_id, entry.state) for entry in ReviewQueueEntry.query}
+
+
+def test_priority_order():
+    """Criticality first, then whose turn it is"""
+    assert priority_for('Critical', 'revision', 0) > priority_for('Critical', 'review', 0)
+    assert priority_for('Critical', 'revision', 1) == priority_for('Critical', 'review', 0)
+    assert priority_for('Critical', 'revision', 0) < priority_for('High', 'review', 0)
+    assert priority_for(None, 'review', 0) == priority_for('Medium', 'review', 0) < priority_for('Low', 'review', 0)
+    print("   ✅ Priorities ordered by criticality, then by the lead's turn")
+
+
+def test_transitions_update_entry():
+    """Each review, chat and re-selection step updates the answer's entry in place"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(tmp, 'review_queue.db')
+        lead_id, client_ids = _setup(app)
+        with app.app_context():
+            resp = QuestionnaireResponse.query.filter_by(review_status='pending', is_approved=False).first()
+            response_id, owner_id = resp.id, resp.user_id
+            entry = _entry(response_id)
+            assert entry.state == 'review' and entry.priority % 2 == 0
+        lead = login_as(app, lead_id, 'lead')
+        owner = login_as(app, owner_id, 'client')
+
+        lead.post(f'/review/{response_id}', data={'action': 'needs_revision', 'comment': 'Add evidence'})
+        with app.app_context():
+            entry = _entry(response_id)
+            assert (entry.state, entry.client_replies, entry.priority % 2) == ('revision', 0, 1)
+            chat_id = QuestionChat.query.filter_by(response_id=response_id, is_active=True).first().id
+
+        owner.post(f'/question-chat/{chat_id}/send', data={'message': 'Uploaded the policy'})
+        owner.post(f'/question-chat/{chat_id}/send', data={'message': 'And the audit report'})
+        with app.app_context():
+            entry = _entry(response_id)
+            assert (entry.state, entry.client_replies, entry.priority % 2) == ('revision', 2, 0)
+
+        lead.post(f'/question-chat/{chat_id}/send', data={'message': 'Thanks, checking'})
+        with app.app_context():
+            assert (_entry(response_id).client_replies, _entry(response_id).priority % 2) == (0, 1)
+
+        lead.post(f'/review/{response_id}', data={'action': 'reject', 'comment': 'Wrong option'})
+        with app.app_context():
+            assert _entry(response_id).state == 'reselection'
+            resp = db.session.get(QuestionnaireResponse, response_id)
+            option = next(q for q in get_questionnaire()[resp.section] if q['question'] == resp.question)['options'][0]
+
+        owner.post(f'/reselect_question/{response_id}', data={'answer': option})
+        with app.app_context():
+            entry = _entry(response_id)
+            assert (entry.state, entry.client_replies, entry.priority % 2) == ('review', 1, 0)
+
+        lead.post(f'/review/{response_id}', data={'action': 'approve'})
+        with app.app_context():
+            assert _entry(response_id) is None
+            incremental = _queued()
+            rebuild(db)
+            assert _queued() == incremental
+    print("   ✅ Entry followed review → revision → replies → reselection → approval")
+
+
+def test_saved_section_requeued():
+    """Saving a section replaces its answers' entries with new ones awaiting review"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(tmp, 'review_queue.db')
+        _, client_ids = _setup(app)
+        with app.app_context():
+            product_id = Product.query.filter_by(owner_id=client_ids[0]).first().id
+            section = get_section_ids()[0]
+            old_ids = {r.id for r in QuestionnaireResponse.query.filter_by(
+                product_id=product_id, section=section, is_approved=False)}
+            assert old_ids
+
+        questions = get_questionnaire()[section]
+        form = {f'answer_{i}': q['options'][0] for i, q in enumerate(questions)}
+        response = login_as(app, client_ids[0], 'client').post(f'/fill_questionnaire/{product_id}/section/0', data=form)
+        assert response.status_code == 302
+        with app.app_context():
+            queued = _queued()
+            assert not {response_id for response_id, _ in queued} & old_ids
+            new = QuestionnaireResponse.query.filter_by(product_id=product_id, section=section, review_status='pending')
+            assert all((r.id, 'review') in queued for r in new)
+            rebuild(db)
+            assert _queued() == queued
+    print(f"   ✅ Saved section requeued {len(old_ids)} answers")
+
+
+def test_keyset_pages():
+    """Pages follow the queue order without gaps or repeats, for any cursor"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = make_app(tmp, 'review_queue.db')
+        lead_id, client_ids = _setup(app)
+        with app.app_context():
+            expected = [entry.id for entry in ReviewQueueEntry.query.filter(
+                ReviewQueueEntry.client_id.in_(client_ids[:2])
+            ).order_by(ReviewQueueEntry.priority, ReviewQueueEntry.waiting_since, ReviewQueueEntry.id)]
+            seen, cursor, pages = [], None, 0
+            while True:
+                entries, cursor = queue_page(client_ids[:2], after=decode_cursor(cursor), limit=7)
+                seen += [entry.id for entry in entries]
+                pages += 1
+                if cursor is None:
+                    break
+            assert seen == expected, (len(seen), len(expected))
+            assert decode_cursor('not-a-cursor') is None and decode_cursor(None) is None
+
+        lead = login_as(app, lead_id, 'lead')
+        html = lead.get('/lead/review-queue').get_data(as_text=True)
+        assert 'Review Next' in html and '?after=' in html
+        assert lead.get('/lead/review-queue?after=garbage').status_code == 200
+    print(f"   ✅ {len(seen)} entries of two clients over {pages} pages, in queue order")
+
+
+def main():
+    """Run all tests"""
+    print("Review Queue Test")
+    print("=" * 40)
+
+    tests = [test_priority_order, test_transitions_update_entry,
+             test_saved_section_requeued, test_keyset_pages]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"❌ Test {test.__name__} failed: {e}")
+
+    print("=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
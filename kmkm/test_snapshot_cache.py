@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Test script for the assessment snapshot cache.
+Covers LRU/TTL eviction, reads of the shared SQLite cache that do not write,
+and write-through invalidation across two apps sharing one SQLite cache, as two
+workers would.
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import db, calculate_product_score_summary, Product, QuestionnaireResponse, get_questionnaire, get_section_ids
+from seed_data import seed_database
+from snapshot_cache import MemoryBackend, SQLiteBackend
+from testing import login_as, make_app
+
+
+def test_memory_backend_lru_and_ttl():
+    """Least recently used entries are evicted first and expired entries are misses"""
+    backend = MemoryBackend('memory://', max_entries=2)
+    backend.set('a', '1', expires_at=100)
+    backend.set('b', '2', expires_at=100)
+    assert backend.get('a', now=10) == '1'  # a is now the most recent
+    backend.set('c', '3', expires_at=100)
+    assert backend.get('b', now=10) is None
+    assert backend.get('a', now=10) == '1'
+    assert backend.get('c', now=100) is None
+    print("   ✅ LRU eviction and TTL expiry")
+
+
+def test_sqlite_hits_rarely_write():
+    """Hits only refresh an entry's last use once per tenth of the TTL, yet LRU eviction still holds"""
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = SQLiteBackend(f'sqlite:///{os.path.join(tmp, "snapshot_cache.db")}', max_entries=2, ttl=100)
+        start = time.time()
+        backend.set('a', '1', expires_at=start + 100)
+        backend.set('b', '2', expires_at=start + 100)
+
+        writes = []
+        backend._conn.set_trace_callback(lambda sql: writes.append(sql) if sql.startswith('UPDATE') else None)
+        for _ in range(20):
+            assert backend.get('a', now=start + 1) == '1'
+        assert writes == []
+        assert backend.get('a', now=start + 20) == '1'
+        assert backend.get('a', now=start + 21) == '1'
+        assert len(writes) == 1
+        backend._conn.set_trace_callback(None)
+
+        backend.set('c', '3', expires_at=time.time() + 100)
+        assert backend.get('b', now=start + 22) is None  # b was used least recently
+        assert backend.get('a', now=start + 22) == '1'
+    print("   ✅ 22 hits wrote once; LRU eviction kept the hot entry")
+
+
+def test_write_invalidates_other_worker():
+    """A save through one app is visible to the next read through another"""
+    with tempfile.TemporaryDirectory() as tmp:
+        config = {
+            'SNAPSHOT_CACHE_URI': f'sqlite:///{os.path.join(tmp, "snapshot_cache.db")}',
+            'UPLOAD_FOLDER': os.path.join(tmp, 'uploads'),
+        }
+        reader_app, writer_app = make_app(tmp, 'cache.db', **config), make_app(tmp, 'cache.db', **config)
+        seed_database(writer_app, seed=9, reset=True, clients=1, leads=1, products_per_client=1, completion=1.0)
+        with writer_app.app_context():
+            product = Product.query.first()
+            product_id, owner_id = product.id, product.owner_id
+            # Leave the first section open for editing
+            QuestionnaireResponse.query.filter_by(product_id=product_id, is_approved=True).update({'is_approved': False})
+            db.session.commit()
+
+        reader = login_as(reader_app, owner_id, 'client')
+        before = reader.get(f'/api/product/{product_id}/scores').get_json()
+        assert reader.get(f'/api/product/{product_id}/scores').get_json() == before
+
+        # Answer every question in the first section with its lowest option
+        questions = get_questionnaire()[get_section_ids()[0]]
+        form = {f'answer_{i}': q['options'][0] for i, q in enumerate(questions)}
+        response = login_as(writer_app, owner_id, 'client').post(f'/fill_questionnaire/{product_id}/section/0', data=form)
+        assert response.status_code == 302
+
+        after = reader.get(f'/api/product/{product_id}/scores').get_json()
+        assert after != before, "reader served a stale score after the write"
+        with writer_app.app_context():
+            assert after == calculate_product_score_summary(product_id)
+        print("   ✅ Write through one app refreshed the other app's cached scores")
+
+
+def main():
+    """Run all tests"""
+    print("Snapshot Cache Test")
+    print("=" * 40)
+
+    tests = [test_memory_backend_lru_and_ttl, test_sqlite_hits_rarely_write, test_write_invalidates_other_worker]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"❌ Test {test.__name__} failed: {e}")
+
+    print("=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
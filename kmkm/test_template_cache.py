@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test script for template caching.
+Checks the {% cache %} tag keys, the bytecode cache on disk and that cached
+result fragments are re-rendered after a write through another worker.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import db, Product, QuestionnaireResponse, get_questionnaire, get_section_ids
+from seed_data import seed_database
+from testing import login_as, make_app
+
+
+def _app(tmp, **config):
+    return make_app(tmp, 'templates.db', SNAPSHOT_CACHE_URI=f'sqlite:///{os.path.join(tmp, "snapshot_cache.db")}',
+                    TEMPLATE_BYTECODE_CACHE_DIR=os.path.join(tmp, 'jinja_cache'),
+                    UPLOAD_FOLDER=os.path.join(tmp, 'uploads'), **config)
+
+
+def test_cache_tag_keys():
+    """A fragment renders once per key; a None key part bypasses the cache"""
+    with tempfile.TemporaryDirectory() as tmp:
+        app = _app(tmp)
+        renders = []
+        template = app.jinja_env.from_string(
+            "{% cache 'probe', part %}{{ record(part) }}<b>{{ part }}</b>{% endcache %}"
+        )
+        with app.app_context():
+            def render(part):
+                return template.render(part=part, record=lambda value: renders.append(value) or '')
+
+            assert render(1) == render(1) == '<b>1</b>'
+            assert render(2) == '<b>2</b>'
+            assert renders == [1, 2]
+            render(None)
+            render(None)
+            assert renders == [1, 2, None, None]
+            assert render('<i>') == '<b>&lt;i&gt;</b>'
+            assert render('<i>') == '<b>&lt;i&gt;</b>', "cached fragment lost its escaping"
+
+        app.jinja_env.get_template('index.html')
+        assert os.listdir(os.path.join(tmp, 'jinja_cache')), "no compiled templates written"
+    print("   ✅ Fragments cached per key and compiled templates written to disk")
+
+
+def test_results_fragment_follows_writes():
+    """Cached results are re-rendered once another worker saves new answers"""
+    with tempfile.TemporaryDirectory() as tmp:
+        reader_app, writer_app = _app(tmp), _app(tmp)
+        seed_database(writer_app, seed=11, reset=True, clients=1, leads=1, products_per_client=1, completion=1.0)
+        with writer_app.app_context():
+            product = Product.query.first()
+            product_id, owner_id = product.id, product.owner_id
+            QuestionnaireResponse.query.filter_by(product_id=product_id, is_approved=True).update({'is_approved': False})
+            db.session.commit()
+
+        reader = login_as(reader_app, owner_id, 'client')
+        before = reader.get(f'/product/{product_id}/results').data
+        assert reader.get(f'/product/{product_id}/results').data == before
+
+        questions = get_questionnaire()[get_section_ids()[0]]
+        form = {f'answer_{i}': q['options'][-1] for i, q in enumerate(questions)}
+        writer = login_as(writer_app, owner_id, 'client')
+        assert writer.post(f'/fill_questionnaire/{product_id}/section/0', data=form).status_code == 302
+
+        after = reader.get(f'/product/{product_id}/results').data
+        uncached_app = _app(tmp, TEMPLATE_FRAGMENT_CACHE=False)
+        uncached = login_as(uncached_app, owner_id, 'client').get(f'/product/{product_id}/results').data
+        assert after != before, "reader served a stale results fragment after the write"
+        assert after == uncached
+    print("   ✅ Results fragment refreshed after a write through another app")
+
+
+def main():
+    """Run all tests"""
+    print("Template Cache Test")
+    print("=" * 40)
+
+    tests = [test_cache_tag_keys, test_results_fragment_follows_writes]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"❌ Test {test.__name__} failed: {e}")
+
+    print("=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Test script for WAL archiving and point-in-time restore.
+Runs against a scratch database so the real instance database is untouched.
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from wal_archive import WalArchiver, restore, list_generations
+
+
+def _count_rows(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute('SELECT count(*) FROM submissions').fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _insert_rows(conn, count):
+    for i in range(count):
+        conn.execute('INSERT INTO submissions (answer) VALUES (?)', (f'answer {i} ' + 'x' * 400,))
+
+
+def test_point_in_time_restore():
+    """Restoring to each recorded timestamp yields exactly the rows committed by then"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'app.db')
+        archive_dir = os.path.join(tmp, 'archive')
+
+        conn = sqlite3.connect(db_path, isolation_level=None)
+        conn.execute('PRAGMA journal_mode = WAL')
+        conn.execute('CREATE TABLE submissions (id INTEGER PRIMARY KEY, answer TEXT)')
+
+        archiver = WalArchiver(db_path, archive_dir)
+        archiver.open()
+        marks = []
+        try:
+            for round_number in range(4):
+                _insert_rows(conn, 40)
+                # Alternate plain passes with checkpoints so restores span WAL restarts
+                if round_number % 2:
+                    archiver.checkpoint()
+                else:
+                    archiver.archive_once()
+                time.sleep(0.01)
+                marks.append((datetime.now(timezone.utc), _count_rows(db_path)))
+                time.sleep(0.01)
+        finally:
+            archiver.close()
+            conn.close()
+
+        for target, expected in marks:
+            output = os.path.join(tmp, f'restored_{expected}.db')
+            restore(output, target, archive_dir)
+            restored = _count_rows(output)
+            print(f"   ✅ Restore to {target.isoformat()} -> {restored} rows (expected {expected})")
+            assert restored == expected
+
+        assert len(list_generations(archive_dir)) == 1
+
+
+def test_missed_wal_reset_starts_new_generation():
+    """A WAL restart the archiver did not see forces a fresh base snapshot"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'app.db')
+        archive_dir = os.path.join(tmp, 'archive')
+
+        conn = sqlite3.connect(db_path, isolation_level=None)
+        conn.execute('PRAGMA journal_mode = WAL')
+        conn.execute('CREATE TABLE submissions (id INTEGER PRIMARY KEY, answer TEXT)')
+        _insert_rows(conn, 10)
+
+        archiver = WalArchiver(db_path, archive_dir)
+        archiver.open()
+        archiver.archive_once()
+        archiver.close()
+
+        # While the archiver is down, another process checkpoints and restarts the WAL
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        _insert_rows(conn, 15)
+
+        archiver = WalArchiver(db_path, archive_dir)
+        archiver.open()
+        try:
+            archiver.archive_once()
+        finally:
+            archiver.close()
+        conn.close()
+
+        generations = list_generations(archive_dir)
+        print(f"   ✅ Generations after missed reset: {len(generations)}")
+        assert len(generations) == 2
+
+        output = os.path.join(tmp, 'latest.db')
+        restore(output, archive_dir=archive_dir)
+        assert _count_rows(output) == 25
+
+
+def main():
+    """Run all tests"""
+    print("WAL Archive Test")
+    print("=" * 40)
+
+    tests = [test_point_in_time_restore, test_missed_wal_reset_starts_new_generation]
+    passed = 0
+    for test in tests:
+        try:
+            test()
+            passed += 1
+        except Exception as e:
+            print(f"❌ Test {test.__name__} failed: {e}")
+
+    print("=" * 40)
+    print(f"Test Results: {passed}/{len(tests)} tests passed")
+    return 0 if passed == len(tests) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,30 @@
+"""
+Helpers shared by the test scripts: an app on a throwaway SQLite database and
+a test client signed in as a given user.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app
+
+
+def make_app(tmp, name='test.db', **config):
+    """An app on the SQLite file `name` in the directory tmp, without rate limits; config overrides the defaults"""
+    return create_app(dict({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.join(tmp, name)}',
+        'SNAPSHOT_CACHE_URI': 'memory://',
+        'METRICS_DB': os.path.join(tmp, 'metrics.db'),
+        'RATELIMIT_ENABLED': False,
+    }, **config))
+
+
+def login_as(app, user_id, role):
+    """A test client whose session belongs to the user"""
+    client = app.test_client()
+    with client.session_transaction() as s:
+        s['user_id'] = user_id
+        s['role'] = role
+    return client
@@ -0,0 +1,504 @@
+#!/usr/bin/env python3
+"""
+Continuous WAL Archiving and Point-in-Time Restore for SecureSphere
+Ships committed SQLite WAL frames to a local archive directory and replays
+them on top of a base snapshot to rebuild the database as of a given time.
+
+Archive layout:
+    <archive_dir>/state.json                    archiver position
+    <archive_dir>/<generation>/base.db          consistent base snapshot
+    <archive_dir>/<generation>/manifest.jsonl   one record per WAL segment
+    <archive_dir>/<generation>/wal/*.seg.gz     raw committed WAL frames
+
+A generation starts with a base snapshot and continues for as long as the
+archiver can prove it has seen every WAL frame since. If a WAL reset is ever
+missed (for example while the archiver was stopped) a new generation with a
+fresh snapshot is started automatically.
+"""
+
+import os
+import sys
+import json
+import gzip
+import time
+import struct
+import sqlite3
+import argparse
+from datetime import datetime, timezone
+
+WAL_HEADER_SIZE = 32
+WAL_FRAME_HEADER_SIZE = 24
+WAL_MAGIC_LE = 0x377f0682
+WAL_MAGIC_BE = 0x377f0683
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+DEFAULT_DB_PATH = os.path.join(basedir, 'instance', 'securesphere.db')
+DEFAULT_ARCHIVE_DIR = os.environ.get('WAL_ARCHIVE_DIR', os.path.join(basedir, 'instance', 'wal_archive'))
+
+
+def wal_checksum(data, s0, s1, big_endian):
+    """Continue SQLite's WAL checksum over data (length must be a multiple of 8)"""
+    words = struct.unpack(f"{'>' if big_endian else '<'}{len(data) // 4}I", data)
+    for i in range(0, len(words), 2):
+        s0 = (s0 + words[i] + s1) & 0xFFFFFFFF
+        s1 = (s1 + words[i + 1] + s0) & 0xFFFFFFFF
+    return s0, s1
+
+
+def read_wal_header(wal_path):
+    """Parse the WAL header, returning None if the WAL is missing or empty"""
+    try:
+        with open(wal_path, 'rb') as f:
+            raw = f.read(WAL_HEADER_SIZE)
+    except FileNotFoundError:
+        return None
+    if len(raw) < WAL_HEADER_SIZE:
+        return None
+
+    magic, version, page_size, ckpt_seq, salt1, salt2, cksum1, cksum2 = struct.unpack('>8I', raw)
+    if magic not in (WAL_MAGIC_LE, WAL_MAGIC_BE):
+        return None
+
+    big_endian = magic == WAL_MAGIC_BE
+    if wal_checksum(raw[:24], 0, 0, big_endian) != (cksum1, cksum2):
+        return None
+
+    return {
+        'raw': raw,
+        'page_size': page_size,
+        'checkpoint_seq': ckpt_seq,
+        'salt1': salt1,
+        'salt2': salt2,
+        'checksum': (cksum1, cksum2),
+        'big_endian': big_endian
+    }
+
+
+def read_committed_frames(wal_path, header, start_frame, checksum):
+    """
+    Read valid frames from start_frame up to the last commit frame.
+
+    Returns (frame_bytes, frame_count, checksum_after_last_commit). Frames are
+    validated with the salt values and the running checksum exactly as SQLite
+    does during recovery, so torn or stale frames are never archived.
+    """
+    frame_size = WAL_FRAME_HEADER_SIZE + header['page_size']
+    committed = []
+    pending = []
+    committed_checksum = checksum
+    s0, s1 = checksum
+
+    with open(wal_path, 'rb') as f:
+        f.seek(WAL_HEADER_SIZE + start_frame * frame_size)
+        while True:
+            frame = f.read(frame_size)
+            if len(frame) < frame_size:
+                break
+
+            _, db_size, salt1, salt2, cksum1, cksum2 = struct.unpack('>6I', frame[:WAL_FRAME_HEADER_SIZE])
+            if salt1 != header['salt1'] or salt2 != header['salt2']:
+                break
+
+            s0, s1 = wal_checksum(frame[:8], s0, s1, header['big_endian'])
+            s0, s1 = wal_checksum(frame[WAL_FRAME_HEADER_SIZE:], s0, s1, header['big_endian'])
+            if (s0, s1) != (cksum1, cksum2):
+                break
+
+            pending.append(frame)
+            if db_size:
+                # Commit frame - everything read so far is durable
+                committed.extend(pending)
+                pending = []
+                committed_checksum = (s0, s1)
+
+    return b''.join(committed), len(committed), committed_checksum
+
+
+def utc_now():
+    return datetime.now(timezone.utc)
+
+
+def parse_timestamp(value):
+    """Parse an ISO timestamp, treating naive values as UTC"""
+    ts = datetime.fromisoformat(value)
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.astimezone(timezone.utc)
+
+
+class WalArchiver:
+    """Copies committed WAL frames into the archive and manages checkpoints"""
+
+    def __init__(self, db_path=DEFAULT_DB_PATH, archive_dir=DEFAULT_ARCHIVE_DIR):
+        self.db_path = db_path
+        self.wal_path = db_path + '-wal'
+        self.archive_dir = archive_dir
+        self.state_path = os.path.join(archive_dir, 'state.json')
+        self.state = None
+        self.reader = None
+        os.makedirs(archive_dir, exist_ok=True)
+
+    # ---------------- connection handling ----------------
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, isolation_level=None, timeout=30)
+        conn.execute('PRAGMA busy_timeout = 30000')
+        return conn
+
+    def open(self):
+        """Switch the database to WAL mode and hold a read transaction"""
+        conn = self._connect()
+        mode = conn.execute('PRAGMA journal_mode = WAL').fetchone()[0]
+        conn.close()
+        if mode.lower() != 'wal':
+            raise RuntimeError(f"Could not enable WAL mode (journal_mode={mode})")
+
+        self.reader = self._connect()
+        self._hold_read_lock()
+        self.state = self._load_state()
+
+    def close(self):
+        if self.reader is not None:
+            self._release_read_lock()
+            self.reader.close()
+            self.reader = None
+
+    def _hold_read_lock(self):
+        # An open read transaction stops other connections from restarting
+        # the WAL underneath us, so no frames can be lost between passes.
+        if self.reader.in_transaction:
+            return
+        self.reader.execute('BEGIN')
+        self.reader.execute('SELECT count(*) FROM sqlite_master').fetchone()
+
+    def _release_read_lock(self):
+        if self.reader.in_transaction:
+            self.reader.execute('COMMIT')
+
+    # ---------------- state handling ----------------
+
+    def _load_state(self):
+        if os.path.exists(self.state_path):
+            with open(self.state_path) as f:
+                return json.load(f)
+        return None
+
+    def _save_state(self):
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def _generation_dir(self, generation=None):
+        return os.path.join(self.archive_dir, generation or self.state['generation'])
+
+    def _append_manifest(self, record):
+        with open(os.path.join(self._generation_dir(), 'manifest.jsonl'), 'a') as f:
+            f.write(json.dumps(record) + '\n')
+
+    # ---------------- archiving ----------------
+
+    def start_generation(self, reason='initial snapshot', writer=None):
+        """Take a base snapshot and archive the current WAL prefix under a write lock"""
+        generation = utc_now().strftime('%Y%m%dT%H%M%S%fZ')
+        gen_dir = os.path.join(self.archive_dir, generation)
+        os.makedirs(os.path.join(gen_dir, 'wal'), exist_ok=True)
+
+        owns_writer = writer is None
+        if owns_writer:
+            writer = self._connect()
+            # Block writers so the snapshot and WAL position describe the same state
+            writer.execute('BEGIN IMMEDIATE')
+        try:
+            header = read_wal_header(self.wal_path)
+
+            self.state = {
+                'generation': generation,
+                'cycle': 0,
+                'segment': 0,
+                'salts': None,
+                'checkpoint_seq': None,
+                'frame': 0,
+                'checksum': None,
+                'sealed': False
+            }
+            if header:
+                self._begin_cycle(header, new_cycle=False)
+                self._archive_frames(header)
+
+            # Refresh the read snapshot while writers are blocked and copy from it;
+            # the backup API cannot read through a connection holding the write lock.
+            self._release_read_lock()
+            self._hold_read_lock()
+            dest = sqlite3.connect(os.path.join(gen_dir, 'base.db'))
+            self.reader.backup(dest)
+            dest.close()
+        finally:
+            if owns_writer:
+                writer.execute('ROLLBACK')
+                writer.close()
+
+        self._append_manifest({
+            'type': 'base',
+            'created_at': utc_now().isoformat(),
+            'reason': reason,
+            'cycle': self.state['cycle'],
+            'frame': self.state['frame']
+        })
+        self._save_state()
+        print(f"📸 Started generation {generation} ({reason})")
+        return generation
+
+    def _begin_cycle(self, header, new_cycle=True):
+        if new_cycle:
+            self.state['cycle'] += 1
+        self.state['salts'] = [header['salt1'], header['salt2']]
+        self.state['checkpoint_seq'] = header['checkpoint_seq']
+        self.state['frame'] = 0
+        self.state['checksum'] = list(header['checksum'])
+        self.state['sealed'] = False
+
+    def _archive_frames(self, header):
+        """Write committed frames past the archived position to a new segment"""
+        data, count, checksum = read_committed_frames(
+            self.wal_path, header, self.state['frame'], tuple(self.state['checksum'])
+        )
+        if not count:
+            return 0
+
+        self.state['segment'] += 1
+        name = f"{self.state['cycle']:06d}-{self.state['segment']:08d}.seg.gz"
+        with gzip.open(os.path.join(self._generation_dir(), 'wal', name), 'wb', compresslevel=1) as f:
+            f.write(data)
+
+        self._append_manifest({
+            'type': 'segment',
+            'file': name,
+            'cycle': self.state['cycle'],
+            'wal_header': header['raw'].hex(),
+            'first_frame': self.state['frame'],
+            'frames': count,
+            'archived_at': utc_now().isoformat()
+        })
+        self.state['frame'] += count
+        self.state['checksum'] = list(checksum)
+        self._save_state()
+        return count
+
+    def archive_once(self, writer=None):
+        """Archive any newly committed frames. Returns the number of frames shipped"""
+        if self.state is None or not os.path.exists(os.path.join(self._generation_dir(), 'base.db')):
+            self.start_generation(writer=writer)
+
+        header = read_wal_header(self.wal_path)
+        if header is None:
+            return 0
+
+        if self.state['salts'] != [header['salt1'], header['salt2']]:
+            expected_seq = (self.state['checkpoint_seq'] or 0) + 1
+            if self.state['salts'] is not None and self.state['sealed'] and header['checkpoint_seq'] == expected_seq:
+                # WAL was restarted after our own checkpoint - continue the chain
+                self._begin_cycle(header)
+            else:
+                self.start_generation(reason='WAL reset was not observed', writer=writer)
+                return 0
+
+        return self._archive_frames(header)
+
+    def checkpoint(self):
+        """
+        Archive the WAL tail under a write lock, then checkpoint it into the
+        database so the WAL can restart without losing unarchived frames.
+        """
+        writer = self._connect()
+        try:
+            writer.execute('BEGIN IMMEDIATE')
+            shipped = self.archive_once(writer=writer)
+
+            self._release_read_lock()
+            busy, log_frames, checkpointed = self.reader.execute('PRAGMA wal_checkpoint(PASSIVE)').fetchone()
+            # A fully backfilled WAL will be restarted by the next writer; the
+            # archive chain only continues if that restart is the next one.
+            self.state['sealed'] = not busy and log_frames == checkpointed
+            self._save_state()
+            writer.execute('ROLLBACK')
+        finally:
+            writer.close()
+            self._hold_read_lock()
+        return shipped
+
+    def run(self, interval=10.0, checkpoint_every=6):
+        """Archive continuously until interrupted"""
+        self.open()
+        print(f"🗄️  Archiving {self.db_path} -> {self.archive_dir} every {interval}s")
+        passes = 0
+        try:
+            while True:
+                passes += 1
+                if passes % checkpoint_every == 0:
+                    shipped = self.checkpoint()
+                else:
+                    shipped = self.archive_once()
+                if shipped:
+                    print(f"✅ Archived {shipped} WAL frames (generation {self.state['generation']}, cycle {self.state['cycle']})")
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            print("\n🛑 Archiver stopped by user")
+        finally:
+            self.close()
+
+
+# ---------------- restore ----------------
+
+def list_generations(archive_dir=DEFAULT_ARCHIVE_DIR):
+    """Return generation metadata sorted oldest first"""
+    generations = []
+    if not os.path.isdir(archive_dir):
+        return generations
+
+    for name in sorted(os.listdir(archive_dir)):
+        manifest_path = os.path.join(archive_dir, name, 'manifest.jsonl')
+        if not os.path.exists(manifest_path):
+            continue
+        with open(manifest_path) as f:
+            records = [json.loads(line) for line in f if line.strip()]
+        base = next((r for r in records if r['type'] == 'base'), None)
+        if base is None:
+            continue
+        segments = [r for r in records if r['type'] == 'segment']
+        generations.append({
+            'generation': name,
+            'base_created_at': base['created_at'],
+            'base_cycle': base['cycle'],
+            'base_frame': base['frame'],
+            'segments': segments,
+            'latest': segments[-1]['archived_at'] if segments else base['created_at']
+        })
+    return generations
+
+
+def restore(output_path, target=None, archive_dir=DEFAULT_ARCHIVE_DIR):
+    """
+    Rebuild the database as of target (UTC datetime, default: latest archived).
+
+    Picks the newest generation whose base snapshot predates target and replays
+    every archived WAL segment recorded at or before target on top of it.
+    Recovery granularity is the archiver interval.
+    """
+    target = target or utc_now()
+    candidates = [g for g in list_generations(archive_dir) if parse_timestamp(g['base_created_at']) <= target]
+    if not candidates:
+        raise ValueError(f"No base snapshot exists at or before {target.isoformat()}")
+    generation = candidates[-1]
+    gen_dir = os.path.join(archive_dir, generation['generation'])
+
+    if os.path.exists(output_path):
+        raise FileExistsError(f"Refusing to overwrite existing file: {output_path}")
+    for suffix in ('-wal', '-shm'):
+        if os.path.exists(output_path + suffix):
+            os.remove(output_path + suffix)
+
+    with open(os.path.join(gen_dir, 'base.db'), 'rb') as src, open(output_path, 'wb') as dst:
+        dst.write(src.read())
+    conn = sqlite3.connect(output_path, isolation_level=None)
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.close()
+
+    # Group the segments to replay by WAL cycle
+    cycles = {}
+    for segment in generation['segments']:
+        in_base = segment['cycle'] == generation['base_cycle'] and segment['first_frame'] < generation['base_frame']
+        if not in_base and parse_timestamp(segment['archived_at']) > target:
+            break
+        cycles.setdefault(segment['cycle'], []).append(segment)
+
+    replayed = 0
+    for cycle in sorted(cycles):
+        segments = cycles[cycle]
+        frames = []
+        for segment in segments:
+            with gzip.open(os.path.join(gen_dir, 'wal', segment['file']), 'rb') as f:
+                frames.append(f.read())
+
+        # Frames are replayed from the start of the cycle so SQLite's running
+        # checksum validates; pages already in the base are rewritten unchanged.
+        with open(output_path + '-wal', 'wb') as f:
+            f.write(bytes.fromhex(segments[0]['wal_header']))
+            for chunk in frames:
+                f.write(chunk)
+
+        conn = sqlite3.connect(output_path, isolation_level=None)
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        conn.close()
+        replayed += sum(s['frames'] for s in segments)
+
+    conn = sqlite3.connect(output_path, isolation_level=None)
+    conn.execute('PRAGMA journal_mode = DELETE')
+    integrity = conn.execute('PRAGMA integrity_check').fetchone()[0]
+    conn.close()
+    if integrity != 'ok':
+        raise RuntimeError(f"Restored database failed integrity check: {integrity}")
+
+    return {
+        'generation': generation['generation'],
+        'frames_replayed': replayed,
+        'segments_replayed': sum(len(s) for s in cycles.values())
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SecureSphere WAL archiving and point-in-time restore')
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help='Path to the SQLite database')
+    parser.add_argument('--archive-dir', default=DEFAULT_ARCHIVE_DIR, help='Archive directory (env: WAL_ARCHIVE_DIR)')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    archive_cmd = sub.add_parser('archive', help='Continuously archive WAL frames')
+    archive_cmd.add_argument('--interval', type=float, default=10.0, help='Seconds between archive passes')
+    archive_cmd.add_argument('--checkpoint-every', type=int, default=6, help='Checkpoint the WAL every N passes')
+    archive_cmd.add_argument('--once', action='store_true', help='Run a single archive + checkpoint pass')
+
+    sub.add_parser('snapshot', help='Start a new generation with a fresh base snapshot')
+    sub.add_parser('list', help='List archived generations')
+
+    restore_cmd = sub.add_parser('restore', help='Restore the database to a point in time')
+    restore_cmd.add_argument('--to', dest='target', help='UTC timestamp, e.g. 2025-08-06T08:30:00 (default: latest)')
+    restore_cmd.add_argument('--output', required=True, help='Path of the restored database file')
+
+    args = parser.parse_args()
+
+    if args.command == 'archive':
+        archiver = WalArchiver(args.db, args.archive_dir)
+        if args.once:
+            archiver.open()
+            try:
+                shipped = archiver.checkpoint()
+                print(f"✅ Archived {shipped} WAL frames")
+            finally:
+                archiver.close()
+        else:
+            archiver.run(interval=args.interval, checkpoint_every=args.checkpoint_every)
+    elif args.command == 'snapshot':
+        archiver = WalArchiver(args.db, args.archive_dir)
+        archiver.open()
+        try:
+            archiver.start_generation(reason='manual snapshot')
+        finally:
+            archiver.close()
+    elif args.command == 'list':
+        generations = list_generations(args.archive_dir)
+        if not generations:
+            print("No generations archived yet")
+        for g in generations:
+            frames = sum(s['frames'] for s in g['segments'])
+            print(f"📦 {g['generation']}: base {g['base_created_at']}, "
+                  f"{len(g['segments'])} segments / {frames} frames, recoverable to {g['latest']}")
+    elif args.command == 'restore':
+        target = parse_timestamp(args.target) if args.target else None
+        result = restore(args.output, target, args.archive_dir)
+        print(f"✅ Restored {args.output} from generation {result['generation']} "
+              f"({result['segments_replayed']} segments, {result['frames_replayed']} frames replayed)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())